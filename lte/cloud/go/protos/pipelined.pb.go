@@ -103,7 +103,7 @@ func (x RuleModResult_Result) String() string {
 }
 
 func (RuleModResult_Result) EnumDescriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{8, 0}
+	return fileDescriptor_e17e923ef6f5752e, []int{10, 0}
 }
 
 type DeactivateFlowsResult_Result int32
@@ -131,7 +131,7 @@ func (x DeactivateFlowsResult_Result) String() string {
 }
 
 func (DeactivateFlowsResult_Result) EnumDescriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{10, 0}
+	return fileDescriptor_e17e923ef6f5752e, []int{12, 0}
 }
 
 type FlowRequest_FlowState int32
@@ -162,7 +162,7 @@ func (x FlowRequest_FlowState) String() string {
 }
 
 func (FlowRequest_FlowState) EnumDescriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{11, 0}
+	return fileDescriptor_e17e923ef6f5752e, []int{15, 0}
 }
 
 type FlowResponse_Result int32
@@ -190,7 +190,7 @@ func (x FlowResponse_Result) String() string {
 }
 
 func (FlowResponse_Result) EnumDescriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{12, 0}
+	return fileDescriptor_e17e923ef6f5752e, []int{16, 0}
 }
 
 type SubscriberQuotaUpdate_Type int32
@@ -218,7 +218,7 @@ func (x SubscriberQuotaUpdate_Type) String() string {
 }
 
 func (SubscriberQuotaUpdate_Type) EnumDescriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{14, 0}
+	return fileDescriptor_e17e923ef6f5752e, []int{18, 0}
 }
 
 // Deprecated
@@ -657,6 +657,88 @@ func (m *DeactivateFlowsRequest) GetIpAddr() string {
 	return ""
 }
 
+// ActivateFlowsBatchRequest activates the flows of several subscribers in a
+// single call, like when sessiond recovers its sessions
+type ActivateFlowsBatchRequest struct {
+	Requests             []*ActivateFlowsRequest `protobuf:"bytes,1,rep,name=requests,proto3" json:"requests,omitempty"`
+	XXX_NoUnkeyedLiteral struct{}                `json:"-"`
+	XXX_unrecognized     []byte                  `json:"-"`
+	XXX_sizecache        int32                   `json:"-"`
+}
+
+func (m *ActivateFlowsBatchRequest) Reset()         { *m = ActivateFlowsBatchRequest{} }
+func (m *ActivateFlowsBatchRequest) String() string { return proto.CompactTextString(m) }
+func (*ActivateFlowsBatchRequest) ProtoMessage()    {}
+func (*ActivateFlowsBatchRequest) Descriptor() ([]byte, []int) {
+	return fileDescriptor_e17e923ef6f5752e, []int{8}
+}
+
+func (m *ActivateFlowsBatchRequest) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_ActivateFlowsBatchRequest.Unmarshal(m, b)
+}
+func (m *ActivateFlowsBatchRequest) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_ActivateFlowsBatchRequest.Marshal(b, m, deterministic)
+}
+func (m *ActivateFlowsBatchRequest) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_ActivateFlowsBatchRequest.Merge(m, src)
+}
+func (m *ActivateFlowsBatchRequest) XXX_Size() int {
+	return xxx_messageInfo_ActivateFlowsBatchRequest.Size(m)
+}
+func (m *ActivateFlowsBatchRequest) XXX_DiscardUnknown() {
+	xxx_messageInfo_ActivateFlowsBatchRequest.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_ActivateFlowsBatchRequest proto.InternalMessageInfo
+
+func (m *ActivateFlowsBatchRequest) GetRequests() []*ActivateFlowsRequest {
+	if m != nil {
+		return m.Requests
+	}
+	return nil
+}
+
+// DeactivateFlowsBatchRequest deactivates the flows of several subscribers in
+// a single call
+type DeactivateFlowsBatchRequest struct {
+	Requests             []*DeactivateFlowsRequest `protobuf:"bytes,1,rep,name=requests,proto3" json:"requests,omitempty"`
+	XXX_NoUnkeyedLiteral struct{}                  `json:"-"`
+	XXX_unrecognized     []byte                    `json:"-"`
+	XXX_sizecache        int32                     `json:"-"`
+}
+
+func (m *DeactivateFlowsBatchRequest) Reset()         { *m = DeactivateFlowsBatchRequest{} }
+func (m *DeactivateFlowsBatchRequest) String() string { return proto.CompactTextString(m) }
+func (*DeactivateFlowsBatchRequest) ProtoMessage()    {}
+func (*DeactivateFlowsBatchRequest) Descriptor() ([]byte, []int) {
+	return fileDescriptor_e17e923ef6f5752e, []int{9}
+}
+
+func (m *DeactivateFlowsBatchRequest) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_DeactivateFlowsBatchRequest.Unmarshal(m, b)
+}
+func (m *DeactivateFlowsBatchRequest) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_DeactivateFlowsBatchRequest.Marshal(b, m, deterministic)
+}
+func (m *DeactivateFlowsBatchRequest) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_DeactivateFlowsBatchRequest.Merge(m, src)
+}
+func (m *DeactivateFlowsBatchRequest) XXX_Size() int {
+	return xxx_messageInfo_DeactivateFlowsBatchRequest.Size(m)
+}
+func (m *DeactivateFlowsBatchRequest) XXX_DiscardUnknown() {
+	xxx_messageInfo_DeactivateFlowsBatchRequest.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_DeactivateFlowsBatchRequest proto.InternalMessageInfo
+
+func (m *DeactivateFlowsBatchRequest) GetRequests() []*DeactivateFlowsRequest {
+	if m != nil {
+		return m.Requests
+	}
+	return nil
+}
+
 type RuleModResult struct {
 	RuleId               string               `protobuf:"bytes,1,opt,name=rule_id,json=ruleId,proto3" json:"rule_id,omitempty"`
 	Result               RuleModResult_Result `protobuf:"varint,2,opt,name=result,proto3,enum=magma.lte.RuleModResult_Result" json:"result,omitempty"`
@@ -669,7 +751,7 @@ func (m *RuleModResult) Reset()         { *m = RuleModResult{} }
 func (m *RuleModResult) String() string { return proto.CompactTextString(m) }
 func (*RuleModResult) ProtoMessage()    {}
 func (*RuleModResult) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{8}
+	return fileDescriptor_e17e923ef6f5752e, []int{10}
 }
 
 func (m *RuleModResult) XXX_Unmarshal(b []byte) error {
@@ -716,7 +798,7 @@ func (m *ActivateFlowsResult) Reset()         { *m = ActivateFlowsResult{} }
 func (m *ActivateFlowsResult) String() string { return proto.CompactTextString(m) }
 func (*ActivateFlowsResult) ProtoMessage()    {}
 func (*ActivateFlowsResult) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{9}
+	return fileDescriptor_e17e923ef6f5752e, []int{11}
 }
 
 func (m *ActivateFlowsResult) XXX_Unmarshal(b []byte) error {
@@ -762,7 +844,7 @@ func (m *DeactivateFlowsResult) Reset()         { *m = DeactivateFlowsResult{} }
 func (m *DeactivateFlowsResult) String() string { return proto.CompactTextString(m) }
 func (*DeactivateFlowsResult) ProtoMessage()    {}
 func (*DeactivateFlowsResult) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{10}
+	return fileDescriptor_e17e923ef6f5752e, []int{12}
 }
 
 func (m *DeactivateFlowsResult) XXX_Unmarshal(b []byte) error {
@@ -790,6 +872,86 @@ func (m *DeactivateFlowsResult) GetResult() DeactivateFlowsResult_Result {
 	return DeactivateFlowsResult_SUCCESS
 }
 
+type ActivateFlowsBatchResult struct {
+	// Result of each request, in the order of the requests
+	Results              []*ActivateFlowsResult `protobuf:"bytes,1,rep,name=results,proto3" json:"results,omitempty"`
+	XXX_NoUnkeyedLiteral struct{}               `json:"-"`
+	XXX_unrecognized     []byte                 `json:"-"`
+	XXX_sizecache        int32                  `json:"-"`
+}
+
+func (m *ActivateFlowsBatchResult) Reset()         { *m = ActivateFlowsBatchResult{} }
+func (m *ActivateFlowsBatchResult) String() string { return proto.CompactTextString(m) }
+func (*ActivateFlowsBatchResult) ProtoMessage()    {}
+func (*ActivateFlowsBatchResult) Descriptor() ([]byte, []int) {
+	return fileDescriptor_e17e923ef6f5752e, []int{13}
+}
+
+func (m *ActivateFlowsBatchResult) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_ActivateFlowsBatchResult.Unmarshal(m, b)
+}
+func (m *ActivateFlowsBatchResult) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_ActivateFlowsBatchResult.Marshal(b, m, deterministic)
+}
+func (m *ActivateFlowsBatchResult) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_ActivateFlowsBatchResult.Merge(m, src)
+}
+func (m *ActivateFlowsBatchResult) XXX_Size() int {
+	return xxx_messageInfo_ActivateFlowsBatchResult.Size(m)
+}
+func (m *ActivateFlowsBatchResult) XXX_DiscardUnknown() {
+	xxx_messageInfo_ActivateFlowsBatchResult.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_ActivateFlowsBatchResult proto.InternalMessageInfo
+
+func (m *ActivateFlowsBatchResult) GetResults() []*ActivateFlowsResult {
+	if m != nil {
+		return m.Results
+	}
+	return nil
+}
+
+type DeactivateFlowsBatchResult struct {
+	// Result of each request, in the order of the requests
+	Results              []*DeactivateFlowsResult `protobuf:"bytes,1,rep,name=results,proto3" json:"results,omitempty"`
+	XXX_NoUnkeyedLiteral struct{}                 `json:"-"`
+	XXX_unrecognized     []byte                   `json:"-"`
+	XXX_sizecache        int32                    `json:"-"`
+}
+
+func (m *DeactivateFlowsBatchResult) Reset()         { *m = DeactivateFlowsBatchResult{} }
+func (m *DeactivateFlowsBatchResult) String() string { return proto.CompactTextString(m) }
+func (*DeactivateFlowsBatchResult) ProtoMessage()    {}
+func (*DeactivateFlowsBatchResult) Descriptor() ([]byte, []int) {
+	return fileDescriptor_e17e923ef6f5752e, []int{14}
+}
+
+func (m *DeactivateFlowsBatchResult) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_DeactivateFlowsBatchResult.Unmarshal(m, b)
+}
+func (m *DeactivateFlowsBatchResult) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_DeactivateFlowsBatchResult.Marshal(b, m, deterministic)
+}
+func (m *DeactivateFlowsBatchResult) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_DeactivateFlowsBatchResult.Merge(m, src)
+}
+func (m *DeactivateFlowsBatchResult) XXX_Size() int {
+	return xxx_messageInfo_DeactivateFlowsBatchResult.Size(m)
+}
+func (m *DeactivateFlowsBatchResult) XXX_DiscardUnknown() {
+	xxx_messageInfo_DeactivateFlowsBatchResult.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_DeactivateFlowsBatchResult proto.InternalMessageInfo
+
+func (m *DeactivateFlowsBatchResult) GetResults() []*DeactivateFlowsResult {
+	if m != nil {
+		return m.Results
+	}
+	return nil
+}
+
 type FlowRequest struct {
 	Match                *FlowMatch            `protobuf:"bytes,1,opt,name=match,proto3" json:"match,omitempty"`
 	AppName              string                `protobuf:"bytes,2,opt,name=app_name,json=appName,proto3" json:"app_name,omitempty"`
@@ -807,7 +969,7 @@ func (m *FlowRequest) Reset()         { *m = FlowRequest{} }
 func (m *FlowRequest) String() string { return proto.CompactTextString(m) }
 func (*FlowRequest) ProtoMessage()    {}
 func (*FlowRequest) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{11}
+	return fileDescriptor_e17e923ef6f5752e, []int{15}
 }
 
 func (m *FlowRequest) XXX_Unmarshal(b []byte) error {
@@ -888,7 +1050,7 @@ func (m *FlowResponse) Reset()         { *m = FlowResponse{} }
 func (m *FlowResponse) String() string { return proto.CompactTextString(m) }
 func (*FlowResponse) ProtoMessage()    {}
 func (*FlowResponse) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{12}
+	return fileDescriptor_e17e923ef6f5752e, []int{16}
 }
 
 func (m *FlowResponse) XXX_Unmarshal(b []byte) error {
@@ -938,7 +1100,7 @@ func (m *UEMacFlowRequest) Reset()         { *m = UEMacFlowRequest{} }
 func (m *UEMacFlowRequest) String() string { return proto.CompactTextString(m) }
 func (*UEMacFlowRequest) ProtoMessage()    {}
 func (*UEMacFlowRequest) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{13}
+	return fileDescriptor_e17e923ef6f5752e, []int{17}
 }
 
 func (m *UEMacFlowRequest) XXX_Unmarshal(b []byte) error {
@@ -1015,7 +1177,7 @@ func (m *SubscriberQuotaUpdate) Reset()         { *m = SubscriberQuotaUpdate{} }
 func (m *SubscriberQuotaUpdate) String() string { return proto.CompactTextString(m) }
 func (*SubscriberQuotaUpdate) ProtoMessage()    {}
 func (*SubscriberQuotaUpdate) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{14}
+	return fileDescriptor_e17e923ef6f5752e, []int{18}
 }
 
 func (m *SubscriberQuotaUpdate) XXX_Unmarshal(b []byte) error {
@@ -1068,7 +1230,7 @@ func (m *UpdateSubscriberQuotaStateRequest) Reset()         { *m = UpdateSubscri
 func (m *UpdateSubscriberQuotaStateRequest) String() string { return proto.CompactTextString(m) }
 func (*UpdateSubscriberQuotaStateRequest) ProtoMessage()    {}
 func (*UpdateSubscriberQuotaStateRequest) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{15}
+	return fileDescriptor_e17e923ef6f5752e, []int{19}
 }
 
 func (m *UpdateSubscriberQuotaStateRequest) XXX_Unmarshal(b []byte) error {
@@ -1109,7 +1271,7 @@ func (m *TableAssignment) Reset()         { *m = TableAssignment{} }
 func (m *TableAssignment) String() string { return proto.CompactTextString(m) }
 func (*TableAssignment) ProtoMessage()    {}
 func (*TableAssignment) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{16}
+	return fileDescriptor_e17e923ef6f5752e, []int{20}
 }
 
 func (m *TableAssignment) XXX_Unmarshal(b []byte) error {
@@ -1162,7 +1324,7 @@ func (m *AllTableAssignments) Reset()         { *m = AllTableAssignments{} }
 func (m *AllTableAssignments) String() string { return proto.CompactTextString(m) }
 func (*AllTableAssignments) ProtoMessage()    {}
 func (*AllTableAssignments) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{17}
+	return fileDescriptor_e17e923ef6f5752e, []int{21}
 }
 
 func (m *AllTableAssignments) XXX_Unmarshal(b []byte) error {
@@ -1202,7 +1364,7 @@ func (m *SerializedRyuPacket) Reset()         { *m = SerializedRyuPacket{} }
 func (m *SerializedRyuPacket) String() string { return proto.CompactTextString(m) }
 func (*SerializedRyuPacket) ProtoMessage()    {}
 func (*SerializedRyuPacket) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{18}
+	return fileDescriptor_e17e923ef6f5752e, []int{22}
 }
 
 func (m *SerializedRyuPacket) XXX_Unmarshal(b []byte) error {
@@ -1248,7 +1410,7 @@ func (m *PacketDropTableId) Reset()         { *m = PacketDropTableId{} }
 func (m *PacketDropTableId) String() string { return proto.CompactTextString(m) }
 func (*PacketDropTableId) ProtoMessage()    {}
 func (*PacketDropTableId) Descriptor() ([]byte, []int) {
-	return fileDescriptor_e17e923ef6f5752e, []int{19}
+	return fileDescriptor_e17e923ef6f5752e, []int{23}
 }
 
 func (m *PacketDropTableId) XXX_Unmarshal(b []byte) error {
@@ -1292,9 +1454,13 @@ func init() {
 	proto.RegisterType((*RequestOriginType)(nil), "magma.lte.RequestOriginType")
 	proto.RegisterType((*ActivateFlowsRequest)(nil), "magma.lte.ActivateFlowsRequest")
 	proto.RegisterType((*DeactivateFlowsRequest)(nil), "magma.lte.DeactivateFlowsRequest")
+	proto.RegisterType((*ActivateFlowsBatchRequest)(nil), "magma.lte.ActivateFlowsBatchRequest")
+	proto.RegisterType((*DeactivateFlowsBatchRequest)(nil), "magma.lte.DeactivateFlowsBatchRequest")
 	proto.RegisterType((*RuleModResult)(nil), "magma.lte.RuleModResult")
 	proto.RegisterType((*ActivateFlowsResult)(nil), "magma.lte.ActivateFlowsResult")
 	proto.RegisterType((*DeactivateFlowsResult)(nil), "magma.lte.DeactivateFlowsResult")
+	proto.RegisterType((*ActivateFlowsBatchResult)(nil), "magma.lte.ActivateFlowsBatchResult")
+	proto.RegisterType((*DeactivateFlowsBatchResult)(nil), "magma.lte.DeactivateFlowsBatchResult")
 	proto.RegisterType((*FlowRequest)(nil), "magma.lte.FlowRequest")
 	proto.RegisterType((*FlowResponse)(nil), "magma.lte.FlowResponse")
 	proto.RegisterType((*UEMacFlowRequest)(nil), "magma.lte.UEMacFlowRequest")
@@ -1309,102 +1475,108 @@ func init() {
 func init() { proto.RegisterFile("lte/protos/pipelined.proto", fileDescriptor_e17e923ef6f5752e) }
 
 var fileDescriptor_e17e923ef6f5752e = []byte{
-	// 1510 bytes of a gzipped FileDescriptorProto
-	0x1f, 0x8b, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0xff, 0xb4, 0x58, 0xdd, 0x6e, 0xdb, 0xb6,
-	0x17, 0x8f, 0x6c, 0xc7, 0x8e, 0x8f, 0x9d, 0xc4, 0x61, 0xd2, 0xc4, 0x71, 0x9a, 0x36, 0xd5, 0xff,
-	0x5f, 0x2c, 0x1b, 0x06, 0x07, 0xc8, 0x86, 0x76, 0x68, 0x81, 0x15, 0xaa, 0x3f, 0x52, 0x6f, 0xf9,
-	0x70, 0x69, 0xa7, 0xcb, 0x76, 0x31, 0x81, 0x96, 0x08, 0x57, 0xa8, 0x64, 0xa9, 0x22, 0xdd, 0x35,
-	0xc3, 0xb0, 0xcb, 0x5d, 0xef, 0x7a, 0xaf, 0xb0, 0xfb, 0x01, 0x03, 0xf6, 0x00, 0xbb, 0xdb, 0x03,
-	0xec, 0x19, 0xf6, 0x0e, 0x83, 0x48, 0xda, 0x51, 0x64, 0x27, 0xe9, 0x47, 0x76, 0x65, 0x91, 0x3c,
-	0xe7, 0xc7, 0x1f, 0x0f, 0x7f, 0xe7, 0x90, 0x34, 0x54, 0x5c, 0x4e, 0x77, 0x82, 0xd0, 0xe7, 0x3e,
-	0xdb, 0x09, 0x9c, 0x80, 0xba, 0xce, 0x80, 0xda, 0x55, 0xd1, 0x81, 0xf2, 0x1e, 0xe9, 0x7b, 0xa4,
-	0xea, 0x72, 0x5a, 0x59, 0xf7, 0x43, 0xeb, 0xb3, 0x70, 0x64, 0x68, 0xf9, 0x9e, 0xe7, 0x0f, 0xa4,
-	0x55, 0x65, 0x3d, 0x8e, 0xe0, 0xbb, 0x8e, 0x75, 0x6a, 0xf7, 0xd4, 0xd0, 0x56, 0x6c, 0x88, 0x51,
-	0xc6, 0x1c, 0x7f, 0x60, 0x7a, 0x64, 0x40, 0xfa, 0x34, 0x54, 0x16, 0x9b, 0x71, 0x8b, 0x61, 0x8f,
-	0x59, 0xa1, 0xd3, 0xa3, 0xe1, 0x08, 0x40, 0xff, 0x5d, 0x83, 0xa5, 0x0e, 0xe5, 0xc3, 0xa0, 0xe9,
-	0xfa, 0xdf, 0x31, 0x4c, 0x5f, 0x0e, 0x29, 0xe3, 0xe8, 0x21, 0xcc, 0x85, 0xf2, 0x93, 0x95, 0xb5,
-	0xad, 0xf4, 0x76, 0x61, 0xf7, 0x76, 0x75, 0x4c, 0xb5, 0x6a, 0x58, 0xdc, 0x79, 0x45, 0x38, 0x8d,
-	0xbb, 0xe0, 0xb1, 0x03, 0x5a, 0x81, 0x59, 0x1a, 0xf8, 0xd6, 0xf3, 0x72, 0x6a, 0x4b, 0xdb, 0xce,
-	0x60, 0xd9, 0x40, 0x4f, 0x61, 0xfe, 0xe5, 0xd0, 0xe7, 0xc4, 0x1c, 0x06, 0x36, 0xe1, 0x94, 0x95,
-	0xd3, 0x5b, 0xda, 0x76, 0x61, 0xf7, 0xe3, 0x18, 0xee, 0xb1, 0x18, 0xe9, 0x8c, 0x49, 0x3e, 0x8d,
-	0xec, 0x3b, 0x9c, 0x70, 0x3a, 0x9a, 0xa4, 0x28, 0x20, 0xa4, 0x1d, 0xd3, 0x7b, 0x8a, 0xfa, 0x71,
-	0xe3, 0x80, 0x58, 0x23, 0xea, 0xf7, 0x27, 0xa8, 0x6f, 0xc4, 0xa7, 0x88, 0x4c, 0x23, 0xde, 0x6f,
-	0x48, 0x5b, 0xef, 0x03, 0x12, 0x73, 0xb4, 0x45, 0xdc, 0xff, 0xbb, 0xf8, 0xe8, 0x3f, 0xa8, 0xc5,
-	0x88, 0x45, 0x8f, 0xe6, 0x99, 0x08, 0x9a, 0xf6, 0xbe, 0x41, 0xbb, 0x60, 0xf6, 0x9f, 0x34, 0x28,
-	0xc5, 0x65, 0xc0, 0x86, 0x2e, 0x47, 0x0f, 0x20, 0x1b, 0x8a, 0x2f, 0x31, 0xed, 0xc2, 0xae, 0x1e,
-	0x9b, 0x36, 0x69, 0x5c, 0x95, 0x3f, 0x58, 0x79, 0xe8, 0xf7, 0x20, 0xab, 0x50, 0x0a, 0x90, 0xeb,
-	0x1c, 0xd7, 0x6a, 0x8d, 0x4e, 0xa7, 0x34, 0x13, 0x35, 0x9a, 0x46, 0x6b, 0xff, 0x18, 0x37, 0x4a,
-	0x1a, 0x42, 0xb0, 0x70, 0x74, 0xdc, 0xad, 0x1b, 0xdd, 0x46, 0xdd, 0x6c, 0xb4, 0x8f, 0x6a, 0x4f,
-	0x4a, 0x29, 0x7d, 0x00, 0x4b, 0x8a, 0xf7, 0x51, 0xe8, 0xf4, 0x9d, 0x41, 0xf7, 0x34, 0xa0, 0xe8,
-	0x21, 0x64, 0xf8, 0x69, 0x40, 0x15, 0x8d, 0x0f, 0x62, 0x34, 0x26, 0x6c, 0xab, 0x67, 0x9f, 0x58,
-	0x38, 0xe9, 0x37, 0x01, 0x62, 0x50, 0x59, 0x48, 0xed, 0x9d, 0x94, 0x66, 0xc4, 0xef, 0xd7, 0x25,
-	0x4d, 0xff, 0x2d, 0x05, 0x2b, 0xd3, 0xf6, 0x0b, 0x7d, 0x08, 0x69, 0xe6, 0xd8, 0x2a, 0xe0, 0x6b,
-	0xf1, 0x95, 0x8f, 0x43, 0xdd, 0xaa, 0xe3, 0xc8, 0x06, 0xad, 0x41, 0xce, 0x09, 0x4c, 0x62, 0xdb,
-	0xa1, 0x08, 0x6a, 0x1e, 0x67, 0x9d, 0xc0, 0xb0, 0xed, 0x10, 0xad, 0xc3, 0x5c, 0x38, 0x74, 0xa9,
-	0xe9, 0xd8, 0x91, 0xdc, 0xd3, 0xdb, 0x79, 0x9c, 0x8b, 0xda, 0x2d, 0x9b, 0xa1, 0x07, 0x30, 0x6f,
-	0x9f, 0x0e, 0x88, 0xe7, 0x58, 0x66, 0xd4, 0xc5, 0xca, 0x19, 0x21, 0xa3, 0x1b, 0xb1, 0x89, 0x94,
-	0xe4, 0x86, 0x2e, 0xc5, 0x45, 0x65, 0x1b, 0x35, 0x18, 0xaa, 0xc1, 0x82, 0x12, 0x93, 0xe9, 0x8b,
-	0x95, 0x95, 0x67, 0x05, 0xcb, 0x9b, 0x97, 0x05, 0x06, 0xcf, 0x87, 0xf1, 0x2e, 0xf4, 0x39, 0xcc,
-	0x91, 0x60, 0x60, 0x12, 0xaf, 0x17, 0x96, 0xb3, 0xc2, 0xfd, 0x7f, 0x71, 0x09, 0xf7, 0xfb, 0x21,
-	0xed, 0x13, 0x4e, 0xed, 0x03, 0xf2, 0xda, 0xf1, 0x86, 0xde, 0x63, 0x87, 0x87, 0x91, 0xa6, 0x72,
-	0x24, 0x18, 0x18, 0x5e, 0x2f, 0xd4, 0xff, 0xd0, 0x60, 0xb5, 0x4e, 0xc9, 0x7b, 0x86, 0x2e, 0x1e,
-	0xa1, 0xd4, 0xf9, 0x08, 0x4d, 0xae, 0x32, 0xfd, 0xf6, 0xab, 0x8c, 0x6d, 0x4d, 0x26, 0xbe, 0x35,
-	0xfa, 0x2f, 0x1a, 0xcc, 0x47, 0xd1, 0x3c, 0xf0, 0x6d, 0xa5, 0xd3, 0x35, 0xc8, 0x29, 0x2a, 0x82,
-	0x79, 0x1e, 0x67, 0x25, 0x13, 0x74, 0x7f, 0x9c, 0x06, 0x29, 0xa1, 0xbf, 0x78, 0xaa, 0x9f, 0x83,
-	0x48, 0xe6, 0xc0, 0xfd, 0xe9, 0x39, 0xb0, 0x0c, 0x8b, 0x6d, 0x03, 0x77, 0x5b, 0xc6, 0xbe, 0x39,
-	0xea, 0xd4, 0xe2, 0x89, 0x91, 0xd2, 0x7f, 0xd5, 0x60, 0x39, 0x21, 0x4a, 0x01, 0xf3, 0x04, 0x96,
-	0x19, 0x27, 0x5c, 0x69, 0xc6, 0x94, 0xd3, 0x8c, 0x2a, 0x50, 0xf9, 0x22, 0x5a, 0x78, 0x49, 0x3a,
-	0x09, 0x25, 0x49, 0x17, 0xf4, 0x05, 0xac, 0xc4, 0xe5, 0x37, 0x86, 0x4a, 0x5d, 0x01, 0x85, 0x62,
-	0x42, 0x54, 0x58, 0xfa, 0xcf, 0x1a, 0xdc, 0x98, 0x50, 0x82, 0xe0, 0xfb, 0x28, 0x51, 0x40, 0xe2,
-	0x99, 0x3b, 0xd5, 0xe3, 0xba, 0xaa, 0xc8, 0x3f, 0x29, 0x28, 0xc4, 0xaa, 0x3c, 0xfa, 0x08, 0x66,
-	0x3d, 0xc2, 0xad, 0xe7, 0x4a, 0x93, 0x2b, 0x31, 0x1e, 0x91, 0xd9, 0x41, 0x34, 0x86, 0xa5, 0x49,
-	0x24, 0x49, 0x12, 0x04, 0xe6, 0x80, 0x78, 0x54, 0xa5, 0x73, 0x8e, 0x04, 0xc1, 0x21, 0xf1, 0x68,
-	0x34, 0xd4, 0x3b, 0xe5, 0x94, 0x99, 0xe1, 0x6b, 0x21, 0xc6, 0x0c, 0xce, 0x89, 0x36, 0x7e, 0x8d,
-	0xee, 0x40, 0x91, 0xd1, 0xf0, 0x95, 0x63, 0x51, 0x53, 0x94, 0x2a, 0xa9, 0xb6, 0x82, 0xea, 0x13,
-	0xa5, 0x67, 0x0d, 0x72, 0x2c, 0xb4, 0x4c, 0x8f, 0x58, 0x22, 0x5f, 0xf3, 0x38, 0xcb, 0x42, 0xeb,
-	0x80, 0x58, 0xd1, 0x80, 0xcd, 0xb8, 0x18, 0xc8, 0xca, 0x01, 0x9b, 0xf1, 0x68, 0xe0, 0x1e, 0xcc,
-	0x46, 0x5b, 0x47, 0xcb, 0x39, 0x11, 0xbe, 0xad, 0x04, 0x6d, 0xb5, 0x3a, 0xf1, 0x2d, 0x2b, 0xbe,
-	0x34, 0xd7, 0x7d, 0xc8, 0x8f, 0xfb, 0x50, 0x09, 0x8a, 0xcd, 0xfd, 0xa3, 0xaf, 0xcc, 0x1a, 0x6e,
-	0x44, 0x31, 0x2a, 0xcd, 0xa0, 0xdb, 0xb0, 0x21, 0x7a, 0x46, 0x2a, 0xac, 0xed, 0x1b, 0x9d, 0x4e,
-	0xab, 0xd9, 0xaa, 0x19, 0xdd, 0xd6, 0xd1, 0x61, 0x49, 0x43, 0x9b, 0xb0, 0x2e, 0x0c, 0x9a, 0xad,
-	0xc3, 0xc9, 0xe1, 0xd4, 0x18, 0xb1, 0x71, 0xd2, 0x6e, 0xe1, 0x46, 0xbd, 0x94, 0xd6, 0x7f, 0x84,
-	0xa2, 0x24, 0xc4, 0x02, 0x7f, 0xc0, 0x28, 0xba, 0x97, 0xd8, 0xf8, 0x5b, 0x13, 0xcc, 0xa5, 0xe1,
-	0x75, 0xed, 0xf7, 0x5f, 0x1a, 0x94, 0x92, 0x47, 0xfb, 0x5b, 0x96, 0x21, 0x8f, 0x58, 0xf1, 0x12,
-	0x9e, 0xf3, 0x88, 0x25, 0x6a, 0xf8, 0x2a, 0x64, 0x3d, 0xe6, 0x30, 0x5b, 0x96, 0x9f, 0x3c, 0x56,
-	0x2d, 0x74, 0x0b, 0x0a, 0x24, 0x30, 0xc7, 0x5e, 0x72, 0xbf, 0xf3, 0x24, 0x38, 0x50, 0x7e, 0x6b,
-	0x90, 0x23, 0x4a, 0x45, 0x6a, 0xb7, 0x89, 0x14, 0xd1, 0xff, 0x61, 0x21, 0xb0, 0x03, 0x93, 0x71,
-	0x12, 0x72, 0x93, 0x3b, 0x1e, 0x15, 0x9b, 0x9e, 0xc1, 0xc5, 0xc0, 0x0e, 0x3a, 0x51, 0x67, 0xd7,
-	0xf1, 0xa8, 0xfe, 0xb7, 0x06, 0x37, 0x12, 0x87, 0xba, 0x3c, 0xc1, 0xaf, 0x69, 0x59, 0x4d, 0x28,
-	0xc8, 0x3b, 0x85, 0x94, 0x6b, 0x5a, 0x6c, 0xd3, 0xdd, 0xa9, 0x68, 0xb1, 0xc9, 0xab, 0xa2, 0xc6,
-	0x82, 0xf4, 0x8c, 0xbe, 0xf5, 0x4f, 0x21, 0x23, 0xc4, 0xbd, 0x08, 0x85, 0x67, 0xc6, 0x7e, 0xab,
-	0x6e, 0x3e, 0x3d, 0x3e, 0xea, 0x1a, 0xa5, 0x19, 0x54, 0x84, 0xb9, 0xc3, 0x23, 0xd5, 0xd2, 0xd0,
-	0x3c, 0xe4, 0xbb, 0x0d, 0x7c, 0xd0, 0x3a, 0x34, 0xba, 0x51, 0x81, 0x33, 0xe1, 0xce, 0x95, 0xf7,
-	0x16, 0xf4, 0x00, 0x72, 0x67, 0xd7, 0x9e, 0xa8, 0x2c, 0x6d, 0x5d, 0x45, 0x0f, 0x8f, 0x1c, 0xf4,
-	0x10, 0x16, 0xbb, 0xa4, 0xe7, 0x52, 0x83, 0x31, 0xa7, 0x3f, 0xf0, 0xe8, 0x80, 0x9f, 0xcb, 0x6b,
-	0xed, 0x7c, 0x5e, 0x6f, 0x02, 0x78, 0xc4, 0x19, 0x98, 0x3c, 0x72, 0x51, 0x17, 0xa3, 0x7c, 0xd4,
-	0x23, 0x30, 0xd0, 0x5d, 0x58, 0x60, 0x56, 0x18, 0x15, 0x07, 0x69, 0x21, 0x0f, 0xf3, 0x0c, 0x9e,
-	0x57, 0xbd, 0xc2, 0x8a, 0xe9, 0xdf, 0xc2, 0xb2, 0xe1, 0xba, 0x89, 0x69, 0x19, 0xda, 0x83, 0x25,
-	0xe1, 0x65, 0x92, 0xb3, 0x4e, 0xb5, 0xa0, 0x4a, 0x6c, 0x41, 0x09, 0x3f, 0x5c, 0xe2, 0x09, 0x20,
-	0xfd, 0x21, 0x2c, 0x77, 0x68, 0xe8, 0x10, 0xd7, 0xf9, 0x9e, 0xda, 0xf8, 0x74, 0xd8, 0x26, 0xd6,
-	0x0b, 0xca, 0x51, 0x09, 0xd2, 0xc1, 0x0b, 0x99, 0x68, 0x45, 0x1c, 0x7d, 0x22, 0x04, 0x19, 0xc7,
-	0x63, 0x8e, 0xda, 0x72, 0xf1, 0xad, 0x57, 0x61, 0x49, 0xda, 0xd7, 0x43, 0x3f, 0x10, 0x73, 0xb5,
-	0x84, 0x3e, 0x24, 0x35, 0xa5, 0xa7, 0x59, 0x9c, 0xe3, 0x72, 0x68, 0xf7, 0xcf, 0x39, 0xc8, 0xb7,
-	0x47, 0xaf, 0x15, 0xd4, 0x56, 0xb7, 0x43, 0x79, 0x25, 0x11, 0x05, 0x1b, 0x6d, 0x26, 0x6f, 0x83,
-	0xe7, 0xae, 0xc8, 0x95, 0x8d, 0x4b, 0x2e, 0x8b, 0xfa, 0x0c, 0xc2, 0x30, 0x7f, 0xee, 0x84, 0x43,
-	0x57, 0x5d, 0xa0, 0x2b, 0xb7, 0x2e, 0x36, 0x50, 0x98, 0x27, 0xb0, 0x98, 0x38, 0x55, 0xd0, 0x9d,
-	0xcb, 0x4e, 0x1c, 0x89, 0xbb, 0x75, 0xd5, 0xa1, 0xa4, 0xcf, 0x20, 0x03, 0x16, 0xf6, 0x28, 0x97,
-	0x0b, 0x3c, 0x66, 0xa4, 0x4f, 0xd1, 0x92, 0xf2, 0x12, 0xaf, 0xb6, 0xea, 0x33, 0xdf, 0xb1, 0x2b,
-	0x95, 0xc4, 0xa9, 0x89, 0xa9, 0xe5, 0x87, 0xb6, 0x88, 0xb5, 0x3e, 0x83, 0x1e, 0x01, 0xd4, 0x42,
-	0xaa, 0x90, 0xd1, 0xea, 0xf4, 0x52, 0x5e, 0x59, 0xbb, 0xa0, 0x50, 0x4a, 0x00, 0x4c, 0x3d, 0xff,
-	0xd5, 0x3b, 0x03, 0xd4, 0x61, 0x51, 0xa6, 0xc9, 0xe8, 0x6c, 0x60, 0xef, 0x82, 0x72, 0x08, 0x8b,
-	0x67, 0xef, 0x14, 0x19, 0xe4, 0x9b, 0xc9, 0xad, 0x8e, 0xbf, 0x61, 0xae, 0x12, 0x02, 0x85, 0xca,
-	0xc5, 0xa5, 0x00, 0xbd, 0xd5, 0x4b, 0xe7, 0x4d, 0x68, 0x8f, 0x4f, 0x89, 0x29, 0xb4, 0xe3, 0xef,
-	0xc8, 0xab, 0x68, 0x37, 0xa1, 0x68, 0xd8, 0xf6, 0x18, 0x0d, 0x5d, 0xf6, 0xc8, 0xbc, 0x8c, 0x57,
-	0x2b, 0xd2, 0xac, 0x4b, 0x39, 0xbd, 0x16, 0x28, 0x19, 0xa2, 0x56, 0xbb, 0xd9, 0x3a, 0x79, 0x2f,
-	0xa8, 0x2f, 0x61, 0x75, 0x8f, 0xf2, 0x69, 0xd5, 0x6c, 0x8a, 0xee, 0xcf, 0x25, 0xe6, 0xa4, 0xcb,
-	0xe3, 0x8d, 0x6f, 0xd6, 0x85, 0xc1, 0x8e, 0xcb, 0xe9, 0x8e, 0xe5, 0xfa, 0x43, 0x7b, 0xa7, 0xef,
-	0xab, 0xbf, 0x24, 0x7a, 0x59, 0xf1, 0xfb, 0xc9, 0xbf, 0x01, 0x00, 0x00, 0xff, 0xff, 0x93, 0x75,
-	0xe0, 0xda, 0x26, 0x11, 0x00, 0x00,
+	// 1605 bytes of a gzipped FileDescriptorProto
+	0x1f, 0x8b, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0xff, 0xb4, 0x58, 0xdd, 0x6e, 0xdb, 0xc8,
+	0x15, 0x16, 0x25, 0x59, 0xb2, 0x8e, 0x64, 0x5b, 0x1e, 0x3b, 0xb6, 0x2c, 0xc7, 0x89, 0xc3, 0x24,
+	0x8d, 0x5b, 0x14, 0x32, 0xe0, 0x16, 0x49, 0x90, 0xa0, 0x0d, 0x18, 0xfd, 0x38, 0x6a, 0xfd, 0xa3,
+	0x50, 0x72, 0xea, 0x16, 0x45, 0x89, 0x11, 0x39, 0x50, 0x88, 0x88, 0x22, 0xc3, 0x19, 0xa5, 0x71,
+	0x51, 0xf4, 0xb2, 0xd7, 0xbd, 0xe8, 0x55, 0x5f, 0xa1, 0xf7, 0x0b, 0x2c, 0xb0, 0xef, 0xb0, 0x0f,
+	0xb0, 0xcf, 0xb0, 0xef, 0xb0, 0xe0, 0xcc, 0x48, 0x1e, 0x51, 0xb2, 0x95, 0x1f, 0xef, 0x95, 0xe6,
+	0xe7, 0x9c, 0xef, 0x9c, 0x39, 0xff, 0x14, 0x94, 0xfb, 0x8c, 0xec, 0x07, 0xa1, 0xcf, 0x7c, 0xba,
+	0x1f, 0xb8, 0x01, 0xe9, 0xbb, 0x03, 0xe2, 0x54, 0xf8, 0x01, 0xca, 0x79, 0xb8, 0xe7, 0xe1, 0x4a,
+	0x9f, 0x91, 0xf2, 0x96, 0x1f, 0xda, 0x4f, 0xc3, 0x11, 0xa1, 0xed, 0x7b, 0x9e, 0x3f, 0x10, 0x54,
+	0xe5, 0x2d, 0x15, 0xc1, 0xef, 0xbb, 0xf6, 0x85, 0xd3, 0x95, 0x57, 0xbb, 0xca, 0x15, 0x25, 0x94,
+	0xba, 0xfe, 0xc0, 0xf2, 0xf0, 0x00, 0xf7, 0x48, 0x28, 0x29, 0x76, 0x54, 0x8a, 0x61, 0x97, 0xda,
+	0xa1, 0xdb, 0x25, 0xe1, 0x08, 0x40, 0xff, 0x56, 0x83, 0xd5, 0x36, 0x61, 0xc3, 0xa0, 0xd1, 0xf7,
+	0xff, 0x4e, 0x4d, 0xf2, 0x7e, 0x48, 0x28, 0x43, 0xcf, 0x61, 0x31, 0x14, 0x4b, 0x5a, 0xd2, 0x76,
+	0x53, 0x7b, 0xf9, 0x83, 0xbb, 0x95, 0xb1, 0xaa, 0x15, 0xc3, 0x66, 0xee, 0x07, 0xcc, 0x88, 0xca,
+	0x62, 0x8e, 0x19, 0xd0, 0x3a, 0x2c, 0x90, 0xc0, 0xb7, 0xdf, 0x96, 0x92, 0xbb, 0xda, 0x5e, 0xda,
+	0x14, 0x1b, 0xf4, 0x1a, 0x96, 0xde, 0x0f, 0x7d, 0x86, 0xad, 0x61, 0xe0, 0x60, 0x46, 0x68, 0x29,
+	0xb5, 0xab, 0xed, 0xe5, 0x0f, 0x7e, 0xad, 0xe0, 0x9e, 0xf1, 0x9b, 0xf6, 0x58, 0xc9, 0xd7, 0x11,
+	0x7d, 0x9b, 0x61, 0x46, 0x46, 0x42, 0x0a, 0x1c, 0x42, 0xd0, 0x51, 0xbd, 0x2b, 0x55, 0x3f, 0xab,
+	0x1f, 0x63, 0x7b, 0xa4, 0xfa, 0x93, 0x29, 0xd5, 0xb7, 0x55, 0x11, 0x11, 0x69, 0xa4, 0xf7, 0x27,
+	0xaa, 0xad, 0xf7, 0x00, 0x71, 0x19, 0x2d, 0x6e, 0xf7, 0x9f, 0xcf, 0x3e, 0xfa, 0x3f, 0xe5, 0x63,
+	0xf8, 0xa3, 0x47, 0x72, 0xa6, 0x8c, 0xa6, 0x7d, 0xad, 0xd1, 0xae, 0x90, 0xfe, 0x6f, 0x0d, 0x8a,
+	0x6a, 0x18, 0xd0, 0x61, 0x9f, 0xa1, 0x67, 0x90, 0x09, 0xf9, 0x8a, 0x8b, 0x5d, 0x3e, 0xd0, 0x15,
+	0xb1, 0x71, 0xe2, 0x8a, 0xf8, 0x31, 0x25, 0x87, 0xfe, 0x18, 0x32, 0x12, 0x25, 0x0f, 0xd9, 0xf6,
+	0x59, 0xb5, 0x5a, 0x6f, 0xb7, 0x8b, 0x89, 0x68, 0xd3, 0x30, 0x9a, 0x47, 0x67, 0x66, 0xbd, 0xa8,
+	0x21, 0x04, 0xcb, 0xa7, 0x67, 0x9d, 0x9a, 0xd1, 0xa9, 0xd7, 0xac, 0x7a, 0xeb, 0xb4, 0xfa, 0xaa,
+	0x98, 0xd4, 0x07, 0xb0, 0x2a, 0xf5, 0x3e, 0x0d, 0xdd, 0x9e, 0x3b, 0xe8, 0x5c, 0x04, 0x04, 0x3d,
+	0x87, 0x34, 0xbb, 0x08, 0x88, 0x54, 0xe3, 0x91, 0xa2, 0xc6, 0x14, 0x6d, 0xe5, 0x72, 0x69, 0x72,
+	0x26, 0xfd, 0x36, 0x80, 0x02, 0x95, 0x81, 0xe4, 0xe1, 0x79, 0x31, 0xc1, 0x7f, 0xff, 0x5c, 0xd4,
+	0xf4, 0x6f, 0x92, 0xb0, 0x3e, 0xcb, 0x5f, 0xe8, 0x97, 0x90, 0xa2, 0xae, 0x23, 0x0d, 0xbe, 0xa9,
+	0xbe, 0x7c, 0x6c, 0xea, 0x66, 0xcd, 0x8c, 0x68, 0xd0, 0x26, 0x64, 0xdd, 0xc0, 0xc2, 0x8e, 0x13,
+	0x72, 0xa3, 0xe6, 0xcc, 0x8c, 0x1b, 0x18, 0x8e, 0x13, 0xa2, 0x2d, 0x58, 0x0c, 0x87, 0x7d, 0x62,
+	0xb9, 0x4e, 0x14, 0xee, 0xa9, 0xbd, 0x9c, 0x99, 0x8d, 0xf6, 0x4d, 0x87, 0xa2, 0x67, 0xb0, 0xe4,
+	0x5c, 0x0c, 0xb0, 0xe7, 0xda, 0x56, 0x74, 0x44, 0x4b, 0x69, 0x1e, 0x46, 0xb7, 0x14, 0x41, 0x32,
+	0xe4, 0x86, 0x7d, 0x62, 0x16, 0x24, 0x6d, 0xb4, 0xa1, 0xa8, 0x0a, 0xcb, 0x32, 0x98, 0x2c, 0x9f,
+	0xbf, 0xac, 0xb4, 0xc0, 0xb5, 0xbc, 0x7d, 0x9d, 0x61, 0xcc, 0xa5, 0x50, 0x3d, 0x42, 0xbf, 0x87,
+	0x45, 0x1c, 0x0c, 0x2c, 0xec, 0x75, 0xc3, 0x52, 0x86, 0xb3, 0xdf, 0x57, 0x43, 0xb8, 0xd7, 0x0b,
+	0x49, 0x0f, 0x33, 0xe2, 0x1c, 0xe3, 0x8f, 0xae, 0x37, 0xf4, 0x5e, 0xba, 0x2c, 0x8c, 0x62, 0x2a,
+	0x8b, 0x83, 0x81, 0xe1, 0x75, 0x43, 0xfd, 0x3b, 0x0d, 0x36, 0x6a, 0x04, 0x7f, 0xa5, 0xe9, 0x54,
+	0x0b, 0x25, 0x27, 0x2d, 0x34, 0xfd, 0xca, 0xd4, 0xe7, 0xbf, 0x52, 0x71, 0x4d, 0x5a, 0x75, 0x8d,
+	0x7e, 0x0e, 0x5b, 0x13, 0x6e, 0x7f, 0x89, 0x99, 0xfd, 0xf6, 0x26, 0xd2, 0x5b, 0xff, 0x2b, 0x6c,
+	0xc7, 0xec, 0x32, 0x81, 0xfd, 0xbb, 0x29, 0xec, 0x7b, 0x0a, 0xf6, 0x6c, 0x8b, 0x2a, 0xe8, 0xff,
+	0xd3, 0x60, 0x29, 0x8a, 0x82, 0x63, 0xdf, 0x91, 0xf9, 0xb5, 0x09, 0x59, 0x69, 0x42, 0x6e, 0xf1,
+	0x9c, 0x99, 0x11, 0x16, 0x44, 0x4f, 0xc6, 0xe9, 0x9b, 0xe4, 0x79, 0xa3, 0xbe, 0x61, 0x02, 0x22,
+	0x9e, 0xbb, 0x4f, 0x66, 0xe7, 0xee, 0x1a, 0xac, 0xb4, 0x0c, 0xb3, 0xd3, 0x34, 0x8e, 0xac, 0xd1,
+	0xa1, 0xa6, 0x26, 0x74, 0x52, 0xff, 0xbf, 0x06, 0x6b, 0x31, 0xeb, 0x70, 0x98, 0x57, 0xb0, 0x46,
+	0x19, 0x66, 0x32, 0xd6, 0x2d, 0x21, 0x66, 0xf4, 0xfc, 0xd2, 0x55, 0x6a, 0x99, 0xab, 0x82, 0x89,
+	0x67, 0x80, 0x60, 0x41, 0x7f, 0x80, 0x75, 0x35, 0x6d, 0xc6, 0x50, 0xc9, 0x39, 0x50, 0x48, 0x49,
+	0x20, 0x89, 0xa5, 0xff, 0x47, 0x83, 0x5b, 0x53, 0xf6, 0xe6, 0xfa, 0xbe, 0x88, 0x15, 0xbe, 0x47,
+	0xd7, 0x79, 0xe8, 0x26, 0xab, 0x5f, 0x07, 0x4a, 0xb3, 0xa2, 0x92, 0x23, 0x3d, 0x85, 0xec, 0xa4,
+	0xe1, 0xee, 0x5c, 0x1d, 0x93, 0x5c, 0x99, 0x11, 0xb9, 0x7e, 0x0e, 0xe5, 0xd9, 0x11, 0x29, 0xab,
+	0x7c, 0x0c, 0x77, 0x77, 0xde, 0x6b, 0x2f, 0x91, 0x7f, 0x4c, 0x42, 0x5e, 0xe9, 0xa6, 0xe8, 0x57,
+	0xb0, 0xe0, 0x45, 0xd0, 0x32, 0xf7, 0xd7, 0x15, 0xa4, 0x88, 0xec, 0x98, 0x8b, 0x15, 0x24, 0x51,
+	0xea, 0xe3, 0x20, 0xb0, 0x06, 0xd8, 0x23, 0xb2, 0x6c, 0x66, 0x71, 0x10, 0x9c, 0x60, 0x8f, 0x44,
+	0x57, 0xdd, 0x0b, 0x46, 0xa8, 0x15, 0x7e, 0xe4, 0x49, 0x9f, 0x36, 0xb3, 0x7c, 0x6f, 0x7e, 0x44,
+	0xf7, 0xa0, 0x40, 0x49, 0xf8, 0xc1, 0xb5, 0x89, 0xc5, 0x5b, 0x82, 0xc8, 0xea, 0xbc, 0x3c, 0xe3,
+	0x25, 0x7e, 0x13, 0xb2, 0x34, 0xb4, 0x2d, 0x0f, 0xdb, 0xbc, 0x2e, 0xe6, 0xcc, 0x0c, 0x0d, 0xed,
+	0x63, 0x6c, 0x47, 0x17, 0x0e, 0x65, 0xfc, 0x22, 0x23, 0x2e, 0x1c, 0xca, 0xa2, 0x8b, 0xc7, 0xb0,
+	0x10, 0x85, 0x1a, 0x29, 0x65, 0xb9, 0xbb, 0x77, 0x63, 0x6a, 0xcb, 0xd7, 0xf1, 0xb5, 0xe8, 0xac,
+	0x82, 0x5c, 0xf7, 0x21, 0x37, 0x3e, 0x43, 0x45, 0x28, 0x34, 0x8e, 0x4e, 0xff, 0x64, 0x55, 0xcd,
+	0x7a, 0xe4, 0xd3, 0x62, 0x02, 0xdd, 0x85, 0x6d, 0x7e, 0x32, 0xca, 0x9a, 0xea, 0x91, 0xd1, 0x6e,
+	0x37, 0x1b, 0xcd, 0xaa, 0xd1, 0x69, 0x9e, 0x9e, 0x14, 0x35, 0xb4, 0x03, 0x5b, 0x9c, 0xa0, 0xd1,
+	0x3c, 0x99, 0xbe, 0x4e, 0x8e, 0x11, 0xeb, 0xe7, 0xad, 0xa6, 0x59, 0xaf, 0x15, 0x53, 0xfa, 0xbf,
+	0xa0, 0x20, 0x14, 0xa2, 0x81, 0x3f, 0xa0, 0x04, 0x3d, 0x8e, 0x05, 0xea, 0x9d, 0x29, 0xcd, 0x05,
+	0xe1, 0x4d, 0xc5, 0xe7, 0xf7, 0x1a, 0x14, 0xe3, 0x23, 0xd4, 0x67, 0x96, 0x7b, 0x0f, 0xdb, 0x6a,
+	0xab, 0xcc, 0x7a, 0xd8, 0xe6, 0xbd, 0x72, 0x03, 0x32, 0x1e, 0x75, 0xa9, 0x23, 0xca, 0x7c, 0xce,
+	0x94, 0x3b, 0x74, 0x07, 0xf2, 0x38, 0xb0, 0xc6, 0x5c, 0xc2, 0xdf, 0x39, 0x1c, 0x1c, 0x4b, 0xbe,
+	0x4d, 0xc8, 0x62, 0x19, 0x45, 0xd2, 0xdb, 0x58, 0x04, 0xd1, 0x03, 0x58, 0x0e, 0x9c, 0xc0, 0xa2,
+	0x0c, 0x87, 0xcc, 0x62, 0xae, 0x47, 0xb8, 0xd3, 0xd3, 0x66, 0x21, 0x70, 0x82, 0x76, 0x74, 0xd8,
+	0x71, 0x3d, 0xa2, 0xff, 0xa0, 0xc1, 0xad, 0xd8, 0xf0, 0x24, 0x26, 0xa5, 0x1b, 0x7a, 0x56, 0x03,
+	0xf2, 0x62, 0x76, 0x13, 0xe1, 0x9a, 0xe2, 0x6e, 0x7a, 0x38, 0x13, 0x4d, 0x11, 0x5e, 0xe1, 0xbd,
+	0x0c, 0x04, 0x67, 0xb4, 0xd6, 0x7f, 0x0b, 0x69, 0x1e, 0xdc, 0x2b, 0x90, 0x7f, 0x63, 0x1c, 0x35,
+	0x6b, 0xd6, 0xeb, 0xb3, 0xd3, 0x8e, 0x51, 0x4c, 0xa0, 0x02, 0x2c, 0x9e, 0x9c, 0xca, 0x9d, 0x86,
+	0x96, 0x20, 0xd7, 0xa9, 0x9b, 0xc7, 0xcd, 0x13, 0xa3, 0x13, 0x15, 0x64, 0x0b, 0xee, 0xcd, 0x9d,
+	0x0f, 0xa3, 0x02, 0x70, 0x39, 0x5e, 0xc6, 0x0b, 0xc0, 0x4c, 0xf5, 0xcc, 0x11, 0x83, 0x1e, 0xc2,
+	0x4a, 0x07, 0x77, 0xfb, 0xc4, 0xa0, 0xd4, 0xed, 0x0d, 0x3c, 0x32, 0x60, 0x13, 0x79, 0xad, 0x4d,
+	0xe6, 0xf5, 0x0e, 0x80, 0x87, 0xdd, 0x81, 0xc5, 0x22, 0x16, 0x39, 0x80, 0xe6, 0xa2, 0x13, 0x8e,
+	0x81, 0x1e, 0xc2, 0x32, 0xb5, 0xc3, 0xa8, 0x38, 0x08, 0x0a, 0x31, 0x34, 0xa5, 0xcd, 0x25, 0x79,
+	0xca, 0xa9, 0xa8, 0xfe, 0x37, 0x58, 0x33, 0xfa, 0xfd, 0x98, 0x58, 0x8a, 0x0e, 0x61, 0x95, 0x73,
+	0x59, 0xf8, 0xf2, 0x50, 0x3e, 0xa8, 0xac, 0x3c, 0x28, 0xc6, 0x67, 0x16, 0x59, 0x0c, 0x48, 0x7f,
+	0x0e, 0x6b, 0x6d, 0x12, 0xba, 0xb8, 0xef, 0xfe, 0x83, 0x38, 0xe6, 0xc5, 0xb0, 0x85, 0xed, 0x77,
+	0x84, 0xa1, 0x22, 0xa4, 0x82, 0x77, 0x22, 0xd1, 0x0a, 0x66, 0xb4, 0x44, 0x08, 0xd2, 0xae, 0x47,
+	0x5d, 0xe9, 0x72, 0xbe, 0xd6, 0x2b, 0xb0, 0x2a, 0xe8, 0x6b, 0xa1, 0x1f, 0x70, 0x59, 0x4d, 0x1e,
+	0x1f, 0x42, 0x35, 0x19, 0x4f, 0x0b, 0x66, 0x96, 0x89, 0xab, 0x83, 0xff, 0x02, 0xe4, 0x5a, 0xa3,
+	0xaf, 0x42, 0xd4, 0x92, 0x53, 0xb8, 0x18, 0xfd, 0x78, 0xc9, 0x45, 0x3b, 0xf1, 0xa9, 0x7b, 0xe2,
+	0x53, 0xa4, 0xbc, 0x7d, 0xcd, 0x50, 0xae, 0x27, 0x90, 0x09, 0x4b, 0x13, 0xbd, 0x01, 0xcd, 0x9b,
+	0x64, 0xca, 0x73, 0xda, 0x8a, 0x9e, 0x40, 0xe7, 0xb0, 0x12, 0xeb, 0x0b, 0x68, 0xfe, 0x0c, 0x53,
+	0x9e, 0xdb, 0x56, 0xf4, 0x04, 0xc2, 0x80, 0xa6, 0xfb, 0x1f, 0x7a, 0x70, 0x95, 0x46, 0xea, 0x60,
+	0x55, 0xbe, 0x3f, 0x87, 0x4a, 0x8a, 0xe8, 0xc1, 0xfa, 0xac, 0x66, 0x88, 0x7e, 0x71, 0xb5, 0x7a,
+	0x13, 0x62, 0x1e, 0xce, 0xa5, 0x93, 0x82, 0x0c, 0x58, 0x3e, 0x24, 0x4c, 0x38, 0xeb, 0x8c, 0xe2,
+	0x1e, 0x41, 0xab, 0x92, 0x95, 0x7f, 0xe9, 0x57, 0xde, 0xf8, 0xae, 0x53, 0x2e, 0xc7, 0x26, 0x16,
+	0x93, 0xd8, 0x7e, 0xe8, 0xf0, 0xb8, 0xd1, 0x13, 0xe8, 0x05, 0x40, 0x35, 0x24, 0x12, 0x1e, 0x6d,
+	0xcc, 0x6e, 0x4b, 0xe5, 0xcd, 0x2b, 0x8a, 0xbe, 0x00, 0x30, 0x89, 0xe7, 0x7f, 0xf8, 0x62, 0x80,
+	0x1a, 0xac, 0x88, 0x94, 0x1f, 0xf5, 0x39, 0xfa, 0x25, 0x28, 0x27, 0xb0, 0x72, 0xf9, 0x6d, 0x2b,
+	0x02, 0xe6, 0x76, 0x3c, 0x6c, 0xd5, 0xef, 0xde, 0x79, 0x41, 0x4d, 0xa0, 0x7c, 0x75, 0x59, 0x43,
+	0x9f, 0xf5, 0x75, 0xfc, 0x29, 0x6a, 0x8f, 0x3b, 0xde, 0x0c, 0xb5, 0xd5, 0xff, 0x1e, 0xe6, 0xa9,
+	0xdd, 0x80, 0x82, 0xe1, 0x38, 0x63, 0x34, 0x74, 0xdd, 0x1f, 0x13, 0xd7, 0xe9, 0xd5, 0x8c, 0xf2,
+	0xaf, 0x4f, 0x18, 0xb9, 0x11, 0x28, 0x61, 0xa2, 0x66, 0xab, 0xd1, 0x3c, 0xff, 0x2a, 0xa8, 0x3f,
+	0xc2, 0xc6, 0x21, 0x61, 0xb3, 0x2a, 0xf3, 0x8c, 0xb8, 0x9f, 0x28, 0x32, 0xd3, 0x2c, 0x2f, 0xb7,
+	0xff, 0xb2, 0xc5, 0x09, 0xf6, 0xfb, 0x8c, 0xec, 0xdb, 0x7d, 0x7f, 0xe8, 0xec, 0xf7, 0x7c, 0xf9,
+	0x37, 0x56, 0x37, 0xc3, 0x7f, 0x7f, 0xf3, 0x53, 0x00, 0x00, 0x00, 0xff, 0xff, 0xa0, 0xaf, 0x82,
+	0x65, 0x5a, 0x13, 0x00, 0x00,
 }
 
 // Reference imports to suppress errors if they are not otherwise used.
@@ -1425,6 +1597,10 @@ type PipelinedClient interface {
 	ActivateFlows(ctx context.Context, in *ActivateFlowsRequest, opts ...grpc.CallOption) (*ActivateFlowsResult, error)
 	// Deactivate flows for a subscriber
 	DeactivateFlows(ctx context.Context, in *DeactivateFlowsRequest, opts ...grpc.CallOption) (*DeactivateFlowsResult, error)
+	// Activate flows for several subscribers
+	ActivateFlowsBatch(ctx context.Context, in *ActivateFlowsBatchRequest, opts ...grpc.CallOption) (*ActivateFlowsBatchResult, error)
+	// Deactivate flows for several subscribers
+	DeactivateFlowsBatch(ctx context.Context, in *DeactivateFlowsBatchRequest, opts ...grpc.CallOption) (*DeactivateFlowsBatchResult, error)
 	// Get policy usage stats
 	GetPolicyUsage(ctx context.Context, in *protos.Void, opts ...grpc.CallOption) (*RuleRecordTable, error)
 	// Add new dpi flow
@@ -1485,6 +1661,24 @@ func (c *pipelinedClient) DeactivateFlows(ctx context.Context, in *DeactivateFlo
 	return out, nil
 }
 
+func (c *pipelinedClient) ActivateFlowsBatch(ctx context.Context, in *ActivateFlowsBatchRequest, opts ...grpc.CallOption) (*ActivateFlowsBatchResult, error) {
+	out := new(ActivateFlowsBatchResult)
+	err := c.cc.Invoke(ctx, "/magma.lte.Pipelined/ActivateFlowsBatch", in, out, opts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *pipelinedClient) DeactivateFlowsBatch(ctx context.Context, in *DeactivateFlowsBatchRequest, opts ...grpc.CallOption) (*DeactivateFlowsBatchResult, error) {
+	out := new(DeactivateFlowsBatchResult)
+	err := c.cc.Invoke(ctx, "/magma.lte.Pipelined/DeactivateFlowsBatch", in, out, opts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
 func (c *pipelinedClient) GetPolicyUsage(ctx context.Context, in *protos.Void, opts ...grpc.CallOption) (*RuleRecordTable, error) {
 	out := new(RuleRecordTable)
 	err := c.cc.Invoke(ctx, "/magma.lte.Pipelined/GetPolicyUsage", in, out, opts...)
@@ -1592,6 +1786,10 @@ type PipelinedServer interface {
 	ActivateFlows(context.Context, *ActivateFlowsRequest) (*ActivateFlowsResult, error)
 	// Deactivate flows for a subscriber
 	DeactivateFlows(context.Context, *DeactivateFlowsRequest) (*DeactivateFlowsResult, error)
+	// Activate flows for several subscribers
+	ActivateFlowsBatch(context.Context, *ActivateFlowsBatchRequest) (*ActivateFlowsBatchResult, error)
+	// Deactivate flows for several subscribers
+	DeactivateFlowsBatch(context.Context, *DeactivateFlowsBatchRequest) (*DeactivateFlowsBatchResult, error)
 	// Get policy usage stats
 	GetPolicyUsage(context.Context, *protos.Void) (*RuleRecordTable, error)
 	// Add new dpi flow
@@ -1630,6 +1828,12 @@ func (*UnimplementedPipelinedServer) ActivateFlows(ctx context.Context, req *Act
 func (*UnimplementedPipelinedServer) DeactivateFlows(ctx context.Context, req *DeactivateFlowsRequest) (*DeactivateFlowsResult, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method DeactivateFlows not implemented")
 }
+func (*UnimplementedPipelinedServer) ActivateFlowsBatch(ctx context.Context, req *ActivateFlowsBatchRequest) (*ActivateFlowsBatchResult, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method ActivateFlowsBatch not implemented")
+}
+func (*UnimplementedPipelinedServer) DeactivateFlowsBatch(ctx context.Context, req *DeactivateFlowsBatchRequest) (*DeactivateFlowsBatchResult, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method DeactivateFlowsBatch not implemented")
+}
 func (*UnimplementedPipelinedServer) GetPolicyUsage(ctx context.Context, req *protos.Void) (*RuleRecordTable, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method GetPolicyUsage not implemented")
 }
@@ -1722,6 +1926,42 @@ func _Pipelined_DeactivateFlows_Handler(srv interface{}, ctx context.Context, de
 	return interceptor(ctx, in, info, handler)
 }
 
+func _Pipelined_ActivateFlowsBatch_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(ActivateFlowsBatchRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(PipelinedServer).ActivateFlowsBatch(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: "/magma.lte.Pipelined/ActivateFlowsBatch",
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(PipelinedServer).ActivateFlowsBatch(ctx, req.(*ActivateFlowsBatchRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _Pipelined_DeactivateFlowsBatch_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(DeactivateFlowsBatchRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(PipelinedServer).DeactivateFlowsBatch(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: "/magma.lte.Pipelined/DeactivateFlowsBatch",
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(PipelinedServer).DeactivateFlowsBatch(ctx, req.(*DeactivateFlowsBatchRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
 func _Pipelined_GetPolicyUsage_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
 	in := new(protos.Void)
 	if err := dec(in); err != nil {
@@ -1936,6 +2176,14 @@ var _Pipelined_serviceDesc = grpc.ServiceDesc{
 			MethodName: "DeactivateFlows",
 			Handler:    _Pipelined_DeactivateFlows_Handler,
 		},
+		{
+			MethodName: "ActivateFlowsBatch",
+			Handler:    _Pipelined_ActivateFlowsBatch_Handler,
+		},
+		{
+			MethodName: "DeactivateFlowsBatch",
+			Handler:    _Pipelined_DeactivateFlowsBatch_Handler,
+		},
 		{
 			MethodName: "GetPolicyUsage",
 			Handler:    _Pipelined_GetPolicyUsage_Handler,
@@ -60,6 +60,7 @@ from magma.common.redis.client import get_default_client
 
 from .ip_allocator_dhcp import IPAllocatorDHCP
 from .ip_allocator_pool import IpAllocatorPool
+from .ip_allocator_compact_pool import IpAllocatorCompactPool
 from .ip_allocator_static import IPAllocatorStaticWrapper
 from .ip_allocator_multi_apn import IPAllocatorMultiAPNWrapper
 from .ip_allocator_base import DuplicateIPAssignmentError
@@ -116,6 +117,14 @@ class IPAddressManager:
         Redis's performance can be measured with the redis-benchmark tool,
         but we expect almost 100% of writes to take less than 1 millisecond.
 
+        All writes to the IP state and SID maps done by one mutating call
+        are queued on self._write_batch and committed in a single MULTI/EXEC
+        transaction when the call returns, so the two maps stay consistent
+        across crashes and the lock is held for a single write round trip.
+        Both maps are loaded in process memory at startup, so the calls
+        don't read Redis either. If the transaction fails, they are
+        reloaded from Redis.
+
     """
 
     def __init__(self,
@@ -139,6 +148,7 @@ class IPAddressManager:
 
         self.multi_apn = config.get('multi_apn', mconfig.multi_apn_ip_alloc)
         self.static_ip_enabled = config.get('static_ip', mconfig.static_ip_enabled)
+        self.compact_ip_pool = config.get('compact_ip_pool', False)
 
         self.allocator_type = mconfig.ip_allocator_type
         logging.debug('Persist to Redis: %s', persist_to_redis)
@@ -152,27 +162,41 @@ class IPAddressManager:
             self.sid_ips_map = defaultdict(IPDesc)  # {SID=>IPDesc}
             self._dhcp_gw_info = UplinkGatewayInfo(defaultdict(str))
             self._dhcp_store = {}  # mac => DHCP_State
+            self._write_batch = store.WriteBatch(None)
         else:
             if not redis_port:
                 raise ValueError(
                     'Must specify a redis_port in mobilityd config.')
             client = get_default_client()
+            self._write_batch = store.WriteBatch(client)
             self._assigned_ip_blocks = store.AssignedIpBlocksSet(client)
-            self.sid_ips_map = store.IPDescDict(client)
+            self.sid_ips_map = store.IPDescDict(client, self._write_batch,
+                                                local_cache=True)
+            self.sid_ips_map.load_cache()
+            self._write_batch.add_reload_callback(
+                self.sid_ips_map.load_cache)
             self._dhcp_gw_info = UplinkGatewayInfo(store.GatewayInfoMap())
             self._dhcp_store = store.MacToIP()  # mac => DHCP_State
 
-        self.ip_state_map = IpDescriptorMap(persist_to_redis, redis_port)
-        logging.info("Using allocator: %s static ip: %s multi_apn %s",
+        self.ip_state_map = IpDescriptorMap(persist_to_redis, redis_port,
+                                            self._write_batch)
+        logging.info("Using allocator: %s static ip: %s multi_apn %s "
+                     "compact ip pool: %s",
                      self.allocator_type,
                      self.static_ip_enabled,
-                     self.multi_apn)
+                     self.multi_apn,
+                     self.compact_ip_pool)
 
         if self.allocator_type == MobilityD.IP_POOL:
             self._dhcp_gw_info.read_default_gw()
-            ip_allocator = IpAllocatorPool(self._assigned_ip_blocks,
-                                           self.ip_state_map,
-                                           self.sid_ips_map)
+            if self.compact_ip_pool:
+                ip_allocator = IpAllocatorCompactPool(self._assigned_ip_blocks,
+                                                      self.ip_state_map,
+                                                      self.sid_ips_map)
+            else:
+                ip_allocator = IpAllocatorPool(self._assigned_ip_blocks,
+                                               self.ip_state_map,
+                                               self.sid_ips_map)
         elif self.allocator_type == MobilityD.DHCP:
             iface = config.get('dhcp_iface', 'dhcp0')
             retry_limit = config.get('retry_limit', 300)
@@ -211,7 +235,7 @@ class IPAddressManager:
             OverlappedIPBlocksError: if the given IP block overlaps with
             existing ones
         """
-        with self._lock:
+        with self._lock, self._write_batch:
             self.ip_allocator.add_ip_block(ipblock)
 
     def remove_ip_blocks(self, *_ipblocks: List[ip_network],
@@ -241,7 +265,7 @@ class IPAddressManager:
         Returns a set of the blocks that have been successfully removed.
         """
 
-        with self._lock:
+        with self._lock, self._write_batch:
             ip_blocks_deleted = self.ip_allocator.remove_ip_blocks(_ipblocks, _force=force)
 
         return ip_blocks_deleted
@@ -292,7 +316,7 @@ class IPAddressManager:
                 with the same IMSI
         """
 
-        with self._lock:
+        with self._lock, self._write_batch:
             # if an IP is reserved for the UE, this IP could be in the state of
             # ALLOCATED, RELEASED or REAPED.
             if sid in self.sid_ips_map:
@@ -387,7 +411,7 @@ class IPAddressManager:
             MappingNotFoundError: if the given sid-ip mapping is not found
             IPNotInUseError: if the given IP is not found in the used list
         """
-        with self._lock:
+        with self._lock, self._write_batch:
             if not (sid in self.sid_ips_map and ip ==
                     self.sid_ips_map[sid].ip):
                 logging.error(
@@ -425,7 +449,7 @@ class IPAddressManager:
         which is set at construction time.
 
         """
-        with self._lock:
+        with self._lock, self._write_batch:
             for ip in self.ip_state_map.list_ips(IPState.REAPED):
                 ip_desc = self.ip_state_map.mark_ip_state(ip, IPState.FREE)
                 logging.debug("Release Reaped IP: %s", ip_desc)
@@ -451,7 +475,7 @@ class IPAddressManager:
             next timer, if any IPs have been released since the current timer
             was initiated.
         """
-        with self._lock:
+        with self._lock, self._write_batch:
             # check if auto recycling is enabled and no timer has been set
             if self._recycling_interval_seconds is not None \
                     and not self._recycle_timer:
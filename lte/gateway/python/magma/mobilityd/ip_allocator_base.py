@@ -23,6 +23,10 @@ from magma.mobilityd.ip_descriptor import IPDesc, IPType
 
 DEFAULT_IP_RECYCLE_INTERVAL = 15
 
+# TODO(oramadan) t23793559 HACK reserve the GW address for
+#  gtp_br0 iface and test VM
+NUM_RESERVED_ADDRESSES = 11
+
 
 class IPAllocator(ABC):
 
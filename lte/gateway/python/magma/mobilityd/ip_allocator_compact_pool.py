@@ -0,0 +1,242 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This is one of ip allocator for ip address manager.
+The IP allocator accepts IP blocks (range of IP addresses), and supports
+allocating and releasing IP addresses from the assigned IP blocks.
+
+Unlike IpAllocatorPool, FREE addresses are not materialized as IPDesc
+entries in the IpDescriptorMap. Each block keeps a FreeRangeSet of integer
+addresses instead, so adding a block is O(1) and allocation does not scan
+the free list. Only ALLOCATED, RELEASED and REAPED addresses are tracked in
+the IpDescriptorMap, which keeps the existing life cycle intact; an address
+goes back to the free ranges when the IP address manager recycles it and
+calls release_ip().
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import logging
+from collections import defaultdict
+from copy import deepcopy
+from ipaddress import ip_address, ip_network
+from typing import Dict, List, Set, Tuple
+
+from magma.mobilityd.ip_descriptor import IPDesc, IPState, IPType
+from .ip_descriptor_map import IpDescriptorMap
+from .ip_free_ranges import FreeRangeSet
+from .ip_allocator_base import IPAllocator, NoAvailableIPError, \
+    IPBlockNotFoundError, OverlappedIPBlocksError, NUM_RESERVED_ADDRESSES
+
+
+class IpAllocatorCompactPool(IPAllocator):
+
+    def __init__(self,
+                 assigned_ip_blocks: Set[ip_network],
+                 ip_state_map: IpDescriptorMap,
+                 sid_ips_map: defaultdict):
+        """ Initializes a new IP allocator
+
+        Free ranges are not persisted: they are rebuilt from the assigned
+        IP blocks and the addresses tracked in ip_state_map, so a restart
+        only costs O(in-use addresses) per block.
+        """
+        self._assigned_ip_blocks = assigned_ip_blocks  # {ip_block}
+        self._ip_state_map = ip_state_map  # {state=>{ip=>ip_desc}}
+        self._sid_ips_map = sid_ips_map  # {SID=>IPDesc}
+        self._free_ranges = {}  # type: Dict[ip_network, FreeRangeSet]
+
+        for ipblock in self._assigned_ip_blocks:
+            self._free_ranges[ipblock] = self._restore_free_ranges(ipblock)
+
+    def add_ip_block(self, ipblock: ip_network):
+        """ Add a block of IP addresses to the free IP list
+
+        IP blocks should not overlap.
+
+        Args:
+            ipblock (ipaddress.ip_network): ip network to add
+            e.g. ipaddress.ip_network("10.0.0.0/24")
+
+        Raises:
+            OverlappedIPBlocksError: if the given IP block overlaps with
+            existing ones
+        """
+        for blk in self._assigned_ip_blocks:
+            if ipblock.overlaps(blk):
+                logging.error("Overlapped IP block: %s", ipblock)
+                raise OverlappedIPBlocksError(ipblock)
+
+        self._assigned_ip_blocks.add(ipblock)
+        self._free_ranges[ipblock] = FreeRangeSet(*_free_host_range(ipblock))
+
+    def remove_ip_blocks(self, ipblocks: List[ip_network],
+                         _force: bool = False) -> List[ip_network]:
+        """ Makes the indicated block(s) unavailable for allocation
+
+        If force is False, blocks that have any addresses currently allocated
+        will not be removed. Otherwise, if force is True, the indicated blocks
+        will be removed regardless of whether any addresses have been allocated
+        and any allocated addresses will no longer be served.
+
+        Only addresses tracked in the IpDescriptorMap are visited, the free
+        ranges of a removed block are dropped as a whole.
+
+        Args:
+            ipblocks (ipaddress.ip_network): variable number of objects of type
+                ipaddress.ip_network, representing the blocks that are intended
+                to be removed. Any blocks that are not active in the IP
+                allocator will be ignored with a warning.
+            _force (bool): whether to forcibly remove the blocks indicated.
+
+        Returns a set of the blocks that have been successfully removed.
+        """
+        remove_blocks = set(ipblocks) & self._assigned_ip_blocks
+
+        extraneous_blocks = set(ipblocks) - remove_blocks
+        if extraneous_blocks:
+            logging.warning("Cannot remove unknown IP block(s): %s",
+                            extraneous_blocks)
+        del extraneous_blocks
+
+        # "soft" removal does not remove blocks have IPs allocated
+        if not _force:
+            remove_blocks -= self._ip_state_map.get_allocated_ip_block_set()
+        if not remove_blocks:
+            return remove_blocks
+
+        states = [IPState.FREE, IPState.RELEASED, IPState.REAPED]
+        if _force:
+            states.append(IPState.ALLOCATED)
+        for state in states:
+            for ip in self._ip_state_map.list_ips(state):
+                if _in_any_block(ip, remove_blocks):
+                    self._ip_state_map.remove_ip_from_state(ip, state)
+
+        # Clean up SID maps
+        remove_sids = tuple(sid for sid, ip_desc in self._sid_ips_map.items()
+                            if not ip_desc
+                            or _in_any_block(ip_desc.ip, remove_blocks))
+        for sid in remove_sids:
+            self._sid_ips_map.pop(sid)
+
+        # Remove the IP blocks
+        self._assigned_ip_blocks -= remove_blocks
+
+        for block in remove_blocks:
+            self._free_ranges.pop(block, None)
+            logging.info('Removed IP block %s from IPv4 address pool', block)
+        return remove_blocks
+
+    def list_added_ip_blocks(self) -> List[ip_network]:
+        """ List IP blocks added to the IP allocator
+
+        Return:
+             copy of the list of assigned IP blocks
+        """
+        return list(deepcopy(self._assigned_ip_blocks))
+
+    def list_allocated_ips(self, ipblock: ip_network) -> List[ip_address]:
+        """ List IP addresses allocated from a given IP block
+
+        Args:
+            ipblock (ipaddress.ip_network): ip network to add
+            e.g. ipaddress.ip_network("10.0.0.0/24")
+
+        Return:
+            list of IP addresses (ipaddress.ip_address)
+
+        Raises:
+          IPBlockNotFoundError: if the given IP block is not found in the
+          internal list
+        """
+        if ipblock not in self._assigned_ip_blocks:
+            logging.error("Listing an unknown IP block: %s", ipblock)
+            raise IPBlockNotFoundError(ipblock)
+
+        return sorted(ip for ip in
+                      self._ip_state_map.list_ips(IPState.ALLOCATED)
+                      if ip in ipblock)
+
+    def alloc_ip_address(self, sid: str, vlan: int) -> IPDesc:
+        """ Allocate the lowest free IP address of the first non-empty block
+
+        Args:
+            sid (string): universal subscriber id
+
+        Returns:
+            IPDesc: descriptor of the allocated IP, in ALLOCATED state
+
+        Raises:
+            NoAvailableIPError: if run out of available IP addresses
+        """
+        for ipblock, free_ranges in self._free_ranges.items():
+            if free_ranges:
+                ip = ip_address(free_ranges.pop())
+                return IPDesc(ip=ip, state=IPState.ALLOCATED, sid=sid,
+                              ip_block=ipblock, ip_type=IPType.IP_POOL)
+
+        logging.error("Run out of available IP addresses")
+        raise NoAvailableIPError("No available IP addresses")
+
+    def release_ip(self, ip_desc: IPDesc):
+        """ Return a recycled IP to the free ranges of its block
+
+        The IP address manager has already moved the descriptor to the FREE
+        state, drop it from the IpDescriptorMap so that FREE addresses only
+        live in the free ranges.
+        """
+        self._ip_state_map.remove_ip_from_state(ip_desc.ip, IPState.FREE)
+        free_ranges = self._free_ranges.get(ip_desc.ip_block)
+        if free_ranges is None:
+            # The block has been removed while the IP was being recycled
+            logging.debug("Dropping IP %s of removed block %s",
+                          ip_desc.ip, ip_desc.ip_block)
+            return
+        if not free_ranges.add(int(ip_desc.ip)):
+            logging.warning("IP %s released twice", ip_desc.ip)
+
+    def _restore_free_ranges(self, ipblock: ip_network) -> FreeRangeSet:
+        """ Rebuild the free ranges of a block from the IpDescriptorMap
+
+        FREE entries left behind by IpAllocatorPool are dropped from the
+        IpDescriptorMap, everything else is treated as in use.
+        """
+        free_ranges = FreeRangeSet(*_free_host_range(ipblock))
+        for state in IPState:
+            for ip in self._ip_state_map.list_ips(state):
+                if ip not in ipblock:
+                    continue
+                if state == IPState.FREE:
+                    self._ip_state_map.remove_ip_from_state(ip, state)
+                else:
+                    free_ranges.discard(int(ip))
+        return free_ranges
+
+
+def _free_host_range(ipblock: ip_network) -> Tuple[int, int]:
+    """ Return the [start, end) integer range of allocatable hosts
+
+    Mirrors ip_network.hosts(), minus the reserved addresses.
+    """
+    start = int(ipblock.network_address)
+    end = int(ipblock.broadcast_address) + 1
+    if ipblock.num_addresses > 2:
+        start += 1
+        if ipblock.version == 4:
+            end -= 1
+    return min(start + NUM_RESERVED_ADDRESSES, end), end
+
+
+def _in_any_block(ip: ip_address, ipblocks: Set[ip_network]) -> bool:
+    return any(ip in block for block in ipblocks)
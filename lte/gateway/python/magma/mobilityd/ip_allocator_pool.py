@@ -27,7 +27,7 @@ from copy import deepcopy
 from magma.mobilityd.ip_descriptor import IPDesc, IPState, IPType
 from .ip_descriptor_map import IpDescriptorMap
 from .ip_allocator_base import IPAllocator, NoAvailableIPError, \
-    IPBlockNotFoundError, OverlappedIPBlocksError
+    IPBlockNotFoundError, OverlappedIPBlocksError, NUM_RESERVED_ADDRESSES
 
 
 DEFAULT_IP_RECYCLE_INTERVAL = 15
@@ -64,9 +64,7 @@ class IpAllocatorPool(IPAllocator):
                 raise OverlappedIPBlocksError(ipblock)
 
         self._assigned_ip_blocks.add(ipblock)
-        # TODO(oramadan) t23793559 HACK reserve the GW address for
-        #  gtp_br0 iface and test VM
-        num_reserved_addresses = 11
+        num_reserved_addresses = NUM_RESERVED_ADDRESSES
         for ip in ipblock.hosts():
             state = IPState.RESERVED if num_reserved_addresses > 0 \
                 else IPState.FREE
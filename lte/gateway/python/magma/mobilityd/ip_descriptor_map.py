@@ -35,9 +35,9 @@ during it's life cycle in the IP allocator:
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
-from collections import defaultdict
+from collections import Counter, defaultdict
 from ipaddress import ip_address, ip_network
-from typing import List, Set
+from typing import List, Optional, Set
 
 import redis
 from magma.mobilityd import mobility_store as store
@@ -51,23 +51,47 @@ class IpDescriptorMap:
 
     def __init__(self,
                  persist_to_redis: bool = True,
-                 redis_port: int = 6379):
+                 redis_port: int = 6379,
+                 write_batch: Optional[store.WriteBatch] = None):
         """
 
         Args:
             persist_to_redis (bool): store all state in local process if falsy,
                 else write state to Redis service
             redis_port (int): redis server port number.
+            write_batch (store.WriteBatch): if it has a client, Redis writes
+                are queued on it while it is active, and its client is used
+                instead of redis_port so that they commit in the same
+                transaction as the other containers of the batch.
+
+        mobilityd is the only writer of the IP state hashes, so the Redis
+        views are created with a local cache, loaded with every IP at
+        startup: reads and version lookups are served from process memory.
+        The cache and the indexes are rebuilt from Redis if a write_batch
+        flush fails.
         """
+        self._persist_to_redis = persist_to_redis
         if not persist_to_redis:
             self.ip_states = defaultdict(dict)  # {state=>{ip=>ip_desc}}
         else:
             if not redis_port:
                 raise ValueError(
                     'Must specify a redis_port in mobilityd config.')
-            client = redis.Redis(host='localhost', port=redis_port)
+            if write_batch is not None and write_batch.client is not None:
+                client = write_batch.client
+            else:
+                client = redis.Redis(host='localhost', port=redis_port)
             self.ip_states = store.defaultdict_key(
-                lambda key: store.ip_states(client, key))
+                lambda key: store.ip_states(client, key, write_batch,
+                                          local_cache=True))
+
+        # In-process indexes kept in sync with ip_states, so that state
+        # lookups don't probe (or round trip to Redis for) every state.
+        self._ip_state_index = {}  # {ip=>state}
+        self._allocated_block_count = Counter()  # {ip_block=>count}
+        self._load()
+        if write_batch is not None:
+            write_batch.add_reload_callback(self._load)
 
     def add_ip_to_state(self, ip: ip_address, ip_desc: IPDesc,
                         state: IPState):
@@ -77,13 +101,22 @@ class IpDescriptorMap:
             % (ip_desc.state, state)
         assert state in IPState, "unknown state %s" % state
 
-        self.ip_states[state][ip.exploded] = ip_desc
+        ip_key = ip.exploded
+        if self._ip_state_index.get(ip_key) == IPState.ALLOCATED \
+                and state == IPState.ALLOCATED:
+            # Overwriting an allocated entry, don't count it twice
+            self._unindex_ip(ip_key, self.ip_states[state][ip_key], state)
+        self.ip_states[state][ip_key] = ip_desc
+        self._index_ip(ip_key, ip_desc, state)
 
     def remove_ip_from_state(self, ip: ip_address, state: IPState) -> IPDesc:
         """ Remove an IP from a internal dict """
         assert state in IPState, "unknown state %s" % state
 
-        ip_desc = self.ip_states[state].pop(ip.exploded, None)
+        ip_key = ip.exploded
+        ip_desc = self.ip_states[state].pop(ip_key, None)
+        if ip_desc is not None:
+            self._unindex_ip(ip_key, ip_desc, state)
         return ip_desc
 
     def pop_ip_from_state(self, state: IPState) -> IPDesc:
@@ -92,6 +125,7 @@ class IpDescriptorMap:
 
         ip_state_key = choice(list(self.ip_states[state].keys()))
         ip_desc = self.ip_states[state].pop(ip_state_key)
+        self._unindex_ip(ip_state_key, ip_desc, state)
         return ip_desc
 
     def get_ip_count(self, state: IPState) -> int:
@@ -104,14 +138,14 @@ class IpDescriptorMap:
         """ check if IP is in state X """
         assert state in IPState, "unknown state %s" % state
 
-        return ip.exploded in self.ip_states[state]
+        return self._ip_state_index.get(ip.exploded) == state
 
     def get_ip_state(self, ip: ip_address) -> IPState:
         """ return the state of an IP """
-        for state in IPState:
-            if self.test_ip_state(ip, state):
-                return state
-        raise AssertionError("IP %s not found in any states" % ip)
+        state = self._ip_state_index.get(ip.exploded)
+        if state is None:
+            raise AssertionError("IP %s not found in any states" % ip)
+        return state
 
     def list_ips(self, state: IPState) -> List[ip_address]:
         """ return a list of IPs in state X """
@@ -146,8 +180,30 @@ class IpDescriptorMap:
 
     def get_allocated_ip_block_set(self) -> Set[ip_network]:
         """ A IP block is allocated if ANY IP is allocated from it """
-        allocated_ips = self.ip_states[IPState.ALLOCATED]
-        return {ip_desc.ip_block for ip_desc in allocated_ips.values()}
+        return set(self._allocated_block_count)
+
+    def _load(self):
+        """ Load the IP states from Redis and build the indexes """
+        self._ip_state_index = {}
+        self._allocated_block_count = Counter()
+        for state in IPState:
+            if self._persist_to_redis:
+                self.ip_states[state].load_cache()
+            for ip_key, ip_desc in self.ip_states[state].items():
+                self._index_ip(ip_key, ip_desc, state)
+
+    def _index_ip(self, ip_key: str, ip_desc: IPDesc, state: IPState):
+        self._ip_state_index[ip_key] = state
+        if state == IPState.ALLOCATED:
+            self._allocated_block_count[ip_desc.ip_block] += 1
+
+    def _unindex_ip(self, ip_key: str, ip_desc: IPDesc, state: IPState):
+        if self._ip_state_index.get(ip_key) == state:
+            del self._ip_state_index[ip_key]
+        if state == IPState.ALLOCATED:
+            self._allocated_block_count[ip_desc.ip_block] -= 1
+            if self._allocated_block_count[ip_desc.ip_block] <= 0:
+                del self._allocated_block_count[ip_desc.ip_block]
 
     def __str__(self) -> str:
         """ return the state of an IP """
@@ -0,0 +1,164 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Compact free list of integer addresses.
+
+Free addresses are kept as a sorted list of disjoint, half-open
+[start, end) ranges instead of one entry per address, so a freshly added
+/16 block is a single range. Allocation always takes the lowest free
+address, releasing an address merges it back into its neighbouring ranges.
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from bisect import bisect_right
+from typing import Iterator
+
+
+class FreeRangeSet:
+    """
+    Set of free integer addresses stored as sorted disjoint ranges.
+
+    The ranges live in _starts[_head:] and _ends[_head:]. pop() moves
+    _head past an exhausted range instead of deleting it from the front of
+    the lists, and the dead prefix is trimmed once it outgrows the live
+    ranges, so pop() is O(1) amortized. add() and discard() are O(log n)
+    lookups (plus a list insert when a range is split), where n is the
+    number of fragments rather than the number of free addresses.
+    """
+
+    def __init__(self, start: int = 0, end: int = 0):
+        """
+        Args:
+            start (int): first free address
+            end (int): one past the last free address; an empty set is
+                created if end <= start
+        """
+        self._starts = []
+        self._ends = []
+        self._head = 0
+        self._count = 0
+        if end > start:
+            self._starts.append(start)
+            self._ends.append(end)
+            self._count = end - start
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __contains__(self, value: int) -> bool:
+        idx = self._find(value)
+        return idx >= self._head and value < self._ends[idx]
+
+    def __iter__(self) -> Iterator[int]:
+        for idx in range(self._head, len(self._starts)):
+            yield from range(self._starts[idx], self._ends[idx])
+
+    def ranges(self):
+        """ Return a list of the (start, end) ranges in the set """
+        return list(zip(self._starts[self._head:], self._ends[self._head:]))
+
+    def _find(self, value: int) -> int:
+        """ Index of the last range starting at or before value, or
+        _head - 1 if there is none """
+        return bisect_right(self._starts, value, self._head) - 1
+
+    def _drop_head(self):
+        """ Drop the lowest range, trimming the dead prefix of the lists
+        once it is longer than the live ranges """
+        self._head += 1
+        if self._head * 2 > len(self._starts):
+            del self._starts[:self._head]
+            del self._ends[:self._head]
+            self._head = 0
+
+    def pop(self) -> int:
+        """ Remove and return the lowest free address
+
+        Raises:
+            KeyError: if the set is empty
+        """
+        if not self._count:
+            raise KeyError('pop from an empty FreeRangeSet')
+        head = self._head
+        value = self._starts[head]
+        if value + 1 == self._ends[head]:
+            self._drop_head()
+        else:
+            self._starts[head] = value + 1
+        self._count -= 1
+        return value
+
+    def add(self, value: int) -> bool:
+        """ Return an address to the set
+
+        Returns:
+            False if the address was already free, True otherwise
+        """
+        idx = self._find(value)
+        joins_prev = idx >= self._head
+        if joins_prev and value < self._ends[idx]:
+            return False
+
+        joins_prev = joins_prev and self._ends[idx] == value
+        joins_next = idx + 1 < len(self._starts) \
+            and self._starts[idx + 1] == value + 1
+        if joins_prev and joins_next:
+            self._ends[idx] = self._ends[idx + 1]
+            del self._starts[idx + 1]
+            del self._ends[idx + 1]
+        elif joins_prev:
+            self._ends[idx] = value + 1
+        elif joins_next:
+            self._starts[idx + 1] = value
+        elif idx < self._head and self._head > 0:
+            # Below the lowest range, reuse the dead slot before it
+            self._head -= 1
+            self._starts[self._head] = value
+            self._ends[self._head] = value + 1
+        else:
+            self._starts.insert(idx + 1, value)
+            self._ends.insert(idx + 1, value + 1)
+        self._count += 1
+        return True
+
+    def discard(self, value: int) -> bool:
+        """ Remove an address from the set if it is free
+
+        Returns:
+            True if the address was removed, False if it was not free
+        """
+        idx = self._find(value)
+        if idx < self._head or value >= self._ends[idx]:
+            return False
+
+        start, end = self._starts[idx], self._ends[idx]
+        if start == value and end == value + 1:
+            if idx == self._head:
+                self._drop_head()
+            else:
+                del self._starts[idx]
+                del self._ends[idx]
+        elif start == value:
+            self._starts[idx] = value + 1
+        elif end == value + 1:
+            self._ends[idx] = value
+        else:
+            self._ends[idx] = value
+            self._starts.insert(idx + 1, value + 1)
+            self._ends.insert(idx + 1, end)
+        self._count -= 1
+        return True
@@ -10,8 +10,13 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import logging
 from collections import defaultdict
+from copy import copy
+from typing import Any, Callable, Dict, Iterator, List, Optional, \
+    Tuple
 
+import redis
 from magma.common.redis.containers import RedisFlatDict, RedisHashDict, \
     RedisSet
 from magma.common.redis.serializers import RedisSerde
@@ -20,6 +25,7 @@ from magma.common.redis.containers import RedisHashDict
 from magma.common.redis.serializers import get_json_serializer, \
     get_json_deserializer
 from magma.common.redis.client import get_default_client
+from orc8r.protos.redis_pb2 import RedisState
 
 IPDESC_REDIS_TYPE = "mobilityd_ipdesc_record"
 IPSTATES_REDIS_TYPE = "mobilityd:ip_states:{}"
@@ -28,6 +34,97 @@ MAC_TO_IP_REDIS_TYPE = "mobilityd_mac_to_ip"
 DHCP_GW_INFO_REDIS_TYPE = "mobilityd_gw_info"
 
 
+class WriteBatch:
+    """
+    Groups the writes of the mobilityd Redis containers into a single
+    MULTI/EXEC transaction.
+
+    While a batch is open, writes to the containers attached to it are
+    queued on a transactional pipeline and recorded in a per-container
+    overlay of pending values, so that point reads (get, contains, pop) see
+    them. Once their local cache is loaded (see `load_cache`), the
+    containers serve every read from it, and queue writes without reading
+    Redis. Otherwise, reads that scan Redis (iteration, len) flush the
+    batch first.
+
+    The batch is re-entrant and is flushed when the outermost `with` block
+    exits, also when it exits with an exception: by then the in-process
+    state has already been updated and Redis has to follow it. If the flush
+    fails, the pending writes and the local caches of the containers are
+    dropped, and the reload callbacks rebuild the in-process state from
+    Redis. If that fails too, it is retried when the batch is next opened.
+    It is not thread safe and must be used under the owner's lock.
+
+    A batch without a client is a no-op, for state kept in process.
+    """
+
+    def __init__(self, client: Optional[redis.Redis]):
+        self.client = client
+        self._depth = 0
+        self._pipe = None
+        self._dirty = []  # containers with pending writes
+        self._reload_callbacks = []  # type: List[Callable[[], None]]
+        self._stale = False
+
+    def __enter__(self):
+        if self._depth == 0 and self._stale:
+            self._reload()
+        if self._depth == 0 and self.client is not None:
+            self._pipe = self.client.pipeline(transaction=True)
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            self.flush()
+            self._pipe = None
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    def add_reload_callback(self, callback: Callable[[], None]):
+        """
+        Register callback to rebuild, from Redis, in-process state derived
+        from the containers of the batch after a failed flush
+        """
+        self._reload_callbacks.append(callback)
+
+    def pipeline(self, container: Any) -> redis.client.Pipeline:
+        """ Return the pipeline to queue a write of container on """
+        if not any(dirty is container for dirty in self._dirty):
+            self._dirty.append(container)
+        return self._pipe
+
+    def flush(self):
+        """ Commit the queued writes in one MULTI/EXEC """
+        if self._pipe is None or not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, []
+        try:
+            self._pipe.execute()
+        except Exception:
+            # The writes were applied to the local caches and to the state
+            # built on them, but not (or not all) to Redis
+            for container in dirty:
+                container.discard_pending()
+            self._stale = True
+            try:
+                self._reload()
+            except redis.RedisError:
+                logging.exception("Failed to reload mobilityd state from "
+                                  "Redis, retrying on the next write")
+            raise
+        for container in dirty:
+            container.pending.clear()
+
+    def _reload(self):
+        for callback in self._reload_callbacks:
+            callback()
+        self._stale = False
+
+
 class AssignedIpBlocksSet(RedisSet):
     def __init__(self, client):
         super().__init__(
@@ -38,22 +135,276 @@ class AssignedIpBlocksSet(RedisSet):
         )
 
 
-class IPDescDict(RedisFlatDict):
-    def __init__(self, client):
+class _LoadedCacheMixin:
+    """
+    Local cache of a mobilityd container, loaded with every entry of the
+    container. mobilityd is the only writer of its containers, so while the
+    cache is loaded a key missing from it is missing from Redis: reads,
+    scans and version lookups don't round trip to Redis.
+    """
+    _cache_loaded = False
+
+    def load_cache(self) -> None:
+        """ Read every entry of the container into the local cache """
+        if self._local_cache is None:
+            raise ValueError("The local cache is not enabled")
+        self.invalidate_cache()
+        self._load_entries()
+        self._cache_loaded = True
+
+    def invalidate_cache(self, key: Optional[str] = None) -> None:
+        super().invalidate_cache(key)
+        self._cache_loaded = False
+
+    def check_cache_versions(self) -> List[str]:
+        evicted = super().check_cache_versions()
+        if evicted:
+            self._cache_loaded = False
+        return evicted
+
+    def discard_pending(self) -> None:
+        """
+        Drop the writes of a failed batch, along with the local cache they
+        were applied to
+        """
+        self.pending.clear()
+        self.invalidate_cache()
+
+    def _load_entries(self) -> None:
+        raise NotImplementedError()
+
+    def _batching(self) -> bool:
+        return self._write_batch is not None and self._write_batch.active
+
+    def _flush(self):
+        if self.pending:
+            self._write_batch.flush()
+
+    def _cache_put(self, key: str, version: int, value) -> None:
+        # The same IPDesc is written to the SID map and to an IP state hash,
+        # and is mutated in place on state transitions: cache a copy
+        super()._cache_put(key, version, copy(value))
+
+
+class IPDescDict(_LoadedCacheMixin, RedisFlatDict):
+    """
+    SID=>IPDesc map. Writes are queued on write_batch while it is active.
+    """
+
+    def __init__(self, client, write_batch: Optional[WriteBatch] = None,
+                 local_cache: bool = False):
         serde = RedisSerde(IPDESC_REDIS_TYPE,
                            serialize_utils.serialize_ip_desc,
                            serialize_utils.deserialize_ip_desc,
                            )
-        super().__init__(client, serde)
+        super().__init__(client, serde, local_cache)
+        self._write_batch = write_batch
+        self.pending = {}  # type: Dict[str, Optional[bytes]]
+
+    def __iter__(self) -> Iterator[str]:
+        if self._cache_loaded:
+            return iter(list(self._local_cache))
+        return super().__iter__()
+
+    def __contains__(self, key: str) -> bool:
+        if key in self.pending:
+            return self.pending[key] is not None
+        if self._cache_loaded:
+            return key in self._local_cache
+        return super().__contains__(key)
+
+    def __getitem__(self, key: str):
+        if key in self.pending:
+            if self.pending[key] is None:
+                raise KeyError(self._make_composite_key(key))
+            return self.serde.deserialize(self.pending[key])
+        if self._cache_loaded and key not in self._local_cache:
+            raise KeyError(self._make_composite_key(key))
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, value) -> Any:
+        if not self._batching():
+            return super().__setitem__(key, value)
+        if ':' in key:
+            raise ValueError("Key %s cannot contain ':' char" % key)
+        version = self.get_version(key) + 1
+        serialized_value = self.serde.serialize(value, version)
+        pipe = self._write_batch.pipeline(self)
+        pipe.set(self._make_composite_key(key), serialized_value)
+        self.pending[key] = serialized_value
+        self._cache_put(key, version, value)
+        return True
+
+    def __delitem__(self, key: str) -> int:
+        if not self._batching():
+            return super().__delitem__(key)
+        if ':' in key:
+            raise ValueError("Key %s cannot contain ':' char" % key)
+        composite_key = self._make_composite_key(key)
+        if key in self.pending:
+            exists = self.pending[key] is not None
+        elif self._cache_loaded:
+            exists = key in self._local_cache
+        else:
+            exists = bool(self.redis.exists(composite_key))
+        if not exists:
+            raise KeyError(composite_key)
+        self._write_batch.pipeline(self).delete(composite_key)
+        self.pending[key] = None
+        self._cache_evict(key)
+        return 1
+
+    def items(self) -> List[Tuple[str, Any]]:
+        if self._cache_loaded:
+            return [(key, value)
+                    for key, (_, value) in self._local_cache.items()]
+        return super().items()
+
+    def get_version(self, key: str) -> int:
+        if key in self.pending:
+            return _get_version(self.pending[key])
+        if self._cache_loaded:
+            return self._local_cache.get(key, (0, None))[0]
+        return super().get_version(key)
+
+    def _load_entries(self) -> None:
+        self._flush()
+        for key, proto_wrapper, serialized_value in super()._scan():
+            if not proto_wrapper.is_garbage:
+                self._local_cache[key] = (
+                    proto_wrapper.version,
+                    self.serde.deserialize(serialized_value))
+
+    def _scan(self) -> Iterator[Tuple[str, RedisState, bytes]]:
+        self._flush()
+        return super()._scan()
+
+    def _fetch_many(self, keys: List[str]) \
+            -> Iterator[Tuple[str, RedisState, bytes]]:
+        self._flush()
+        return super()._fetch_many(keys)
+
+
+class IPStatesDict(_LoadedCacheMixin, RedisHashDict):
+    """
+    ip=>IPDesc Redis hash of one IP state. Writes are queued on write_batch
+    while it is active.
+    """
+    __marker = object()
+
+    def __init__(self, client, key, serialize, deserialize,
+                 write_batch: Optional[WriteBatch] = None,
+                 local_cache: bool = False):
+        super().__init__(client, key, serialize, deserialize,
+                         local_cache=local_cache)
+        self._write_batch = write_batch
+        self.pending = {}  # type: Dict[str, Optional[bytes]]
+
+    def __len__(self, pipe=None):
+        if self._cache_loaded:
+            return len(self._local_cache)
+        self._flush()
+        return super().__len__(pipe)
+
+    def _data(self, pipe=None):
+        if self._cache_loaded:
+            return {key: value
+                    for key, (_, value) in self._local_cache.items()}
+        self._flush()
+        return super()._data(pipe)
+
+    def __contains__(self, key):
+        if key in self.pending:
+            return self.pending[key] is not None
+        if self._cache_loaded:
+            return key in self._local_cache
+        return super().__contains__(key)
+
+    def __getitem__(self, key):
+        if key in self.pending:
+            if self.pending[key] is None:
+                raise KeyError(key)
+            return self._unpickle(self.pending[key])
+        if self._cache_loaded and key not in self._local_cache:
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if not self._batching():
+            return super().__setitem__(key, value)
+        pickled_key = self._pickle_key(key)
+        version = self.get_version(key) + 1
+        pickled_value = self._pickle_value(value, version)
+        pipe = self._write_batch.pipeline(self)
+        pipe.hset(self.key, pickled_key, pickled_value)
+        self.pending[key] = pickled_value
+        self._cache_put(key, version, value)
+
+    def __delitem__(self, key):
+        if not self._batching():
+            return super().__delitem__(key)
+        self.pop(key)
+
+    def pop(self, key, default=__marker):
+        if not self._batching():
+            if default is self.__marker:
+                return super().pop(key)
+            return super().pop(key, default)
+        if self._local_cache is not None and key in self._local_cache \
+                and key not in self.pending:
+            value = self._local_cache.pop(key)[1]
+        else:
+            if key in self.pending:
+                pickled_value = self.pending[key]
+            elif self._cache_loaded:
+                pickled_value = None
+            else:
+                pickled_value = self.redis.hget(self.key,
+                                                self._pickle_key(key))
+            if pickled_value is None:
+                if default is self.__marker:
+                    raise KeyError(key)
+                return default
+            value = self._unpickle(pickled_value)
+            self._cache_evict(key)
+        self._write_batch.pipeline(self).hdel(self.key, self._pickle_key(key))
+        self.pending[key] = None
+        return value
+
+    def get_version(self, key):
+        if key in self.pending:
+            return _get_version(self.pending[key])
+        if self._cache_loaded:
+            return self._local_cache.get(key, (0, None))[0]
+        return super().get_version(key)
+
+    def _load_entries(self) -> None:
+        self._flush()
+        for pickled_key, pickled_value in \
+                self.redis.hgetall(self.key).items():
+            self._local_cache[self._unpickle_key(pickled_key)] = (
+                _get_version(pickled_value), self._unpickle(pickled_value))
+
+
+def _get_version(serialized: Optional[bytes]) -> int:
+    """ Version of a serialized value, 0 for a pending delete """
+    if serialized is None:
+        return 0
+    proto_wrapper = RedisState()
+    proto_wrapper.ParseFromString(serialized)
+    return proto_wrapper.version
 
 
-def ip_states(client, key):
+def ip_states(client, key, write_batch: Optional[WriteBatch] = None,
+              local_cache: bool = False):
     """ Get Redis view of IP states. """
-    redis_dict = RedisHashDict(
+    redis_dict = IPStatesDict(
         client,
         IPSTATES_REDIS_TYPE.format(key),
         serialize_utils.serialize_ip_desc,
         serialize_utils.deserialize_ip_desc,
+        write_batch,
+        local_cache,
     )
     return redis_dict
 
@@ -24,6 +24,7 @@ from lte.protos.mconfig.mconfigs_pb2 import MobilityD
 
 from magma.mobilityd.ip_address_man import IPAddressManager, \
     IPNotInUseError, MappingNotFoundError
+from magma.mobilityd.ip_descriptor import IPState
 from magma.mobilityd.ip_allocator_pool import IPBlockNotFoundError, \
     NoAvailableIPError
 
@@ -35,6 +36,7 @@ class IPAllocatorTests(unittest.TestCase):
     """
 
     RECYCLING_INTERVAL_SECONDS = 1
+    COMPACT_IP_POOL = False
 
     def _new_ip_allocator(self, recycling_interval):
         """
@@ -47,6 +49,7 @@ class IPAllocatorTests(unittest.TestCase):
             'recycling_interval': recycling_interval,
             'persist_to_redis': False,
             'redis_port': 6379,
+            'compact_ip_pool': self.COMPACT_IP_POOL,
         }
         mconfig = MobilityD(ip_allocator_type=MobilityD.IP_POOL,
                             static_ip_enabled=False)
@@ -338,3 +341,38 @@ class IPAllocatorTests(unittest.TestCase):
             ip0 in self._allocator.list_allocated_ips(self._block))
         self.assertTrue(
             ip1 in self._allocator.list_allocated_ips(self._block))
+
+
+class CompactIPAllocatorTests(IPAllocatorTests):
+    """
+    Run the IP Allocator tests against the compact free-range IP pool
+    """
+
+    COMPACT_IP_POOL = True
+
+    def test_add_large_ip_block(self):
+        """ adding a /16 block does not materialize its free addresses """
+        block = ipaddress.ip_network('10.0.0.0/16')
+        self._allocator.add_ip_block(block)
+        self.assertEqual(
+            0, self._allocator.ip_state_map.get_ip_count(IPState.FREE))
+
+        self._allocator.alloc_ip_address('SID0')
+        self._allocator.alloc_ip_address('SID1')
+        self._allocator.alloc_ip_address('SID2')
+        ip3, _ = self._allocator.alloc_ip_address('SID3')
+        self.assertEqual(ip3, ipaddress.ip_address('10.0.0.12'))
+        self.assertEqual([ip3], self._allocator.list_allocated_ips(block))
+
+    def test_recycled_ip_leaves_descriptor_map(self):
+        """ recycled IPs go back to the free ranges, not the FREE state """
+        self._new_ip_allocator(0)  # Immediately recycle
+
+        ip0, _ = self._allocator.alloc_ip_address('SID0')
+        self._allocator.release_ip_address('SID0', ip0)
+        self.assertEqual(
+            0, self._allocator.ip_state_map.get_ip_count(IPState.FREE))
+        self.assertIsNone(self._allocator.get_ip_for_sid('SID0'))
+
+        ip1, _ = self._allocator.alloc_ip_address('SID1')
+        self.assertEqual(ip0, ip1)
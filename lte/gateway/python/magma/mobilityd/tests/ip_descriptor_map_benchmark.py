@@ -0,0 +1,125 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Micro-benchmark of IpDescriptorMap state transitions with 64k allocated UEs.
+
+Not collected by the unit test runner, run it explicitly with:
+    python3 -m pytest -s magma/mobilityd/tests/ip_descriptor_map_benchmark.py
+
+Besides transitions per second, the number of operations issued against the
+per-state dicts is reported: with persist_to_redis each of them is a Redis
+round trip.
+"""
+
+import ipaddress
+import time
+import unittest
+from collections import defaultdict
+
+from magma.mobilityd.ip_descriptor import IPDesc, IPState, IPType
+from magma.mobilityd.ip_descriptor_map import IpDescriptorMap
+
+NUM_UES = 64 * 1024
+
+
+class _CountingDict(dict):
+    """ dict counting the operations a Redis hash would see """
+    ops = 0
+
+    def __contains__(self, key):
+        _CountingDict.ops += 1
+        return super().__contains__(key)
+
+    def __getitem__(self, key):
+        _CountingDict.ops += 1
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        _CountingDict.ops += 1
+        super().__setitem__(key, value)
+
+    def pop(self, key, *args):
+        _CountingDict.ops += 1
+        return super().pop(key, *args)
+
+
+class _ProbingIpDescriptorMap(IpDescriptorMap):
+    """ Previous implementation: probe every state dict for an IP """
+
+    def test_ip_state(self, ip, state):
+        return ip.exploded in self.ip_states[state]
+
+    def get_ip_state(self, ip):
+        for state in IPState:
+            if self.test_ip_state(ip, state):
+                return state
+        raise AssertionError("IP %s not found in any states" % ip)
+
+    def mark_ip_state(self, ip, state):
+        old_state = self.get_ip_state(ip)
+        ip_desc = self.ip_states[old_state][ip.exploded]
+        self.remove_ip_from_state(ip, old_state)
+        ip_desc.state = state
+        self.add_ip_to_state(ip, ip_desc, state)
+        return ip_desc
+
+
+class IpDescriptorMapBenchmark(unittest.TestCase):
+
+    def _populate(self, map_cls):
+        ip_map = map_cls(persist_to_redis=False)
+        ip_map.ip_states = defaultdict(_CountingDict)
+        block = ipaddress.ip_network('10.0.0.0/15')
+        ips = []
+        for i, ip in enumerate(block.hosts()):
+            if i == NUM_UES:
+                break
+            ip_desc = IPDesc(ip=ip, state=IPState.ALLOCATED, sid='IMSI%d' % i,
+                             ip_block=block, ip_type=IPType.IP_POOL)
+            ip_map.add_ip_to_state(ip, ip_desc, IPState.ALLOCATED)
+            ips.append(ip)
+        return ip_map, ips
+
+    def _run_transitions(self, map_cls):
+        ip_map, ips = self._populate(map_cls)
+        cycle = (IPState.RELEASED, IPState.REAPED, IPState.ALLOCATED)
+        _CountingDict.ops = 0
+        start = time.perf_counter()
+        for state in cycle:
+            for ip in ips:
+                ip_map.mark_ip_state(ip, state)
+        elapsed = time.perf_counter() - start
+        transitions = len(cycle) * len(ips)
+        self.assertEqual(len(ips), ip_map.get_ip_count(IPState.ALLOCATED))
+        return transitions / elapsed, _CountingDict.ops / transitions
+
+    def test_transitions_per_second(self):
+        for name, map_cls in (('probing', _ProbingIpDescriptorMap),
+                              ('indexed', IpDescriptorMap)):
+            rate, ops = self._run_transitions(map_cls)
+            print('\n%s: %d UEs, %.0f transitions/s, '
+                  '%.1f state dict ops per transition'
+                  % (name, NUM_UES, rate, ops))
+
+    def test_allocated_block_set(self):
+        ip_map, _ = self._populate(IpDescriptorMap)
+        start = time.perf_counter()
+        for _ in range(1000):
+            blocks = ip_map.get_allocated_ip_block_set()
+        elapsed = time.perf_counter() - start
+        self.assertEqual(1, len(blocks))
+        print('\nget_allocated_ip_block_set: %.1f us per call at %d UEs'
+              % (elapsed * 1e3, NUM_UES))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import ipaddress
+import unittest
+from unittest import mock
+
+import redis
+from magma.common.redis.mocks.mock_redis import MockRedis, \
+    MockRedisPipeline
+from magma.mobilityd import mobility_store as store
+from magma.mobilityd.ip_descriptor import IPDesc, IPState, IPType
+from magma.mobilityd.ip_descriptor_map import IpDescriptorMap
+
+BLOCK1 = ipaddress.ip_network('192.168.0.0/28')
+BLOCK2 = ipaddress.ip_network('192.168.1.0/28')
+
+
+def _ip_desc(ip, state, block, sid='IMSI1'):
+    return IPDesc(ip=ip, state=state, sid=sid, ip_block=block,
+                  ip_type=IPType.IP_POOL)
+
+
+class IpDescriptorMapTests(unittest.TestCase):
+    """
+    Test the IP state and allocated block indexes of IpDescriptorMap
+    """
+
+    def setUp(self):
+        self._map = IpDescriptorMap(persist_to_redis=False)
+        self._ip1 = ipaddress.ip_address('192.168.0.1')
+        self._ip2 = ipaddress.ip_address('192.168.0.2')
+        self._ip3 = ipaddress.ip_address('192.168.1.1')
+
+    def _allocate(self, ip, block, sid='IMSI1'):
+        self._map.add_ip_to_state(
+            ip, _ip_desc(ip, IPState.ALLOCATED, block, sid),
+            IPState.ALLOCATED)
+
+    def test_add_remove(self):
+        """
+        Test that the state of the IPs and the allocated blocks follow the
+        IPs added and removed
+        """
+        self._allocate(self._ip1, BLOCK1)
+        self._allocate(self._ip2, BLOCK1, 'IMSI2')
+        self._allocate(self._ip3, BLOCK2)
+        self.assertEqual(self._map.get_ip_state(self._ip1),
+                         IPState.ALLOCATED)
+        self.assertTrue(self._map.test_ip_state(self._ip3,
+                                                IPState.ALLOCATED))
+        self.assertEqual(self._map._allocated_block_count,
+                         {BLOCK1: 2, BLOCK2: 1})
+        self.assertEqual(self._map.get_allocated_ip_block_set(),
+                         {BLOCK1, BLOCK2})
+
+        # Overwriting an allocated IP doesn't count it twice
+        self._allocate(self._ip1, BLOCK1)
+        self.assertEqual(self._map._allocated_block_count[BLOCK1], 2)
+
+        ip_desc = self._map.remove_ip_from_state(self._ip3,
+                                                 IPState.ALLOCATED)
+        self.assertEqual(ip_desc.ip, self._ip3)
+        self.assertEqual(self._map.get_allocated_ip_block_set(), {BLOCK1})
+        with self.assertRaises(AssertionError):
+            self._map.get_ip_state(self._ip3)
+        self.assertIsNone(
+            self._map.remove_ip_from_state(self._ip3, IPState.ALLOCATED))
+
+        self._map.remove_ip_from_state(self._ip1, IPState.ALLOCATED)
+        self.assertEqual(self._map._allocated_block_count, {BLOCK1: 1})
+        ip_desc = self._map.pop_ip_from_state(IPState.ALLOCATED)
+        self.assertEqual(ip_desc.ip, self._ip2)
+        self.assertEqual(self._map._allocated_block_count, {})
+        self.assertEqual(self._map._ip_state_index, {})
+
+    def test_mark_cycle(self):
+        """
+        Test that the indexes follow an IP through its life cycle
+        """
+        self._allocate(self._ip1, BLOCK1)
+        for state in [IPState.RELEASED, IPState.REAPED, IPState.ALLOCATED,
+                      IPState.RELEASED]:
+            ip_desc = self._map.mark_ip_state(self._ip1, state)
+            self.assertEqual(ip_desc.state, state)
+            self.assertEqual(self._map.get_ip_state(self._ip1), state)
+            self.assertEqual(self._map.list_ips(state), [self._ip1])
+            self.assertEqual(
+                sum(self._map.get_ip_count(other) for other in IPState), 1)
+            self.assertEqual(self._map.get_allocated_ip_block_set(),
+                             {BLOCK1} if state == IPState.ALLOCATED
+                             else set())
+
+    def test_mark_same_state(self):
+        """
+        Test that marking an IP with its current state fails without
+        changing the indexes
+        """
+        self._allocate(self._ip1, BLOCK1)
+        with self.assertRaises(AssertionError):
+            self._map.mark_ip_state(self._ip1, IPState.ALLOCATED)
+        self.assertEqual(self._map.get_ip_state(self._ip1),
+                         IPState.ALLOCATED)
+        self.assertEqual(self._map.list_ips(IPState.ALLOCATED), [self._ip1])
+        self.assertEqual(self._map._allocated_block_count, {BLOCK1: 1})
+
+    def test_mark_missing_sid(self):
+        """
+        Test that marking an IP whose descriptor has no sid fails without
+        changing the indexes
+        """
+        self._map.add_ip_to_state(
+            self._ip1, _ip_desc(self._ip1, IPState.ALLOCATED, BLOCK1, None),
+            IPState.ALLOCATED)
+        with self.assertRaises(AssertionError):
+            self._map.mark_ip_state(self._ip1, IPState.RELEASED)
+        self.assertEqual(self._map.get_ip_state(self._ip1),
+                         IPState.ALLOCATED)
+        self.assertEqual(self._map._allocated_block_count, {BLOCK1: 1})
+
+    @mock.patch("redis.Redis", MockRedis)
+    def test_indexes_loaded(self):
+        """
+        Test that the indexes are built from the IP states stored in Redis
+        """
+        MockRedis.redis.clear()
+        self.addCleanup(MockRedis.redis.clear)
+        self._map = IpDescriptorMap()
+        self._allocate(self._ip1, BLOCK1)
+        self._allocate(self._ip3, BLOCK2)
+        self._map.mark_ip_state(self._ip3, IPState.RELEASED)
+
+        ip_map = IpDescriptorMap()
+        self.assertEqual(ip_map.get_ip_state(self._ip1), IPState.ALLOCATED)
+        self.assertEqual(ip_map.get_ip_state(self._ip3), IPState.RELEASED)
+        self.assertEqual(ip_map._allocated_block_count, {BLOCK1: 1})
+
+    @mock.patch("redis.Redis", MockRedis)
+    def test_failed_flush(self):
+        """
+        Test that the indexes are rebuilt from Redis when the writes of a
+        batch fail
+        """
+        MockRedis.redis.clear()
+        self.addCleanup(MockRedis.redis.clear)
+        batch = store.WriteBatch(MockRedis('localhost', 6379))
+        self._map = IpDescriptorMap(write_batch=batch)
+        with batch:
+            self._allocate(self._ip1, BLOCK1)
+
+        with mock.patch.object(MockRedisPipeline, 'execute',
+                               side_effect=redis.ConnectionError):
+            with self.assertRaises(redis.ConnectionError):
+                with batch:
+                    self._map.mark_ip_state(self._ip1, IPState.RELEASED)
+                    self._allocate(self._ip3, BLOCK2)
+
+        self.assertEqual(self._map.get_ip_state(self._ip1),
+                         IPState.ALLOCATED)
+        self.assertEqual(self._map.list_ips(IPState.RELEASED), [])
+        with self.assertRaises(AssertionError):
+            self._map.get_ip_state(self._ip3)
+        self.assertEqual(self._map._allocated_block_count, {BLOCK1: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import random
+import unittest
+
+from magma.mobilityd.ip_free_ranges import FreeRangeSet
+
+
+class FreeRangeSetTests(unittest.TestCase):
+    """
+    Test class for the compact free list of the IP pool
+    """
+
+    def test_empty(self):
+        free = FreeRangeSet()
+        self.assertEqual(0, len(free))
+        self.assertFalse(free)
+        with self.assertRaises(KeyError):
+            free.pop()
+
+    def test_pop_lowest(self):
+        free = FreeRangeSet(10, 13)
+        self.assertEqual(3, len(free))
+        self.assertEqual([10, 11, 12], [free.pop() for _ in range(3)])
+        self.assertFalse(free)
+        self.assertEqual([], free.ranges())
+
+    def test_add_merges_neighbours(self):
+        free = FreeRangeSet(0, 10)
+        for value in (3, 5, 4):
+            self.assertTrue(free.discard(value))
+        self.assertEqual([(0, 3), (6, 10)], free.ranges())
+
+        self.assertTrue(free.add(5))
+        self.assertEqual([(0, 3), (5, 10)], free.ranges())
+        self.assertTrue(free.add(3))
+        self.assertEqual([(0, 4), (5, 10)], free.ranges())
+        self.assertTrue(free.add(4))
+        self.assertEqual([(0, 10)], free.ranges())
+        self.assertEqual(10, len(free))
+
+    def test_add_duplicate(self):
+        free = FreeRangeSet(0, 4)
+        self.assertFalse(free.add(2))
+        self.assertEqual(4, len(free))
+        self.assertTrue(free.add(20))
+        self.assertEqual([(0, 4), (20, 21)], free.ranges())
+
+    def test_discard(self):
+        free = FreeRangeSet(0, 5)
+        self.assertTrue(free.discard(0))
+        self.assertTrue(free.discard(4))
+        self.assertTrue(free.discard(2))
+        self.assertFalse(free.discard(2))
+        self.assertFalse(free.discard(7))
+        self.assertEqual([(1, 2), (3, 4)], free.ranges())
+        self.assertEqual([1, 3], list(free))
+        self.assertIn(3, free)
+        self.assertNotIn(2, free)
+
+    def test_large_range(self):
+        free = FreeRangeSet(0, 1 << 16)
+        self.assertEqual(1 << 16, len(free))
+        self.assertEqual(1, len(free.ranges()))
+        self.assertEqual(0, free.pop())
+        self.assertTrue(free.add(0))
+        self.assertEqual([(0, 1 << 16)], free.ranges())
+
+    def test_pop_fragments(self):
+        free = FreeRangeSet(0, 20)
+        for value in range(1, 20, 2):
+            self.assertTrue(free.discard(value))
+        self.assertEqual([0, 2, 4, 6], [free.pop() for _ in range(4)])
+        self.assertEqual([(8, 9), (10, 11), (12, 13), (14, 15), (16, 17),
+                          (18, 19)], free.ranges())
+        self.assertNotIn(6, free)
+        self.assertIn(8, free)
+
+        # Below the lowest range and next to it
+        self.assertTrue(free.add(2))
+        self.assertTrue(free.add(7))
+        self.assertTrue(free.discard(10))
+        self.assertEqual([(2, 3), (7, 9), (12, 13), (14, 15), (16, 17),
+                          (18, 19)], free.ranges())
+        self.assertEqual([2, 7, 8, 12, 14, 16, 18],
+                         [free.pop() for _ in range(7)])
+        self.assertFalse(free)
+        self.assertTrue(free.add(5))
+        self.assertEqual([(5, 6)], free.ranges())
+
+    def test_matches_set(self):
+        rand = random.Random(0)
+        free = FreeRangeSet(0, 64)
+        expected = set(range(64))
+        for _ in range(2000):
+            value = rand.randrange(72)
+            op = rand.randrange(3)
+            if op == 0 and expected:
+                self.assertEqual(min(expected), free.pop())
+                expected.remove(min(expected))
+            elif op == 1:
+                self.assertEqual(value not in expected, free.add(value))
+                expected.add(value)
+            else:
+                self.assertEqual(value in expected, free.discard(value))
+                expected.discard(value)
+            self.assertEqual(len(expected), len(free))
+        self.assertEqual(sorted(expected), list(free))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import ipaddress
+import unittest
+from unittest import mock
+
+import redis
+from magma.common.redis.mocks.mock_redis import MockRedis, \
+    MockRedisPipeline
+from magma.mobilityd import mobility_store as store
+from magma.mobilityd.ip_descriptor import IPDesc, IPState, IPType
+
+
+class WriteBatchTests(unittest.TestCase):
+    """
+    Test that mobilityd Redis writes are grouped by store.WriteBatch
+    """
+
+    @mock.patch("redis.Redis", MockRedis)
+    def setUp(self):
+        MockRedis.redis.clear()
+        self._client = MockRedis('localhost', 6379)
+        self._batch = store.WriteBatch(self._client)
+        self._allocated = store.ip_states(self._client, IPState.ALLOCATED,
+                                          self._batch)
+        self._released = store.ip_states(self._client, IPState.RELEASED,
+                                         self._batch)
+        self._sid_ips_map = store.IPDescDict(self._client, self._batch)
+
+        block = ipaddress.ip_network('192.168.0.0/28')
+        self._ip = ipaddress.ip_address('192.168.0.12')
+        self._ip_desc = IPDesc(ip=self._ip, state=IPState.ALLOCATED,
+                               sid='IMSI1', ip_block=block,
+                               ip_type=IPType.IP_POOL)
+
+    def tearDown(self):
+        MockRedis.redis.clear()
+
+    def test_writes_committed_on_exit(self):
+        with self._batch:
+            self._allocated[self._ip.exploded] = self._ip_desc
+            self._sid_ips_map['IMSI1'] = self._ip_desc
+
+            # Nothing written yet, but pending writes are readable
+            self.assertEqual({}, MockRedis.redis)
+            self.assertIn(self._ip.exploded, self._allocated)
+            self.assertIn('IMSI1', self._sid_ips_map)
+            self.assertEqual(self._ip,
+                             self._allocated[self._ip.exploded].ip)
+            self.assertEqual(1, self._sid_ips_map.get_version('IMSI1'))
+
+        self.assertNotEqual({}, MockRedis.redis)
+        self.assertEqual(self._ip, self._sid_ips_map['IMSI1'].ip)
+        self.assertEqual(1, self._allocated.get_version(self._ip.exploded))
+
+    def test_state_transition(self):
+        self._allocated[self._ip.exploded] = self._ip_desc
+        self._sid_ips_map['IMSI1'] = self._ip_desc
+
+        with self._batch:
+            ip_desc = self._allocated.pop(self._ip.exploded)
+            ip_desc.state = IPState.RELEASED
+            self._released[self._ip.exploded] = ip_desc
+
+            self.assertNotIn(self._ip.exploded, self._allocated)
+            self.assertIsNone(self._allocated.pop(self._ip.exploded, None))
+            # Not committed yet
+            self.assertIsNotNone(self._client.hget(
+                self._allocated.key, self._ip.exploded))
+
+        self.assertIsNone(self._client.hget(
+            self._allocated.key, self._ip.exploded))
+        self.assertEqual(IPState.RELEASED,
+                         self._released[self._ip.exploded].state)
+
+    def test_delete(self):
+        self._sid_ips_map['IMSI1'] = self._ip_desc
+
+        with self._batch:
+            del self._sid_ips_map['IMSI1']
+            self.assertNotIn('IMSI1', self._sid_ips_map)
+            with self.assertRaises(KeyError):
+                del self._sid_ips_map['IMSI1']
+
+        self.assertIsNone(self._sid_ips_map.get('IMSI1'))
+
+    def test_scan_flushes_batch(self):
+        with self._batch:
+            self._sid_ips_map['IMSI1'] = self._ip_desc
+            self.assertEqual(['IMSI1'], list(self._sid_ips_map))
+            self.assertIsNotNone(self._client.get(
+                'IMSI1:' + store.IPDESC_REDIS_TYPE))
+
+    def test_nested_batch(self):
+        with self._batch:
+            with self._batch:
+                self._sid_ips_map['IMSI1'] = self._ip_desc
+            self.assertEqual({}, MockRedis.redis)
+        self.assertIn('IMSI1', self._sid_ips_map)
+
+    def test_local_cache(self):
+        allocated = store.ip_states(self._client, IPState.ALLOCATED,
+                                    self._batch, local_cache=True)
+        sid_ips_map = store.IPDescDict(self._client, self._batch,
+                                       local_cache=True)
+        with self._batch:
+            allocated[self._ip.exploded] = self._ip_desc
+            sid_ips_map['IMSI1'] = self._ip_desc
+
+        with mock.patch.object(self._client, 'get') as get, \
+                mock.patch.object(self._client, 'hget') as hget:
+            self.assertEqual(self._ip, sid_ips_map['IMSI1'].ip)
+            self.assertEqual(1, allocated.get_version(self._ip.exploded))
+            get.assert_not_called()
+            hget.assert_not_called()
+
+        # Cached copies are not affected by in-place state transitions
+        with self._batch:
+            ip_desc = allocated.pop(self._ip.exploded)
+            ip_desc.state = IPState.RELEASED
+        self.assertEqual(IPState.ALLOCATED, sid_ips_map['IMSI1'].state)
+        self.assertNotIn(self._ip.exploded, allocated)
+        self.assertEqual([], sid_ips_map.check_cache_versions())
+
+    def test_loaded_cache(self):
+        self._allocated[self._ip.exploded] = self._ip_desc
+        self._sid_ips_map['IMSI1'] = self._ip_desc
+        allocated = store.ip_states(self._client, IPState.ALLOCATED,
+                                    self._batch, local_cache=True)
+        released = store.ip_states(self._client, IPState.RELEASED,
+                                   self._batch, local_cache=True)
+        sid_ips_map = store.IPDescDict(self._client, self._batch,
+                                       local_cache=True)
+        for container in (allocated, released, sid_ips_map):
+            container.load_cache()
+
+        # The batch neither reads Redis nor flushes before it exits
+        reads = ['get', 'mget', 'exists', 'scan_iter', 'hget', 'hgetall',
+                 'hlen']
+        mocks = []
+        for patch in [mock.patch.object(self._client, name)
+                      for name in reads] + \
+                [mock.patch.object(MockRedisPipeline, 'execute')]:
+            mocks.append(patch.start())
+            self.addCleanup(patch.stop)
+        with self._batch:
+            ip_desc = allocated.pop(self._ip.exploded)
+            ip_desc.state = IPState.RELEASED
+            released[self._ip.exploded] = ip_desc
+            self.assertIsNone(allocated.pop(self._ip.exploded, None))
+            self.assertEqual(0, len(allocated))
+            self.assertEqual([self._ip.exploded], list(released))
+            self.assertEqual(1, released.get_version(self._ip.exploded))
+
+            sid_ips_map['IMSI2'] = ip_desc
+            del sid_ips_map['IMSI1']
+            self.assertNotIn('IMSI1', sid_ips_map)
+            self.assertEqual([('IMSI2', self._ip)],
+                             [(sid, ip_desc.ip)
+                              for sid, ip_desc in sid_ips_map.items()])
+            with self.assertRaises(KeyError):
+                del sid_ips_map['IMSI3']
+            for mocked in mocks:
+                mocked.assert_not_called()
+        mocks[-1].assert_called_once_with()
+
+    def test_failed_flush(self):
+        sid_ips_map = store.IPDescDict(self._client, self._batch,
+                                       local_cache=True)
+        sid_ips_map['IMSI1'] = self._ip_desc
+        sid_ips_map.load_cache()
+        reload_callback = mock.Mock()
+        self._batch.add_reload_callback(sid_ips_map.load_cache)
+        self._batch.add_reload_callback(reload_callback)
+
+        with mock.patch.object(MockRedisPipeline, 'execute',
+                               side_effect=redis.ConnectionError):
+            with self.assertRaises(redis.ConnectionError):
+                with self._batch:
+                    sid_ips_map['IMSI2'] = self._ip_desc
+                    del sid_ips_map['IMSI1']
+
+        # The local cache is rebuilt from Redis
+        reload_callback.assert_called_once_with()
+        self.assertEqual({}, sid_ips_map.pending)
+        self.assertEqual(['IMSI1'], list(sid_ips_map))
+        self.assertEqual(1, sid_ips_map.get_version('IMSI1'))
+
+        # A failed reload is retried when the batch is next opened
+        reload_callback.side_effect = redis.ConnectionError
+        with mock.patch.object(MockRedisPipeline, 'execute',
+                               side_effect=redis.ConnectionError):
+            with self.assertRaises(redis.ConnectionError):
+                with self._batch:
+                    sid_ips_map['IMSI2'] = self._ip_desc
+        with self.assertRaises(redis.ConnectionError):
+            with self._batch:
+                pass
+        reload_callback.side_effect = None
+        with self._batch:
+            sid_ips_map['IMSI2'] = self._ip_desc
+        self.assertEqual(4, reload_callback.call_count)
+        self.assertEqual(['IMSI1', 'IMSI2'], sorted(sid_ips_map))
+
+
+if __name__ == "__main__":
+    unittest.main()
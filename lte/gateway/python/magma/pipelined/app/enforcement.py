@@ -78,6 +78,7 @@ class EnforcementController(PolicyMixin, MagmaController):
             self._service_manager.allocate_scratch_tables(self.APP_NAME, 1)[0]
         self._bridge_ip_address = kwargs['config']['bridge_ip_address']
         self._redirect_manager = None
+        self._dns_resolver = kwargs['dns_resolver']
         self._qos_mgr = None
         self._clean_restart = kwargs['config']['clean_restart']
 
@@ -98,7 +99,8 @@ class EnforcementController(PolicyMixin, MagmaController):
             self.tbl_num,
             self._enforcement_stats_scratch,
             self._redirect_scratch,
-            self._session_rule_version_mapper)
+            self._session_rule_version_mapper,
+            self._dns_resolver)
 
     def cleanup_on_disconnect(self, datapath):
         """
@@ -351,7 +353,7 @@ class EnforcementController(PolicyMixin, MagmaController):
             priority=priority)
         try:
             self._redirect_manager.handle_redirection(
-                self._datapath, self.loop, redirect_request)
+                self._datapath, redirect_request)
             return RuleModResult.SUCCESS
         except RedirectException as err:
             self.logger.error(
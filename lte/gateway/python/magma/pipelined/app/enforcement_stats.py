@@ -11,8 +11,8 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import heapq
 from typing import List
-from collections import defaultdict
 
 from lte.protos.pipelined_pb2 import RuleModResult
 from lte.protos.session_manager_pb2 import RuleRecord, \
@@ -41,6 +41,8 @@ from magma.pipelined.openflow.registers import Direction, DIRECTION_REG, \
 ETH_FRAME_SIZE_BYTES = 14
 PROCESS_STATS = 0x0
 IGNORE_STATS = 0x1
+# The low bits of the encoded imsi hold its padding, not its digits
+IMSI_SHARD_SHIFT = 3
 
 
 class EnforcementStatsController(PolicyMixin, MagmaController):
@@ -52,6 +54,11 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
     usage records to session manager via RPC. Flows are deleted when their
     version (reg4 match) is different from the current version of the rule for
     the subscriber maintained by the rule version mapper.
+
+    With poll_shards set above 1, each poll only covers the subscribers of
+    one imsi shard in turn, along with the poll_active_subscribers
+    subscribers of the other shards that had the most traffic on their last
+    poll, so the size of a poll doesn't grow with the number of flows.
     """
 
     APP_NAME = 'enforcement_stats'
@@ -73,15 +80,35 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
         self.loop = kwargs['loop']
         # Spawn a thread to poll for flow stats
         poll_interval = kwargs['config']['enforcement']['poll_interval']
+        self._poll_shards = \
+            kwargs['config']['enforcement'].get('poll_shards', 1)
+        if self._poll_shards < 1 or \
+                self._poll_shards & (self._poll_shards - 1):
+            self.logger.error('poll_shards must be a power of 2, got %s, '
+                              'polling all the flows at once',
+                              self._poll_shards)
+            self._poll_shards = 1
+        self._max_active_polls = \
+            kwargs['config']['enforcement'].get('poll_active_subscribers', 0)
         # Create a rpc channel to sessiond
         self.sessiond = kwargs['rpc_stubs']['sessiond']
         self._msg_hub = MessageHub(self.logger)
         self.unhandled_stats_msgs = []  # Store multi-part responses from ovs
-        self.total_usage = {}  # Store total usage
-        # Store last usage excluding deleted flows for calculating deltas
+        # Store total usage, as (imsi, rule num, ip) ->
+        # [sid, rule id, bytes tx, bytes rx]
+        self.total_usage = {}
+        # Store last usage excluding deleted flows for calculating deltas,
+        # keyed like total_usage
         self.last_usage_for_delta = {}
         self.failed_usage = {}  # Store failed usage to retry rpc to sessiond
         self._unmatched_bytes = 0  # Store bytes matched by default rule if any
+        self._next_shard = 0
+        self._poll_round = None  # The shard poll waiting for its replies
+        # Encoded imsis polled along with every shard
+        self._active_imsis = []
+        # The usage keys and the sessions found in each shard
+        self._shard_keys = [set() for _ in range(self._poll_shards)]
+        self._shard_sessions = [{} for _ in range(self._poll_shards)]
         self._clean_restart = kwargs['config']['clean_restart']
         self.flow_stats_thread = hub.spawn(self._monitor, poll_interval)
 
@@ -98,6 +125,10 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
         self.last_usage_for_delta = {}
         self.failed_usage = {}
         self._unmatched_bytes = 0
+        self._poll_round = None
+        self._active_imsis = []
+        self._shard_keys = [set() for _ in range(self._poll_shards)]
+        self._shard_sessions = [{} for _ in range(self._poll_shards)]
 
     def initialize_on_connect(self, datapath):
         """
@@ -250,7 +281,8 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
 
     def get_policy_usage(self, fut):
         record_table = RuleRecordTable(
-            records=self.total_usage.values(),
+            records=[_get_rule_record(usage, key[2])
+                     for key, usage in self.total_usage.items()],
             epoch=global_epoch)
         fut.set_result(record_table)
 
@@ -272,17 +304,77 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
         """
         Send a FlowStatsRequest message to the datapath
         """
+        if self._poll_shards > 1:
+            self._poll_shard_stats(datapath)
+            return
+        req = self._get_flow_stats_request(datapath)
+        try:
+            messages.send_msg(datapath, req)
+        except MagmaOFError as e:
+            self.logger.warning("Couldn't poll datapath stats: %s", e)
+
+    def _poll_shard_stats(self, datapath):
+        """
+        Send the FlowStatsRequest messages for the flows of the next imsi
+        shard, and for the flows of the active subscribers of the other
+        shards. The default flow is polled once all the shards were.
+        """
+        if self._poll_round is not None:
+            self.logger.warning('Flow stats of shard %d not received in '
+                                'time, skipping them',
+                                self._poll_round.shard)
+        if not self.total_usage:
+            # The flows of the other shards aren't known yet, e.g. on startup,
+            # so they all get polled once
+            poll_round = _PollRound(0, 1, [])
+            reqs = [self._get_flow_stats_request(datapath)]
+        else:
+            poll_round = self._get_next_poll_round()
+            parser = datapath.ofproto_parser
+            shard_mask = (self._poll_shards - 1) << IMSI_SHARD_SHIFT
+            reqs = [self._get_flow_stats_request(
+                datapath, match=parser.OFPMatch(
+                    metadata=(poll_round.shard << IMSI_SHARD_SHIFT,
+                              shard_mask)))]
+            reqs.extend(
+                self._get_flow_stats_request(
+                    datapath, match=parser.OFPMatch(metadata=imsi))
+                for imsi in poll_round.imsis)
+        if poll_round.shard == 0:
+            reqs.append(self._get_flow_stats_request(
+                datapath, cookie=self.DEFAULT_FLOW_COOKIE,
+                cookie_mask=flows.OVS_COOKIE_MATCH_ALL))
+
+        # Replies may come before send_msg returns
+        self._poll_round = poll_round
+        for req in reqs:
+            datapath.set_xid(req)
+            poll_round.pending_xids.add(req.xid)
+        for req in reqs:
+            try:
+                messages.send_msg(datapath, req)
+            except MagmaOFError as e:
+                self.logger.warning("Couldn't poll datapath stats: %s", e)
+                self._poll_round = None
+                return
+
+    def _get_next_poll_round(self):
+        shard = self._next_shard
+        self._next_shard = (shard + 1) % self._poll_shards
+        return _PollRound(
+            shard, self._poll_shards,
+            [imsi for imsi in self._active_imsis
+             if _get_imsi_shard(imsi, self._poll_shards) != shard])
+
+    def _get_flow_stats_request(self, datapath, **kwargs):
         ofproto, parser = datapath.ofproto, datapath.ofproto_parser
-        req = parser.OFPFlowStatsRequest(
+        return parser.OFPFlowStatsRequest(
             datapath,
             table_id=self.tbl_num,
             out_group=ofproto.OFPG_ANY,
             out_port=ofproto.OFPP_ANY,
+            **kwargs
         )
-        try:
-            messages.send_msg(datapath, req)
-        except MagmaOFError as e:
-            self.logger.warning("Couldn't poll datapath stats: %s", e)
 
     @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
     def _flow_stats_reply_handler(self, ev):
@@ -293,7 +385,10 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
         if not self.init_finished:
             self.logger.debug('Setup not finished, skipping stats reply')
             return
-        
+        if self._poll_shards > 1:
+            self._handle_shard_stats_reply(ev.msg)
+            return
+
         self.unhandled_stats_msgs.append(ev.msg.body)
         if ev.msg.flags == OFPMPF_REPLY_MORE:
             # Wait for more multi-part responses thats received for the
@@ -303,40 +398,212 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
             self._handle_flow_stats, self.unhandled_stats_msgs)
         self.unhandled_stats_msgs = []
 
-    def _handle_flow_stats(self, stats_msgs):
+    def _handle_shard_stats_reply(self, msg):
+        """
+        Collect the replies to the requests of a shard poll, and schedule
+        their handling once all of them are received
+        """
+        poll_round = self._poll_round
+        if poll_round is None or msg.xid not in poll_round.pending_xids:
+            # Reply to a poll that was given up
+            return
+        poll_round.stats_msgs.append(msg.body)
+        if msg.flags == OFPMPF_REPLY_MORE:
+            return
+        poll_round.pending_xids.discard(msg.xid)
+        if poll_round.pending_xids:
+            return
+        self._poll_round = None
+        self.loop.call_soon_threadsafe(
+            self._handle_flow_stats, poll_round.stats_msgs, poll_round)
+
+    def _handle_flow_stats(self, stats_msgs, poll_round=None):
         """
         Aggregate flow stats by rule, and report to session manager
+
+        The stats are walked once, summing the byte counts by subscriber,
+        rule and ip, and picking the flows of old rule versions to delete.
+        The stats of a shard poll only replace the usage of the subscribers
+        the poll covered.
         """
         stat_count = sum(len(flow_stats) for flow_stats in stats_msgs)
-        if stat_count == 0:
+        if stat_count == 0 and poll_round is None:
             return
 
         self.logger.debug("Processing %s stats responses", len(stats_msgs))
-        # Aggregate flows into rule records
-        current_usage = defaultdict(RuleRecord)
+        # (imsi, rule num, ip) -> [sid, rule id, bytes tx, bytes rx]
+        current_usage = {}
+        old_flow_stats = []
+        # Decoded imsis and rule ids, looked up once per poll
+        sids = {}
+        rule_ids = {}
         for flow_stats in stats_msgs:
             self.logger.debug("Processing stats of %d flows", len(flow_stats))
             for stat in flow_stats:
                 if stat.table_id != self.tbl_num:
                     # this update is not intended for policy
                     return
-                current_usage = self._update_usage_from_flow_stat(
-                    current_usage, stat)
+                rule_num = stat.cookie
+                rule_id = rule_ids.get(rule_num)
+                if rule_id is None:
+                    rule_id = rule_ids[rule_num] = self._get_rule_id(stat)
+                # Rule not found, must be default flow
+                if rule_id == "":
+                    self._check_default_flow_stat(stat)
+                    continue
 
-        # Calculate the delta values from last stat update
-        delta_usage = _delta_usage_maps(current_usage,
-                                        self.last_usage_for_delta)
-        self.total_usage = current_usage
+                imsi = stat.match.get(IMSI_REG)
+                sid = sids.get(imsi)
+                if sid is None:
+                    sid = sids[imsi] = _get_sid(stat)
+                ipv4_addr = _get_ipv4(stat)
+                key = (imsi, rule_num, ipv4_addr)
 
-        # Append any records which we couldn't send to session manager earlier
-        delta_usage = _merge_usage_maps(delta_usage, self.failed_usage)
-        self.failed_usage = {}
+                rule_version = _get_version(stat)
+                current_ver = self._session_rule_version_mapper.get_version(
+                    sid, ipv4_addr, rule_id)
+                if current_ver != rule_version:
+                    old_flow_stats.append((key, stat, rule_version))
+
+                # If this is a pass through app name flow ignore stats
+                if stat.match[SCRATCH_REGS[1]] == IGNORE_STATS:
+                    continue
+                usage = current_usage.get(key)
+                if usage is None:
+                    usage = current_usage[key] = [sid, rule_id, 0, 0]
+                bytes_tx, bytes_rx = _get_byte_counts(stat)
+                usage[2] += bytes_tx
+                usage[3] += bytes_rx
+
+        if poll_round is None:
+            delta_usage = self._get_delta_usage(current_usage)
+            self.total_usage = current_usage
+
+            # Send report even if usage is empty. Sessiond uses empty reports
+            # to recognize when flows have ended
+            self._report_usage(delta_usage)
+
+            self.last_usage_for_delta = \
+                self._delete_old_flows(current_usage, old_flow_stats)
+            return
+
+        self._handle_shard_usage(current_usage, old_flow_stats, poll_round)
+
+    def _handle_shard_usage(self, current_usage, old_flow_stats, poll_round):
+        """
+        Report the usage of the subscribers covered by a shard poll, and
+        merge it into the usage of the other subscribers, which are still
+        reported so that sessiond doesn't end their flows.
+
+        The flows of the active subscribers that weren't found anymore are
+        only dropped when their shard gets polled.
+        """
+        if poll_round.num_shards == 1:
+            polled_shards = range(self._poll_shards)
+        else:
+            polled_shards = [poll_round.shard]
+        for shard in polled_shards:
+            for key in self._shard_keys[shard]:
+                if key not in current_usage:
+                    self.total_usage.pop(key, None)
+                    self.last_usage_for_delta.pop(key, None)
+            self._shard_keys[shard] = set()
+            self._shard_sessions[shard] = {}
+        unpolled_sessions = {}
+        for shard, sessions in enumerate(self._shard_sessions):
+            if shard not in polled_shards:
+                unpolled_sessions.update(sessions)
+        for key, usage in current_usage.items():
+            shard = _get_imsi_shard(key[0], self._poll_shards)
+            self._shard_keys[shard].add(key)
+            self._shard_sessions[shard].setdefault((usage[0], key[2]),
+                                                   (usage[0], usage[1]))
+
+        active_usage = {}
+        delta_usage = self._get_delta_usage(current_usage, unpolled_sessions,
+                                            active_usage)
+        self.total_usage.update(current_usage)
 
-        # Send report even if usage is empty. Sessiond uses empty reports to
-        # recognize when flows have ended
         self._report_usage(delta_usage)
 
-        self._delete_old_flows(stats_msgs)
+        self.last_usage_for_delta.update(
+            self._delete_old_flows(current_usage, old_flow_stats))
+        self._active_imsis = heapq.nlargest(
+            self._max_active_polls, active_usage, key=active_usage.get)
+
+    def _check_default_flow_stat(self, flow_stat):
+        """
+        Log the bytes matched by the default flow, which aren't reported
+        """
+        default_flow_matched = \
+            flow_stat.cookie == self.DEFAULT_FLOW_COOKIE and \
+            flow_stat.byte_count != 0 and \
+            self._unmatched_bytes != flow_stat.byte_count
+        if default_flow_matched:
+            self.logger.error('%s bytes total not reported.',
+                              flow_stat.byte_count)
+            self._unmatched_bytes = flow_stat.byte_count
+
+    def _get_delta_usage(self, current_usage, unpolled_sessions=None,
+                         active_usage=None):
+        """
+        Return the usage records to report to sessiond, keyed by
+        'sid|rule_id|ip'. Records are only built for the usage that changed
+        since the last poll, or that couldn't be sent to session manager
+        earlier. A session with flows but no usage still gets one empty
+        record, as sessiond considers that the flows of a session without
+        records have ended.
+
+        The (sid, ip) -> (sid, rule id) sessions of unpolled_sessions are
+        taken as idle, along with the records that failed to be sent for
+        them. The bytes used by each polled imsi are added to active_usage.
+        """
+        delta_usage = {}
+        reported_sessions = set()
+        idle_sessions = dict(unpolled_sessions or {})
+        last_usage_for_delta = self.last_usage_for_delta
+        failed_usage, self.failed_usage = self.failed_usage, {}
+        for key, usage in current_usage.items():
+            sid, rule_id, bytes_tx, bytes_rx = usage
+            ipv4_addr = key[2]
+            last = last_usage_for_delta.get(key)
+            if last is not None:
+                bytes_tx -= last[2]
+                bytes_rx -= last[3]
+            # Append any records which we couldn't send to session manager
+            # earlier
+            if failed_usage:
+                failed = failed_usage.get(
+                    _get_usage_key(sid, rule_id, ipv4_addr))
+                if failed is not None:
+                    bytes_tx += failed.bytes_tx
+                    bytes_rx += failed.bytes_rx
+            if bytes_tx or bytes_rx:
+                delta_usage[_get_usage_key(sid, rule_id, ipv4_addr)] = \
+                    _get_rule_record((sid, rule_id, bytes_tx, bytes_rx),
+                                     ipv4_addr)
+                reported_sessions.add((sid, ipv4_addr))
+                if active_usage is not None:
+                    imsi = key[0]
+                    active_usage[imsi] = \
+                        active_usage.get(imsi, 0) + bytes_tx + bytes_rx
+            else:
+                idle_sessions.setdefault((sid, ipv4_addr), (sid, rule_id))
+
+        if unpolled_sessions:
+            for usage_key, failed in failed_usage.items():
+                session = (failed.sid, failed.ue_ipv4 or None)
+                if usage_key not in delta_usage and \
+                        session in unpolled_sessions:
+                    delta_usage[usage_key] = failed
+                    reported_sessions.add(session)
+
+        for session, (sid, rule_id) in idle_sessions.items():
+            if session not in reported_sessions:
+                ipv4_addr = session[1]
+                delta_usage[_get_usage_key(sid, rule_id, ipv4_addr)] = \
+                    _get_rule_record((sid, rule_id, 0, 0), ipv4_addr)
+        return delta_usage
 
     def _report_usage(self, delta_usage):
         """
@@ -360,103 +627,36 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
             self.failed_usage = _merge_usage_maps(
                 delta_usage, self.failed_usage)
 
-    def _update_usage_from_flow_stat(self, current_usage, flow_stat):
-        """
-        Update the rule record map with the flow stat and return the
-        updated map.
-        """
-        rule_id = self._get_rule_id(flow_stat)
-        # Rule not found, must be default flow
-        if rule_id == "":
-            default_flow_matched = \
-                flow_stat.cookie == self.DEFAULT_FLOW_COOKIE and \
-                flow_stat.byte_count != 0 and \
-                self._unmatched_bytes != flow_stat.byte_count
-            if default_flow_matched:
-                self.logger.error('%s bytes total not reported.',
-                                  flow_stat.byte_count)
-                self._unmatched_bytes = flow_stat.byte_count
-            return current_usage
-        # If this is a pass through app name flow ignore stats
-        if flow_stat.match[SCRATCH_REGS[1]] == IGNORE_STATS:
-            return current_usage
-        sid = _get_sid(flow_stat)
-        ipv4_addr = _get_ipv4(flow_stat)
-
-        # use a compound key to separate flows for the same rule but for
-        # different subscribers
-        key = sid + "|" + rule_id
-        if ipv4_addr:
-            key += "|" + ipv4_addr
-        record = current_usage[key]
-        record.rule_id = rule_id
-        record.sid = sid
-        if ipv4_addr:
-            record.ue_ipv4 = ipv4_addr
-        if flow_stat.match[DIRECTION_REG] == Direction.IN:
-            # HACK decrement byte count for downlink packets by the length
-            # of an ethernet frame. Only IP and below should be counted towards
-            # a user's data. Uplink does this already because the GTP port is
-            # an L3 port.
-            record.bytes_rx += _get_downlink_byte_count(flow_stat)
-        else:
-            record.bytes_tx += flow_stat.byte_count
-        current_usage[key] = record
-        return current_usage
-
-    def _delete_old_flows(self, stats_msgs):
+    def _delete_old_flows(self, current_usage, old_flow_stats):
         """
-        Check if the version of any flow is older than the current version. If
-        so, delete the flow and update last_usage_for_delta so we calculate the
-        correct usage delta for the next poll.
+        Delete the flows whose version is older than the current version, and
+        return the usage to calculate the correct usage delta from on the
+        next poll.
         """
-        deleted_flow_usage = defaultdict(RuleRecord)
-        for deletable_stat in self._old_flow_stats(stats_msgs):
-            stat_rule_id = self._get_rule_id(deletable_stat)
-            stat_sid = _get_sid(deletable_stat)
-            ipv4_addr = _get_ipv4(deletable_stat)
-            rule_version = _get_version(deletable_stat)
-
+        last_usage = current_usage
+        for key, stat, rule_version in old_flow_stats:
+            sid = _get_sid(stat)
+            ipv4_addr = key[2]
             try:
-                self._delete_flow(deletable_stat, stat_sid, ipv4_addr,
-                                  rule_version)
-                # Only remove the usage of the deleted flow if deletion
-                # is successful.
-                self._update_usage_from_flow_stat(deleted_flow_usage,
-                                                  deletable_stat)
+                self._delete_flow(stat, sid, ipv4_addr, rule_version)
             except MagmaOFError as e:
                 self.logger.error(
                     'Failed to delete rule %s for subscriber %s '
-                    '(version: %s): %s', stat_rule_id,
-                    stat_sid, rule_version, e)
-
-        self.last_usage_for_delta = _delta_usage_maps(self.total_usage,
-                                                      deleted_flow_usage)
-
-    def _old_flow_stats(self, stats_msgs):
-        """
-        Generator function to filter the flow stats that should be deleted from
-        the stats messages.
-        """
-        for flow_stats in stats_msgs:
-            for stat in flow_stats:
-                if stat.table_id != self.tbl_num:
-                    # this update is not intended for policy
-                    return
-
-                rule_id = self._get_rule_id(stat)
-                sid = _get_sid(stat)
-                ipv4_addr = _get_ipv4(stat)
-                rule_version = _get_version(stat)
-                if rule_id == "":
-                    continue
-
-                current_ver = \
-                    self._session_rule_version_mapper.get_version(sid,
-                                                                  ipv4_addr,
-                                                                  rule_id)
-                if current_ver != rule_version:
-                    yield stat
+                    '(version: %s): %s', self._get_rule_id(stat),
+                    sid, rule_version, e)
+                continue
+            # Only remove the usage of the deleted flow if deletion
+            # is successful.
+            if stat.match[SCRATCH_REGS[1]] == IGNORE_STATS:
+                continue
+            if last_usage is current_usage:
+                last_usage = dict(current_usage)
+            sid, rule_id, bytes_tx, bytes_rx = last_usage[key]
+            deleted_tx, deleted_rx = _get_byte_counts(stat)
+            last_usage[key] = [sid, rule_id, bytes_tx - deleted_tx,
+                               bytes_rx - deleted_rx]
+
+        return last_usage
 
     def _delete_flow(self, flow_stat, sid, ip_addr, version):
         cookie, mask = (
@@ -486,6 +686,26 @@ class EnforcementStatsController(PolicyMixin, MagmaController):
             return ""
 
 
+class _PollRound:
+    """
+    The subscribers covered by a shard poll, and the replies to its requests
+    """
+
+    def __init__(self, shard: int, num_shards: int, imsis: List[int]):
+        self.shard = shard
+        self.num_shards = num_shards
+        self.imsis = set(imsis)
+        self.pending_xids = set()
+        self.stats_msgs = []
+
+
+def _get_imsi_shard(imsi: int, num_shards: int) -> int:
+    """
+    Return the shard of an encoded imsi, num_shards being a power of 2
+    """
+    return (imsi >> IMSI_SHARD_SHIFT) & (num_shards - 1)
+
+
 def _generate_rule_match(imsi, ip_addr, rule_num, version, direction):
     """
     Return a MagmaMatch that matches on the rule num and the version.
@@ -497,25 +717,27 @@ def _generate_rule_match(imsi, ip_addr, rule_num, version, direction):
                       **ip_match)
 
 
-def _delta_usage_maps(current_usage, last_usage):
+def _get_usage_key(sid, rule_id, ipv4_addr):
     """
-    Calculate the delta between the 2 usage maps and returns a new
-    usage map.
+    Return the key of a usage record reported to sessiond. The compound key
+    separates flows for the same rule but for different subscribers.
     """
-    if len(last_usage) == 0:
-        return current_usage
-    new_usage = {}
-    for key, current in current_usage.items():
-        last = last_usage.get(key, None)
-        if last is not None:
-            rec = RuleRecord()
-            rec.MergeFrom(current)  # copy metadata
-            rec.bytes_rx = current.bytes_rx - last.bytes_rx
-            rec.bytes_tx = current.bytes_tx - last.bytes_tx
-            new_usage[key] = rec
-        else:
-            new_usage[key] = current
-    return new_usage
+    key = sid + "|" + rule_id
+    if ipv4_addr:
+        key += "|" + ipv4_addr
+    return key
+
+
+def _get_rule_record(usage, ipv4_addr):
+    """
+    Return the RuleRecord of a [sid, rule id, bytes tx, bytes rx] usage
+    """
+    sid, rule_id, bytes_tx, bytes_rx = usage
+    record = RuleRecord(sid=sid, rule_id=rule_id, bytes_tx=bytes_tx,
+                        bytes_rx=bytes_rx)
+    if ipv4_addr:
+        record.ue_ipv4 = ipv4_addr
+    return record
 
 
 def _merge_usage_maps(current_usage, last_usage):
@@ -562,6 +784,19 @@ def _get_version(flow):
     return flow.match[RULE_VERSION_REG]
 
 
+def _get_byte_counts(flow_stat):
+    """
+    Return the uplink and downlink bytes counted by a flow
+    """
+    if flow_stat.match[DIRECTION_REG] == Direction.IN:
+        # HACK decrement byte count for downlink packets by the length
+        # of an ethernet frame. Only IP and below should be counted towards
+        # a user's data. Uplink does this already because the GTP port is
+        # an L3 port.
+        return 0, _get_downlink_byte_count(flow_stat)
+    return flow_stat.byte_count, 0
+
+
 def _get_downlink_byte_count(flow_stat):
     total_bytes = flow_stat.byte_count
     packet_count = flow_stat.packet_count
@@ -63,7 +63,8 @@ class GYController(PolicyMixin, MagmaController):
                 self.tbl_num,
                 self._service_manager.get_table_num(EGRESS),
                 self._redirect_scratch,
-                self._session_rule_version_mapper
+                self._session_rule_version_mapper,
+                kwargs['dns_resolver']
             ).set_cwf_args(
                 internal_ip_allocator=kwargs['internal_ip_allocator'],
                 arp=kwargs['app_futures']['arpd'],
@@ -194,7 +195,7 @@ class GYController(PolicyMixin, MagmaController):
             priority=priority)
         try:
             self._redirect_manager.setup_cwf_redirect(
-                self._datapath, self.loop, redirect_request)
+                self._datapath, redirect_request)
             return RuleModResult.SUCCESS
         except RedirectException as err:
             self.logger.error(
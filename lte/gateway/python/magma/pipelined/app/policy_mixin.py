@@ -23,7 +23,8 @@ from magma.policydb.rule_store import PolicyRuleDict
 from magma.pipelined.openflow.magma_match import MagmaMatch
 from magma.pipelined.openflow.registers import Direction, IMSI_REG, \
     DIRECTION_REG
-from magma.pipelined.openflow.messages import MsgChannel
+from magma.pipelined.openflow.messages import MsgChannel, \
+    DEFAULT_CHUNK_SIZE, DEFAULT_MAX_IN_FLIGHT_CHUNKS
 from magma.pipelined.policy_converters import FlowMatchError
 
 
@@ -42,6 +43,11 @@ class PolicyMixin(metaclass=ABCMeta):
         self._rule_mapper = kwargs['rule_id_mapper']
         self._session_rule_version_mapper = kwargs[
             'session_rule_version_mapper']
+        # Flow messages per barrier and chunks in flight on restart
+        self._flow_chunk_size = kwargs['config'].get(
+            'restart_flow_chunk_size', DEFAULT_CHUNK_SIZE)
+        self._flow_chunks_in_flight = kwargs['config'].get(
+            'restart_flow_chunks_in_flight', DEFAULT_MAX_IN_FLIGHT_CHUNKS)
 
     def handle_restart(self,
                        requests: List[ActivateFlowsRequest]
@@ -104,8 +110,7 @@ class PolicyMixin(metaclass=ABCMeta):
                 self._datapath, self.tbl_num, match, cookie=flow.cookie,
                 cookie_mask=flows.OVS_COOKIE_MATCH_ALL))
         if msg_list:
-            chan = self._msg_hub.send(msg_list, self._datapath)
-            self._wait_for_responses(chan, len(msg_list))
+            self._send_chunked(msg_list)
 
     def _add_missing_flows(self, requests, current_flows):
         msg_list = []
@@ -147,8 +152,7 @@ class PolicyMixin(metaclass=ABCMeta):
             self._msg_hub.filter_msgs_if_not_in_flow_list(msg_list,
                                                           current_flows)
         if msgs_to_send:
-            chan = self._msg_hub.send(msgs_to_send, self._datapath)
-            self._wait_for_responses(chan, len(msgs_to_send))
+            self._send_chunked(msgs_to_send)
 
         return remaining_flows
 
@@ -210,6 +214,108 @@ class PolicyMixin(metaclass=ABCMeta):
             dynamic_rule_results=dyn_results,
         )
 
+    def activate_rules_batch(self, requests: List[ActivateFlowsRequest]
+                             ) -> List[ActivateFlowsResult]:
+        """
+        Activate the flows for several subscribers. The flow messages of all
+        their rules are sent in chunks, instead of waiting for the replies of
+        each rule. Redirection rules and rules without flows are installed
+        on their own, as in activate_rules.
+
+        Args:
+            requests (ActivateFlowsRequest []): subscribers and rules to
+                activate
+        Returns:
+            the ActivateFlowsResult of each request, in order
+        """
+        if self._datapath is None:
+            return [self.activate_rules(req.sid.id, req.ip_addr, req.apn_ambr,
+                                        req.rule_ids, req.dynamic_rules)
+                    for req in requests]
+
+        msg_list = []
+        # (imsi, RuleModResult) of the rule each flow message is for
+        msg_rules = {}
+        rule_results = []
+        for req in requests:
+            imsi = req.sid.id
+            static_results = []
+            for rule_id in req.rule_ids:
+                rule = self._policy_dict[rule_id]
+                if rule is None:
+                    self.logger.error("Could not find rule for rule_id: %s",
+                                      rule_id)
+                    static_results.append(RuleModResult(
+                        rule_id=rule_id, result=RuleModResult.FAILURE))
+                    continue
+                static_results.append(self._add_batch_rule_flow_msgs(
+                    imsi, req.ip_addr, req.apn_ambr, rule, msg_list,
+                    msg_rules))
+            dyn_results = [self._add_batch_rule_flow_msgs(
+                imsi, req.ip_addr, req.apn_ambr, rule, msg_list, msg_rules)
+                for rule in req.dynamic_rules]
+
+            flow_add = self._get_default_flow_msg_for_subscriber(imsi)
+            if flow_add:
+                msg_list.append(flow_add)
+            rule_results.append((static_results, dyn_results))
+
+        if msg_list:
+            self._fail_batch_rules(msg_rules, self._msg_hub.send_chunked(
+                msg_list, self._datapath,
+                chunk_size=self._flow_chunk_size,
+                max_in_flight=self._flow_chunks_in_flight))
+        return [ActivateFlowsResult(static_rule_results=static_results,
+                                    dynamic_rule_results=dyn_results)
+                for static_results, dyn_results in rule_results]
+
+    def _add_batch_rule_flow_msgs(self, imsi, ip_addr, apn_ambr, rule,
+                                  msg_list, msg_rules) -> RuleModResult:
+        """
+        Add the flow messages of a rule activated in a batch to msg_list,
+        returning its result, successful until one of its messages fails
+        """
+        result = RuleModResult(rule_id=rule.id)
+        if rule.redirect.support == rule.redirect.ENABLED or \
+                not rule.flow_list:
+            result.result = self._install_flow_for_rule(imsi, ip_addr,
+                                                        apn_ambr, rule)
+            return result
+        try:
+            flow_adds = self._get_rule_match_flow_msgs(imsi, ip_addr,
+                                                       apn_ambr, rule)
+        except FlowMatchError:
+            result.result = RuleModResult.FAILURE
+            return result
+        for msg in flow_adds:
+            msg_rules[id(msg)] = (imsi, result)
+        msg_list.extend(flow_adds)
+        result.result = RuleModResult.SUCCESS
+        return result
+
+    def _fail_batch_rules(self, msg_rules, replies):
+        """
+        Fail the rules of the flow messages OVS didn't install
+        """
+        for reply in replies:
+            if reply.exception() is not None:
+                failures = [(msg, reply.exception())
+                            for msg in reply.msg_list]
+            else:
+                failures = reply.failures
+            for msg, err in failures:
+                imsi, result = msg_rules.get(id(msg), (None, None))
+                if result is None:
+                    # default flow of a subscriber
+                    self.logger.error("Failed to install flow: %s", err)
+                    continue
+                if result.result == RuleModResult.FAILURE:
+                    continue
+                self.logger.error(
+                    "Failed to install rule %s for subscriber %s: %s",
+                    result.rule_id, imsi, err)
+                result.result = RuleModResult.FAILURE
+
     def _install_flow_for_static_rule(self, imsi, ip_addr, apn_ambr, rule_id):
         """
         Install a flow to get stats for a particular static rule id. The rule
@@ -226,6 +332,23 @@ class PolicyMixin(metaclass=ABCMeta):
             return RuleModResult.FAILURE
         return self._install_flow_for_rule(imsi, ip_addr, apn_ambr, rule)
 
+    def _send_chunked(self, msg_list):
+        """
+        Send a large list of flow messages in chunks, logging the failed
+        chunks
+        """
+        replies = self._msg_hub.send_chunked(
+            msg_list, self._datapath,
+            chunk_size=self._flow_chunk_size,
+            max_in_flight=self._flow_chunks_in_flight)
+        for reply in replies:
+            if reply.exception() is not None:
+                self.logger.error("Failed to send %d flow messages: %s",
+                                  len(reply.msg_list), reply.exception())
+            for _, err in reply.failures:
+                self.logger.error("Failed to install rule for subscriber: "
+                                  "%s", err)
+
     def _wait_for_responses(self, chan, response_count):
         def fail(err):
             #TODO need to rework setup to return all rule specific success/fails
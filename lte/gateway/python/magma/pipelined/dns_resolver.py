@@ -0,0 +1,171 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple  # noqa
+
+import aiodns
+
+from magma.pipelined.metrics import REDIRECT_DNS_LOOKUP, REDIRECT_DNS_QUERY
+
+LOG = logging.getLogger('pipelined.dns_resolver')
+
+
+class DnsResolver:
+    """
+    DnsResolver
+
+    Resolves the ipv4 addresses of the redirect server hosts, shared by all
+    the redirect installs. The addresses are cached for their DNS ttl, and
+    the lookup failures for NEGATIVE_TTL_SECS, so a redirect storm sends a
+    single query per host. Lookups of a host being queried wait for that
+    query.
+
+    The entries looked up at least PREFETCH_MIN_HITS times are queried
+    again when looked up shortly before they expire, so the popular hosts
+    keep being resolved from the cache.
+
+    The query is pluggable: a coroutine function taking the host and
+    returning its addresses and their ttl. Defaults to an aiodns A query.
+    """
+    DNS_TIMEOUT_SECS = 15
+    NEGATIVE_TTL_SECS = 30
+    PREFETCH_MIN_HITS = 2
+    # Entries are prefetched when the smallest of PREFETCH_SECS and
+    # PREFETCH_TTL_RATIO of their ttl is left
+    PREFETCH_SECS = 5
+    PREFETCH_TTL_RATIO = 0.1
+
+    def __init__(self, loop, query=None):
+        self._loop = loop
+        self._query = query or self._query_a
+        self._resolver = None
+        self._entries = {}
+        # host -> future of the query in flight
+        self._pending = {}
+
+    def get(self, host: str) -> Optional[List[str]]:
+        """
+        Return the cached ipv4 addresses of host, or None if they need to be
+        resolved
+
+        Raises:
+            aiodns.error.DNSError: if looking them up failed recently
+        """
+        entry = self._entries.get(host)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry.expires_at <= now:
+            del self._entries[host]
+            return None
+        entry.hits += 1
+        if entry.error is not None:
+            REDIRECT_DNS_LOOKUP.labels('negative_hit').inc()
+            raise entry.error
+        REDIRECT_DNS_LOOKUP.labels('hit').inc()
+        if entry.hits >= self.PREFETCH_MIN_HITS and \
+                entry.expires_at - now <= entry.prefetch_secs and \
+                host not in self._pending:
+            fut = self._send_query(host, 'prefetch')
+            # Nobody waits for a prefetch, the failure is already logged
+            fut.add_done_callback(
+                lambda fut: fut.cancelled() or fut.exception())
+        return entry.ips
+
+    def resolve(self, host: str) -> asyncio.Future:
+        """
+        Return a future of the ipv4 addresses of host, done right away if
+        they're cached. On a lookup failure the future holds the
+        aiodns.error.DNSError.
+        """
+        fut = self._loop.create_future()
+        try:
+            ips = self.get(host)
+        except aiodns.error.DNSError as err:
+            fut.set_exception(err)
+            return fut
+        if ips is not None:
+            fut.set_result(ips)
+            return fut
+
+        pending = self._pending.get(host)
+        if pending is not None:
+            REDIRECT_DNS_LOOKUP.labels('coalesced').inc()
+            return pending
+        REDIRECT_DNS_LOOKUP.labels('miss').inc()
+        return self._send_query(host, 'miss')
+
+    def set(self, host: str, ips: List[str], ttl: int):
+        """
+        Cache the addresses of host for ttl seconds
+        """
+        self._entries[host] = _DnsEntry(ips, None, ttl)
+
+    def _send_query(self, host, reason):
+        REDIRECT_DNS_QUERY.labels(reason).inc()
+        fut = self._loop.create_future()
+        self._pending[host] = fut
+        query = asyncio.ensure_future(self._query(host), loop=self._loop)
+        query.add_done_callback(
+            lambda query: self._query_done(host, query, fut))
+        return fut
+
+    def _query_done(self, host, query, fut):
+        del self._pending[host]
+        if query.cancelled():
+            fut.cancel()
+            return
+        try:
+            ips, ttl = query.result()
+        except aiodns.error.DNSError as err:
+            LOG.error('Error: ip lookup for %s: %s', host, err)
+            entry = self._entries.get(host)
+            if entry is None or entry.error is not None or \
+                    entry.expires_at <= time.monotonic():
+                self._entries[host] = \
+                    _DnsEntry(None, err, self.NEGATIVE_TTL_SECS)
+            # else the addresses of a failed prefetch are kept until they
+            # expire
+            fut.set_exception(err)
+            return
+        except Exception as err:  # pylint: disable=broad-except
+            LOG.error('Error: ip lookup for %s: %s', host, err)
+            fut.set_exception(err)
+            return
+        self._entries[host] = _DnsEntry(ips, None, ttl)
+        fut.set_result(ips)
+
+    async def _query_a(self, host: str) -> Tuple[List[str], int]:
+        if self._resolver is None:
+            self._resolver = aiodns.DNSResolver(
+                timeout=self.DNS_TIMEOUT_SECS, loop=self._loop)
+        result = await self._resolver.query(host, 'A')
+        return [entry.host for entry in result], \
+            min(entry.ttl for entry in result)
+
+
+class _DnsEntry:
+    """
+    The addresses of a host, or the error looking them up
+    """
+
+    def __init__(self, ips, error, ttl):
+        self.ips = ips
+        self.error = error
+        self.expires_at = time.monotonic() + ttl
+        self.prefetch_secs = min(DnsResolver.PREFETCH_SECS,
+                                 ttl * DnsResolver.PREFETCH_TTL_RATIO)
+        self.hits = 0
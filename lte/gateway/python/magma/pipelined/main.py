@@ -127,6 +127,9 @@ def main():
     # Run the service loop
     service.run()
 
+    # Write the rule versions not flushed to Redis yet
+    service_manager.session_rule_version_mapper.close()
+
     # Cleanup the service
     service.close()
 
@@ -11,7 +11,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from prometheus_client import Counter, Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 
 DP_SEND_MSG_ERROR = Counter('dp_send_msg_error',
@@ -48,3 +48,40 @@ NETWORK_IFACE_STATUS = Gauge(
     'Status of a network interface required for data pipeline',
     ['iface_name'],
 )
+
+QOS_RECOVERY_PENDING = Gauge(
+    'qos_recovery_pending',
+    'Number of QoS recovery operations left to apply after a restart',
+    ['op'],
+)
+
+QOS_RECOVERY_DONE = Counter(
+    'qos_recovery_done',
+    'Counts number of QoS recovery operations applied after a restart',
+    ['op'],
+)
+
+QOS_RECOVERY_DURATION = Gauge(
+    'qos_recovery_duration_seconds',
+    'Time taken by the last QoS state recovery, until the QoS handles '
+    'unreferenced by the subscribers were removed',
+)
+
+REDIRECT_DNS_LOOKUP = Counter(
+    'redirect_dns_lookup',
+    'Counts number of redirect server lookups by DNS cache result',
+    ['result'],
+)
+
+REDIRECT_DNS_QUERY = Counter(
+    'redirect_dns_query',
+    'Counts number of DNS queries sent for redirect servers by reason',
+    ['reason'],
+)
+
+REDIRECT_BYPASS_FLOWS_LATENCY_MS = Histogram(
+    'redirect_bypass_flows_latency_ms',
+    'Time taken to install the redirect server bypass flows of a url '
+    'redirect, including its DNS lookup, in milliseconds',
+    buckets=[1, 10, 50, 100, 500, 1000, 5000, 15000],
+)
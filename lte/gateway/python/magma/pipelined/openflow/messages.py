@@ -11,7 +11,10 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import logging
-from typing import Any, List, Optional
+import math
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, List, Optional
 
 # there's a cyclic dependency in ryu
 import ryu.base.app_manager  # pylint: disable=unused-import
@@ -25,6 +28,12 @@ from magma.pipelined.metrics import DP_SEND_MSG_ERROR
 logger = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT_SEC = 10
+# Messages per barrier when sending a list in chunks
+DEFAULT_CHUNK_SIZE = 1000
+# Chunks sent without their barrier reply when sending a list in chunks
+DEFAULT_MAX_IN_FLIGHT_CHUNKS = 4
+# Resolution of the request timeouts
+TIMER_TICK_SEC = 0.05
 
 
 def send_msg(datapath, msg, retries=3):
@@ -108,6 +117,96 @@ class MsgChannel(object):
         self._queue.put(reply)
 
 
+class MsgChunkReply(object):
+    """
+    Reply for a chunk of messages sent to OVS by `MessageHub.send_chunked`.
+    It keeps the messages of the chunk, so that a failed chunk or just its
+    failed messages can be sent again.
+    """
+
+    def __init__(self, msg_list: List[MsgBase]) -> None:
+        self.msg_list = msg_list
+        # (message, exception) of the messages OVS returned an error for
+        self.failures = []
+        self._exception = None
+
+    def ok(self) -> bool:
+        """
+        Return true if all the messages of the chunk were installed
+        """
+        return self._exception is None and not self.failures
+
+    def exception(self) -> Optional[Exception]:
+        """
+        The exception if the whole chunk failed, like on a timeout
+        """
+        return self._exception
+
+    def set_exception(self, exception: Exception) -> None:
+        self._exception = exception
+
+
+class _TimerWheel(object):
+    """
+    Runs the request timeouts of a MessageHub from a single green thread
+    instead of one per request. The timeouts are bucketed by tick, and the
+    thread only runs while a timeout is pending, firing them up to one tick
+    late.
+    """
+
+    def __init__(self, tick_sec: float=TIMER_TICK_SEC) -> None:
+        self._tick_sec = tick_sec
+        # Callbacks to run by tick, and by timer id
+        self._buckets = defaultdict(dict)
+        self._next_timer_id = 0
+        self._last_tick = self._current_tick()
+        self._thread = None
+
+    def add(self, timeout_sec: float, callback: Callable[[], Any]):
+        """
+        Run callback after timeout_sec seconds
+
+        Returns:
+            a handle to cancel the timer with
+        """
+        tick = self._current_tick() + \
+            max(1, math.ceil(timeout_sec / self._tick_sec))
+        timer_id = self._next_timer_id
+        self._next_timer_id += 1
+        self._buckets[tick][timer_id] = callback
+        if self._thread is None:
+            self._last_tick = self._current_tick()
+            self._thread = hub.spawn(self._run)
+        return tick, timer_id
+
+    def cancel(self, handle) -> None:
+        """
+        Cancel a timer that didn't run yet
+        """
+        tick, timer_id = handle
+        bucket = self._buckets.get(tick)
+        if bucket is not None:
+            bucket.pop(timer_id, None)
+            if not bucket:
+                del self._buckets[tick]
+
+    def _current_tick(self) -> int:
+        return int(time.monotonic() / self._tick_sec)
+
+    def _run(self) -> None:
+        while self._buckets:
+            hub.sleep(self._tick_sec)
+            current_tick = self._current_tick()
+            for tick in range(self._last_tick + 1, current_tick + 1):
+                for callback in self._buckets.pop(tick, {}).values():
+                    try:
+                        callback()
+                    except Exception:  # pylint: disable=broad-except
+                        logger.exception('Error running request timeout')
+            self._last_tick = current_tick
+        self._thread = None
+
+
 class MessageHub(object):
     """
     MessageHub can send flow modifications and and returns a channel
@@ -122,6 +221,7 @@ class MessageHub(object):
     """
     def __init__(self, msg_hub_logger):
         self._switches = {}
+        self._timers = _TimerWheel()
         self.logger = msg_hub_logger
 
     def send(self,
@@ -167,9 +267,75 @@ class MessageHub(object):
             switch.results_by_msg[msg.xid] = None
             datapath.send_msg(msg)
         datapath.send_msg(barrier)
-        req.set_timeout(timeout, switch, barrier.xid, msg_xids)
+        req.set_timeout(self._timers, timeout, switch, barrier.xid, msg_xids)
         return channel
 
+    def send_chunked(self,
+                     msg_list: List[MsgBase],
+                     datapath: Datapath,
+                     chunk_size: int=DEFAULT_CHUNK_SIZE,
+                     max_in_flight: int=DEFAULT_MAX_IN_FLIGHT_CHUNKS,
+                     timeout: int=DEFAULT_TIMEOUT_SEC) -> List[MsgChunkReply]:
+        """
+        Send a large list of messages to OVS in chunks followed by a
+        barrier each, and wait for the results. At most max_in_flight chunks
+        are waiting for their barrier reply at any time, so that OVS isn't
+        flooded.
+
+        If OVS doesn't reply within the timeout, the chunks waiting for a
+        reply fail and the remaining ones aren't sent.
+
+        Args:
+            msg_list: list of messages to send
+            datapath: datapath representing switch to send to
+            chunk_size: number of messages per chunk
+            max_in_flight: number of chunks sent without a reply yet
+            timeout: time to wait for a reply from OVS
+        Returns:
+            the reply for each chunk, in order
+        """
+        channel = MsgChannel()
+        chunks = [msg_list[i:i + chunk_size]
+                  for i in range(0, len(msg_list), chunk_size)]
+        replies = [MsgChunkReply(chunk) for chunk in chunks]
+        # Number of message replies received per chunk
+        received = [0] * len(chunks)
+        sent = 0
+        in_flight = 0
+        while sent < len(chunks) or in_flight:
+            if sent < len(chunks) and in_flight < max_in_flight:
+                # The chunk index is the txn id of its messages
+                self.send(chunks[sent], datapath, txn_id=sent,
+                          timeout=timeout, channel=channel)
+                sent += 1
+                in_flight += 1
+                continue
+            try:
+                reply = channel.get(timeout=timeout)
+            except MsgChannel.Timeout:
+                self._fail_chunks(replies, received, sent)
+                break
+            # The replies of a chunk are in the order of its messages
+            index = reply.txn_id
+            if not reply.ok():
+                msg = chunks[index][received[index]]
+                replies[index].failures.append((msg, reply.exception()))
+            received[index] += 1
+            if received[index] == len(chunks[index]):
+                in_flight -= 1
+        return replies
+
+    @staticmethod
+    def _fail_chunks(replies, received, sent):
+        """
+        Fail the chunks without all their replies after a timeout
+        """
+        for index, reply in enumerate(replies):
+            if index >= sent:
+                reply.set_exception(MagmaOFError('Chunk not sent'))
+            elif received[index] < len(reply.msg_list):
+                reply.set_exception(MagmaOFError('No response from OVS'))
+
     def filter_msgs_if_not_in_flow_list(self,
                                         msg_list: List[MsgBase],
                                         flow_list):
@@ -177,14 +343,23 @@ class MessageHub(object):
         Returns a list of messages not found in the provided flow_list, also
         returns a list of remaining flows(not found in the msg_list)
         """
+        # Index the flows by the fields compared on a match, so that each
+        # message is matched in constant time. The flows with the same key
+        # are matched in list order.
+        flow_indexes_by_key = defaultdict(deque)
+        for index, flow in enumerate(flow_list):
+            flow_indexes_by_key[self._flow_match_key(flow)].append(index)
+
         msgs_to_send = []
-        remaining_flows = flow_list.copy()
+        matched = [False] * len(flow_list)
         for msg in msg_list:
-            index = self._get_msg_index_in_flow_list(msg, remaining_flows)
-            if index >= 0:
-                remaining_flows.pop(index)
+            flow_indexes = flow_indexes_by_key.get(self._flow_match_key(msg))
+            if flow_indexes:
+                matched[flow_indexes.popleft()] = True
             else:
                 msgs_to_send.append(msg)
+        remaining_flows = [flow for index, flow in enumerate(flow_list)
+                           if not matched[index]]
         return msgs_to_send, remaining_flows
 
     @staticmethod
@@ -232,49 +407,50 @@ class MessageHub(object):
         # for now, result is unused. Just return if there's an exception
         switch.results_by_msg[msg.xid] = MagmaOFError(ev.msg)
 
-    def _flow_matches_flowmsg(self, flow, msg):
+    @staticmethod
+    def _flow_match_key(flow):
         """
-        Compare the flow and flow message based on
+        Key of a flow or flow message, two of them match if their keys are
+        equal. It is made of
          - cookie(Policy number)
          - metadata(Subscriber IMSI)
+         - reg1, reg2
          - reg4(Policy version number)
         """
-        return flow.cookie == msg.cookie and\
-               flow.match.get('metadata', None) == msg.match.get('metadata', None) and\
-               flow.match.get('reg1', None) == msg.match.get('reg1', None) and\
-               flow.match.get('reg2', None) == msg.match.get('reg2', None) and\
-               flow.match.get('reg4', None) == msg.match.get('reg4', None)
-
-    def _get_msg_index_in_flow_list(self, msg, flow_list):
-        for i in range(len(flow_list)):
-            if self._flow_matches_flowmsg(msg, flow_list[i]):
-                return i
-        return -1
+        match = flow.match
+        return (flow.cookie,
+                match.get('metadata', None),
+                match.get('reg1', None),
+                match.get('reg2', None),
+                match.get('reg4', None))
 
     class _MsgRequest(object):
         def __init__(self, txn_id, msg_xids, channel=None):
             self.txn_id = txn_id
             self.msg_xids = msg_xids
             self.channel = channel
-            self._timeout_thread = None
+            self._timers = None
+            self._timer = None
 
-        def set_timeout(self, timeout_sec, switch, barrier_xid, msg_xids):
+        def set_timeout(self, timers, timeout_sec, switch, barrier_xid,
+                        msg_xids):
             """
-            Spawn a timeout handler after timeout_sec seconds to clear up any
-            associated state with the request
+            Schedule a timeout handler after timeout_sec seconds to clear up
+            any associated state with the request
             """
             def _handle_timeout():
                 return self._handle_timeout(switch, barrier_xid, msg_xids)
-            # spawn timeout func to ensure cleanup occurs
-            self._timeout_thread = hub.spawn_after(timeout_sec,
-                                                   _handle_timeout)
+            # schedule timeout func to ensure cleanup occurs
+            self._timers = timers
+            self._timer = timers.add(timeout_sec, _handle_timeout)
 
         def cancel_timeout(self):
             """
             If a request is received, stop the timeout handler from running
             """
-            if self._timeout_thread is not None:
-                self._timeout_thread.cancel()
+            if self._timer is not None:
+                self._timers.cancel(self._timer)
+                self._timer = None
 
         def _handle_timeout(self, switch, barrier_xid, msg_xids):
             switch.requests_by_barrier.pop(barrier_xid, None)
@@ -44,6 +44,7 @@ class MockDatapath(object):
         self.id = id
         self.prev_barrier_xid = None
         self.prev_msg_xid = None
+        self.barrier_xids = []
         self.send_msg = MagicMock(return_value=True)
 
         self.ofproto_parser = Mock()
@@ -55,6 +56,7 @@ class MockDatapath(object):
         self._curr_xid += 1
         if msg.is_barrier is True:
             self.prev_barrier_xid = xid
+            self.barrier_xids.append(xid)
         else:
             self.prev_msg_xid = xid
         return xid
@@ -142,6 +144,52 @@ class MessageHubTest(unittest.TestCase):
         self._msg_sender.handle_barrier(ev2)
         self._check_reply(chan2, "2")
 
+    def test_send_chunked(self):
+        """
+        Test sending messages in chunks with a bounded number of chunks in
+        flight, and getting an error back on the chunk of its message
+        """
+        msg_list = [MockMessage() for _ in range(5)]
+        thread = hub.spawn(self._msg_sender.send_chunked, msg_list,
+                           self._mock_datapath, chunk_size=2,
+                           max_in_flight=2)
+        hub.sleep(0.01)
+        # 2 chunks of 2 messages, and their barriers
+        self.assertEqual(self._mock_datapath.send_msg.call_count, 6)
+
+        # Error on the last message of the second chunk
+        self._msg_sender.handle_error(self._get_error_event())
+        self._msg_sender.handle_barrier(
+            self._get_barrier_event(self._mock_datapath.barrier_xids[0]))
+        hub.sleep(0.01)
+        # The last chunk of 1 message, and its barrier
+        self.assertEqual(self._mock_datapath.send_msg.call_count, 8)
+
+        for xid in self._mock_datapath.barrier_xids[1:]:
+            self._msg_sender.handle_barrier(self._get_barrier_event(xid))
+        replies = thread.wait()
+        self.assertEqual([reply.msg_list for reply in replies],
+                         [msg_list[:2], msg_list[2:4], msg_list[4:]])
+        self.assertEqual([reply.ok() for reply in replies],
+                         [True, False, True])
+        self.assertEqual(len(replies[1].failures), 1)
+        self.assertIs(replies[1].failures[0][0], msg_list[3])
+
+    def test_send_chunked_timeout(self):
+        """
+        Test that the chunks without a reply fail on timeout, and the
+        remaining chunks aren't sent
+        """
+        msg_list = [MockMessage() for _ in range(3)]
+        replies = self._msg_sender.send_chunked(
+            msg_list, self._mock_datapath, chunk_size=1, max_in_flight=2,
+            timeout=0.1)
+        # 2 chunks of 1 message, and their barriers
+        self.assertEqual(self._mock_datapath.send_msg.call_count, 4)
+        self.assertEqual([reply.ok() for reply in replies],
+                         [False, False, False])
+        self.assertTrue(all(reply.exception() for reply in replies))
+
     def test_timeout(self):
         """
         Test timeout handling when no response is received
@@ -155,9 +203,10 @@ class MessageHubTest(unittest.TestCase):
         self.assertEqual(len(switch.results_by_msg), 0)
         self.assertEqual(len(switch.requests_by_barrier), 0)
 
-    def _get_barrier_event(self):
+    def _get_barrier_event(self, xid=None):
         barrier_msg = Mock()
-        barrier_msg.xid = self._mock_datapath.prev_barrier_xid
+        barrier_msg.xid = xid if xid is not None else \
+            self._mock_datapath.prev_barrier_xid
         barrier_msg.datapath = self._mock_datapath
         ev = Mock()
         ev.msg = barrier_msg
@@ -14,8 +14,11 @@ from typing import List, Dict  # noqa
 
 import asyncio
 import logging
+import time
 from enum import Enum
 from lte.protos.policydb_pb2 import FlowMatch
+from magma.pipelined.metrics import QOS_RECOVERY_DONE, \
+    QOS_RECOVERY_DURATION, QOS_RECOVERY_PENDING
 from magma.pipelined.qos.qos_meter_impl import MeterManager
 from magma.pipelined.qos.qos_tc_impl import TCManager, TrafficClass
 from magma.pipelined.qos.types import QosInfo, get_json, get_key, get_subscriber_key
@@ -89,7 +92,11 @@ class SubscriberState(object):
                     qos_handle: int) -> None:
         k = get_subscriber_key(self.imsi, ip_addr, rule_num, d)
         self._qos_store[get_json(k)] = qos_handle
+        self.restore_rule(ip_addr, rule_num, d, qos_handle)
 
+    def restore_rule(self, ip_addr: str, rule_num: int, d: FlowMatch.Direction,
+                     qos_handle: int) -> None:
+        """ Adds a rule already in the qos_store """
         if rule_num not in self.rules:
             self.rules[rule_num] = []
 
@@ -126,6 +133,9 @@ class SubscriberState(object):
         return 0
 
 class QosManager(object):
+    # Number of unreferenced qos handles removed at once on recovery
+    RECOVERY_BATCH_SIZE = 1000
+
     @staticmethod
     def get_impl(datapath, loop, config):
         try:
@@ -167,6 +177,7 @@ class QosManager(object):
         self.impl = QosManager.get_impl(datapath, loop, config)
         self._qos_store = QosStore(self.__class__.__name__)
         self._initialized = False
+        self._recovery_task = None
 
     def setup(self):
         if not self._qos_enabled:
@@ -183,49 +194,96 @@ class QosManager(object):
         else:
             # read existing state from qos_impl
             LOG.info("Qos Setup: recovering existing state")
+            self._recovery_task = asyncio.ensure_future(self._recover_state(),
+                                                        loop=self._loop)
+
+    async def _recover_state(self):
+        start = time.monotonic()
+        try:
+            qos_state = await self.impl.read_all_state()
+            LOG.debug("read_all_state complete => \n%s", qos_state)
+            # the qos_store is read and purged off the event loop
+            subscriber_state, unreferenced = await self._loop.run_in_executor(
+                None, self._reconcile_store, qos_state)
+        except Exception as e:  # pylint: disable=broad-except
+            # in case of any exception start clean slate
+            LOG.error("error %s. restarting clean", str(e))
+            self._clean_restart = True
+            self.setup()
+            return
 
-            def callback(fut):
-                LOG.debug("read_all_state complete => \n%s", fut.result())
-                qos_state = fut.result()
-                try:
-                    # populate state from db
-                    in_store_qid = set()
-                    purge_store_set = set()
-                    for k, v in self._qos_store.items():
-                        if v not in qos_state:
-                            purge_store_set.add(k)
-                            continue
-                        in_store_qid.add(v)
-                        _, imsi, ip_addr, rule_num, d = get_key(k)
-                        subscriber = self.get_or_create_subscriber(imsi)
-                        subscriber.update_rule(ip_addr, rule_num, d, v)
-
-                        qid_state = qos_state[v]
-                        if qid_state['ambr'] != 0:
-                            session = subscriber.get_or_create_session(ip_addr)
-                            session.set_ambr(d, qid_state['ambr'])
-
-                    # purge entries from qos_store
-                    for k in purge_store_set:
-                        LOG.debug("purging qos_store entry %s qos_handle", k)
-                        del self._qos_store[k]
-
-                    # purge unreferenced qos configs from system
-                    for qos_handle in qos_state:
-                        if qos_handle not in in_store_qid:
-                            LOG.debug("removing qos_handle %d", qos_handle)
-                            self.impl.remove_qos(qos_handle,
-                                qos_state[qos_handle]['direction'], recovery_mode=True)
-
-                    self._initialized = True
-                    LOG.info("init complete with state recovered successfully")
-                except Exception as e:  # pylint: disable=broad-except
-                    # in case of any exception start clean slate
-                    LOG.error("error %s. restarting clean", str(e))
-                    self._clean_restart = True
-                    self.setup()
-
-            asyncio.ensure_future(self.impl.read_all_state(), loop=self._loop).add_done_callback(callback)
+        self._subscriber_state.update(subscriber_state)
+        # the unreferenced qos handles aren't used by any subscriber, new
+        # qos can be added while they are being removed
+        self._initialized = True
+        LOG.info("init complete with state recovered successfully, removing "
+                 "%d unreferenced qos handles", len(unreferenced))
+        try:
+            await self._remove_unreferenced_qos(unreferenced)
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.error("error %s removing unreferenced qos handles", str(e))
+            return
+        QOS_RECOVERY_DURATION.set(time.monotonic() - start)
+        LOG.info("qos state recovery complete")
+
+    def _reconcile_store(self, qos_state):
+        """
+        Diffs the qos_store against the qos handles found in the system, in a
+        single pass over the store. Restores the subscribers of the handles
+        found in both and purges the store entries whose handle is gone.
+
+        Returns:
+            the restored SubscriberState by imsi, and the (qos_handle,
+            direction) of the handles unreferenced by the store, children
+            before their parent
+        """
+        subscriber_state = {}
+        in_store_qid = set()
+        purge_store_set = set()
+        for k, v in self._qos_store.items():
+            if v not in qos_state:
+                purge_store_set.add(k)
+                continue
+            in_store_qid.add(v)
+            _, imsi, ip_addr, rule_num, d = get_key(k)
+            subscriber = subscriber_state.get(imsi)
+            if not subscriber:
+                subscriber = SubscriberState(imsi, self._qos_store)
+                subscriber_state[imsi] = subscriber
+            subscriber.restore_rule(ip_addr, rule_num, d, v)
+            QOS_RECOVERY_DONE.labels('restore_rule').inc()
+
+            qid_state = qos_state[v]
+            if qid_state['ambr'] != 0:
+                session = subscriber.get_or_create_session(ip_addr)
+                session.set_ambr(d, qid_state['ambr'])
+                # the apn ambr handle is only referenced by its children
+                in_store_qid.add(qid_state['ambr'])
+
+        # purge entries from qos_store
+        QOS_RECOVERY_PENDING.labels('purge_store').set(len(purge_store_set))
+        for k in purge_store_set:
+            LOG.debug("purging qos_store entry %s qos_handle", k)
+            del self._qos_store[k]
+            QOS_RECOVERY_PENDING.labels('purge_store').dec()
+            QOS_RECOVERY_DONE.labels('purge_store').inc()
+
+        unreferenced = [qos_handle for qos_handle in qos_state
+                        if qos_handle not in in_store_qid]
+        unreferenced.sort(key=lambda qos_handle: qos_state[qos_handle]['ambr'] == 0)
+        return subscriber_state, [(qos_handle, qos_state[qos_handle]['direction'])
+                                  for qos_handle in unreferenced]
+
+    async def _remove_unreferenced_qos(self, qos_handles):
+        # purge unreferenced qos configs from system, in batches to report
+        # the progress
+        QOS_RECOVERY_PENDING.labels('remove_qos').set(len(qos_handles))
+        for i in range(0, len(qos_handles), self.RECOVERY_BATCH_SIZE):
+            batch = qos_handles[i:i + self.RECOVERY_BATCH_SIZE]
+            LOG.debug("removing qos_handles %s", batch)
+            await self.impl.remove_qos_batch(batch)
+            QOS_RECOVERY_PENDING.labels('remove_qos').dec(len(batch))
+            QOS_RECOVERY_DONE.labels('remove_qos').inc(len(batch))
 
     def get_or_create_subscriber(self, imsi):
         subscriber_state = self._subscriber_state.get(imsi)
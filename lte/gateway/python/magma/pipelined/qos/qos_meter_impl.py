@@ -10,6 +10,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+from typing import List, Tuple  # noqa
 import logging
 from magma.pipelined.openflow.meters import MeterClass
 from .utils import IdManager
@@ -81,6 +82,19 @@ class MeterManager(object):
         MeterClass.del_meter(self._datapath, meter_id)
         self._id_manager.release_idx(meter_id)
 
+    def remove_qos_batch(self, qos_handles: List[Tuple[int, int]]):
+        """
+        Removes the (meter_id, direction) meters
+
+        Returns:
+            a future done once the meters are removed
+        """
+        for meter_id, d in qos_handles:
+            self.remove_qos(meter_id, d, recovery_mode=True)
+        fut = self._loop.create_future()
+        fut.set_result(None)
+        return fut
+
     def check_broken_kernel_impl(self, ):
         LOG.info("check_broken_kernel_impl")
         MeterClass.dump_meter_features(self._datapath)
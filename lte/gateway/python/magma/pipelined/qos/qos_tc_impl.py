@@ -11,12 +11,13 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import List  # noqa
+from typing import List, Tuple  # noqa
 import os
 import shlex
 import subprocess
 import logging
 from lte.protos.policydb_pb2 import FlowMatch
+from .tc_netlink import TcNetlink
 from .types import QosInfo
 from .utils import IdManager
 
@@ -48,7 +49,6 @@ def run_cmd(cmd_list, show_error=True) -> int:
     return err
 
 
-# TODO - replace this implementation with pyroute2 tc
 ROOT_QID = 65534
 DEFAULT_RATE = '12Kbit'
 DEFAULT_INTF_SPEED = '1000'
@@ -56,10 +56,27 @@ class TrafficClass:
     """
     Creates/Deletes queues in linux. Using Qdiscs for flow based
     rate limiting(traffic shaping) of user traffic.
+
+    The queues are managed by running tc commands, or over netlink once
+    use_netlink is enabled.
     """
+    _netlink = None
+
+    @staticmethod
+    def use_netlink(enable: bool) -> None:
+        """
+        Selects netlink instead of the tc commands for the class operations,
+        except dump_class_state
+        """
+        if not enable:
+            TrafficClass._netlink = None
+        elif TrafficClass._netlink is None:
+            TrafficClass._netlink = TcNetlink()
 
     @staticmethod
     def delete_class(intf: str, qid: int, show_error=True) -> int:
+        if TrafficClass._netlink:
+            return TrafficClass._netlink.delete_class(intf, qid, show_error)
         qid_hex = hex(qid)
         # delete filter if this is a leaf class
         filter_cmd = "tc filter del dev {intf} protocol ip parent 1: prio 1 "
@@ -69,20 +86,29 @@ class TrafficClass:
             qid=qid_hex)
         return run_cmd([filter_cmd, tc_cmd], show_error)
 
+    @staticmethod
+    def delete_classes(intf: str, qids: List[int],
+                       show_error=True) -> List[int]:
+        """
+        Deletes several classes, returning the error code of each
+        """
+        if TrafficClass._netlink:
+            return TrafficClass._netlink.delete_classes(intf, qids,
+                                                        show_error)
+        return [TrafficClass.delete_class(intf, qid, show_error=show_error)
+                for qid in qids]
+
     @staticmethod
     def create_class(intf: str, qid: int, max_bw: int, rate=None,
                      parent_qid=None, show_error=True) -> int:
         if not rate:
             rate = DEFAULT_RATE
 
-        if not parent_qid:
-            parent_qid = ROOT_QID
+        parent_qid = TrafficClass._get_parent_qid(qid, parent_qid)
 
-        if parent_qid == qid:
-            # parent qid should only be self for root case, everything else
-            # should be the child of root class
-            LOG.error('parent and self qid equal, setting parent_qid to root')
-            parent_qid = ROOT_QID
+        if TrafficClass._netlink:
+            return TrafficClass._netlink.create_class(
+                intf, qid, max_bw, rate, parent_qid, show_error)
 
         qid_hex = hex(qid)
         parent_qid_hex = hex(parent_qid)
@@ -105,6 +131,36 @@ class TrafficClass:
         # add fq_codel qdisc and filter
         return run_cmd((qdisc_cmd, filter_cmd), show_error)
 
+    @staticmethod
+    def create_classes(intf: str, classes: List[Tuple[int, int, str, int]],
+                       show_error=True) -> List[int]:
+        """
+        Creates several (qid, max_bw, rate, parent_qid) classes, returning
+        the error code of each
+        """
+        if TrafficClass._netlink:
+            classes = [(qid, max_bw, rate or DEFAULT_RATE,
+                        TrafficClass._get_parent_qid(qid, parent_qid))
+                       for qid, max_bw, rate, parent_qid in classes]
+            return TrafficClass._netlink.create_classes(intf, classes,
+                                                        show_error)
+        return [TrafficClass.create_class(intf, qid, max_bw, rate=rate,
+                                          parent_qid=parent_qid,
+                                          show_error=show_error)
+                for qid, max_bw, rate, parent_qid in classes]
+
+    @staticmethod
+    def _get_parent_qid(qid: int, parent_qid) -> int:
+        if not parent_qid:
+            return ROOT_QID
+
+        if parent_qid == qid:
+            # parent qid should only be self for root case, everything else
+            # should be the child of root class
+            LOG.error('parent and self qid equal, setting parent_qid to root')
+            return ROOT_QID
+        return parent_qid
+
     @staticmethod
     def init_qdisc(intf: str, show_error=False) -> int:
         speed = DEFAULT_INTF_SPEED
@@ -116,6 +172,10 @@ class TrafficClass:
         except OSError:
             LOG.error('unable to read speed from %s defaulting to %s', fn, speed)
 
+        if TrafficClass._netlink:
+            return TrafficClass._netlink.init_qdisc(
+                intf, speed, ROOT_QID, DEFAULT_RATE, show_error)
+
         qdisc_cmd = "tc qdisc add dev {intf} root handle 1: htb".format(intf=intf)
         parent_q_cmd = "tc class add dev {intf} parent 1: classid 1:{root_qid} htb "
         parent_q_cmd +="rate {speed}Mbit ceil {speed}Mbit"
@@ -128,6 +188,9 @@ class TrafficClass:
 
     @staticmethod
     def read_all_classes(intf: str):
+        if TrafficClass._netlink:
+            return TrafficClass._netlink.read_all_classes(intf)
+
         qid_list = []
         # example output of this command
         # b'class htb 1:1 parent 1:fffe prio 0 rate 12Kbit ceil 1Gbit burst \
@@ -200,6 +263,8 @@ class TCManager(object):
                                           config['qos']['linux_tc']['max_idx'])
         self._id_manager = IdManager(self._start_idx, self._max_idx)
         self._initialized = True
+        TrafficClass.use_netlink(
+            config['qos']['linux_tc'].get('use_netlink', False))
         LOG.info("Init LinuxTC module uplink:%s downlink:%s",
                  config['nat_iface'], config['enodeb_iface'])
 
@@ -258,8 +323,40 @@ class TCManager(object):
             LOG.error('error deleting class %d, not releasing idx', qid)
         return
 
+    def remove_qos_batch(self, qos_handles: List[Tuple[int, FlowMatch.Direction]]):
+        """
+        Removes the (qid, direction) classes in the given order, off the
+        event loop
+
+        Returns:
+            a future done once the classes are removed
+        """
+        return self._loop.run_in_executor(None, self._remove_qos_batch,
+                                          qos_handles)
+
+    def _remove_qos_batch(self, qos_handles):
+        qids_by_intf = {}
+        for qid, d in qos_handles:
+            if qid < self._start_idx or qid > (self._max_idx - 1):
+                LOG.error("invalid qid %d, removal failed", qid)
+                continue
+            intf = self._uplink if d == FlowMatch.UPLINK else self._downlink
+            qids_by_intf.setdefault(intf, []).append(qid)
+
+        for intf, qids in qids_by_intf.items():
+            errs = TrafficClass.delete_classes(intf, qids)
+            for qid, err in zip(qids, errs):
+                if err == 0:
+                    self._id_manager.release_idx(qid)
+                else:
+                    LOG.error('error deleting class %d, not releasing idx', qid)
+
     def read_all_state(self, ):
         LOG.debug("read_all_state")
+        # the classes are dumped off the event loop
+        return self._loop.run_in_executor(None, self._read_all_state)
+
+    def _read_all_state(self):
         st = {}
         ul_qid_list  = TrafficClass.read_all_classes(self._uplink)
         dl_qid_list = TrafficClass.read_all_classes(self._downlink)
@@ -275,7 +372,5 @@ class TCManager(object):
                 }
 
         self._id_manager.restore_state(st)
-        fut = self._loop.create_future()
         LOG.debug("map -> %s", st)
-        fut.set_result(st)
-        return fut
+        return st
@@ -0,0 +1,208 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import errno
+import logging
+import re
+import threading
+from typing import List, Tuple  # noqa
+
+from pyroute2 import IPRoute, NetlinkError
+
+LOG = logging.getLogger('pipelined.qos.tc_netlink')
+
+# Handle of the root htb qdisc, '1:'
+ROOT_HANDLE = 0x10000
+TC_H_ROOT = 0xFFFFFFFF
+FILTER_PRIO = 1
+ETH_P_IP = 0x0800
+
+# tc rate units, in bits per second
+_RATE_UNITS = {
+    '': 1, 'bit': 1,
+    'kbit': 10 ** 3, 'mbit': 10 ** 6, 'gbit': 10 ** 9, 'tbit': 10 ** 12,
+    'kibit': 2 ** 10, 'mibit': 2 ** 20, 'gibit': 2 ** 30, 'tibit': 2 ** 40,
+    'bps': 8,
+    'kbps': 8 * 10 ** 3, 'mbps': 8 * 10 ** 6, 'gbps': 8 * 10 ** 9,
+    'tbps': 8 * 10 ** 12,
+}
+_RATE_RE = re.compile(r'([0-9]+(?:\.[0-9]*)?)\s*([a-z]*)')
+
+
+def get_rate_bytes(rate) -> int:
+    """
+    Converts a rate in tc syntax, either a number of bits per second or a
+    string with a tc unit such as '12Kbit', to bytes per second
+    """
+    if isinstance(rate, int):
+        return rate // 8
+    match = _RATE_RE.fullmatch(str(rate).strip().lower())
+    if not match or match.group(2) not in _RATE_UNITS:
+        raise ValueError("invalid tc rate %s" % rate)
+    return int(float(match.group(1)) * _RATE_UNITS[match.group(2)]) // 8
+
+
+def _class_handle(qid: int) -> int:
+    return ROOT_HANDLE | qid
+
+
+class TcNetlink(object):
+    """
+    Runs the TrafficClass operations over a netlink socket kept open,
+    instead of forking a tc process per command. The return values follow
+    the tc commands: 0 on success, else the error code of the last
+    operation that failed.
+    """
+
+    def __init__(self):
+        self._ipr = IPRoute()
+        # The socket is shared with the QoS recovery run off the event loop
+        self._lock = threading.Lock()
+        self._ifindexes = {}
+
+    def init_qdisc(self, intf: str, speed: str, root_qid: int,
+                   default_rate: str, show_error=False) -> int:
+        try:
+            speed_bytes = get_rate_bytes(speed + 'Mbit')
+            default_rate_bytes = get_rate_bytes(default_rate)
+        except ValueError as e:
+            LOG.error('%s, not initializing qdisc on %s', e, intf)
+            return errno.EINVAL
+        ifindex = self._get_ifindex(intf)
+        err = self._tc(show_error, intf, 'add', 'htb', ifindex, ROOT_HANDLE,
+                       default=0)
+        err = self._tc(show_error, intf, 'add-class', 'htb', ifindex,
+                       _class_handle(root_qid), parent=ROOT_HANDLE,
+                       rate=speed_bytes, ceil=speed_bytes) or err
+        return self._tc(show_error, intf, 'add-class', 'htb', ifindex,
+                        _class_handle(1), parent=_class_handle(root_qid),
+                        rate=default_rate_bytes,
+                        ceil=speed_bytes) or err
+
+    def create_class(self, intf: str, qid: int, max_bw: int, rate,
+                     parent_qid: int, show_error=True) -> int:
+        return self.create_classes(intf, [(qid, max_bw, rate, parent_qid)],
+                                   show_error)[0]
+
+    def create_classes(self, intf: str,
+                       classes: List[Tuple[int, int, str, int]],
+                       show_error=True) -> List[int]:
+        """
+        Creates (qid, max_bw, rate, parent_qid) htb classes, each with its
+        fq_codel qdisc and fw filter, replacing the existing ones
+
+        Returns:
+            the error code of each class
+        """
+        ifindex = self._get_ifindex(intf)
+        existing_qids = None
+        if len(classes) > 1:
+            # One dump is cheaper than trying to delete every class first
+            existing_qids = {qid for qid, _ in self.read_all_classes(intf)}
+        errs = []
+        for qid, max_bw, rate, parent_qid in classes:
+            try:
+                rate_bytes = get_rate_bytes(rate)
+                max_bw_bytes = get_rate_bytes(max_bw)
+            except ValueError as e:
+                LOG.error('%s, not creating class %d', e, qid)
+                errs.append(errno.EINVAL)
+                continue
+            # delete if exists
+            if existing_qids is None or qid in existing_qids:
+                self._delete_class(ifindex, intf, qid, False)
+            self._tc(show_error, intf, 'add-class', 'htb', ifindex,
+                     _class_handle(qid), parent=_class_handle(parent_qid),
+                     rate=rate_bytes, ceil=max_bw_bytes)
+            err = self._tc(show_error, intf, 'add', 'fq_codel', ifindex,
+                           parent=_class_handle(qid))
+            err = self._tc(show_error, intf, 'add-filter', 'fw', ifindex,
+                           qid, parent=ROOT_HANDLE, prio=FILTER_PRIO,
+                           protocol=ETH_P_IP,
+                           classid=_class_handle(qid)) or err
+            errs.append(err)
+        return errs
+
+    def delete_class(self, intf: str, qid: int, show_error=True) -> int:
+        return self.delete_classes(intf, [qid], show_error)[0]
+
+    def delete_classes(self, intf: str, qids: List[int],
+                       show_error=True) -> List[int]:
+        """
+        Deletes classes along with their filter
+
+        Returns:
+            the error code of each class
+        """
+        ifindex = self._get_ifindex(intf)
+        return [self._delete_class(ifindex, intf, qid, show_error)
+                for qid in qids]
+
+    def read_all_classes(self, intf: str) -> List[Tuple[int, int]]:
+        """
+        Returns the (qid, parent qid) of the htb classes, except the root
+        """
+        qid_list = []
+        ifindex = self._get_ifindex(intf)
+        try:
+            with self._lock:
+                classes = self._ipr.get_classes(ifindex)
+        except NetlinkError as e:
+            LOG.error('failed dumping tc classes of %s: %s', intf, e)
+            self._forget_ifindex(intf, e)
+            return qid_list
+        for msg in classes:
+            if msg.get_attr('TCA_KIND') != 'htb':
+                continue
+            if msg['parent'] == TC_H_ROOT:
+                continue
+            qid_list.append((msg['handle'] & 0xFFFF, msg['parent'] & 0xFFFF))
+        return qid_list
+
+    def _delete_class(self, ifindex: int, intf: str, qid: int,
+                      show_error: bool) -> int:
+        # delete filter if this is a leaf class
+        err = self._tc(show_error, intf, 'del-filter', 'fw', ifindex, qid,
+                       parent=ROOT_HANDLE, prio=FILTER_PRIO,
+                       protocol=ETH_P_IP)
+        # no kind, or the htb class parameters would be required
+        return self._tc(show_error, intf, 'del-class', None, ifindex,
+                        _class_handle(qid)) or err
+
+    def _tc(self, show_error: bool, intf: str, command: str, kind: str,
+            ifindex: int, handle=0, **kwarg) -> int:
+        try:
+            with self._lock:
+                self._ipr.tc(command, kind, ifindex, handle, **kwarg)
+        except NetlinkError as e:
+            if show_error:
+                LOG.error("%s error running tc %s %s on %s handle %s", e,
+                          command, kind or '', intf, hex(handle))
+            self._forget_ifindex(intf, e)
+            return e.code
+        return 0
+
+    def _get_ifindex(self, intf: str) -> int:
+        ifindex = self._ifindexes.get(intf)
+        if ifindex is None:
+            # 0 makes the requests fail with ENODEV, as the tc command would
+            with self._lock:
+                ifindex = next(iter(self._ipr.link_lookup(ifname=intf)), 0)
+            if ifindex:
+                self._ifindexes[intf] = ifindex
+        return ifindex
+
+    def _forget_ifindex(self, intf: str, err: NetlinkError):
+        # The interface may have been recreated with a new index
+        if err.code == errno.ENODEV:
+            self._ifindexes.pop(intf, None)
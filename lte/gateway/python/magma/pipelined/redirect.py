@@ -13,15 +13,15 @@ limitations under the License.
 
 import netifaces
 import aiodns
-import asyncio
 import ipaddress
+import time
 from collections import namedtuple
 from redis import RedisError
 from urllib.parse import urlsplit
-from memoize import Memoizer
 
 from magma.configuration.service_configs import get_service_config_value
 from magma.pipelined.imsi import encode_imsi
+from magma.pipelined.metrics import REDIRECT_BYPASS_FLOWS_LATENCY_MS
 from magma.pipelined.openflow import flows
 from magma.pipelined.openflow.magma_match import MagmaMatch
 from magma.pipelined.openflow.registers import IMSI_REG, DIRECTION_REG, \
@@ -44,8 +44,6 @@ class RedirectionManager:
     The redirection manager handles subscribers who have redirection enabled,
     it adds the flows into ovs for redirecting user to the redirection server
     """
-    DNS_TIMEOUT_SECS = 15
-
     REDIRECT_NOT_PROCESSED = REG_ZERO_VAL
     REDIRECT_PROCESSED = 0x1
 
@@ -55,14 +53,15 @@ class RedirectionManager:
     )
 
     def __init__(self, bridge_ip, logger, main_tbl_num, next_table,
-                 scratch_table_num, session_rule_version_mapper):
+                 scratch_table_num, session_rule_version_mapper,
+                 dns_resolver):
         self._bridge_ip = bridge_ip
         self.logger = logger
         self.main_tbl_num = main_tbl_num
         self.next_table = next_table
         self._scratch_tbl_num = scratch_table_num
         self._redirect_dict = RedirectDict()
-        self._dns_cache = Memoizer({})
+        self._dns_resolver = dns_resolver
         self._redirect_port = get_service_config_value(
             'redirectd', 'http_port', 8080)
         self._session_rule_version_mapper = session_rule_version_mapper
@@ -90,7 +89,7 @@ class RedirectionManager:
         self._cwf_args_set = True
         return self
 
-    def handle_redirection(self, datapath, loop, redirect_request):
+    def handle_redirection(self, datapath, redirect_request):
         """
         Depending on redirection server address type install redirection rules
         """
@@ -111,11 +110,11 @@ class RedirectionManager:
             raise RedirectException("No ipv6 support, so no ipv6 redirect")
 
         self._save_redirect_entry(ip_addr, rule.redirect)
-        self._install_redirect_flows(datapath, loop, imsi, ip_addr, rule,
+        self._install_redirect_flows(datapath, imsi, ip_addr, rule,
                                      rule_num, rule_version, priority)
         return
 
-    def _install_redirect_flows(self, datapath, loop, imsi, ip_addr, rule,
+    def _install_redirect_flows(self, datapath, imsi, ip_addr, rule,
                                 rule_num, rule_version, priority):
         """
         Add flows to forward traffic to the redirection server.
@@ -131,7 +130,7 @@ class RedirectionManager:
         """
 
         if rule.redirect.address_type == rule.redirect.URL:
-            self._install_url_bypass_flows(datapath, loop, imsi, rule,
+            self._install_url_bypass_flows(datapath, imsi, rule,
                                            rule_num, rule_version, priority,
                                            ue_ip=ip_addr)
         elif rule.redirect.address_type == rule.redirect.IPv4:
@@ -285,7 +284,7 @@ class RedirectionManager:
             cookie=rule_num, hard_timeout=rule.hard_timeout,
             resubmit_table=self.next_table)
 
-    def setup_cwf_redirect(self, datapath, loop, redirect_request):
+    def setup_cwf_redirect(self, datapath, redirect_request):
         """
         Add flows to forward traffic to the redirection server for cwf networks
 
@@ -312,7 +311,7 @@ class RedirectionManager:
         rule_version = redirect_request.rule_version
         priority = redirect_request.priority
         if rule.redirect.address_type == rule.redirect.URL:
-            self._install_url_bypass_flows(datapath, loop, imsi, rule,
+            self._install_url_bypass_flows(datapath, imsi, rule,
                                            rule_num, rule_version, priority)
         elif rule.redirect.address_type == rule.redirect.IPv4:
             self._install_ipv4_bypass_flows(datapath, imsi, rule,
@@ -496,47 +495,51 @@ class RedirectionManager:
         self._install_not_processed_flows(datapath, imsi, ip_addr, rule,
                                           rule_num, priority)
 
-    def _install_url_bypass_flows(self, datapath, loop, imsi, rule, rule_num,
+    def _install_url_bypass_flows(self, datapath, imsi, rule, rule_num,
                                   rule_version, priority, ue_ip=None):
         """
         Resolve DNS queries to get the ip address of redirect url, this is done
         to allow traffic to safely pass through as we want subscribers to have
         full access to the url they are redirected to.
 
-        First check cache for redirect url, if not in cache submit a DNS query
+        First check the cache of the shared DNS resolver for redirect url, if
+        not in cache wait for its DNS query
         """
         redirect_addr_host = urlsplit(rule.redirect.server_address).netloc
-        cached_ips = self._dns_cache.get(redirect_addr_host)
+        try:
+            cached_ips = self._dns_resolver.get(redirect_addr_host)
+        except aiodns.error.DNSError as err:
+            self.logger.error("Error: ip lookup for {} failed recently: {}"
+                              .format(redirect_addr_host, err))
+            return
         if cached_ips is not None:
             self.logger.debug(
-                "DNS cache hit for {}, entry expires in {} sec".format(
-                    redirect_addr_host, self._dns_cache.ttl(redirect_addr_host)
-                )
-            )
+                "DNS cache hit for {}".format(redirect_addr_host))
             self._install_ipv4_bypass_flows(datapath, imsi, rule, rule_num,
                                             rule_version, priority, cached_ips,
                                             ue_ip)
+            REDIRECT_BYPASS_FLOWS_LATENCY_MS.observe(0)
             return
 
-        resolver = aiodns.DNSResolver(timeout=self.DNS_TIMEOUT_SECS, loop=loop)
-        query = resolver.query(redirect_addr_host, 'A')
+        start = time.monotonic()
 
         def add_flows(dns_resolve_future):
             """
             Callback for when DNS query is resolved, adds the bypass flows
             """
             try:
-                ips = [entry.host for entry in dns_resolve_future.result()]
-                ttl = min(entry.ttl for entry in dns_resolve_future.result())
+                ips = dns_resolve_future.result()
             except aiodns.error.DNSError as err:
                 self.logger.error("Error: ip lookup for {}: {}".format(
                                   redirect_addr_host, err))
                 return
-            self._dns_cache.get(redirect_addr_host, lambda: ips, max_age=ttl)
             self._install_ipv4_bypass_flows(datapath, imsi, rule, rule_num,
                                             rule_version, priority, ips, ue_ip)
+            REDIRECT_BYPASS_FLOWS_LATENCY_MS.observe(
+                (time.monotonic() - start) * 1000)
 
-        asyncio.ensure_future(query, loop=loop).add_done_callback(add_flows)
+        self._dns_resolver.resolve(redirect_addr_host).add_done_callback(
+            add_flows)
 
     def _install_ipv4_bypass_flows(self, datapath, imsi, rule, rule_num,
                                    rule_version, priority, ips, ue_ip=None):
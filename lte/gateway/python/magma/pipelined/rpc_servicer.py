@@ -21,13 +21,17 @@ from lte.protos.pipelined_pb2 import (
     SetupFlowsResult,
     RequestOriginType,
     ActivateFlowsResult,
+    ActivateFlowsBatchResult,
     DeactivateFlowsResult,
+    DeactivateFlowsBatchResult,
     FlowResponse,
     RuleModResult,
     SetupUEMacRequest,
     SetupPolicyRequest,
     SetupQuotaRequest,
     ActivateFlowsRequest,
+    ActivateFlowsBatchRequest,
+    DeactivateFlowsBatchRequest,
     AllTableAssignments,
     TableAssignment)
 from lte.protos.policydb_pb2 import PolicyRule
@@ -140,12 +144,7 @@ class PipelinedRpcServicer(pipelined_pb2_grpc.PipelinedServicer):
         enforcement_stats flows.
         """
         logging.debug('Activating GX flows for %s', request.sid.id)
-        for rule_id in request.rule_ids:
-            self._service_manager.session_rule_version_mapper.update_version(
-                request.sid.id, request.ip_addr, rule_id)
-        for rule in request.dynamic_rules:
-            self._service_manager.session_rule_version_mapper.update_version(
-                request.sid.id, request.ip_addr, rule.id)
+        self._update_rule_versions(request)
         enforcement_stats_res = self._activate_rules_in_enforcement_stats(
             request.sid.id, request.ip_addr, request.apn_ambr, request.rule_ids,
             request.dynamic_rules)
@@ -178,6 +177,14 @@ class PipelinedRpcServicer(pipelined_pb2_grpc.PipelinedServicer):
         enforcement_stats flows.
         """
         logging.debug('Activating GY flows for %s', request.sid.id)
+        self._update_rule_versions(request)
+
+        res = self._activate_rules_in_gy(request.sid.id, request.ip_addr, request.apn_ambr,
+            request.rule_ids, request.dynamic_rules)
+
+        fut.set_result(res)
+
+    def _update_rule_versions(self, request: ActivateFlowsRequest) -> None:
         for rule_id in request.rule_ids:
             self._service_manager.session_rule_version_mapper.update_version(
                 request.sid.id, request.ip_addr, rule_id)
@@ -185,10 +192,90 @@ class PipelinedRpcServicer(pipelined_pb2_grpc.PipelinedServicer):
             self._service_manager.session_rule_version_mapper.update_version(
                 request.sid.id, request.ip_addr, rule.id)
 
-        res = self._activate_rules_in_gy(request.sid.id, request.ip_addr, request.apn_ambr,
-            request.rule_ids, request.dynamic_rules)
+    def ActivateFlowsBatch(self, request, context):
+        """
+        Activate flows for several subscribers, like when sessiond recovers
+        its sessions
+        """
+        if not self._service_manager.is_app_enabled(
+                EnforcementController.APP_NAME):
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details('Service not enabled!')
+            return None
 
-        fut.set_result(res)
+        fut = Future()  # type: Future[ActivateFlowsBatchResult]
+        self._loop.call_soon_threadsafe(self._activate_flows_batch,
+                                        request, fut)
+        return fut.result()
+
+    def _activate_flows_batch(self, request: ActivateFlowsBatchRequest,
+                              fut: 'Future[ActivateFlowsBatchResult]'
+                              ) -> ActivateFlowsBatchResult:
+        """
+        Activate the GX requests as _activate_flows_gx does, with the flows
+        of all the subscribers installed at once in each app. The GY
+        requests are activated one by one.
+        """
+        logging.debug('Activating flows for %d subscribers',
+                      len(request.requests))
+        results = [None] * len(request.requests)
+        gx_indexes = []
+        for i, req in enumerate(request.requests):
+            self._update_rule_versions(req)
+            if req.request_origin.type == RequestOriginType.GX:
+                gx_indexes.append(i)
+            else:
+                results[i] = self._activate_rules_in_gy(
+                    req.sid.id, req.ip_addr, req.apn_ambr, req.rule_ids,
+                    req.dynamic_rules)
+
+        gx_results = self._activate_rules_batch_gx(
+            [request.requests[i] for i in gx_indexes])
+        for i, res in zip(gx_indexes, gx_results):
+            results[i] = res
+        fut.set_result(ActivateFlowsBatchResult(results=results))
+
+    def _activate_rules_batch_gx(self, requests: List[ActivateFlowsRequest]
+                                 ) -> List[ActivateFlowsResult]:
+        if self._service_manager.is_app_enabled(
+                EnforcementStatsController.APP_NAME):
+            enforcement_stats_results = \
+                self._enforcement_stats.activate_rules_batch(requests)
+        else:
+            enforcement_stats_results = [ActivateFlowsResult()
+                                         for _ in requests]
+
+        # Do not install any rules that failed to install in enforcement_stats.
+        enforcement_reqs = []
+        failed_results = []
+        for req, enforcement_stats_res in zip(requests,
+                                              enforcement_stats_results):
+            _report_enforcement_stats_failures(enforcement_stats_res,
+                                               req.sid.id)
+            failed_static_rule_results, failed_dynamic_rule_results = \
+                _retrieve_failed_results(enforcement_stats_res)
+            enforcement_reqs.append(ActivateFlowsRequest(
+                sid=req.sid, ip_addr=req.ip_addr, apn_ambr=req.apn_ambr,
+                request_origin=req.request_origin,
+                rule_ids=_filter_failed_static_rule_ids(
+                    req, failed_static_rule_results),
+                dynamic_rules=_filter_failed_dynamic_rules(
+                    req, failed_dynamic_rule_results)))
+            failed_results.append((failed_static_rule_results,
+                                   failed_dynamic_rule_results))
+
+        enforcement_results = \
+            self._enforcer_app.activate_rules_batch(enforcement_reqs)
+        for req, enforcement_res, (failed_static_rule_results,
+                                   failed_dynamic_rule_results) in \
+                zip(requests, enforcement_results, failed_results):
+            _report_enforcement_failures(enforcement_res, req.sid.id)
+            # Include the failed rules from enforcement_stats in the response.
+            enforcement_res.static_rule_results.extend(
+                failed_static_rule_results)
+            enforcement_res.dynamic_rule_results.extend(
+                failed_dynamic_rule_results)
+        return enforcement_results
 
     def _activate_rules_in_enforcement_stats(self, imsi: str, ip_addr: str,
                                              apn_ambr: AggregatedMaximumBitrate,
@@ -264,6 +351,34 @@ class PipelinedRpcServicer(pipelined_pb2_grpc.PipelinedServicer):
         self._gy_app.deactivate_rules(request.sid.id, request.ip_addr,
                                       request.rule_ids)
 
+    def DeactivateFlowsBatch(self, request, context):
+        """
+        Deactivate flows for several subscribers
+        """
+        if not self._service_manager.is_app_enabled(
+                EnforcementController.APP_NAME):
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details('Service not enabled!')
+            return None
+
+        self._loop.call_soon_threadsafe(self._deactivate_flows_batch,
+                                        request)
+        return DeactivateFlowsBatchResult(
+            results=[DeactivateFlowsResult() for _ in request.requests])
+
+    def _deactivate_flows_batch(self, request: DeactivateFlowsBatchRequest):
+        """
+        Deactivate the requests one by one, as DeactivateFlows does. The only
+        saving is a single hop to the event loop for the whole batch: the
+        flow deletes are sent without waiting for a reply, so unlike
+        activation there is no round trip per rule to batch away.
+        """
+        for req in request.requests:
+            if req.request_origin.type == RequestOriginType.GX:
+                self._deactivate_flows_gx(req)
+            else:
+                self._deactivate_flows_gy(req)
+
     def GetPolicyUsage(self, request, context):
         """
         Get policy usage stats
@@ -13,13 +13,14 @@ limitations under the License.
 import json
 import threading
 from collections import namedtuple
-from typing import Optional
+from typing import Dict, Iterator, Optional, Tuple
 
 from magma.pipelined.imsi import encode_imsi
 from magma.common.redis.client import get_default_client
 from magma.common.redis.containers import RedisHashDict
 from magma.common.redis.serializers import get_json_deserializer, \
     get_json_serializer
+from orc8r.protos.redis_pb2 import RedisState
 
 
 SubscriberRuleKey = namedtuple('SubscriberRuleKey', 'key_type imsi ip_addr rule_id')
@@ -31,6 +32,10 @@ class RuleIDToNumMapper:
 
     This class assigns integers to rule ids so that they can be identified in
     an openflow register. The methods can be called from multiple threads
+
+    Rule numbers are never reassigned, so both directions of the mapping are
+    cached in memory. The cache is loaded from Redis on first use and written
+    through when a rule is registered, and serves the reads without a lock.
     """
 
     def __init__(self):
@@ -38,33 +43,63 @@ class RuleIDToNumMapper:
         self._curr_rule_num = 1
         self._rule_nums_by_rule = RuleIDDict()
         self._rules_by_rule_num = RuleNameDict()
+        self._rule_num_cache = {}
+        self._rule_id_cache = {}
+        self._loaded = False
         self._lock = threading.Lock()  # write lock
 
     def _register_rule(self, rule_id):
         """ NOT thread safe """
-        rule_num = self._rule_nums_by_rule.get(rule_id)
+        rule_num = self._rule_num_cache.get(rule_id)
         if rule_num is not None:
             return rule_num
         rule_num = self._curr_rule_num
         self._rule_nums_by_rule[rule_id] = rule_num
         self._rules_by_rule_num[rule_num] = rule_id
+        # Cache the rule id first, so that a rule num read without the lock
+        # can always be mapped back
+        self._rule_id_cache[rule_num] = rule_id
+        self._rule_num_cache[rule_id] = rule_num
         self._curr_rule_num += 1
         return rule_num
 
     def get_rule_num(self, rule_id):
-        with self._lock:
-            return self._rule_nums_by_rule[rule_id]
+        self._load_if_needed()
+        rule_num = self._rule_num_cache.get(rule_id)
+        if rule_num is None:
+            with self._lock:
+                return self._rule_nums_by_rule[rule_id]
+        return rule_num
 
     def get_or_create_rule_num(self, rule_id):
-        with self._lock:
-            rule_num = self._rule_nums_by_rule.get(rule_id)
-            if rule_num is None:
-                return self._register_rule(rule_id)
+        self._load_if_needed()
+        rule_num = self._rule_num_cache.get(rule_id)
+        if rule_num is not None:
             return rule_num
+        with self._lock:
+            return self._register_rule(rule_id)
 
     def get_rule_id(self, rule_num):
+        self._load_if_needed()
+        rule_id = self._rule_id_cache.get(rule_num)
+        if rule_id is None:
+            with self._lock:
+                return self._rules_by_rule_num[rule_num]
+        return rule_id
+
+    def _load_if_needed(self):
+        if self._loaded:
+            return
         with self._lock:
-            return self._rules_by_rule_num[rule_num]
+            if self._loaded:
+                return
+            for rule_id, rule_num in self._rule_nums_by_rule.items():
+                self._rule_id_cache[rule_num] = rule_id
+                self._rule_num_cache[rule_id] = rule_num
+            # Don't hand out the numbers of the rules registered before a
+            # restart again
+            self._curr_rule_num = max(self._rule_id_cache, default=0) + 1
+            self._loaded = True
 
 
 class SessionRuleToVersionMapper:
@@ -74,21 +109,45 @@ class SessionRuleToVersionMapper:
     This class assigns version numbers to rule id & subscriber id combinations
     that can be used in an openflow register. The methods can be called from
     multiple threads.
+
+    The versions are kept in memory indexed by subscriber, which serves all
+    the reads. Redis is only written to, with one pipeline of the updated
+    versions every FLUSH_INTERVAL_SEC, and read once to load the versions on
+    first use. The keys are text, so that they can be listed by state_cli.
     """
 
     VERSION_LIMIT = 0xFFFFFFFF  # 32 bit unsigned int limit (inclusive)
+    FLUSH_INTERVAL_SEC = 1
 
     def __init__(self):
         self._version_by_imsi_and_rule = RuleVersionDict()
+        # Encoded imsi -> (ip_addr, rule_id) -> version
+        self._versions_by_imsi = {}
+        self._loaded = False
+        # Key -> version of the versions not written to Redis yet
+        self._pending_writes = {}
+        # Key -> RedisState version of the versions written to Redis
+        self._state_versions = {}
+        self._flush_timer = None
         self._lock = threading.Lock()  # write lock
 
-    def _update_version_unsafe(self, imsi: str, ip_addr: str, rule_id: str):
-        key = self._get_json_key(encode_imsi(imsi), ip_addr, rule_id)
-        version = self._version_by_imsi_and_rule.get(key)
-        if not version:
-            version = 0
-        self._version_by_imsi_and_rule[key] = \
-            (version % self.VERSION_LIMIT) + 1
+    def _update_version_unsafe(self, imsi64: int, ip_addr: str,
+                               rule_id: str):
+        versions = self._versions_by_imsi.setdefault(imsi64, {})
+        version = versions.get((ip_addr, rule_id), 0)
+        self._set_version_unsafe(imsi64, versions, ip_addr, rule_id,
+                                 (version % self.VERSION_LIMIT) + 1)
+
+    def _set_version_unsafe(self, imsi64: int, versions: dict,
+                            ip_addr: str, rule_id: str, version: int):
+        versions[(ip_addr, rule_id)] = version
+        self._pending_writes[_pack_version_key(imsi64, ip_addr,
+                                               rule_id)] = version
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.FLUSH_INTERVAL_SEC,
+                                                self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
 
     def update_version(self, imsi: str, ip_addr: str,
                        rule_id: Optional[str] = None):
@@ -97,17 +156,20 @@ class SessionRuleToVersionMapper:
         rule id is not specified, then all rules for the subscriber will be
         incremented.
         """
-        encoded_imsi = encode_imsi(imsi)
+        imsi64 = encode_imsi(imsi)
         if ip_addr is None:
             ip_addr = ""
+        self._load_if_needed()
         with self._lock:
             if rule_id is None:
-                for k, v in self._version_by_imsi_and_rule.items():
-                    _, imsi, ip_addr, _ = SubscriberRuleKey(*json.loads(k))
-                    if imsi == encoded_imsi and ip_addr == ip_addr:
-                        self._version_by_imsi_and_rule[k] = v + 1
+                versions = self._versions_by_imsi.get(imsi64, {})
+                for (rule_ip_addr, rule_id_), version in \
+                        list(versions.items()):
+                    self._set_version_unsafe(
+                        imsi64, versions, rule_ip_addr, rule_id_,
+                        (version % self.VERSION_LIMIT) + 1)
             else:
-                self._update_version_unsafe(imsi, ip_addr, rule_id)
+                self._update_version_unsafe(imsi64, ip_addr, rule_id)
 
     def get_version(self, imsi: str, ip_addr: str, rule_id: str) -> int:
         """
@@ -115,16 +177,83 @@ class SessionRuleToVersionMapper:
         """
         if ip_addr is None:
             ip_addr = ""
-        key = self._get_json_key(encode_imsi(imsi), ip_addr, rule_id)
+        self._load_if_needed()
+        # Reads don't take the lock, the dicts are only updated in place
+        versions = self._versions_by_imsi.get(encode_imsi(imsi))
+        if versions is None:
+            return 0
+        return versions.get((ip_addr, rule_id), 0)
+
+    def flush(self):
+        """
+        Writes the versions updated since the last flush to Redis
+        """
+        with self._lock:
+            pending, self._pending_writes = self._pending_writes, {}
+            self._flush_timer = None
+            values = {key: (version, self._next_state_version_unsafe(key))
+                      for key, version in pending.items()}
+        if values:
+            self._version_by_imsi_and_rule.set_many(values)
+
+    def close(self):
+        """
+        Writes the versions not flushed yet, called on shutdown
+        """
         with self._lock:
-            version = self._version_by_imsi_and_rule.get(key)
-            if version is None:
-                version = 0
-        return version
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+        self.flush()
 
-    def _get_json_key(self, imsi: str, ip_addr: str, rule_id: str):
-        return json.dumps(SubscriberRuleKey('imsi_rule', imsi, ip_addr,
-                                            rule_id))
+    def _load_if_needed(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            migrated = {}
+            legacy_keys = []
+            for key, version, state_version in \
+                    self._version_by_imsi_and_rule.versioned_items():
+                if key.startswith('['):
+                    # JSON SubscriberRuleKey written by older versions
+                    _, imsi64, ip_addr, rule_id = \
+                        SubscriberRuleKey(*json.loads(key))
+                    new_key = _pack_version_key(imsi64, ip_addr, rule_id)
+                    migrated[new_key] = \
+                        (version, self._next_state_version_unsafe(new_key))
+                    legacy_keys.append(key)
+                else:
+                    imsi64, ip_addr, rule_id = _unpack_version_key(key)
+                    self._state_versions[key] = state_version
+                self._versions_by_imsi.setdefault(imsi64, {})[
+                    (ip_addr, rule_id)] = version
+            if migrated:
+                self._version_by_imsi_and_rule.set_many(migrated)
+                for key in legacy_keys:
+                    del self._version_by_imsi_and_rule[key]
+            self._loaded = True
+
+    def _next_state_version_unsafe(self, key: str) -> int:
+        state_version = self._state_versions.get(key, 0) + 1
+        self._state_versions[key] = state_version
+        return state_version
+
+
+def _pack_version_key(imsi64: int, ip_addr: str, rule_id: str) -> str:
+    """
+    Packs a rule version key as "<encoded imsi>|<ip address>|<rule id>".
+    Only the rule id may contain a '|'.
+    """
+    return '%d|%s|%s' % (imsi64, ip_addr, rule_id)
+
+
+def _unpack_version_key(key: str) -> Tuple[int, str, str]:
+    """
+    Unpacks a rule version key into the encoded imsi, ip address and rule id
+    """
+    imsi64, ip_addr, rule_id = key.split('|', 2)
+    return int(imsi64), ip_addr, rule_id
 
 
 class RuleIDDict(RedisHashDict):
@@ -170,7 +299,8 @@ class RuleNameDict(RedisHashDict):
 class RuleVersionDict(RedisHashDict):
     """
     RuleVersionDict uses the RedisHashDict collection to store a mapping of
-    subscriber+rule_id to rule version.
+    subscriber+rule_id to rule version. The keys are packed by
+    _pack_version_key.
     Setting and deleting items in the dictionary syncs with Redis automatically
     """
     _DICT_HASH = "pipelined:rule_versions"
@@ -185,3 +315,27 @@ class RuleVersionDict(RedisHashDict):
     def __missing__(self, key):
         """Instead of throwing a key error, return None when key not found"""
         return None
+
+    def versioned_items(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Yields the (key, value, RedisState version) of every item, read with
+        a single HGETALL
+        """
+        for pickled_key, pickled_value in \
+                self.redis.hgetall(self.key).items():
+            proto_wrapper = RedisState()
+            proto_wrapper.ParseFromString(pickled_value)
+            yield self._unpickle_key(pickled_key), \
+                self._unpickle(pickled_value), proto_wrapper.version
+
+    def set_many(self, values: Dict[str, Tuple[int, int]]):
+        """
+        Writes the items of values, a key -> (value, RedisState version)
+        dict, in a single pipeline. The caller keeps track of the RedisState
+        versions, so unlike __setitem__ this doesn't read them from Redis.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for key, (value, version) in values.items():
+            pipe.hset(self.key, self._pickle_key(key),
+                      self._pickle_value(value, version))
+        pipe.execute()
@@ -66,6 +66,7 @@ from magma.pipelined.app.uplink_bridge import UplinkBridgeController
 
 from magma.pipelined.rule_mappers import RuleIDToNumMapper, \
     SessionRuleToVersionMapper
+from magma.pipelined.dns_resolver import DnsResolver
 from magma.pipelined.internal_ip_allocator import InternalIPAllocator
 from ryu.base.app_manager import AppManager
 
@@ -484,6 +485,7 @@ class ServiceManager:
         contexts['app_futures'] = {app.name: Future() for app in self._apps}
         contexts['internal_ip_allocator'] = \
             InternalIPAllocator(self._magma_service.config)
+        contexts['dns_resolver'] = DnsResolver(self._magma_service.loop)
         contexts['config'] = self._magma_service.config
         contexts['mconfig'] = self._magma_service.mconfig
         contexts['loop'] = self._magma_service.loop
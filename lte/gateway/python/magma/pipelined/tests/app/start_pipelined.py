@@ -19,6 +19,7 @@ from collections import namedtuple
 from concurrent.futures import Future
 
 from magma.pipelined.rule_mappers import RuleIDToNumMapper
+from magma.pipelined.dns_resolver import DnsResolver
 from magma.pipelined.internal_ip_allocator import InternalIPAllocator
 from magma.pipelined.app.base import MagmaController, ControllerType
 from magma.pipelined.tests.app.exceptions import ServiceRunningError,\
@@ -192,6 +193,7 @@ class StartThread(object):
             self._test_setup.service_manager.rule_id_mapper
         contexts['internal_ip_allocator'] = \
             InternalIPAllocator(self._test_setup.config)
+        contexts['dns_resolver'] = DnsResolver(self._test_setup.loop)
         contexts['session_rule_version_mapper'] = \
             self._test_setup.service_manager.session_rule_version_mapper
         contexts['app_futures'] = app_futures
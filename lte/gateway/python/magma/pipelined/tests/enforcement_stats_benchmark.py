@@ -0,0 +1,145 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark of the aggregation of the enforcement stats flow stats into usage
+records, over a synthetic stats reply, for a poll of all the flows and for a
+poll of one imsi shard along with the active subscribers. The rule mappers
+are backed by plain dicts instead of Redis and the usage isn't reported, so
+it doesn't need OVS, Redis or sessiond.
+
+Not collected by the unit test runner, run it explicitly with:
+    python3 -m pytest -s magma/pipelined/tests/enforcement_stats_benchmark.py
+"""
+
+import logging
+import time
+import unittest
+
+from ryu.ofproto import ofproto_v1_4_parser
+
+from magma.pipelined.app.enforcement_stats import \
+    EnforcementStatsController, _PollRound, _get_imsi_shard
+from magma.pipelined.imsi import encode_imsi
+from magma.pipelined.openflow.registers import Direction
+from magma.pipelined.rule_mappers import RuleIDToNumMapper, \
+    SessionRuleToVersionMapper
+
+NUM_SUBSCRIBERS = 10000
+RULES_PER_SUBSCRIBER = 5
+# Flow stats per multipart reply
+STATS_PER_REPLY = 1000
+TABLE_NUM = 12
+POLL_SHARDS = 16
+ACTIVE_SUBSCRIBERS = 256
+
+
+def _get_controller(rule_mapper, version_mapper):
+    """
+    Returns an EnforcementStatsController with only the state used by the
+    flow stats handling, without starting the ryu app
+    """
+    controller = EnforcementStatsController.__new__(
+        EnforcementStatsController)
+    controller.logger = logging.getLogger(__name__)
+    controller.tbl_num = TABLE_NUM
+    controller._rule_mapper = rule_mapper
+    controller._session_rule_version_mapper = version_mapper
+    controller.total_usage = {}
+    controller.last_usage_for_delta = {}
+    controller.failed_usage = {}
+    controller._unmatched_bytes = 0
+    controller._poll_shards = POLL_SHARDS
+    controller._max_active_polls = ACTIVE_SUBSCRIBERS
+    controller._active_imsis = []
+    controller._shard_keys = [set() for _ in range(POLL_SHARDS)]
+    controller._shard_sessions = [{} for _ in range(POLL_SHARDS)]
+    controller._report_usage = lambda delta_usage: None
+    return controller
+
+
+class EnforcementStatsBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        rule_mapper = RuleIDToNumMapper()
+        rule_mapper._rule_nums_by_rule = {}
+        rule_mapper._rules_by_rule_num = {}
+        version_mapper = SessionRuleToVersionMapper()
+        version_mapper._version_by_imsi_and_rule = {}
+        self._controller = _get_controller(rule_mapper, version_mapper)
+
+        stats = []
+        self._imsis = []
+        for sub in range(NUM_SUBSCRIBERS):
+            imsi = 'IMSI00101%010d' % sub
+            ip_addr = '10.%d.%d.%d' % (sub >> 16, (sub >> 8) & 0xff,
+                                       sub & 0xff)
+            self._imsis.append(encode_imsi(imsi))
+            for rule in range(RULES_PER_SUBSCRIBER):
+                rule_id = 'rule%d' % rule
+                rule_num = rule_mapper.get_or_create_rule_num(rule_id)
+                version_mapper.update_version(imsi, ip_addr, rule_id)
+                for direction, ip_field in ((Direction.OUT, 'ipv4_src'),
+                                            (Direction.IN, 'ipv4_dst')):
+                    match = ofproto_v1_4_parser.OFPMatch(
+                        metadata=encode_imsi(imsi), reg1=direction,
+                        reg3=0, reg4=1, eth_type=0x0800,
+                        **{ip_field: ip_addr})
+                    stats.append(ofproto_v1_4_parser.OFPFlowStats(
+                        table_id=TABLE_NUM, cookie=rule_num, match=match,
+                        byte_count=1500 * (rule + 1),
+                        packet_count=rule + 1))
+        self._stats_msgs = [stats[i:i + STATS_PER_REPLY]
+                            for i in range(0, len(stats), STATS_PER_REPLY)]
+        self._num_stats = len(stats)
+        self._stats = stats
+
+    def test_handle_flow_stats(self):
+        start = time.perf_counter()
+        self._controller._handle_flow_stats(self._stats_msgs)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(self._controller.total_usage),
+                         NUM_SUBSCRIBERS * RULES_PER_SUBSCRIBER)
+        print('\n%d flow stats handled in %.2fs: %.0f stats/s'
+              % (self._num_stats, elapsed, self._num_stats / elapsed))
+
+    def test_handle_shard_flow_stats(self):
+        # The usage of all the flows is known from the first poll
+        self._controller._handle_flow_stats(self._stats_msgs,
+                                            _PollRound(0, 1, []))
+        poll_round = _PollRound(0, POLL_SHARDS, [
+            imsi for imsi in self._imsis[:ACTIVE_SUBSCRIBERS * 2]
+            if _get_imsi_shard(imsi, POLL_SHARDS) != 0
+        ][:ACTIVE_SUBSCRIBERS])
+        stats = [stat for stat in self._stats
+                 if _get_imsi_shard(stat.match['metadata'], POLL_SHARDS) == 0
+                 or stat.match['metadata'] in poll_round.imsis]
+        for stat in stats:
+            stat.byte_count += 1500
+            stat.packet_count += 1
+        stats_msgs = [stats[i:i + STATS_PER_REPLY]
+                      for i in range(0, len(stats), STATS_PER_REPLY)]
+
+        start = time.perf_counter()
+        self._controller._handle_flow_stats(stats_msgs, poll_round)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(self._controller.total_usage),
+                         NUM_SUBSCRIBERS * RULES_PER_SUBSCRIBER)
+        self.assertEqual(len(self._controller._active_imsis),
+                         ACTIVE_SUBSCRIBERS)
+        print('\nshard of %d flow stats out of %d handled in %.2fs'
+              % (len(stats), self._num_stats, elapsed))
+
+
+if __name__ == "__main__":
+    unittest.main()
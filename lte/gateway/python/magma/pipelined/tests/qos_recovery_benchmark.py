@@ -0,0 +1,118 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark of the QoS state recovery done on a pipelined restart, with the
+qos_store backed by a dict and the linux tc classes mocked, each class
+deletion taking as long as a tc command. Measures how long the event loop
+waits for the QoS to be usable again, and for the unreferenced classes to
+be removed.
+
+Not collected by the unit test runner, run it explicitly with:
+    python3 -m pytest -s magma/pipelined/tests/qos_recovery_benchmark.py
+"""
+
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from lte.protos.policydb_pb2 import FlowMatch
+from magma.pipelined.qos.common import QosImplType, QosManager
+from magma.pipelined.qos.types import get_json, get_subscriber_key
+
+NUM_SUBSCRIBERS = 25000
+# Classes left behind by subscribers gone during the restart
+NUM_UNREFERENCED = 2000
+# Time taken by a tc class deletion command
+DELETE_CLASS_SEC = 0.005
+MAX_IDX = 65534
+WATCH_INTERVAL_SEC = 0.001
+
+
+class QosRecoveryBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            "clean_restart": False,
+            "enodeb_iface": "eth0",
+            "nat_iface": "eth1",
+            "qos": {
+                "max_rate": 1000000000,
+                "enable": True,
+                "impl": QosImplType.LINUX_TC,
+                "linux_tc": {"min_idx": 2, "max_idx": MAX_IDX},
+            },
+        }
+        self._store = {}
+        self._classes = {"eth0": [], "eth1": []}
+        qid = 2
+        for sub in range(NUM_SUBSCRIBERS):
+            imsi = '00101%010d' % sub
+            ip_addr = '10.%d.%d.%d' % (sub >> 16, (sub >> 8) & 0xff,
+                                       sub & 0xff)
+            for d, intf in ((FlowMatch.UPLINK, "eth1"),
+                            (FlowMatch.DOWNLINK, "eth0")):
+                k = get_subscriber_key(imsi, ip_addr, 0, d)
+                self._store[get_json(k)] = qid
+                self._classes[intf].append((qid, MAX_IDX))
+                qid += 1
+        for _ in range(NUM_UNREFERENCED):
+            self._classes["eth1"].append((qid, MAX_IDX))
+            qid += 1
+
+    @staticmethod
+    def _delete_classes(intf, qids, show_error=True):
+        time.sleep(DELETE_CLASS_SEC * len(qids))
+        return [0] * len(qids)
+
+    @patch("magma.pipelined.qos.qos_tc_impl.TrafficClass")
+    def test_recovery(self, mock_traffic_cls):
+        mock_traffic_cls.read_all_classes.side_effect = \
+            lambda intf: self._classes[intf]
+        mock_traffic_cls.delete_classes.side_effect = self._delete_classes
+        loop = asyncio.new_event_loop()
+        qos_mgr = QosManager(MagicMock, loop, self.config)
+        qos_mgr._qos_store = self._store
+
+        start = time.perf_counter()
+        initialized = None
+        # the longest delay of a timer callback during the recovery
+        max_blocked = 0
+
+        async def watch_loop():
+            nonlocal initialized, max_blocked
+            while not qos_mgr._recovery_task.done():
+                last = time.perf_counter()
+                await asyncio.sleep(WATCH_INTERVAL_SEC)
+                now = time.perf_counter()
+                max_blocked = max(max_blocked,
+                                  now - last - WATCH_INTERVAL_SEC)
+                if initialized is None and qos_mgr._initialized:
+                    initialized = now
+
+        qos_mgr._setupInternal()
+        loop.run_until_complete(
+            asyncio.gather(qos_mgr._recovery_task, watch_loop()))
+        done = time.perf_counter()
+        loop.close()
+
+        self.assertEqual(len(qos_mgr._subscriber_state), NUM_SUBSCRIBERS)
+        self.assertEqual(mock_traffic_cls.delete_classes.call_count,
+                         NUM_UNREFERENCED // qos_mgr.RECOVERY_BATCH_SIZE)
+        print('\n%d qos handles restored, usable in %.2fs, %d unreferenced '
+              'removed in %.2fs, event loop delayed at most %.3fs'
+              % (len(self._store), initialized - start, NUM_UNREFERENCED,
+                 done - initialized, max_blocked))
+
+
+if __name__ == "__main__":
+    unittest.main()
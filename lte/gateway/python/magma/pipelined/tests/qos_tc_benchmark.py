@@ -0,0 +1,98 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark of the linux tc QoS class operations done for a mass attach, an
+APN AMBR class and a bearer class per subscriber, with the tc commands and
+with netlink. Runs on an ifb interface created for the benchmark, so it
+needs to run as root.
+
+Not collected by the unit test runner, run it explicitly with:
+    sudo python3 -m pytest -s magma/pipelined/tests/qos_tc_benchmark.py
+"""
+
+import os
+import time
+import unittest
+
+from pyroute2 import IPRoute
+
+from magma.pipelined.qos.qos_tc_impl import TrafficClass
+
+NUM_SUBSCRIBERS = 500
+INTF = 'qosbench0'
+APN_AMBR = 10000000
+BEARER_MBR = 5000000
+BEARER_GBR = 1000000
+
+
+@unittest.skipIf(os.geteuid() != 0, 'needs to run as root')
+class QosTcBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self._ipr = IPRoute()
+        self._ipr.link('add', ifname=INTF, kind='ifb')
+        self._classes = []
+        for sub in range(NUM_SUBSCRIBERS):
+            ambr_qid = 2 + 2 * sub
+            self._classes.append((ambr_qid, APN_AMBR, None, None))
+            self._classes.append((ambr_qid + 1, BEARER_MBR, BEARER_GBR,
+                                  ambr_qid))
+
+    def tearDown(self):
+        TrafficClass.use_netlink(False)
+        self._ipr.link('del', ifname=INTF)
+        self._ipr.close()
+
+    def _run(self, name, use_netlink, batched=False):
+        TrafficClass.use_netlink(use_netlink)
+        TrafficClass.init_qdisc(INTF)
+        # children first
+        qids = [qid for qid, _, _, _ in reversed(self._classes)]
+
+        start = time.perf_counter()
+        if batched:
+            TrafficClass.create_classes(INTF, self._classes,
+                                        show_error=False)
+        else:
+            for qid, max_bw, rate, parent_qid in self._classes:
+                TrafficClass.create_class(INTF, qid, max_bw, rate=rate,
+                                          parent_qid=parent_qid,
+                                          show_error=False)
+        created = time.perf_counter()
+        num_classes = len(TrafficClass.read_all_classes(INTF))
+        read = time.perf_counter()
+        if batched:
+            TrafficClass.delete_classes(INTF, qids, show_error=False)
+        else:
+            for qid in qids:
+                TrafficClass.delete_class(INTF, qid, show_error=False)
+        deleted = time.perf_counter()
+
+        self.assertEqual(num_classes, len(self._classes) + 1)
+        print('\n%s: %d classes created in %.2fs (%.0f/s), read in %.3fs, '
+              'deleted in %.2fs (%.0f/s)'
+              % (name, len(self._classes), created - start,
+                 len(self._classes) / (created - start), read - created,
+                 deleted - read, len(self._classes) / (deleted - read)))
+
+    def test_tc_commands(self):
+        self._run('tc commands', False)
+
+    def test_netlink(self):
+        self._run('netlink', True)
+
+    def test_netlink_batched(self):
+        self._run('netlink, batched', True, batched=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
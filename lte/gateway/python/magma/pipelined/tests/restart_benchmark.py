@@ -0,0 +1,100 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark of the flow reconciliation done on a pipelined restart, matching
+the flow messages generated for the subscribers against a synthetic dump
+of the flows installed before the restart, and sending the missing ones to
+a fake datapath. Doesn't need OVS.
+
+Not collected by the unit test runner, run it explicitly with:
+    python3 -m pytest -s magma/pipelined/tests/restart_benchmark.py
+"""
+
+import logging
+import time
+import unittest
+
+from ryu.ofproto import ofproto_v1_4, ofproto_v1_4_parser
+
+from magma.pipelined.openflow.messages import MessageHub
+
+NUM_SUBSCRIBERS = 20000
+RULES_PER_SUBSCRIBER = 5
+# Share of the flow messages whose flow wasn't installed before the restart
+MISSING_RATIO = 0.1
+
+
+class _FakeDatapath(object):
+    """Datapath that counts the messages sent instead of sending them"""
+    id = 1
+    ofproto = ofproto_v1_4
+    ofproto_parser = ofproto_v1_4_parser
+
+    def __init__(self):
+        self.xid = 0
+        self.sent = 0
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def send_msg(self, msg):
+        self.sent += 1
+
+
+def _match(imsi, rule_num, direction, version):
+    return ofproto_v1_4_parser.OFPMatch(metadata=imsi, reg1=direction,
+                                        reg2=rule_num, reg4=version)
+
+
+class RestartBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self._datapath = _FakeDatapath()
+        self._msg_hub = MessageHub(logging.getLogger(__name__))
+        self._msgs = []
+        self._flows = []
+        missing_every = int(1 / MISSING_RATIO)
+        for imsi in range(NUM_SUBSCRIBERS):
+            for rule_num in range(RULES_PER_SUBSCRIBER):
+                for direction in (0x01, 0x10):
+                    match = _match(imsi, rule_num, direction, 1)
+                    self._msgs.append(ofproto_v1_4_parser.OFPFlowMod(
+                        self._datapath, cookie=rule_num, match=match))
+                    if len(self._msgs) % missing_every:
+                        self._flows.append(ofproto_v1_4_parser.OFPFlowStats(
+                            cookie=rule_num, match=match))
+        # Flows of subscribers gone during the restart, to be deleted
+        for imsi in range(NUM_SUBSCRIBERS, NUM_SUBSCRIBERS + 100):
+            self._flows.append(ofproto_v1_4_parser.OFPFlowStats(
+                cookie=0, match=_match(imsi, 0, 0x01, 1)))
+
+    def test_reconcile(self):
+        start = time.perf_counter()
+        msgs_to_send, remaining_flows = \
+            self._msg_hub.filter_msgs_if_not_in_flow_list(self._msgs,
+                                                          self._flows)
+        filtered = time.perf_counter()
+        self._msg_hub.send(msgs_to_send, self._datapath)
+        sent = time.perf_counter()
+
+        self.assertEqual(len(remaining_flows), 100)
+        self.assertEqual(self._datapath.sent, len(msgs_to_send) + 1)
+        print('\n%d flow messages, %d installed flows: filtered in %.2fs, '
+              '%d missing sent in %.2fs'
+              % (len(self._msgs), len(self._flows), filtered - start,
+                 len(msgs_to_send), sent - filtered))
+
+
+if __name__ == "__main__":
+    unittest.main()
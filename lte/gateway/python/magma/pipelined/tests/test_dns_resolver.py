@@ -0,0 +1,119 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import aiodns
+
+from magma.pipelined.dns_resolver import DnsResolver
+
+HOST = 'about.sha.ddih.org'
+IPS = ['185.128.101.5', '185.128.121.4']
+
+
+class DnsResolverTest(unittest.TestCase):
+    def setUp(self):
+        self._loop = asyncio.new_event_loop()
+        self._queries = []
+        self._results = []
+        self._resolver = DnsResolver(self._loop, self._query)
+
+    def tearDown(self):
+        self._loop.close()
+
+    async def _query(self, host):
+        self._queries.append(host)
+        await asyncio.sleep(0)
+        result = self._results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _resolve(self, host):
+        return self._loop.run_until_complete(self._resolver.resolve(host))
+
+    def test_concurrent_lookups(self):
+        """
+        Test that concurrent lookups of a host share a query, and that the
+        next ones are answered from the cache
+        """
+        self._results.append((IPS, 60))
+        futs = [self._resolver.resolve(HOST) for _ in range(3)]
+        results = self._loop.run_until_complete(asyncio.gather(*futs))
+
+        self.assertEqual(results, [IPS] * 3)
+        self.assertEqual(self._queries, [HOST])
+        self.assertEqual(self._resolver.get(HOST), IPS)
+        self.assertTrue(self._resolver.resolve(HOST).done())
+        self.assertEqual(self._queries, [HOST])
+
+    def test_negative_cache(self):
+        """
+        Test that a failed lookup is cached for NEGATIVE_TTL_SECS
+        """
+        self._results.append(aiodns.error.DNSError(4, 'Domain name not found'))
+        with self.assertRaises(aiodns.error.DNSError):
+            self._resolve(HOST)
+        with self.assertRaises(aiodns.error.DNSError):
+            self._resolver.get(HOST)
+        self.assertEqual(self._queries, [HOST])
+
+        self._results.append((IPS, 60))
+        now = self._resolver._entries[HOST].expires_at
+        with patch('magma.pipelined.dns_resolver.time.monotonic',
+                   return_value=now):
+            self.assertEqual(self._resolve(HOST), IPS)
+        self.assertEqual(self._queries, [HOST, HOST])
+
+    def test_prefetch(self):
+        """
+        Test that the entries looked up shortly before they expire are
+        queried again if they were looked up enough, and that a failed
+        prefetch keeps the addresses until they expire
+        """
+        self._resolver.set(HOST, IPS, 60)
+        self.assertEqual(self._resolver.get(HOST), IPS)
+        expires_at = self._resolver._entries[HOST].expires_at
+
+        with patch('magma.pipelined.dns_resolver.time.monotonic',
+                   return_value=expires_at - 10):
+            self.assertEqual(self._resolver.get(HOST), IPS)
+        self.assertEqual(self._queries, [])
+
+        new_ips = ['185.128.101.6']
+        self._results.append((new_ips, 60))
+        with patch('magma.pipelined.dns_resolver.time.monotonic',
+                   return_value=expires_at - 1):
+            self.assertEqual(self._resolver.get(HOST), IPS)
+            self._loop.run_until_complete(self._resolver._pending[HOST])
+        self.assertEqual(self._queries, [HOST])
+        self.assertEqual(self._resolver.get(HOST), new_ips)
+
+        self._resolver.set(HOST, IPS, 60)
+        self._resolver.get(HOST)
+        self._results.append(aiodns.error.DNSError(12, 'Timeout'))
+        expires_at = self._resolver._entries[HOST].expires_at
+        with patch('magma.pipelined.dns_resolver.time.monotonic',
+                   return_value=expires_at - 1):
+            self._resolver.get(HOST)
+            with self.assertRaises(aiodns.error.DNSError):
+                self._loop.run_until_complete(
+                    self._resolver._pending[HOST])
+        self.assertEqual(self._resolver.get(HOST), IPS)
+        self.assertEqual(self._queries, [HOST, HOST])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,7 @@ from concurrent.futures import Future
 
 import warnings
 from lte.protos.mconfig.mconfigs_pb2 import PipelineD
+from lte.protos.pipelined_pb2 import ActivateFlowsRequest, RuleModResult
 from lte.protos.policydb_pb2 import FlowDescription, FlowMatch, PolicyRule
 from magma.pipelined.app.enforcement import EnforcementController
 from magma.pipelined.bridge_util import BridgeTools
@@ -34,6 +35,8 @@ from magma.pipelined.tests.pipelined_test_util import FlowTest, FlowVerifier, \
     PktsToSend, SubTest, create_service_manager, start_ryu_app_thread, \
     stop_ryu_app_thread, wait_after_send, SnapshotVerifier, \
     fake_controller_setup
+from magma.subscriberdb.sid import SIDUtils
+from ryu.lib import hub
 
 
 class EnforcementTableTest(unittest.TestCase):
@@ -348,6 +351,52 @@ class EnforcementTableTest(unittest.TestCase):
 
         flow_verifier.verify()
 
+    def test_activate_rules_batch(self):
+        """
+        Activate a rule and an unknown rule for 2 subscribers in one batch
+
+        Assert:
+            The rule is installed and the unknown rule fails for both
+            Each subscriber gets its rule flow and its drop flow
+        """
+        fake_controller_setup(self.enforcement_controller)
+        subscribers = [('IMSI010000000077771', '192.168.128.81'),
+                       ('IMSI010000000077772', '192.168.128.82')]
+        flow_list = [FlowDescription(
+            match=FlowMatch(
+                ipv4_dst='45.11.0.0/24', direction=FlowMatch.UPLINK),
+            action=FlowDescription.PERMIT)
+        ]
+        policy = PolicyRule(id='batch_match', priority=2, flow_list=flow_list)
+        self._static_rule_dict[policy.id] = policy
+        requests = [ActivateFlowsRequest(sid=SIDUtils.to_pb(imsi),
+                                         ip_addr=sub_ip,
+                                         rule_ids=[policy.id, 'unknown'])
+                    for imsi, sub_ip in subscribers]
+        flow_query = FlowQuery(self._tbl_num, self.testing_controller)
+        num_flows_start = len(flow_query.lookup())
+
+        results = []
+        hub.joinall([hub.spawn(lambda: results.extend(
+            self.enforcement_controller.activate_rules_batch(requests)))])
+        wait_after_send(self.testing_controller)
+        num_flows_final = len(flow_query.lookup())
+
+        def deactivate_flows():
+            for imsi, sub_ip in subscribers:
+                self.enforcement_controller.deactivate_rules(
+                    imsi=imsi, ip_addr=sub_ip, rule_ids=None)
+        hub.joinall([hub.spawn(deactivate_flows)])
+
+        self.assertEqual(len(results), len(subscribers))
+        for res in results:
+            self.assertEqual(
+                [(r.rule_id, r.result) for r in res.static_rule_results],
+                [(policy.id, RuleModResult.SUCCESS),
+                 ('unknown', RuleModResult.FAILURE)])
+        self.assertEqual(num_flows_final - num_flows_start,
+                         2 * len(subscribers))
+
 
 if __name__ == "__main__":
     unittest.main()
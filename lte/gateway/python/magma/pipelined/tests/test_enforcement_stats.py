@@ -245,8 +245,8 @@ class EnforcementStatsTest(unittest.TestCase):
         fake_controller_setup(self.enforcement_controller,
                               self.enforcement_stats_controller)
         redirect_ips = ["185.128.101.5", "185.128.121.4"]
-        self.enforcement_controller._redirect_manager._dns_cache.get(
-            "about.sha.ddih.org", lambda: redirect_ips, max_age=42
+        self.enforcement_controller._redirect_manager._dns_resolver.set(
+            "about.sha.ddih.org", redirect_ips, ttl=42
         )
         imsi = 'IMSI010000000088888'
         sub_ip = '192.168.128.74'
@@ -0,0 +1,423 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import itertools
+import logging
+import unittest
+from concurrent.futures import Future
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from ryu.ofproto import ofproto_v1_4, ofproto_v1_4_parser
+
+from magma.pipelined.app.enforcement_stats import \
+    EnforcementStatsController, IGNORE_STATS, IMSI_SHARD_SHIFT, \
+    PROCESS_STATS, _get_rule_record
+from magma.pipelined.imsi import encode_imsi
+from magma.pipelined.openflow.exceptions import MagmaOFError
+from magma.pipelined.openflow.registers import Direction
+from magma.pipelined.rule_mappers import RuleIDToNumMapper, \
+    SessionRuleToVersionMapper
+
+TABLE_NUM = 12
+IMSI = 'IMSI001010000000001'
+IP_ADDR = '192.168.128.1'
+
+
+def _get_flow_stat(imsi, ip_addr, rule_num, byte_count, packet_count=1,
+                   direction=Direction.OUT, version=1,
+                   stats_action=PROCESS_STATS):
+    ip_field = 'ipv4_src' if direction == Direction.OUT else 'ipv4_dst'
+    match = ofproto_v1_4_parser.OFPMatch(
+        metadata=encode_imsi(imsi), reg1=direction, reg3=stats_action,
+        reg4=version, eth_type=0x0800, **{ip_field: ip_addr})
+    return ofproto_v1_4_parser.OFPFlowStats(
+        table_id=TABLE_NUM, cookie=rule_num, match=match,
+        byte_count=byte_count, packet_count=packet_count)
+
+
+class EnforcementStatsTestCase(unittest.TestCase):
+    """
+    Builds an EnforcementStatsController with only the state used by the
+    flow stats handling, without starting the ryu app
+    """
+    POLL_SHARDS = 1
+
+    def setUp(self):
+        self._rule_mapper = RuleIDToNumMapper()
+        self._rule_mapper._rule_nums_by_rule = {}
+        self._rule_mapper._rules_by_rule_num = {}
+        self._version_mapper = SessionRuleToVersionMapper()
+        self._version_mapper._version_by_imsi_and_rule = {}
+        self._reports = []
+
+        controller = EnforcementStatsController.__new__(
+            EnforcementStatsController)
+        controller.logger = logging.getLogger(__name__)
+        controller.tbl_num = TABLE_NUM
+        controller._rule_mapper = self._rule_mapper
+        controller._session_rule_version_mapper = self._version_mapper
+        controller.total_usage = {}
+        controller.last_usage_for_delta = {}
+        controller.failed_usage = {}
+        controller._unmatched_bytes = 0
+        controller._poll_shards = self.POLL_SHARDS
+        controller._max_active_polls = 1
+        controller._next_shard = 0
+        controller._poll_round = None
+        controller._active_imsis = []
+        controller._shard_keys = [set() for _ in range(self.POLL_SHARDS)]
+        controller._shard_sessions = [{} for _ in range(self.POLL_SHARDS)]
+        controller._report_usage = self._reports.append
+        controller._delete_flow = Mock()
+        self._controller = controller
+
+    def tearDown(self):
+        self._version_mapper.close()
+
+    def _add_rule(self, imsi, ip_addr, rule_id, updates=1):
+        for _ in range(updates):
+            self._version_mapper.update_version(imsi, ip_addr, rule_id)
+        return self._rule_mapper.get_or_create_rule_num(rule_id)
+
+    def _last_report(self):
+        return {key: (record.bytes_tx, record.bytes_rx)
+                for key, record in self._reports[-1].items()}
+
+
+class EnforcementStatsUsageTest(EnforcementStatsTestCase):
+    """
+    Test the aggregation of the flow stats into the usage reported to
+    sessiond, without OVS or sessiond
+    """
+
+    def test_delta_usage(self):
+        """
+        Test that each poll reports the bytes counted since the previous one,
+        and that an idle session gets a single empty record
+        """
+        rule1 = self._add_rule(IMSI, IP_ADDR, 'rule1')
+        rule2 = self._add_rule(IMSI, IP_ADDR, 'rule2')
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 100),
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 1000, packet_count=10,
+                           direction=Direction.IN),
+            _get_flow_stat(IMSI, IP_ADDR, rule2, 50),
+        ]])
+        self.assertEqual(self._last_report(), {
+            IMSI + '|rule1|' + IP_ADDR: (100, 860),
+            IMSI + '|rule2|' + IP_ADDR: (50, 0),
+        })
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 250),
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 1000, packet_count=10,
+                           direction=Direction.IN),
+            _get_flow_stat(IMSI, IP_ADDR, rule2, 50),
+        ]])
+        self.assertEqual(self._last_report(), {
+            IMSI + '|rule1|' + IP_ADDR: (150, 0),
+        })
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 250),
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 1000, packet_count=10,
+                           direction=Direction.IN),
+            _get_flow_stat(IMSI, IP_ADDR, rule2, 50),
+        ]])
+        report = self._last_report()
+        self.assertEqual(len(report), 1)
+        self.assertEqual(list(report.values()), [(0, 0)])
+        self.assertEqual(len(self._controller.total_usage), 2)
+
+    def test_failed_usage_retry(self):
+        """
+        Test that the usage that failed to be reported is added to the next
+        report
+        """
+        rule1 = self._add_rule(IMSI, IP_ADDR, 'rule1')
+        usage_key = IMSI + '|rule1|' + IP_ADDR
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 100)]])
+        future = Future()
+        future.set_exception(RuntimeError('sessiond unavailable'))
+        self._controller._report_usage_done(future, self._reports[-1])
+        self.assertIn(usage_key, self._controller.failed_usage)
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 130)]])
+        self.assertEqual(self._last_report(), {usage_key: (130, 0)})
+        self.assertEqual(self._controller.failed_usage, {})
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 140)]])
+        self.assertEqual(self._last_report(), {usage_key: (10, 0)})
+
+    def test_old_version_flows_deleted(self):
+        """
+        Test that the flows of an old rule version are deleted, and that
+        their bytes are no longer counted in the next deltas
+        """
+        rule1 = self._add_rule(IMSI, IP_ADDR, 'rule1', updates=2)
+        usage_key = IMSI + '|rule1|' + IP_ADDR
+        old_stat = _get_flow_stat(IMSI, IP_ADDR, rule1, 100, version=1)
+
+        self._controller._handle_flow_stats([[
+            old_stat,
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 30, version=2),
+        ]])
+        self.assertEqual(self._last_report(), {usage_key: (130, 0)})
+        self._controller._delete_flow.assert_called_once_with(
+            old_stat, IMSI, IP_ADDR, 1)
+        key = (encode_imsi(IMSI), rule1, IP_ADDR)
+        self.assertEqual(self._controller.total_usage[key][2], 130)
+        self.assertEqual(self._controller.last_usage_for_delta[key][2], 30)
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 50, version=2)]])
+        self.assertEqual(self._last_report(), {usage_key: (20, 0)})
+
+    def test_old_version_flow_delete_failure(self):
+        """
+        Test that the bytes of an old flow that failed to be deleted are
+        still counted in the next deltas
+        """
+        rule1 = self._add_rule(IMSI, IP_ADDR, 'rule1', updates=2)
+        usage_key = IMSI + '|rule1|' + IP_ADDR
+        self._controller._delete_flow.side_effect = MagmaOFError('failed')
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 100, version=1)]])
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 120, version=1)]])
+        self.assertEqual(self._last_report(), {usage_key: (20, 0)})
+
+    def test_ignore_stats(self):
+        """
+        Test that the bytes of the IGNORE_STATS flows aren't reported, and
+        that their old versions are deleted all the same
+        """
+        rule1 = self._add_rule(IMSI, IP_ADDR, 'rule1')
+        rule2 = self._add_rule(IMSI, IP_ADDR, 'rule2', updates=2)
+        ignored_stat = _get_flow_stat(IMSI, IP_ADDR, rule2, 500, version=1,
+                                      stats_action=IGNORE_STATS)
+
+        self._controller._handle_flow_stats([[
+            _get_flow_stat(IMSI, IP_ADDR, rule1, 100),
+            ignored_stat,
+        ]])
+        self.assertEqual(self._last_report(), {
+            IMSI + '|rule1|' + IP_ADDR: (100, 0),
+        })
+        self.assertEqual(list(self._controller.total_usage),
+                         [(encode_imsi(IMSI), rule1, IP_ADDR)])
+        self._controller._delete_flow.assert_called_once_with(
+            ignored_stat, IMSI, IP_ADDR, 1)
+
+
+class EnforcementStatsShardTest(EnforcementStatsTestCase):
+    """
+    Test the polls of one imsi shard at a time, against a datapath that
+    answers the flow stats requests from a list of flows
+    """
+    POLL_SHARDS = 4
+
+    def setUp(self):
+        super().setUp()
+        self._controller.init_finished = True
+        self._controller.loop = Mock()
+        self._controller.loop.call_soon_threadsafe.side_effect = \
+            lambda func, *args: func(*args)
+
+        xids = itertools.count(1)
+        self._datapath = Mock(ofproto=ofproto_v1_4,
+                              ofproto_parser=ofproto_v1_4_parser)
+        self._datapath.set_xid.side_effect = \
+            lambda msg: msg.set_xid(next(xids))
+        self._sent = []
+        send_patcher = patch(
+            'magma.pipelined.app.enforcement_stats.messages.send_msg',
+            side_effect=lambda datapath, msg: self._sent.append(msg))
+        send_patcher.start()
+        self.addCleanup(send_patcher.stop)
+
+        # IMSI00101000000000<n> is in shard n
+        self._imsis = ['IMSI00101000000000%d' % shard
+                       for shard in range(self.POLL_SHARDS)]
+        self._ip_addrs = ['192.168.128.%d' % (shard + 1)
+                          for shard in range(self.POLL_SHARDS)]
+        self._flows = []
+        for imsi, ip_addr in zip(self._imsis, self._ip_addrs):
+            rule_num = self._add_rule(imsi, ip_addr, 'rule1')
+            self._flows.append(_get_flow_stat(imsi, ip_addr, rule_num, 100))
+
+    def _get_reply(self, req):
+        """
+        Returns the flows matched by a flow stats request
+        """
+        if req.cookie_mask:
+            return []
+        metadata = req.match.get('metadata')
+        if metadata is None:
+            return list(self._flows)
+        value, mask = metadata if isinstance(metadata, tuple) \
+            else (metadata, 0xffffffffffffffff)
+        return [stat for stat in self._flows
+                if stat.match['metadata'] & mask == value]
+
+    def _send_reply(self, req, body, more=False):
+        flags = ofproto_v1_4.OFPMPF_REPLY_MORE if more else 0
+        self._controller._flow_stats_reply_handler(SimpleNamespace(
+            msg=SimpleNamespace(xid=req.xid, flags=flags, body=body)))
+
+    def _poll(self):
+        """
+        Polls the datapath and answers the requests sent
+        """
+        self._sent = []
+        self._controller._poll_stats(self._datapath)
+        for req in self._sent:
+            self._send_reply(req, self._get_reply(req))
+        return self._sent
+
+    def _add_traffic(self, shard, byte_count):
+        self._flows[shard].byte_count += byte_count
+
+    def _usage_key(self, shard):
+        return self._imsis[shard] + '|rule1|' + self._ip_addrs[shard]
+
+    def test_shard_rotation(self):
+        """
+        Test that all the flows are polled first, then one shard per poll,
+        and that the default flow is polled along with shard 0
+        """
+        self._controller._max_active_polls = 0
+        reqs = self._poll()
+        self.assertEqual(len(reqs), 2)
+        self.assertIsNone(reqs[0].match.get('metadata'))
+        self.assertEqual(reqs[1].cookie,
+                         EnforcementStatsController.DEFAULT_FLOW_COOKIE)
+        self.assertEqual(len(self._controller.total_usage), 4)
+
+        shard_mask = (self.POLL_SHARDS - 1) << IMSI_SHARD_SHIFT
+        for shard in [0, 1, 2, 3, 0]:
+            reqs = self._poll()
+            self.assertEqual(reqs[0].match.get('metadata'),
+                             (shard << IMSI_SHARD_SHIFT, shard_mask))
+            self.assertEqual(len(reqs), 2 if shard == 0 else 1)
+        self.assertEqual(len(self._reports), 6)
+        self.assertIsNone(self._controller._poll_round)
+
+    def test_round_waits_for_all_replies(self):
+        """
+        Test that a shard poll is only handled once all of its requests
+        were answered in full, ignoring the replies to other requests
+        """
+        self._add_traffic(2, 500)
+        self._poll()
+        self.assertEqual(self._controller._active_imsis,
+                         [encode_imsi(self._imsis[2])])
+
+        self._sent = []
+        self._controller._poll_stats(self._datapath)
+        reqs = self._sent
+        # Shard 0, the active subscriber of shard 2 and the default flow
+        self.assertEqual(len(reqs), 3)
+        self.assertEqual(reqs[1].match.get('metadata'),
+                         encode_imsi(self._imsis[2]))
+        reports = len(self._reports)
+
+        self._send_reply(SimpleNamespace(xid=1000), [self._flows[3]])
+        self._send_reply(reqs[1], [], more=True)
+        self._send_reply(reqs[0], self._get_reply(reqs[0]))
+        self._send_reply(reqs[2], self._get_reply(reqs[2]))
+        self.assertEqual(len(self._reports), reports)
+        self._add_traffic(2, 300)
+        self._send_reply(reqs[1], self._get_reply(reqs[1]))
+        self.assertEqual(len(self._reports), reports + 1)
+        self.assertEqual(self._last_report()[self._usage_key(2)], (300, 0))
+        self.assertIsNone(self._controller._poll_round)
+
+    def test_merge_shard_usage(self):
+        """
+        Test that the usage of a shard poll and of the active subscribers is
+        merged into the usage of the other shards
+        """
+        self._poll()
+        # Shard 0 is polled, the traffic of shard 1 is only seen on its poll
+        self._add_traffic(1, 200)
+        self._poll()
+        self.assertEqual(self._last_report()[self._usage_key(1)], (0, 0))
+        self._add_traffic(1, 50)
+        self._add_traffic(2, 70)
+        self._poll()
+
+        # Shard 1 is polled, shard 2 isn't yet
+        self.assertEqual(self._last_report()[self._usage_key(1)], (250, 0))
+        self.assertEqual(self._last_report()[self._usage_key(2)], (0, 0))
+        total_usage = {key[0]: usage[2]
+                       for key, usage in self._controller.total_usage.items()}
+        self.assertEqual(total_usage, {
+            encode_imsi(self._imsis[0]): 100,
+            encode_imsi(self._imsis[1]): 350,
+            encode_imsi(self._imsis[2]): 100,
+            encode_imsi(self._imsis[3]): 100,
+        })
+
+        # Shard 2 is polled along with the active subscriber of shard 1
+        self.assertEqual(self._controller._active_imsis,
+                         [encode_imsi(self._imsis[1])])
+        self._add_traffic(1, 30)
+        self._poll()
+        report = self._last_report()
+        self.assertEqual(report[self._usage_key(1)], (30, 0))
+        self.assertEqual(report[self._usage_key(2)], (70, 0))
+        self.assertEqual(
+            self._controller.total_usage[
+                (encode_imsi(self._imsis[1]), self._flows[1].cookie,
+                 self._ip_addrs[1])][2],
+            380)
+
+    def test_unpolled_sessions(self):
+        """
+        Test that the sessions of the unpolled shards are still reported,
+        with no usage, and that their usage is counted from the last poll
+        of their shard
+        """
+        self._poll()
+        self._add_traffic(3, 40)
+        self._poll()
+
+        report = self._last_report()
+        self.assertEqual(set(report), {self._usage_key(shard)
+                                       for shard in range(4)})
+        self.assertEqual(report[self._usage_key(0)], (0, 0))
+        self.assertEqual(report[self._usage_key(3)], (0, 0))
+
+        self._controller.failed_usage = {
+            self._usage_key(2): _get_rule_record(
+                (self._imsis[2], 'rule1', 10, 0), self._ip_addrs[2])}
+        self._poll()
+        report = self._last_report()
+        self.assertEqual(report[self._usage_key(2)], (10, 0))
+        self.assertEqual(report[self._usage_key(3)], (0, 0))
+
+        self._poll()
+        self._poll()
+        self.assertEqual(self._last_report()[self._usage_key(3)], (40, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
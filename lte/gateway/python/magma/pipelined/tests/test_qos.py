@@ -11,17 +11,21 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import asyncio
+import errno
 import subprocess
 import unittest
 from collections import namedtuple
 from unittest.mock import MagicMock, call, patch
 
+from magma.pipelined.metrics import QOS_RECOVERY_DONE, QOS_RECOVERY_PENDING
 from magma.pipelined.qos.common import QosImplType, QosManager, SubscriberState
 from magma.pipelined.qos.qos_meter_impl import MeterManager
 from magma.pipelined.qos.qos_tc_impl import TrafficClass, argSplit, run_cmd
+from magma.pipelined.qos.tc_netlink import get_rate_bytes
 from magma.pipelined.qos.types import QosInfo, get_json, get_key, get_subscriber_key
 from magma.pipelined.qos.utils import IdManager
 from lte.protos.policydb_pb2 import FlowMatch
+from pyroute2 import NetlinkError
 
 class TestQosCommon(unittest.TestCase):
     def testIdManager(self):
@@ -444,6 +448,10 @@ get_action_instruction"
         MockSt = namedtuple("MockSt", "meter_id")
         dummy_meter_ev_body = [MockSt(11), MockSt(13), MockSt(2), MockSt(15)]
 
+        def tc_delete(intf, qids, show_error=True):
+            return [0] * len(qids)
+        mock_traffic_cls.delete_classes.side_effect = tc_delete
+
         def tc_read(intf):
             if intf == self.ul_intf:
                 return [(2, 65534), (15, 65534)]
@@ -464,8 +472,8 @@ get_action_instruction"
 
         qos_mgr._setupInternal()
 
-        # run async loop once to ensure ready items are cleared
-        loop._run_once()
+        # run async loop until the recovery is complete
+        loop.run_until_complete(qos_mgr._recovery_task)
 
         # verify that qos_handle 20 not found in system is purged from map
         self.assertFalse([v for _, v in qos_mgr._qos_store.items() if v == 20])
@@ -474,7 +482,7 @@ get_action_instruction"
         if self.config["qos"]["impl"] == QosImplType.OVS_METER:
             mock_meter_cls.del_meter.assert_called_with(MagicMock, 15)
         else:
-            mock_traffic_cls.delete_class.assert_called_with(self.ul_intf, 15)
+            mock_traffic_cls.delete_classes.assert_called_with(self.ul_intf, [15])
 
         # add a new rule to the qos_mgr and check if it is assigned right id
         imsi, rule_num, d, qos_info = "3", 0, 0, QosInfo(100000, 100000)
@@ -514,13 +522,14 @@ get_action_instruction"
 
         qos_mgr._setupInternal()
 
-        # run async loop once to ensure ready items are cleared
-        loop._run_once()
+        # run async loop until the recovery is complete
+        loop.run_until_complete(qos_mgr._recovery_task)
         self.assertTrue(not qos_mgr._qos_store)
         if self.config["qos"]["impl"] == QosImplType.OVS_METER:
             mock_meter_cls.del_meter.assert_not_called()
         else:
             mock_traffic_cls.delete_class.assert_not_called()
+            mock_traffic_cls.delete_classes.assert_not_called()
 
         # case 3 - check with empty qos_map, all qos configs get purged
         mock_meter_cls.reset_mock()
@@ -536,8 +545,8 @@ get_action_instruction"
 
         qos_mgr._setupInternal()
 
-        # run async loop once to ensure ready items are cleared
-        loop._run_once()
+        # run async loop until the recovery is complete
+        loop.run_until_complete(qos_mgr._recovery_task)
 
         self.assertTrue(not qos_mgr._qos_store)
         # verify that unreferenced qos configs are purged from the system
@@ -547,10 +556,10 @@ get_action_instruction"
             mock_meter_cls.del_meter.assert_any_call(MagicMock, 13)
             mock_meter_cls.del_meter.assert_any_call(MagicMock, 11)
         else:
-            mock_traffic_cls.delete_class.assert_any_call(self.ul_intf, 2)
-            mock_traffic_cls.delete_class.assert_any_call(self.ul_intf, 15)
-            mock_traffic_cls.delete_class.assert_any_call(self.dl_intf, 13)
-            mock_traffic_cls.delete_class.assert_any_call(self.dl_intf, 11)
+            deleted = {intf: sorted(qids) for (intf, qids), _ in
+                       mock_traffic_cls.delete_classes.call_args_list}
+            self.assertEqual(deleted, {self.ul_intf: [2, 15],
+                                       self.dl_intf: [11, 13]})
 
     def testSanity(self):
         for impl_type in (QosImplType.LINUX_TC, QosImplType.OVS_METER):
@@ -568,6 +577,47 @@ get_action_instruction"
                 self.config["qos"]["impl"] = impl_type
                 self._testUncleanRestart()
 
+    @patch("magma.pipelined.qos.qos_tc_impl.TrafficClass")
+    def testUncleanRestartBatches(self, mock_traffic_cls):
+        """This test verifies that the recovery keeps the apn ambr class of
+        the restored rules, and removes the unreferenced classes in batches
+        with the children before their parent"""
+        self.config["clean_restart"] = False
+        self.config["qos"]["impl"] = QosImplType.LINUX_TC
+        loop = asyncio.new_event_loop()
+        qos_mgr = QosManager(MagicMock, loop, self.config)
+        qos_mgr.RECOVERY_BATCH_SIZE = 2
+        qos_mgr._qos_store = {}
+
+        # qid 3 is restored along with its apn ambr parent qid 2, qid 4 and
+        # its children 5 and 6 and qid 7 are unreferenced
+        imsi, ip_addr, rule_num, d = "1", '1.1.1.1', 0, FlowMatch.UPLINK
+        k = get_json(get_subscriber_key(imsi, ip_addr, rule_num, d))
+        qos_mgr._qos_store[k] = 3
+        ul_qids = [(2, 65534), (3, 2), (4, 65534), (5, 4), (6, 4), (7, 65534)]
+        mock_traffic_cls.read_all_classes.side_effect = \
+            lambda intf: ul_qids if intf == self.ul_intf else []
+        mock_traffic_cls.delete_classes.side_effect = \
+            lambda intf, qids, show_error=True: [0] * len(qids)
+        removed = QOS_RECOVERY_DONE.labels('remove_qos')._value.get()
+
+        qos_mgr._setupInternal()
+        loop.run_until_complete(qos_mgr._recovery_task)
+
+        self.assertTrue(qos_mgr._initialized)
+        subscriber_state = qos_mgr._subscriber_state[imsi]
+        self.assertEqual(subscriber_state.get_qos_handle(rule_num, d), 3)
+        self.assertEqual(subscriber_state.sessions[ip_addr].get_ambr(d), 2)
+        self.assertEqual(mock_traffic_cls.delete_classes.call_args_list,
+                         [call(self.ul_intf, [5, 6]), call(self.ul_intf, [4, 7])])
+        self.assertEqual(
+            QOS_RECOVERY_DONE.labels('remove_qos')._value.get() - removed, 4)
+        self.assertEqual(
+            QOS_RECOVERY_PENDING.labels('remove_qos')._value.get(), 0)
+
+        # freed qids are reused
+        self.assertEqual(qos_mgr.impl._id_manager.allocate_idx(), 5)
+
     @patch("magma.pipelined.qos.qos_tc_impl.TrafficClass")
     @patch("magma.pipelined.qos.qos_tc_impl.TCManager.get_action_instruction")
     def testApnAmbrSanity(
@@ -755,6 +805,78 @@ class TestTrafficClass(unittest.TestCase):
         run_cmd(['tc qdisc del dev {intf} root'.format(intf=intf)])
 
 
+class TestTcNetlink(unittest.TestCase):
+    class MockClassMsg(dict):
+        def __init__(self, kind, handle, parent):
+            super().__init__(handle=handle, parent=parent)
+            self._kind = kind
+
+        def get_attr(self, name):
+            return self._kind if name == 'TCA_KIND' else None
+
+    def setUp(self):
+        patcher = patch("magma.pipelined.qos.tc_netlink.IPRoute")
+        self.mock_ipr = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.mock_ipr.link_lookup.return_value = [5]
+        TrafficClass.use_netlink(True)
+        self.addCleanup(TrafficClass.use_netlink, False)
+
+    def testRateConversion(self):
+        self.assertEqual(get_rate_bytes(250000), 31250)
+        self.assertEqual(get_rate_bytes('12Kbit'), 1500)
+        self.assertEqual(get_rate_bytes('1000Mbit'), 125000000)
+        with self.assertRaises(ValueError):
+            get_rate_bytes('-1Mbit')
+
+    def testCreateDeleteClasses(self):
+        errs = TrafficClass.create_classes('eth0', [
+            (2, 1000000, None, None),
+            (3, 500000, 250000, 2),
+        ])
+        self.assertEqual(errs, [0, 0])
+        self.mock_ipr.link_lookup.assert_called_once_with(ifname='eth0')
+        self.mock_ipr.tc.assert_any_call(
+            'add-class', 'htb', 5, 0x10002, parent=0x1fffe, rate=1500,
+            ceil=125000)
+        self.mock_ipr.tc.assert_any_call(
+            'add-class', 'htb', 5, 0x10003, parent=0x10002, rate=31250,
+            ceil=62500)
+        self.mock_ipr.tc.assert_any_call(
+            'add', 'fq_codel', 5, 0, parent=0x10003)
+        self.mock_ipr.tc.assert_any_call(
+            'add-filter', 'fw', 5, 3, parent=0x10000, prio=1,
+            protocol=0x0800, classid=0x10003)
+
+        self.mock_ipr.tc.reset_mock()
+        self.assertEqual(TrafficClass.delete_classes('eth0', [3, 2]), [0, 0])
+        self.mock_ipr.tc.assert_has_calls([
+            call('del-filter', 'fw', 5, 3, parent=0x10000, prio=1,
+                 protocol=0x0800),
+            call('del-class', None, 5, 0x10003),
+            call('del-filter', 'fw', 5, 2, parent=0x10000, prio=1,
+                 protocol=0x0800),
+            call('del-class', None, 5, 0x10002),
+        ])
+
+    def testError(self):
+        self.mock_ipr.tc.side_effect = NetlinkError(errno.ENOENT)
+        with self.assertLogs("pipelined.qos.tc_netlink", level="ERROR"):
+            self.assertEqual(TrafficClass.delete_class('eth0', 3),
+                             errno.ENOENT)
+
+    def testReadAllClasses(self):
+        self.mock_ipr.get_classes.return_value = [
+            self.MockClassMsg('htb', 0x1fffe, 0xffffffff),
+            self.MockClassMsg('htb', 0x10001, 0x1fffe),
+            self.MockClassMsg('htb', 0x10003, 0x10002),
+            self.MockClassMsg('fq_codel', 0x80010000, 0x10003),
+        ]
+        self.assertEqual(TrafficClass.read_all_classes('eth0'),
+                         [(1, 0xfffe), (3, 2)])
+        self.mock_ipr.get_classes.assert_called_once_with(5)
+
+
 class TestSubscriberState(unittest.TestCase):
     def testSingleRuleWithNoApnAmbr(self, ):
         rule_num, d = 10, FlowMatch.UPLINK
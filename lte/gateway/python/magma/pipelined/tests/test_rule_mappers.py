@@ -11,15 +11,46 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import json
 import unittest
+from unittest import mock
 
-from magma.pipelined.rule_mappers import SessionRuleToVersionMapper
+from magma.common.redis.mocks.mock_redis import MockRedis
+from magma.pipelined.imsi import encode_imsi
+from magma.pipelined.rule_mappers import RuleIDToNumMapper, \
+    SessionRuleToVersionMapper, SubscriberRuleKey
 
 
 class RuleMappersTest(unittest.TestCase):
+    @mock.patch("redis.Redis", MockRedis)
     def setUp(self):
+        MockRedis.redis.clear()
         self._session_rule_version_mapper = SessionRuleToVersionMapper()
-        self._session_rule_version_mapper._version_by_imsi_and_rule = {}
+        self._rule_id_mapper = RuleIDToNumMapper()
+        self._rule_id_mapper._rule_nums_by_rule = {}
+        self._rule_id_mapper._rules_by_rule_num = {}
+
+    def test_rule_id_mapper(self):
+        """
+        Test that the rule nums registered before a restart are loaded, and
+        that new rules are written through
+        """
+        self._rule_id_mapper._rule_nums_by_rule.update(
+            {'rule1': 1, 'rule2': 2})
+        self._rule_id_mapper._rules_by_rule_num.update(
+            {1: 'rule1', 2: 'rule2'})
+
+        self.assertEqual(self._rule_id_mapper.get_rule_num('rule2'), 2)
+        self.assertEqual(self._rule_id_mapper.get_rule_id(1), 'rule1')
+        self.assertEqual(
+            self._rule_id_mapper.get_or_create_rule_num('rule1'), 1)
+        self.assertEqual(
+            self._rule_id_mapper.get_or_create_rule_num('rule3'), 3)
+        self.assertEqual(self._rule_id_mapper.get_rule_id(3), 'rule3')
+        self.assertEqual(self._rule_id_mapper._rule_nums_by_rule['rule3'], 3)
+        self.assertEqual(self._rule_id_mapper._rules_by_rule_num[3], 'rule3')
+        with self.assertRaises(KeyError):
+            self._rule_id_mapper.get_rule_id(4)
 
     def test_session_rule_version_mapper(self):
         rule_ids = ['rule1', 'rule2']
@@ -95,5 +126,124 @@ class RuleMappersTest(unittest.TestCase):
                                                           rule_ids[1]),
             2)
 
+    def test_session_rule_version_write_behind(self):
+        """
+        Test that the versions are written to the store on flush, and
+        loaded back from it with the legacy JSON keys migrated
+        """
+        imsi = 'IMSI12345'
+        self._session_rule_version_mapper.update_version(imsi, '1.2.3.4',
+                                                         'rule1')
+        store = self._session_rule_version_mapper._version_by_imsi_and_rule
+        self.assertEqual(len(store), 0)
+        self._session_rule_version_mapper.flush()
+        self.assertEqual(list(store.values()), [1])
+
+        store[json.dumps(SubscriberRuleKey(
+            'imsi_rule', encode_imsi(imsi), '', 'rule2')).encode()] = 5
+        with mock.patch("redis.Redis", MockRedis):
+            mapper = SessionRuleToVersionMapper()
+        self.assertEqual(mapper.get_version(imsi, '1.2.3.4', 'rule1'), 1)
+        self.assertEqual(mapper.get_version(imsi, None, 'rule2'), 5)
+        imsi64 = encode_imsi(imsi)
+        self.assertEqual(sorted(store), ['%d|1.2.3.4|rule1' % imsi64,
+                                         '%d||rule2' % imsi64])
+
+
+class SessionRuleToVersionMapperRedisTest(unittest.TestCase):
+    """
+    Test the rule versions written to and loaded from a RuleVersionDict
+    """
+
+    @mock.patch("redis.Redis", MockRedis)
+    def setUp(self):
+        MockRedis.redis.clear()
+        self._mapper = SessionRuleToVersionMapper()
+
+    def tearDown(self):
+        self._mapper.close()
+        MockRedis.redis.clear()
+
+    @mock.patch("redis.Redis", MockRedis)
+    def _new_mapper(self):
+        return SessionRuleToVersionMapper()
+
+    def test_flush(self):
+        """
+        Test that the flushed versions are loaded after a restart
+        """
+        imsi = 'IMSI12345'
+        self._mapper.update_version(imsi, '1.2.3.4', 'rule1')
+        self._mapper.update_version(imsi, '1.2.3.4', 'rule2')
+        self._mapper.update_version(imsi, '1.2.3.4', 'rule1')
+        self.assertEqual(MockRedis.redis, {})
+
+        self._mapper.flush()
+        self.assertEqual(len(self._mapper._version_by_imsi_and_rule), 2)
+        self.assertIsNone(self._mapper._flush_timer)
+
+        mapper = self._new_mapper()
+        self.assertEqual(mapper.get_version(imsi, '1.2.3.4', 'rule1'), 2)
+        self.assertEqual(mapper.get_version(imsi, '1.2.3.4', 'rule2'), 1)
+        self.assertEqual(mapper.get_version(imsi, '1.2.3.4', 'rule3'), 0)
+
+    def test_flush_pipeline(self):
+        """
+        Test that a flush writes the pending versions in one pipeline,
+        without reading their RedisState versions
+        """
+        imsi = 'IMSI12345'
+        store = self._mapper._version_by_imsi_and_rule
+        for _ in range(2):
+            self._mapper.update_version(imsi, '1.2.3.4', 'rule1')
+            self._mapper.update_version(imsi, '1.2.3.4', 'rule2')
+            with mock.patch.object(store.redis, 'hget') as hget, \
+                    mock.patch.object(store.redis, 'pipeline',
+                                      wraps=store.redis.pipeline) as pipe:
+                self._mapper.flush()
+                hget.assert_not_called()
+                pipe.assert_called_once_with(transaction=False)
+
+        key = '%d|1.2.3.4|rule1' % encode_imsi(imsi)
+        self.assertEqual(store[key], 2)
+        self.assertEqual(store.get_version(key), 2)
+        mapper = self._new_mapper()
+        mapper.update_version(imsi, '1.2.3.4', 'rule1')
+        mapper.flush()
+        self.assertEqual(store[key], 3)
+        self.assertEqual(store.get_version(key), 3)
+
+    def test_close(self):
+        """
+        Test that the pending versions are written on close
+        """
+        imsi = 'IMSI12345'
+        self._mapper.update_version(imsi, None, 'rule1')
+        self.assertIsNotNone(self._mapper._flush_timer)
+        self._mapper.close()
+        self.assertIsNone(self._mapper._flush_timer)
+
+        mapper = self._new_mapper()
+        self.assertEqual(mapper.get_version(imsi, None, 'rule1'), 1)
+
+    def test_legacy_keys_migrated(self):
+        """
+        Test that the legacy JSON keys are rewritten as text keys
+        """
+        imsi = 'IMSI12345'
+        store = self._mapper._version_by_imsi_and_rule
+        store[json.dumps(SubscriberRuleKey(
+            'imsi_rule', encode_imsi(imsi), '1.2.3.4', 'rule1')).encode()] = 3
+
+        self.assertEqual(self._mapper.get_version(imsi, '1.2.3.4', 'rule1'),
+                         3)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(list(store),
+                         ['%d|1.2.3.4|rule1' % encode_imsi(imsi)])
+
+        mapper = self._new_mapper()
+        self.assertEqual(mapper.get_version(imsi, '1.2.3.4', 'rule1'), 3)
+
+
 if __name__ == "__main__":
     unittest.main()
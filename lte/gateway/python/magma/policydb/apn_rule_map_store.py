@@ -29,12 +29,13 @@ class ApnRuleAssignmentsDict(RedisHashDict):
     """
     _DICT_HASH = "policydb:apn_installed"
 
-    def __init__(self):
+    def __init__(self, local_cache: bool = False):
         client = get_default_client()
         super().__init__(
             client,
             self._DICT_HASH,
             get_proto_serializer(),
-            get_proto_deserializer(SubscriberPolicySet)
+            get_proto_deserializer(SubscriberPolicySet),
+            local_cache=local_cache,
         )
         self._clear()
@@ -27,13 +27,14 @@ class BaseNameDict(RedisHashDict):
     _DICT_HASH = "policydb:basenames"
     _NOTIFY_CHANNEL = "policydb:basenames:stream_update"
 
-    def __init__(self):
+    def __init__(self, local_cache: bool = False):
         client = get_default_client()
         super().__init__(
             client,
             self._DICT_HASH,
             get_proto_serializer(),
-            get_proto_deserializer(ChargingRuleNameSet))
+            get_proto_deserializer(ChargingRuleNameSet),
+            local_cache=local_cache)
 
     def send_update_notification(self):
         """
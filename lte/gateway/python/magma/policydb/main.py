@@ -34,10 +34,11 @@ from .streamer_callback import ApnRuleMappingsStreamerCallback,\
 def main():
     service = MagmaService('policydb', mconfigs_pb2.PolicyDB())
 
-    apn_rules_dict = ApnRuleAssignmentsDict()
-    assignments_dict = RuleAssignmentsDict()
-    basenames_dict = BaseNameDict()
-    rating_groups_dict = RatingGroupsDict()
+    # policydb is the only writer of these hashes, serve reads from memory
+    apn_rules_dict = ApnRuleAssignmentsDict(local_cache=True)
+    assignments_dict = RuleAssignmentsDict(local_cache=True)
+    basenames_dict = BaseNameDict(local_cache=True)
+    rating_groups_dict = RatingGroupsDict(local_cache=True)
     sessiond_chan = ServiceRegistry.get_rpc_channel('sessiond',
                                                     ServiceRegistry.LOCAL)
     session_mgr_stub = LocalSessionManagerStub(sessiond_chan)
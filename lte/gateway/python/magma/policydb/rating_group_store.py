@@ -28,13 +28,14 @@ class RatingGroupsDict(RedisHashDict):
     _DICT_HASH = "policydb:rating_groups"
     _NOTIFY_CHANNEL = "policydb:rating_groups:stream_update"
 
-    def __init__(self):
+    def __init__(self, local_cache: bool = False):
         client = get_default_client()
         super().__init__(
             client,
             self._DICT_HASH,
             get_proto_serializer(),
-            get_proto_deserializer(RatingGroup))
+            get_proto_deserializer(RatingGroup),
+            local_cache=local_cache)
 
     def send_update_notification(self):
         """
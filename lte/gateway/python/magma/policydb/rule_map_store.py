@@ -26,13 +26,14 @@ class RuleAssignmentsDict(RedisHashDict):
     """
     _DICT_HASH = "policydb:installed"
 
-    def __init__(self):
+    def __init__(self, local_cache: bool = False):
         client = get_default_client()
         super().__init__(
             client,
             self._DICT_HASH,
             get_proto_serializer(),
-            get_proto_deserializer(InstalledPolicies)
+            get_proto_deserializer(InstalledPolicies),
+            local_cache=local_cache,
         )
         # TODO: Remove when sessiond becomes stateless
         self._clear()
@@ -0,0 +1,149 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+
+from magma.common.job import Job
+
+
+class LteAuthSeqJournal(Job):
+    """
+    Write-behind journal of the LTE auth sequence numbers.
+
+    The next sequence number of the subscribers authenticated since the
+    start is kept in memory, and the changed ones are written to the store
+    together every flush interval, instead of one transaction per auth.
+
+    Sequence numbers must never be reused, even if the gateway crashes
+    before a flush. So on start every subscriber is advanced by
+    skip_window in the store, and at most skip_window sequence numbers are
+    handed out past the last one committed to the store: a reservation
+    that would cross the window first waits for the subscriber to be
+    flushed. A subscriber is also flushed right away once it reaches the
+    window, so that the next reservation doesn't wait.
+    """
+
+    def __init__(self, store, flush_interval, skip_window, loop=None):
+        super().__init__(interval=flush_interval, loop=loop)
+        self._store = store
+        self._skip_window = skip_window
+        self._lock = threading.Lock()
+        # Serializes the flushes, so that an older snapshot can't be
+        # written after a newer one
+        self._flush_lock = threading.Lock()
+        self._next_seqs = {}
+        # Sequence numbers handed out per subscriber since its last
+        # committed flush
+        self._unflushed = {}
+
+    def start(self):
+        """
+        Skips the sequence numbers that might have been handed out without
+        being flushed before a restart, then starts the periodic flush.
+        """
+        self._store.skip_lte_auth_seqs(self._skip_window)
+        super().start()
+
+    def stop(self):
+        """
+        Stops the periodic flush and flushes the pending changes.
+        """
+        super().stop()
+        self.flush()
+
+    async def _run(self):
+        await self._loop.run_in_executor(None, self.flush)
+
+    def reserve(self, sid, count, load_next_seq):
+        """
+        Reserves count consecutive sequence numbers for a subscriber.
+
+        Args:
+            sid: the subscriber id
+            count: the number of sequence numbers to reserve
+            load_next_seq: returns the next sequence number from the store,
+                called if the subscriber isn't in the journal yet
+        Returns:
+            the first reserved sequence number
+        Raises:
+            ValueError: if count is larger than the skip window
+        """
+        if count > self._skip_window:
+            raise ValueError('Can\'t reserve %d sequence numbers with a skip '
+                             'window of %d' % (count, self._skip_window))
+        with self._lock:
+            known = sid in self._next_seqs
+        if not known:
+            next_seq = load_next_seq()
+        while True:
+            with self._lock:
+                if sid not in self._next_seqs:
+                    self._next_seqs[sid] = next_seq
+                unflushed = self._unflushed.get(sid, 0) + count
+                if unflushed <= self._skip_window:
+                    seq = self._next_seqs[sid]
+                    self._next_seqs[sid] = seq + count
+                    self._unflushed[sid] = unflushed
+                    break
+            # Crossing the window: wait for the flush in progress, if any,
+            # and for the subscriber's flush to commit
+            self.flush()
+        if unflushed >= self._skip_window:
+            self.flush()
+        return seq
+
+    def get_next_seq(self, sid, load_next_seq):
+        """
+        Returns the next sequence number of a subscriber without reserving
+        it.
+        """
+        with self._lock:
+            if sid in self._next_seqs:
+                return self._next_seqs[sid]
+        return load_next_seq()
+
+    def set_next_seq(self, sid, seq):
+        """
+        Sets the next sequence number of a subscriber. This is flushed right
+        away, since the skip window only covers sequence numbers handed
+        out after the last flush.
+        """
+        with self._lock:
+            self._next_seqs[sid] = seq
+            self._unflushed.setdefault(sid, 0)
+        self.flush()
+
+    def flush(self):
+        """
+        Writes the sequence numbers changed since the last flush to the
+        store in one transaction.
+
+        The handed out counts are only cleared once the write commits, so
+        the reservations made meanwhile, or after a failed write, still
+        count against the skip window.
+        """
+        with self._flush_lock:
+            with self._lock:
+                flushed = dict(self._unflushed)
+                pending = {sid: self._next_seqs[sid] for sid in flushed}
+            if not pending:
+                return
+            self._store.set_lte_auth_seqs(pending)
+            with self._lock:
+                for sid, count in flushed.items():
+                    unflushed = self._unflushed[sid] - count
+                    # Keep the subscribers set meanwhile pending
+                    if unflushed or self._next_seqs[sid] != pending[sid]:
+                        self._unflushed[sid] = unflushed
+                    else:
+                        del self._unflushed[sid]
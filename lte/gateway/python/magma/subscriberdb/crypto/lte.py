@@ -49,3 +49,33 @@ class BaseLTEAuthAlgo(metaclass=abc.ABCMeta):
             kasme (bytes): 256 bit base network authentication code
         """
         pass
+
+    def generate_eutran_vectors(self, key, opc, sqns, plmn):
+        """
+        Generate one E-EUTRAN key vector per sequence number. Algos can
+        override this to share work between the vectors.
+        Args:
+            key (bytes): 128 bit subscriber key
+            opc (bytes): 128 bit operator variant algorithm configuration field
+            sqns ([int]): 48 bit sequence numbers
+            plmn (bytes): 24 bit network identifer
+        Returns:
+            [(rand, xres, autn, kasme)], in the order of sqns
+        """
+        return [self.generate_eutran_vector(key, opc, sqn, plmn)
+                for sqn in sqns]
+
+    def generate_eutran_vectors_batch(self, subscribers, plmn):
+        """
+        Generate the E-EUTRAN key vectors of several subscribers. Algos can
+        override this to share work between the subscribers.
+        Args:
+            subscribers ([(bytes, bytes, [int])]): the key, OP_c and 48 bit
+                sequence numbers of each subscriber
+            plmn (bytes): 24 bit network identifer
+        Returns:
+            [[(rand, xres, autn, kasme)]], in the order of subscribers and
+            of their sqns
+        """
+        return [self.generate_eutran_vectors(key, opc, sqns, plmn)
+                for key, opc, sqns in subscribers]
@@ -41,17 +41,90 @@ class Milenage(BaseLTEAuthAlgo):
             autn (bytes): 128 bit authentication token
             kasme (bytes): 256 bit base network authentication code
         """
-        sqn_bytes = bytearray.fromhex('{:012x}'.format(sqn))
-        rand = Milenage.generate_rand()
+        return self.generate_eutran_vectors(key, opc, [sqn], plmn)[0]
 
-        mac_a, _ = Milenage.f1(key, sqn_bytes, rand, opc, self.amf)
-        xres, ak = Milenage.f2_f5(key, rand, opc)
-        ck = Milenage.f3(key, rand, opc)
-        ik = Milenage.f4(key, rand, opc)
+    def generate_eutran_vectors(self, key, opc, sqns, plmn):
+        """
+        Generate one E-EUTRAN key vector per sequence number.
 
-        autn = Milenage.generate_autn(sqn_bytes, ak, mac_a, self.amf)
-        kasme = Milenage.generate_kasme(ck, ik, plmn, sqn_bytes, ak)
-        return rand, xres, autn, kasme
+        Args:
+            key (bytes): 128 bit subscriber key
+            opc (bytes): 128 bit operator variant algorithm configuration field
+            sqns ([int]): 48 bit sequence numbers
+            plmn (bytes): 24 bit network identifer
+        Returns:
+            [(rand, xres, autn, kasme)], in the order of sqns
+        """
+        return self.generate_eutran_vectors_batch([(key, opc, sqns)], plmn)[0]
+
+    def generate_eutran_vectors_batch(self, subscribers, plmn):
+        """
+        Generate the E-EUTRAN key vectors of several subscribers.
+
+        This computes f1 to f5 for all the vectors of a subscriber with two
+        AES calls on the concatenated blocks, instead of two calls per
+        function and vector. The XORs and the buffers are shared by all the
+        subscribers, and each key is expanded once.
+
+        Args:
+            subscribers ([(bytes, bytes, [int])]): the key, OP_c and 48 bit
+                sequence numbers of each subscriber
+            plmn (bytes): 24 bit network identifer
+        Returns:
+            [[(rand, xres, autn, kasme)]], in the order of subscribers and
+            of their sqns
+        """
+        ciphers = [_ecb_cipher(key) for key, _, _ in subscribers]
+        counts = [len(sqns) for _, _, sqns in subscribers]
+        opcs = b''.join(opc * num for (_, opc, _), num
+                        in zip(subscribers, counts))
+        sqn_bytes = [sqn.to_bytes(6, byteorder='big')
+                     for _, _, sqns in subscribers for sqn in sqns]
+        rands = [Milenage.generate_rand() for _ in sqn_bytes]
+
+        # TEMP = E_K(RAND XOR OP_C), with one AES call per subscriber
+        ins = xor(b''.join(rands), opcs)
+        temps = b''.join(_encrypt_runs(ciphers, counts, ins, 16))
+        temps_x_opc = xor(temps, opcs)
+
+        # Constants from 3GPP 35.206 4.1, c1 is all zeros
+        c2 = 15 * b'\x00' + b'\x01'
+        c3 = 15 * b'\x00' + b'\x02'
+        c4 = 15 * b'\x00' + b'\x04'
+
+        # Inputs of the second encryption of f1, f2/f5, f3 and f4
+        blocks = []
+        opcs4 = []
+        for i, sqn in enumerate(sqn_bytes):
+            opc = opcs[16 * i:16 * (i + 1)]
+            temp = temps[16 * i:16 * (i + 1)]
+            temp_x_opc = temps_x_opc[16 * i:16 * (i + 1)]
+            in1 = (sqn + self.amf[0:2]) * 2
+            blocks.append(xor(temp, rotate(xor(in1, opc), 8)))
+            blocks.append(xor(temp_x_opc, c2))
+            blocks.append(xor(rotate(temp_x_opc, 4), c3))
+            blocks.append(xor(rotate(temp_x_opc, 8), c4))
+            opcs4.append(opc * 4)
+        outs = xor(b''.join(_encrypt_runs(ciphers, counts, b''.join(blocks),
+                                          64)),
+                   b''.join(opcs4))
+
+        vectors = []
+        for i, sqn in enumerate(sqn_bytes):
+            out1, out2, ck, ik = (outs[64 * i + 16 * j:64 * i + 16 * (j + 1)]
+                                  for j in range(4))
+            mac_a = out1[:8]
+            xres, ak = out2[8:16], out2[0:6]
+            autn = Milenage.generate_autn(sqn, ak, mac_a, self.amf)
+            kasme = Milenage.generate_kasme(ck, ik, plmn, sqn, ak)
+            vectors.append((rands[i], xres, autn, kasme))
+
+        results = []
+        offset = 0
+        for num in counts:
+            results.append(vectors[offset:offset + num])
+            offset += num
+        return results
 
     def generate_auts(self, key, opc, rand, sqn):
         """
@@ -313,8 +386,41 @@ class Milenage(BaseLTEAuthAlgo):
         Returns:
             encrypted output
         """
-        aes_cipher = AES.new(k, AES.MODE_CBC, IV)
-        return aes_cipher.encrypt(buf)
+        # CBC over a single block is ECB over the block XOR IV
+        return _ecb_cipher(k).encrypt(xor(buf, IV))
+
+
+def _ecb_cipher(k):
+    """
+    Returns the AES-128 ECB cipher for a key. The cipher isn't cached, so
+    that the subscriber keys aren't kept in memory after the request.
+
+    Args:
+        k (bytes): 128 bit encryption key
+    Returns:
+        AES cipher object
+    """
+    return AES.new(bytes(k), AES.MODE_ECB)
+
+
+def _encrypt_runs(ciphers, counts, buf, size):
+    """
+    Encrypt consecutive runs of a buffer, each with its own cipher
+
+    Args:
+        ciphers ([AES cipher]): the cipher of each run
+        counts ([int]): the number of vectors in each run
+        buf (bytes): the concatenated runs
+        size (int): the number of bytes per vector
+    Returns:
+        [bytes], the encrypted runs
+    """
+    outs = []
+    offset = 0
+    for cipher, num in zip(ciphers, counts):
+        outs.append(cipher.encrypt(buf[offset:offset + size * num]))
+        offset += size * num
+    return outs
 
 
 def xor(s1, s2):
@@ -331,7 +437,8 @@ def xor(s1, s2):
     """
     if len(s1) != len(s2):
         raise ValueError('Input not equal length: %d %d' % (len(s1), len(s2)))
-    return bytes(a ^ b for a, b in zip(s1, s2))
+    return (int.from_bytes(s1, 'big') ^ int.from_bytes(s2, 'big')).to_bytes(
+        len(s1), 'big')
 
 
 def rotate(input_s, bytes_):
@@ -344,5 +451,5 @@ def rotate(input_s, bytes_):
     Returns:
         (bytes) s1 rotated by n bytes
     """
-    return bytes(input_s[(i + bytes_) % len(input_s)] for i in range(len(
-        input_s)))
+    bytes_ %= len(input_s)
+    return bytes(input_s[bytes_:] + input_s[:bytes_])
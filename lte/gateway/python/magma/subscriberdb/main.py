@@ -15,6 +15,7 @@ import logging
 
 from magma.common.service import MagmaService
 from magma.common.streamer import StreamerClient
+from .auth_seq_journal import LteAuthSeqJournal
 from .processor import Processor
 from .protocols.diameter.application import base, s6a
 from .protocols.diameter.server import S6aServer
@@ -33,12 +34,23 @@ def main():
     # Initialize a store to keep all subscriber data.
     store = SqliteStore(service.config['db_path'], loop=service.loop)
 
+    # Write the LTE auth sequence numbers back to the store in batches
+    auth_seq_journal = None
+    flush_interval = service.config.get('lte_auth_seq_flush_interval', 0)
+    if flush_interval:
+        auth_seq_journal = LteAuthSeqJournal(
+            store, flush_interval,
+            service.config.get('lte_auth_seq_skip_window', 1000),
+            loop=service.loop)
+        auth_seq_journal.start()
+
     # Initialize the processor
     processor = Processor(store,
                           get_default_sub_profile(service),
                           service.mconfig.sub_profiles,
                           service.mconfig.lte_auth_op,
-                          service.mconfig.lte_auth_amf)
+                          service.mconfig.lte_auth_amf,
+                          auth_seq_journal=auth_seq_journal)
 
     # Add all servicers to the server
     subscriberdb_servicer = SubscriberDBRpcServicer(store)
@@ -77,7 +89,9 @@ def main():
                               s6a_manager,
                               service.config['mme_realm'],
                               service.config['mme_host_name'],
-                              loop=service.loop),
+                              loop=service.loop,
+                              max_pending_requests=service.config.get(
+                                  's6a_max_pending_requests', 0)),
                 service.config['host_address'], service.config['mme_port'])
             asyncio.ensure_future(s6a_server, loop=service.loop)
     asyncio.ensure_future(serve(), loop=service.loop)
@@ -85,6 +99,9 @@ def main():
     # Run the service loop
     service.run()
 
+    if auth_seq_journal:
+        auth_seq_journal.stop()
+
     # Cleanup the service
     service.close()
 
@@ -95,7 +112,8 @@ def _get_s6a_manager(service, processor):
         service.config['mme_realm'],
         service.config['mme_host_name'],
         service.config['mme_host_address'],
-        service.loop
+        service.loop,
+        service.config.get('s6a_auth_workers', 0),
     )
 
 
@@ -13,6 +13,9 @@ limitations under the License.
 """
 
 import abc
+import threading
+from collections import OrderedDict
+
 from lte.protos.subscriberdb_pb2 import (
     GSMSubscription,
     LTESubscription,
@@ -24,6 +27,9 @@ from .crypto.gsm import UnsafePreComputedA3A8
 from .crypto.milenage import Milenage
 from .crypto.utils import CryptoError
 
+# Upper bound on the E-UTRAN vectors returned for one auth request
+MAX_LTE_AUTH_VECTORS = 5
+
 
 class GSMProcessor(metaclass=abc.ABCMeta):
     """
@@ -100,6 +106,26 @@ class LTEProcessor(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    def generate_lte_auth_vectors(self, imsi, plmn, num_vectors):
+        """
+        Returns E-UTRAN key vectors for the subscriber, each using the next
+        sequence number.
+
+        Args:
+            imsi: the subscriber identifier
+            plmn (bytes): 24 bit network identifer
+            num_vectors (int): number of requested vectors, clamped to
+                [1, MAX_LTE_AUTH_VECTORS]
+        Returns:
+            [(rand, xres, autn, kasme)]
+        Raises:
+            SubscriberNotFoundError if the subscriber is not present
+            CryptoError if the auth tuple couldn't be generated
+        """
+        num_vectors = min(max(num_vectors, 1), MAX_LTE_AUTH_VECTORS)
+        return [self.generate_lte_auth_vector(imsi, plmn)
+                for _ in range(num_vectors)]
+
 
 class Processor(GSMProcessor, LTEProcessor):
     """
@@ -108,13 +134,21 @@ class Processor(GSMProcessor, LTEProcessor):
     """
 
     def __init__(self, store, default_sub_profile,
-                 sub_profiles, op=None, amf=None):
+                 sub_profiles, op=None, amf=None, auth_cache_capacity=10000,
+                 auth_seq_journal=None):
         """
         Init the Processor with all the components.
 
         We use the UnsafePreComputedA3A8 crypto by default for
         GSM authentication. This requires the auth-tuple to be stored directly
         in the store as the key for the subscriber.
+
+        The key and OPc of the recently authenticated subscribers are kept in
+        an LRU cache of auth_cache_capacity entries, invalidated when the
+        store reports the subscriber changed.
+
+        If auth_seq_journal is set, the LTE auth sequence numbers are kept
+        by the journal and written back to the store in batches.
         """
         self._store = store
         self._op = op
@@ -126,6 +160,14 @@ class Processor(GSMProcessor, LTEProcessor):
         if len(amf) != 2:
             raise ValueError("AMF has invalid length len=%d value=%s" %
                              (len(amf), amf))
+        self._auth_cache_lock = threading.Lock()
+        self._auth_cache = OrderedDict()
+        self._auth_cache_capacity = auth_cache_capacity
+        # Bumped on every invalidation, so that keys read before it
+        # aren't cached after it
+        self._auth_cache_generation = 0
+        store.add_change_callback(self._invalidate_lte_auth_keys)
+        self._auth_seq_journal = auth_seq_journal
 
     def get_sub_profile(self, imsi):
         """
@@ -171,9 +213,104 @@ class Processor(GSMProcessor, LTEProcessor):
         Returns the lte auth vector for the subscriber by querying the store
         for the crypto algo and secret keys.
         """
+        return self.generate_lte_auth_vectors(imsi, plmn, 1)[0]
+
+    def generate_lte_auth_vectors(self, imsi, plmn, num_vectors):
+        """
+        Returns the lte auth vectors for the subscriber by querying the store
+        for the crypto algo and secret keys. The sequence numbers of all the
+        vectors are reserved with one store update.
+        """
+        num_vectors = min(max(num_vectors, 1), MAX_LTE_AUTH_VECTORS)
         sid = SIDUtils.to_str(SubscriberID(id=imsi, type=SubscriberID.IMSI))
-        subs = self._store.get_subscriber_data(sid)
+        generation = self._auth_cache_generation
+
+        if self._auth_seq_journal is None:
+            # Read the keys and reserve the sequence numbers in one
+            # transaction
+            with self._store.edit_subscriber(sid) as subs:
+                key, opc = self._get_lte_auth_keys(sid, subs, generation)
+                seq = subs.state.lte_auth_next_seq
+                subs.state.lte_auth_next_seq += num_vectors
+        else:
+            # With cached keys and a journaled sequence number, the store
+            # isn't accessed at all
+            subs = None
+            keys = self._cached_lte_auth_keys(sid)
+            if keys is None:
+                subs = self._store.get_subscriber_data(sid)
+                keys = self._get_lte_auth_keys(sid, subs, generation)
+            key, opc = keys
+            seq = self._auth_seq_journal.reserve(
+                sid, num_vectors,
+                lambda: self._load_lte_auth_next_seq(sid, subs))
+
+        sqns = [self.seq_to_sqn(seq + i) for i in range(num_vectors)]
+        milenage = Milenage(self._amf)
+        return milenage.generate_eutran_vectors(key, opc, sqns, plmn)
+
+    def _get_lte_auth_keys(self, sid, subs, generation):
+        """
+        Returns the key and OPc of the subscriber from the cache, or
+        validates the subscription and caches them.
+
+        Args:
+            sid: the subscriber id
+            subs: the SubscriberData read from the store
+            generation: the cache generation read before subs was read
+        Raises:
+            CryptoError if the subscription can't be used for LTE auth
+        """
+        keys = self._cached_lte_auth_keys(sid)
+        if keys is not None:
+            return keys
+
+        keys = (subs.lte.auth_key, self._get_lte_auth_opc(sid, subs))
+        with self._auth_cache_lock:
+            if generation == self._auth_cache_generation:
+                if len(self._auth_cache) == self._auth_cache_capacity:
+                    self._auth_cache.popitem(last=False)
+                self._auth_cache[sid] = keys
+        return keys
+
+    def _cached_lte_auth_keys(self, sid):
+        """
+        Returns the cached key and OPc of the subscriber, or None.
+        """
+        with self._auth_cache_lock:
+            if sid not in self._auth_cache:
+                return None
+            self._auth_cache.move_to_end(sid)
+            return self._auth_cache[sid]
 
+    def _load_lte_auth_next_seq(self, sid, subs=None):
+        """
+        Returns the next sequence number of the subscriber from subs, or
+        from the store if subs isn't given.
+        """
+        if subs is None:
+            subs = self._store.get_subscriber_data(sid)
+        return subs.state.lte_auth_next_seq
+
+    def _invalidate_lte_auth_keys(self, subscriber_ids):
+        """
+        Store change callback, drops the cached keys of the subscribers.
+        """
+        with self._auth_cache_lock:
+            self._auth_cache_generation += 1
+            if subscriber_ids is None:
+                self._auth_cache.clear()
+                return
+            for sid in subscriber_ids:
+                self._auth_cache.pop(sid, None)
+
+    def _get_lte_auth_opc(self, sid, subs):
+        """
+        Validates the LTE subscription and returns the OPc of the subscriber.
+
+        Raises:
+            CryptoError if the subscription can't be used for LTE auth
+        """
         if subs.lte.state != LTESubscription.ACTIVE:
             raise CryptoError("LTE service not active for %s" % sid)
 
@@ -185,16 +322,10 @@ class Processor(GSMProcessor, LTEProcessor):
             raise CryptoError("Subscriber key not valid for %s" % sid)
 
         if len(subs.lte.auth_opc) == 0:
-            opc = Milenage.generate_opc(subs.lte.auth_key, self._op)
+            return Milenage.generate_opc(subs.lte.auth_key, self._op)
         elif len(subs.lte.auth_opc) != 16:
             raise CryptoError("Subscriber OPc is invalid length for %s" % sid)
-        else:
-            opc = subs.lte.auth_opc
-
-        sqn = self.seq_to_sqn(self.get_next_lte_auth_seq(imsi))
-        milenage = Milenage(self._amf)
-        return milenage.generate_eutran_vector(subs.lte.auth_key,
-                                               opc, sqn, plmn)
+        return subs.lte.auth_opc
 
     def resync_lte_auth_seq(self, imsi, rand, auts):
         """
@@ -202,29 +333,13 @@ class Processor(GSMProcessor, LTEProcessor):
         the AUTS sent by U-SIM
         """
         sid = SIDUtils.to_str(SubscriberID(id=imsi, type=SubscriberID.IMSI))
+        generation = self._auth_cache_generation
         subs = self._store.get_subscriber_data(sid)
-
-        if subs.lte.state != LTESubscription.ACTIVE:
-            raise CryptoError("LTE service not active for %s" % sid)
-
-        if subs.lte.auth_algo != LTESubscription.MILENAGE:
-            raise CryptoError("Unknown crypto (%s) for %s" %
-                              (subs.lte.auth_algo, sid))
-
-        if len(subs.lte.auth_key) != 16:
-            raise CryptoError("Subscriber key not valid for %s" % sid)
-
-        if len(subs.lte.auth_opc) == 0:
-            opc = Milenage.generate_opc(subs.lte.auth_key, self._op)
-        elif len(subs.lte.auth_opc) != 16:
-            raise CryptoError("Subscriber OPc is invalid length for %s" % sid)
-        else:
-            opc = subs.lte.auth_opc
+        key, opc = self._get_lte_auth_keys(sid, subs, generation)
 
         dummy_amf = b'\x00\x00'  # Use dummy AMF for re-synchronization
         milenage = Milenage(dummy_amf)
-        sqn_ms, mac_s = \
-            milenage.generate_resync(auts, subs.lte.auth_key, opc, rand)
+        sqn_ms, mac_s = milenage.generate_resync(auts, key, opc, rand)
 
         if mac_s != auts[6:]:
             raise CryptoError("Invalid resync authentication code")
@@ -233,7 +348,12 @@ class Processor(GSMProcessor, LTEProcessor):
 
         # current_seq_number was the seq number the network sent
         # to the mobile station as part of the original auth request.
-        current_seq_number = subs.state.lte_auth_next_seq - 1
+        if self._auth_seq_journal is None:
+            next_seq = subs.state.lte_auth_next_seq
+        else:
+            next_seq = self._auth_seq_journal.get_next_seq(
+                sid, lambda: self._load_lte_auth_next_seq(sid, subs))
+        current_seq_number = next_seq - 1
         if seq_ms >= current_seq_number:
             self.set_next_lte_auth_seq(imsi, seq_ms + 1)
         else:
@@ -250,6 +370,9 @@ class Processor(GSMProcessor, LTEProcessor):
         Returns the sequence number for the next auth operation.
         """
         sid = SIDUtils.to_str(SubscriberID(id=imsi, type=SubscriberID.IMSI))
+        if self._auth_seq_journal is not None:
+            return self._auth_seq_journal.reserve(
+                sid, 1, lambda: self._load_lte_auth_next_seq(sid))
 
         # Increment the sequence number.
         # The 3GPP TS 33.102 spec allows wrapping around the maximum value.
@@ -265,6 +388,11 @@ class Processor(GSMProcessor, LTEProcessor):
         Updates the LTE auth sequence number.
         """
         sid = SIDUtils.to_str(SubscriberID(id=imsi, type=SubscriberID.IMSI))
+        if self._auth_seq_journal is not None:
+            # Fail like the store would for unknown subscribers
+            self._store.get_subscriber_data(sid)
+            self._auth_seq_journal.set_next_seq(sid, seq)
+            return
 
         with self._store.edit_subscriber(sid) as subs:
             subs.state.lte_auth_next_seq = seq
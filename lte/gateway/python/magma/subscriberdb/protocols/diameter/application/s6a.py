@@ -11,6 +11,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import IntEnum, unique
 import logging
 
@@ -64,7 +67,8 @@ class S6AApplication(abc.Application):
              'ULR-Flags']
     }
 
-    def __init__(self, lte_processor, realm, host, host_ip, loop=None):
+    def __init__(self, lte_processor, realm, host, host_ip, loop=None,
+                 auth_workers=0):
         """Each application has access to a write stream and a collection of
         settings, currently limited to realm and host
 
@@ -73,9 +77,21 @@ class S6AApplication(abc.Application):
             realm: the realm the application should serve
             host: the host name the application should serve
             host_ip: the IP address of the host
+            loop: asyncio loop
+            auth_workers: number of worker threads processing auth
+                requests off the loop, 0 to process them inline
         """
         super(S6AApplication, self).__init__(realm, host, host_ip, loop)
         self.lte_processor = lte_processor
+        # Each worker is a single thread executor, and requests for an IMSI
+        # always go to the same one, so SQN updates stay in request order
+        self._auth_workers = [ThreadPoolExecutor(max_workers=1)
+                              for _ in range(auth_workers)]
+        if self._auth_workers and self._loop is None:
+            self._loop = asyncio.get_event_loop()
+        # writer -> (future, state_id, request) of the responses not written
+        # yet on that connection, in request order
+        self._pending_responses = {}
 
     def handle_msg(self, state_id, msg):
         """
@@ -117,7 +133,7 @@ class S6AApplication(abc.Application):
                           msg.header.command_code)
             resp = self._gen_response(state_id, msg,
                                       avp.ResultCode.DIAMETER_MISSING_AVP)
-            self.writer.send_msg(resp)
+            self._send_response(resp)
             return False
         return True
 
@@ -157,6 +173,70 @@ class S6AApplication(abc.Application):
         resp_msg.append_avp(avp.AVP('Result-Code', result_code))
         return resp_msg
 
+    def _send_response(self, resp):
+        """
+        Writes a response, after the responses to the earlier requests
+        which are still being processed
+
+        Args:
+            resp: the response message
+        Returns:
+            None
+        """
+        if self.writer not in self._pending_responses:
+            self.writer.send_msg(resp)
+            return
+        future = self._loop.create_future()
+        future.set_result(resp)
+        self._add_pending_response(future, None, None)
+
+    def _add_pending_response(self, future, state_id, msg):
+        """
+        Queues the response future of a request on the current connection
+
+        Args:
+            future: the future of the response message
+            state_id: the server state id
+            msg: the request message
+        Returns:
+            None
+        """
+        self.writer.add_pending()
+        self._pending_responses.setdefault(self.writer, deque()).append(
+            (future, state_id, msg))
+
+    def _flush_responses(self, writer):
+        """
+        Writes the responses of a connection that are ready, stopping at the
+        first request still being processed
+
+        Args:
+            writer: the writer of the connection
+        Returns:
+            None
+        """
+        pending = self._pending_responses.get(writer)
+        if pending is None:
+            return
+        # Write the ready responses in one batch
+        writer.begin_batch()
+        while pending and pending[0][0].done():
+            future, state_id, msg = pending.popleft()
+            writer.remove_pending()
+            if future.exception():
+                logging.error("Processing diameter request failed: %s",
+                              future.exception())
+                S6A_AUTH_FAILURE_TOTAL.labels(
+                    code=avp.ResultCode.DIAMETER_UNABLE_TO_COMPLY).inc()
+                resp = self._gen_response(
+                    state_id, msg, avp.ResultCode.DIAMETER_UNABLE_TO_COMPLY)
+            else:
+                resp = future.result()
+            writer.send_msg(resp)
+        if not pending:
+            del self._pending_responses[writer]
+        writer.end_batch()
+
     def _send_auth(self, state_id, msg):
         """
         Handles an incoming 3GPP-Authentication-Information-Request
@@ -171,6 +251,29 @@ class S6AApplication(abc.Application):
         # Validate the message
         if not self.validate_message(state_id, msg):
             return
+        if not self._auth_workers:
+            self._send_response(self._process_auth(state_id, msg))
+            return
+
+        imsi = msg.find_avp(*avp.resolve('User-Name')).value
+        worker = self._auth_workers[hash(imsi) % len(self._auth_workers)]
+        future = self._loop.run_in_executor(
+            worker, self._process_auth, state_id, msg)
+        writer = self.writer
+        self._add_pending_response(future, state_id, msg)
+        future.add_done_callback(lambda _: self._flush_responses(writer))
+
+    def _process_auth(self, state_id, msg):
+        """
+        Generates the 3GPP-Authentication-Information-Answer to a validated
+        auth request. Runs on an auth worker if they are enabled.
+
+        Args:
+            state_id: the server state id
+            msg: an auth request message
+        Returns:
+            the answer message
+        """
         imsi = ""
         try:
             imsi = msg.find_avp(*avp.resolve('User-Name')).value
@@ -187,15 +290,19 @@ class S6AApplication(abc.Application):
                 auts = re_sync_info.value[16:]
                 self.lte_processor.resync_lte_auth_seq(imsi, rand, auts)
 
-            rand, xres, autn, kasme = \
-                self.lte_processor.generate_lte_auth_vector(imsi, plmn)
+            num_vectors_avp = request_eutran_info.find_avp(
+                *avp.resolve('Number-Of-Requested-Vectors'))
+            num_vectors = num_vectors_avp.value if num_vectors_avp else 1
+            vectors = self.lte_processor.generate_lte_auth_vectors(
+                imsi, plmn, num_vectors)
 
             auth_info = avp.AVP('Authentication-Info', [
                 avp.AVP('E-UTRAN-Vector', [
                     avp.AVP('RAND', rand),
                     avp.AVP('XRES', xres),
                     avp.AVP('AUTN', autn),
-                    avp.AVP('KASME', kasme)])])
+                    avp.AVP('KASME', kasme)])
+                for rand, xres, autn, kasme in vectors])
 
             S6A_AUTH_SUCCESS_TOTAL.inc()
             resp = self._gen_response(state_id, msg,
@@ -215,7 +322,7 @@ class S6AApplication(abc.Application):
                 state_id, msg, avp.ResultCode.DIAMETER_ERROR_USER_UNKNOWN)
             logging.warning("Subscriber not found: %s", e)
 
-        self.writer.send_msg(resp)
+        return resp
 
     def _send_location_request(self, state_id, msg):
         """
@@ -282,4 +389,4 @@ class S6AApplication(abc.Application):
         resp = self._gen_response(state_id, msg,
                                   avp.ResultCode.DIAMETER_SUCCESS,
                                   [ula_flags, subscription_data])
-        self.writer.send_msg(resp)
+        self._send_response(resp)
@@ -62,6 +62,8 @@ class BaseAVP(metaclass=abc.ABCMeta):
 
     """
 
+    __slots__ = ('code', 'vendor', 'name', 'flags', 'payload')
+
     def __init__(self, code, value=None, flags=0, name='',
                  vendor=VendorId.DEFAULT):
         self.code = code
@@ -146,7 +148,14 @@ class BaseAVP(metaclass=abc.ABCMeta):
         """
         Two AVPs are equal if they respresent the same data.
         """
-        return repr(self) == repr(other)
+        if not isinstance(other, BaseAVP):
+            return NotImplemented
+        return (type(self) is type(other) and
+                self.code == other.code and
+                self.vendor == other.vendor and
+                self.flags == other.flags and
+                self.name == other.name and
+                self.payload == other.payload)
 
     @property
     def length(self):
@@ -267,6 +276,8 @@ class BaseAVP(metaclass=abc.ABCMeta):
 class OctetStringAVP(BaseAVP):
     """Implements an Octet String AVP"""
 
+    __slots__ = ()
+
     @staticmethod
     def decode_payload(payload):
         return bytes(payload)
@@ -282,6 +293,8 @@ class OctetStringAVP(BaseAVP):
 class UTF8StringAVP(BaseAVP):
     """Implements an UTF-8 String AVP"""
 
+    __slots__ = ()
+
     @staticmethod
     def decode_payload(payload):
         return bytes(payload).decode(encoding='UTF-8')
@@ -297,6 +310,8 @@ class UTF8StringAVP(BaseAVP):
 class Unsigned32AVP(BaseAVP):
     """Implements an Unsigned Integer 32 AVP."""
 
+    __slots__ = ()
+
     @staticmethod
     def decode_payload(payload):
         return struct.unpack("!I", payload)[0]
@@ -312,6 +327,8 @@ class Unsigned32AVP(BaseAVP):
 class GroupedAVP(BaseAVP):
     """Implements a Grouped AVP"""
 
+    __slots__ = ()
+
     @staticmethod
     def decode_payload(payload):
         """Returns a list of AVPs from the decoded payload"""
@@ -343,8 +360,11 @@ class GroupedAVP(BaseAVP):
         Return:
             an iterator on all AVPs that match
         """
-        return filter(lambda element: element.vendor == vendor \
-                                      and element.code == code, self.value)
+        if self.payload is None:
+            return iter(())
+        return (decode(encoded) for avp_vendor, avp_code, encoded
+                in scan(self.payload)
+                if avp_vendor == vendor and avp_code == code)
 
     def find_avp(self, vendor, code):
         """
@@ -356,12 +376,14 @@ class GroupedAVP(BaseAVP):
         Return:
             the first AVP that matches or None if no match exists
         """
-        result = list(self.filter_avps(vendor, code))
-        if len(result):
-            return result[0]
+        return next(self.filter_avps(vendor, code), None)
 
 
 class AddressAVP(BaseAVP):
+    """Implements an Address AVP"""
+
+    __slots__ = ()
+
     @staticmethod
     def decode_payload(payload):
         """Decode the payload as IPV4 or IPV6 string"""
@@ -393,6 +415,8 @@ class EnumAVP(Unsigned32AVP):
     Decode Enum AVPs given a Enum type
     """
 
+    __slots__ = ()
+
     @classmethod
     def decode_payload(cls, payload):
         """Decode as an enum if we can"""
@@ -421,6 +445,7 @@ class ResultCodeAVP(EnumAVP):
     """
     Decode Result-Code AVP as ResultCode Enums
     """
+    __slots__ = ()
     enum = ResultCode
 
 @unique
@@ -436,6 +461,7 @@ class DisconnectCauseAVP(EnumAVP):
     """
     Decode Disconnect-Cause AVP as DisconnectCause Enums
     """
+    __slots__ = ()
     enum = DisconnectCause
 
 
@@ -445,6 +471,8 @@ class UnknownAVP(BaseAVP):
     to encode or decode the payload
     """
 
+    __slots__ = ()
+
     @staticmethod
     def decode_payload(payload):
         return bytes(payload)
@@ -503,11 +531,46 @@ def resolve(name):
     Raises:
         ValueError if not found
     """
-    for vendor in AVPDict.keys():
-        for code in AVPDict[vendor].keys():
-            if AVPDict[vendor][code][0] == name:
-                return vendor, code
-    raise ValueError('AVP not found')
+    try:
+        return _NAME_INDEX[name]
+    except KeyError:
+        raise ValueError('AVP not found') from None
+
+
+def scan(payload):
+    """
+    Iterates over the AVPs encoded back to back in the payload, reading only
+    their headers. This lets callers pick the AVPs they need and decode just
+    those.
+
+    Args:
+        payload: bytestream of encoded AVPs
+    Return:
+        an iterator of (vendor, code, encoded) tuples, where encoded is a
+        memoryview of the whole AVP including its padding
+    Raises:
+        exception.CodecException if an AVP header is invalid
+    """
+    payload = memoryview(payload)
+    offset = 0
+    while offset < len(payload):
+        if len(payload) - offset < HEADER_LEN:
+            raise exception.CodecException('AVP shorter than header length')
+        code, flags_and_length = struct.unpack_from('!II', payload, offset)
+        length = flags_and_length & 0x00FFFFFF
+        vendor = VendorId.DEFAULT
+        header_len = HEADER_LEN
+        if flags_and_length & (FLAG_VENDOR << 24) != 0:
+            header_len += 4
+            if len(payload) - offset < header_len:
+                raise exception.CodecException(
+                    'AVP too short to decode vendor')
+            vendor = struct.unpack_from('!I', payload, offset + HEADER_LEN)[0]
+        if length < header_len or length > len(payload) - offset:
+            raise exception.CodecException('Invalid AVP length')
+        end = offset + ((length + 3) & ~3)
+        yield vendor, code, payload[offset:end]
+        offset = end
 
 
 def decode(payload):
@@ -648,3 +711,18 @@ AVPDict = {
                FLAG_MANDATORY | FLAG_VENDOR),
     }
 }
+
+
+def _build_name_index():
+    """
+    Index the AVPDict by AVP name, keeping the first definition of a name
+    """
+    index = {}
+    for vendor, avps in AVPDict.items():
+        for code, avp_def in avps.items():
+            index.setdefault(avp_def[0], (vendor, code))
+    return index
+
+
+# Name to (vendor, code) lookup for resolve, built once at import
+_NAME_INDEX = _build_name_index()
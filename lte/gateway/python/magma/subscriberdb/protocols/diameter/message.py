@@ -183,7 +183,14 @@ class MessageHeader(object):
 
     def __eq__(self, other):
         """Two message headers are equal if they represent the same payload"""
-        return repr(self) == repr(other)
+        if not isinstance(other, MessageHeader):
+            return NotImplemented
+        return (self.version == other.version and
+                self.command_flags == other.command_flags and
+                self.command_code == other.command_code and
+                self.application_id == other.application_id and
+                self.hop_by_hop_id == other.hop_by_hop_id and
+                self.end_to_end_id == other.end_to_end_id)
 
     @property
     def length(self):
@@ -206,12 +213,25 @@ class Message(object):
     a list of AVPs. This provides utilities for decoding a message payload into its
     constituint components, and encoding it back. There are also convenience methods
     for adding and retreiving AVPs in the instance.
+
+    A decoded message keeps its AVPs encoded, as (vendor, code, encoded)
+    tuples, and only decodes the ones that are looked up.
     """
 
     def __init__(self, header=None):
         self.header = header if header else MessageHeader()
         self._avps = []
 
+    def _avp_at(self, index):
+        """
+        Return the AVP at an index, decoding it first if needed
+        """
+        avp_ = self._avps[index]
+        if isinstance(avp_, tuple):
+            avp_ = avp.decode(avp_[2])
+            self._avps[index] = avp_
+        return avp_
+
     @classmethod
     def create_response_msg(cls, msg):
         """
@@ -226,7 +246,14 @@ class Message(object):
     def __repr__(self):
         return ("DiameterMessage length=%d:\n\t%s\nAVPs:\n\t%s" %
                 (self.length, self.header,
-                 "\n\t".join([str(x) for x in self._avps])))
+                 "\n\t".join([str(x) for x in self.avps])))
+
+    @property
+    def avps(self):
+        """
+        The list of all the message AVPs, decoding the ones not decoded yet
+        """
+        return [self._avp_at(index) for index in range(len(self._avps))]
 
     @property
     def length(self):
@@ -238,7 +265,10 @@ class Message(object):
         """
         length = self.header.length
         for avp_ in self._avps:
-            length += avp_.length
+            if isinstance(avp_, tuple):
+                length += len(avp_[2])
+            else:
+                length += avp_.length
         return length
 
     def encode(self, buf, begin):
@@ -253,7 +283,13 @@ class Message(object):
         offset = begin
         offset += self.header.encode(buf, offset, self.length)
         for avp_ in self._avps:
-            offset += avp_.encode(buf, offset)
+            if isinstance(avp_, tuple):
+                # Still encoded as received, copy it over as is
+                encoded = avp_[2]
+                buf[offset:offset + len(encoded)] = encoded
+                offset += len(encoded)
+            else:
+                offset += avp_.encode(buf, offset)
         return offset - begin
 
     def append_avp(self, avp_):
@@ -275,8 +311,12 @@ class Message(object):
         Return:
             an iterator on all AVPs that match
         """
-        return filter(lambda element: element.vendor == vendor and
-                                      element.code == code, self._avps)
+        for index, avp_ in enumerate(self._avps):
+            if isinstance(avp_, tuple):
+                if avp_[0] == vendor and avp_[1] == code:
+                    yield self._avp_at(index)
+            elif avp_.vendor == vendor and avp_.code == code:
+                yield avp_
 
     def find_avp(self, vendor, code):
         """
@@ -288,9 +328,7 @@ class Message(object):
         Return:
             the first AVP that matches or None if no match exists
         """
-        result = list(self.filter_avps(vendor, code))
-        if len(result):
-            return result[0]
+        return next(self.filter_avps(vendor, code), None)
 
     def has_fields(self, fields):
         """
@@ -307,6 +345,29 @@ class Message(object):
         return True
 
 
+def decode_length(payload):
+    """
+    Decodes the length of a diameter message from its header, so that the
+    message can be framed before it is received in full
+
+    Args:
+        payload: the byte stream from the wire, starting at the message
+    Return:
+        the length of the message in bytes
+    Raises:
+        CodecException if the length isn't valid
+        TooShortException if the payload is shorter than the header
+    """
+    if len(payload) < HEADER_LEN:
+        raise TooShortException()
+
+    length = struct.unpack_from('!I', payload, 0)[0] & 0x00FFFFFF
+
+    if length % 4 != 0 or length < HEADER_LEN:
+        raise CodecException("Received garbage")
+    return length
+
+
 def decode(payload):
     """
     Decodes a diameter message from the wire
@@ -320,23 +381,16 @@ def decode(payload):
         TooShortException if the payload was not long enough to decode. This is
             uniquely raised so that the we can get more data and try again
     """
-    if len(payload) < HEADER_LEN:
-        raise TooShortException()
-
-    length = struct.unpack_from('!I', payload, 0)[0] & 0x00FFFFFF
-
-    if length % 4 != 0:
-        raise CodecException("Received garbage")
+    length = decode_length(payload)
 
     if len(payload) < length:
         raise TooShortException()
 
     msg = Message(MessageHeader.decode(payload))
 
-    offset = msg.header.length
-    while offset < length:
-        avp_entry = avp.decode(payload[offset:])
-        offset += avp_entry.length
-        msg.append_avp(avp_entry)
-
+    # The caller may reuse its buffer, so copy the message out of it once.
+    # The AVPs are then views into that copy, and aren't decoded until they
+    # are looked up.
+    body = bytes(payload[msg.header.length:length])
+    msg._avps = list(avp.scan(body))  # pylint:disable=protected-access
     return msg
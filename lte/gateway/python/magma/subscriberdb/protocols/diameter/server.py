@@ -28,13 +28,26 @@ class S6aServer(asyncio.Protocol):
     connection initialization and handling incoming data from the network
     """
 
-    def __init__(self, base_manager, s6a_manager, realm, host, loop=None):
+    def __init__(self, base_manager, s6a_manager, realm, host, loop=None,
+                 max_pending_requests=0):
+        """
+        Args:
+            base_manager: the diameter base application
+            s6a_manager: the s6a application
+            realm: the realm the server serves
+            host: the host name the server serves
+            loop: asyncio loop
+            max_pending_requests: number of requests still being processed
+                at which reading from the connection is paused, 0 to never
+                pause
+        """
         self.realm = realm
         self.host = host
         self.state_id = random.randint(0, 100000000)
         self._s6a_manager = s6a_manager
         self._readbuf = None
         self._base_manager = base_manager
+        self._max_pending_requests = max_pending_requests
         self.writer = None
         self.loop = loop
 
@@ -51,17 +64,22 @@ class S6aServer(asyncio.Protocol):
         # bytesarray is more efficient to append fragments of reads
         self._readbuf = bytearray()
         self.writer = Writer(self.realm, self.host,
-                             self.state_id, transport)
+                             self.state_id, transport,
+                             self._max_pending_requests)
         self._base_manager.set_writer(self.writer)
         self._s6a_manager.set_writer(self.writer)
 
     def data_received(self, data):
         """
-        Append the 'data' bytes to the readbuf, and parse the message
-        if the entire message has been received.
+        Append the 'data' bytes to the readbuf, and handle every message
+        received in full. The messages are framed by the length in their
+        header, and a message that fails to decode is skipped on its own.
         Unparsed bytes will be left in readbuf and will be parsed when
         more data is received in the future.
 
+        The answers to the messages handled here are written together once
+        all of them were handled.
+
         Args:
             data (bytes): new data read from the transport
         Returns:
@@ -70,34 +88,45 @@ class S6aServer(asyncio.Protocol):
         logging.debug("Bytes read: %s", data)
         self._readbuf.extend(data)
 
-        # Use memoryview to prevent copies when slicing
-        memview = memoryview(self._readbuf)
-        remain = len(memview)
         begin = 0  # beginning of message
+        # The applications are shared by all the connections, answer on this
+        # one
+        self._base_manager.set_writer(self.writer)
+        self._s6a_manager.set_writer(self.writer)
+        self.writer.begin_batch()
+        try:
+            # Use memoryview to prevent copies when slicing
+            with memoryview(self._readbuf) as memview:
+                while len(memview) - begin >= message.HEADER_LEN:
+                    try:
+                        length = message.decode_length(memview[begin:])
+                    except exception.CodecException as exc:
+                        # The stream can't be framed anymore, clear it
+                        logging.error("Discarding diameter stream: %s", exc)
+                        begin = len(memview)
+                        break
+                    if len(memview) - begin < length:
+                        # Wait for the rest of the message
+                        break
+                    try:
+                        msg = message.decode(memview[begin:begin + length])
+                        logging.debug("Handling diameter message:\n%s", msg)
+                        self._handle_msg(msg.header.application_id, msg)
+                    except Exception as exc:  # pylint: disable=broad-except
+                        # Handle any exceptions with message handling,
+                        # without affecting other messages/users
+                        logging.exception(exc)
+                    begin += length
+        finally:
+            self.writer.end_batch()
 
-        while remain >= message.HEADER_LEN:
-            try:
-                msg = message.decode(memview[begin:])
-                logging.debug("Handling diameter message:\n%s", msg)
-                self._handle_msg(msg.header.application_id, msg)
-                # Get ready for the next message
-                begin += msg.length
-                remain -= msg.length
-            except exception.TooShortException:
-                logging.error("Diameter message too short to decode")
-                return
-            except Exception as exc:  # pylint: disable=broad-except
-                # Handle any exceptions with message handling, without
-                # affecting other messages/users
-                logging.exception(exc)
-
-                # Clear past garbage
-                length = len(memview[begin:])
-                begin += length
-                remain -= length
-
-        # Get the unparsed bytes
-        self._readbuf = bytearray(memview[begin:])
+        # Drop the parsed bytes, keeping the buffer for the next reads
+        try:
+            del self._readbuf[:begin]
+        except BufferError:
+            # A view of the buffer is still referenced, e.g. from the
+            # traceback of a logged exception, so it can't be resized
+            self._readbuf = self._readbuf[begin:]
 
     def connection_lost(self, exc):
         """
@@ -133,18 +162,68 @@ class S6aServer(asyncio.Protocol):
 class Writer:
     """The writer abstracts away a client connection for an
     application to be able to send messages to.
+
+    The messages sent within a batch are written to the transport together
+    at the end of the batch. The writer also counts the requests whose
+    answers are still being generated, and pauses reading from the
+    connection while max_pending of them are outstanding.
     """
 
-    def __init__(self, realm, host, state_id, transport):
+    def __init__(self, realm, host, state_id, transport, max_pending=0):
         self.realm = realm
         self.host = host
         self.state_id = state_id
         self._transport = transport
+        # Encoded messages held until the end of the batch
+        self._write_bufs = []
+        self._batch_depth = 0
+        self._max_pending = max_pending
+        self._pending = 0
+        self._reading_paused = False
+
+    def begin_batch(self):
+        """
+        Holds the messages sent until the matching end_batch
+        """
+        self._batch_depth += 1
+
+    def end_batch(self):
+        """
+        Writes the messages held since the outermost begin_batch
+        """
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._flush()
+
+    def add_pending(self):
+        """
+        Counts a request whose answer will be sent later, pausing reading
+        from the connection if too many of them are outstanding
+        """
+        self._pending += 1
+        if self._max_pending and not self._reading_paused \
+                and self._pending >= self._max_pending:
+            logging.warning("Too many pending diameter requests, "
+                            "pausing reads")
+            self._transport.pause_reading()
+            self._reading_paused = True
+
+    def remove_pending(self):
+        """
+        Uncounts a request counted by add_pending, resuming reading from
+        the connection once half of the pending requests were answered
+        """
+        self._pending -= 1
+        if self._reading_paused and \
+                self._pending <= self._max_pending // 2:
+            self._transport.resume_reading()
+            self._reading_paused = False
 
     def send_msg(self, msg):
         """
         Sends a message. Prepares a writer buffer to send,
-        and encodes the message into it, then writes to transport.
+        and encodes the message into it, then writes to transport, or holds
+        it until the end of the current batch.
 
         Args:
             msg: the message to send
@@ -158,7 +237,9 @@ class Writer:
         except exception.CodecException as e:
             logging.fatal("Encoding failed with err: %s", e)
             return
-        self._write(buf)
+        self._write_bufs.append(buf)
+        if self._batch_depth == 0:
+            self._flush()
 
     def _get_write_buf(self, msg):
         """
@@ -174,6 +255,16 @@ class Writer:
         buf = memoryview(bytearray(msg.length))
         return buf
 
+    def _flush(self):
+        """
+        Writes the held messages to the transport in one call
+        """
+        bufs, self._write_bufs = self._write_bufs, []
+        if len(bufs) == 1:
+            self._write(bufs[0])
+        elif bufs:
+            self._transport.writelines(bufs)
+
     def _write(self, buf):
         """
         Write the buffer to the underlying socket
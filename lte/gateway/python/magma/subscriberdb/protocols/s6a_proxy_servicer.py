@@ -56,18 +56,19 @@ class S6aProxyRpcServicer(s6a_proxy_pb2_grpc.S6aProxyServicer):
                 auts = re_sync_info[16:]
                 self.lte_processor.resync_lte_auth_seq(imsi, rand, auts)
 
-            rand, xres, autn, kasme = \
-                self.lte_processor.generate_lte_auth_vector(imsi, plmn)
+            vectors = self.lte_processor.generate_lte_auth_vectors(
+                imsi, plmn, request.num_requested_eutran_vectors)
 
             metrics.S6A_AUTH_SUCCESS_TOTAL.inc()
 
             # Generate and return response message
             aia.error_code = s6a_proxy_pb2.SUCCESS
-            eutran_vector = aia.eutran_vectors.add()
-            eutran_vector.rand = bytes(rand)
-            eutran_vector.xres = xres
-            eutran_vector.autn = autn
-            eutran_vector.kasme = kasme
+            for rand, xres, autn, kasme in vectors:
+                eutran_vector = aia.eutran_vectors.add()
+                eutran_vector.rand = bytes(rand)
+                eutran_vector.xres = xres
+                eutran_vector.autn = autn
+                eutran_vector.kasme = kasme
             logging.info("Auth success: %s", imsi)
             return aia
 
@@ -85,6 +85,28 @@ class BaseStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def set_lte_auth_seqs(self, next_seqs):
+        """
+        Method that should update the LTE auth sequence number of many
+        subscribers at once. Subscribers not present are skipped.
+
+        Args:
+            next_seqs - dict of subscriber id to the next sequence number
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def skip_lte_auth_seqs(self, window):
+        """
+        Method that should advance the LTE auth sequence number of all the
+        subscribers by window.
+
+        Args:
+            window - number of sequence numbers to skip
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def get_subscriber_data(self, subscriber_id):
         """
@@ -120,6 +142,19 @@ class BaseStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def add_change_callback(self, callback):
+        """
+        Registers a callback to run after subscribers are added, changed
+        or deleted, so that data derived from them can be invalidated.
+        Changes to the subscriber state alone don't trigger it.
+
+        Args:
+            callback - called with the list of changed subscriber ids, or
+                None if all the subscribers might have changed
+        """
+        raise NotImplementedError()
+
 
 class SubscriberNotFoundError(Exception):
     """
@@ -98,6 +98,26 @@ class CachedStore(BaseStore):
             self._persistent_store.resync(subscribers)
         self._on_ready.resync(subscribers)
 
+    def set_lte_auth_seqs(self, next_seqs):
+        """
+        Method that updates the LTE auth sequence number of many
+        subscribers in one transaction.
+        """
+        with self._lock:
+            self._persistent_store.set_lte_auth_seqs(next_seqs)
+            for sid, seq in next_seqs.items():
+                if sid in self._cache:
+                    self._cache[sid].state.lte_auth_next_seq = seq
+
+    def skip_lte_auth_seqs(self, window):
+        """
+        Method that advances the LTE auth sequence number of all the
+        subscribers by window.
+        """
+        with self._lock:
+            self._cache_clear()
+            self._persistent_store.skip_lte_auth_seqs(window)
+
     def get_subscriber_data(self, subscriber_id):
         """
         Method that returns the subscriber data for the subscriber.
@@ -122,6 +142,13 @@ class CachedStore(BaseStore):
     def on_ready(self):
         return self._on_ready.event.wait()
 
+    def add_change_callback(self, callback):
+        """
+        Registers a callback run after subscribers are added, changed or
+        deleted. All writes go through the persistent store, which runs it.
+        """
+        self._persistent_store.add_change_callback(callback)
+
     def _cache_get(self, k):
         """
         Get from the LRU cache. Move the last hit entry to the end.
@@ -11,6 +11,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import hashlib
 import sqlite3
 import threading
 from contextlib import contextmanager
@@ -39,6 +40,7 @@ class SqliteStore(BaseStore):
         self._tlocal = threading.local()
         self._create_store()
         self._on_ready = OnDataReady(loop=loop)
+        self._change_callbacks = []
 
     @property
     def conn(self):
@@ -46,16 +48,39 @@ class SqliteStore(BaseStore):
         Returns a thread local connection to the sqlite db.
         """
         if not getattr(self._tlocal, 'conn', None):
-            self._tlocal.conn = sqlite3.connect(self._db_location, uri=True)
+            conn = sqlite3.connect(self._db_location, uri=True)
+            # WAL lets the S6a readers proceed while a resync is writing
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._tlocal.conn = conn
         return self._tlocal.conn
 
     def _create_store(self):
         """
-        Create the sqlite table if it doesn't exist already.
+        Create the sqlite table if it doesn't exist already, and add the
+        digest column to tables created by older versions.
         """
         with self.conn:
             self.conn.execute("CREATE TABLE IF NOT EXISTS subscriberdb"
-                              "(subscriber_id text PRIMARY KEY, data text)")
+                              "(subscriber_id text PRIMARY KEY, data text, "
+                              "digest blob)")
+            columns = [row[1] for row in
+                       self.conn.execute("PRAGMA table_info(subscriberdb)")]
+            if 'digest' not in columns:
+                # Rows without a digest are rewritten on the next resync
+                self.conn.execute("ALTER TABLE subscriberdb "
+                                  "ADD COLUMN digest blob")
+
+    @staticmethod
+    def _digest(subscriber_data):
+        """
+        Digest of the subscriber data excluding the locally maintained
+        state, used by resync to skip subscribers that didn't change.
+        """
+        config = SubscriberData()
+        config.CopyFrom(subscriber_data)
+        config.ClearField('state')
+        return hashlib.sha1(
+            config.SerializeToString(deterministic=True)).digest()
 
     def add_subscriber(self, subscriber_data):
         """
@@ -69,8 +94,10 @@ class SqliteStore(BaseStore):
             if res.fetchone():
                 raise DuplicateSubscriberError(sid)
 
-            self.conn.execute("INSERT INTO subscriberdb(subscriber_id, data) "
-                              "VALUES (?, ?)", (sid, data_str))
+            self.conn.execute("INSERT INTO subscriberdb"
+                              "(subscriber_id, data, digest) VALUES (?, ?, ?)",
+                              (sid, data_str, self._digest(subscriber_data)))
+        self._on_change([sid])
         self._on_ready.add_subscriber(subscriber_data)
 
     @contextmanager
@@ -80,7 +107,8 @@ class SqliteStore(BaseStore):
         """
         with self.conn:
             res = self.conn.execute(
-                "SELECT data FROM subscriberdb WHERE " "subscriber_id = ?",
+                "SELECT data, digest FROM subscriberdb WHERE "
+                "subscriber_id = ?",
                 (subscriber_id,),
             )
             row = res.fetchone()
@@ -90,10 +118,14 @@ class SqliteStore(BaseStore):
             subscriber_data.ParseFromString(row[0])
             yield subscriber_data
             data_str = subscriber_data.SerializeToString()
+            digest = self._digest(subscriber_data)
             self.conn.execute(
-                "UPDATE subscriberdb SET data = ? " "WHERE subscriber_id = ?",
-                (data_str, subscriber_id),
+                "UPDATE subscriberdb SET data = ?, digest = ? "
+                "WHERE subscriber_id = ?",
+                (data_str, digest, subscriber_id),
             )
+        if digest != row[1]:
+            self._on_change([subscriber_id])
 
     def delete_subscriber(self, subscriber_id):
         """
@@ -104,6 +136,7 @@ class SqliteStore(BaseStore):
                 "DELETE FROM subscriberdb WHERE " "subscriber_id = ?",
                 (subscriber_id,),
             )
+        self._on_change([subscriber_id])
 
     def delete_all_subscribers(self):
         """
@@ -111,6 +144,7 @@ class SqliteStore(BaseStore):
         """
         with self.conn:
             self.conn.execute("DELETE FROM subscriberdb")
+        self._on_change(None)
 
     def get_subscriber_data(self, subscriber_id):
         """
@@ -149,11 +183,20 @@ class SqliteStore(BaseStore):
         """
         sid = SIDUtils.to_str(subscriber_data.sid)
         data_str = subscriber_data.SerializeToString()
+        digest = self._digest(subscriber_data)
         with self.conn:
+            # Most updates only change the state, try that first
             res = self.conn.execute("UPDATE subscriberdb SET data = ? "
-                                    "WHERE subscriber_id = ?", (data_str, sid))
+                                    "WHERE subscriber_id = ? AND digest = ?",
+                                    (data_str, sid, digest))
+            if res.rowcount:
+                return
+            res = self.conn.execute("UPDATE subscriberdb SET data = ?, "
+                                    "digest = ? WHERE subscriber_id = ?",
+                                    (data_str, digest, sid))
             if not res.rowcount:
                 raise SubscriberNotFoundError(sid)
+        self._on_change([sid])
 
     def resync(self, subscribers):
         """
@@ -161,34 +204,107 @@ class SqliteStore(BaseStore):
         subscribers. The resync leaves the current state of subscribers
         intact.
 
+        Only the subscribers whose data differs from the store, compared by
+        the digest of everything but the state, are written, and only the
+        subscribers missing from the list are deleted.
+
         Args:
             subscribers - list of subscribers to be in the store.
         """
         with self.conn:
-            # Capture the current state of the subscribers
-            res = self.conn.execute("SELECT subscriber_id, data FROM subscriberdb")
-            current_state = {}
-            for row in res:
-                sub = SubscriberData()
-                sub.ParseFromString(row[1])
-                current_state[row[0]] = sub.state
-
-            # Clear all subscribers
-            self.conn.execute("DELETE FROM subscriberdb")
+            current_digests = dict(self.conn.execute(
+                "SELECT subscriber_id, digest FROM subscriberdb"))
 
-            # Add the subscribers with the current state
+            upserts = []
             for sub in subscribers:
                 sid = SIDUtils.to_str(sub.sid)
-                if sid in current_state:
-                    sub.state.CopyFrom(current_state[sid])
-                data_str = sub.SerializeToString()
-                self.conn.execute("INSERT INTO subscriberdb(subscriber_id, data) "
-                                  "VALUES (?, ?)", (sid, data_str))
+                digest = self._digest(sub)
+                if sid in current_digests:
+                    if current_digests.pop(sid) == digest:
+                        continue
+                    # Keep the current state of the changed subscriber
+                    row = self.conn.execute(
+                        "SELECT data FROM subscriberdb WHERE "
+                        "subscriber_id = ?", (sid, )).fetchone()
+                    current = SubscriberData()
+                    current.ParseFromString(row[0])
+                    sub.state.CopyFrom(current.state)
+                upserts.append((sid, sub.SerializeToString(), digest))
+
+            # Whatever is left in current_digests is no longer in the list
+            self.conn.executemany(
+                "DELETE FROM subscriberdb WHERE subscriber_id = ?",
+                ((sid, ) for sid in current_digests))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO subscriberdb"
+                "(subscriber_id, data, digest) VALUES (?, ?, ?)", upserts)
+        changed_ids = list(current_digests) + [row[0] for row in upserts]
+        if changed_ids:
+            self._on_change(changed_ids)
         self._on_ready.resync(subscribers)
 
+    def set_lte_auth_seqs(self, next_seqs):
+        """
+        Method that updates the LTE auth sequence number of many
+        subscribers in one transaction. Subscribers not present are
+        skipped.
+
+        Args:
+            next_seqs - dict of subscriber id to the next sequence number
+        """
+        with self.conn:
+            updates = []
+            for sid, seq in next_seqs.items():
+                row = self.conn.execute(
+                    "SELECT data FROM subscriberdb WHERE "
+                    "subscriber_id = ?", (sid, )).fetchone()
+                if not row:
+                    continue
+                sub = SubscriberData()
+                sub.ParseFromString(row[0])
+                sub.state.lte_auth_next_seq = seq
+                updates.append((sub.SerializeToString(), sid))
+            self.conn.executemany(
+                "UPDATE subscriberdb SET data = ? WHERE subscriber_id = ?",
+                updates)
+
+    def skip_lte_auth_seqs(self, window):
+        """
+        Method that advances the LTE auth sequence number of all the
+        subscribers by window, in one transaction.
+
+        Args:
+            window - number of sequence numbers to skip
+        """
+        with self.conn:
+            updates = []
+            res = self.conn.execute(
+                "SELECT subscriber_id, data FROM subscriberdb")
+            for sid, data in res.fetchall():
+                sub = SubscriberData()
+                sub.ParseFromString(data)
+                sub.state.lte_auth_next_seq += window
+                updates.append((sub.SerializeToString(), sid))
+            self.conn.executemany(
+                "UPDATE subscriberdb SET data = ? WHERE subscriber_id = ?",
+                updates)
+
     def on_ready(self):
         return self._on_ready.event.wait()
 
+    def add_change_callback(self, callback):
+        """
+        Registers a callback run after subscribers are added, changed or
+        deleted. Changes to the subscriber state alone don't trigger it.
+        The callback gets the list of changed subscriber ids, or None if
+        all of them might have changed.
+        """
+        self._change_callbacks.append(callback)
+
+    def _on_change(self, subscriber_ids):
+        for callback in self._change_callbacks:
+            callback(subscriber_ids)
+
     def _update_apn(self, apn_config, apn_data):
         """
         Method that populates apn data.
@@ -19,6 +19,8 @@ from lte.protos.s6a_service_pb2_grpc import S6aServiceStub
 from lte.protos.subscriberdb_pb2 import SubscriberData, LTESubscription
 from magma.common.service_registry import ServiceRegistry
 from magma.common.streamer import StreamerClient
+from magma.subscriberdb.sid import SIDUtils
+from magma.subscriberdb.store.base import SubscriberNotFoundError
 
 
 class SubscriberDBStreamerCallback(StreamerClient.Callback):
@@ -65,8 +67,45 @@ class SubscriberDBStreamerCallback(StreamerClient.Callback):
             logging.debug("Resync with subscribers: %s", ','.join(keys))
             self._store.resync(subscribers)
         else:
-            # TODO: implement updates
-            pass
+            self._process_incremental_updates(updates)
+
+    def _process_incremental_updates(self, updates):
+        """
+        Apply the subscribers changed since the last stream response. An
+        update with an empty value deletes the subscriber, others add or
+        replace it, keeping its local state. Subscribers that are deleted
+        or no longer active are detached, as on resync.
+        """
+        detached_sub_ids = []
+        for update in updates:
+            if not update.value:
+                sub_id = update.key if update.key.startswith('IMSI') \
+                    else 'IMSI' + update.key
+                try:
+                    old_sub = self._store.get_subscriber_data(sub_id)
+                except SubscriberNotFoundError:
+                    continue
+                if old_sub.lte.state == LTESubscription.ACTIVE:
+                    detached_sub_ids.append(sub_id)
+                self._store.delete_subscriber(sub_id)
+                continue
+
+            sub = SubscriberData()
+            sub.ParseFromString(update.value)
+            sub_id = SIDUtils.to_str(sub.sid)
+            try:
+                with self._store.edit_subscriber(sub_id) as subscriber_data:
+                    was_active = \
+                        subscriber_data.lte.state == LTESubscription.ACTIVE
+                    sub.state.CopyFrom(subscriber_data.state)
+                    subscriber_data.CopyFrom(sub)
+            except SubscriberNotFoundError:
+                self._store.add_subscriber(sub)
+                continue
+            if was_active and sub.lte.state != LTESubscription.ACTIVE:
+                detached_sub_ids.append(sub_id)
+
+        self.detach_deleted_subscribers(detached_sub_ids, [])
 
     def detach_deleted_subscribers(self, old_sub_ids, new_sub_ids):
         """
@@ -0,0 +1,175 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from lte.protos.subscriberdb_pb2 import SubscriberData, SubscriberState
+from magma.subscriberdb.auth_seq_journal import LteAuthSeqJournal
+from magma.subscriberdb.sid import SIDUtils
+from magma.subscriberdb.store.sqlite import SqliteStore
+
+SKIP_WINDOW = 10
+
+
+class LteAuthSeqJournalTests(unittest.TestCase):
+    """
+    Tests for the LteAuthSeqJournal
+    """
+
+    def setUp(self):
+        self._store = SqliteStore('file::memory:')
+        for sid, seq in (('IMSI11111', 1), ('IMSI22222', 100)):
+            self._store.add_subscriber(SubscriberData(
+                sid=SIDUtils.to_pb(sid),
+                state=SubscriberState(lte_auth_next_seq=seq)))
+        self._loop = asyncio.new_event_loop()
+        self._journal = LteAuthSeqJournal(
+            self._store, 1, SKIP_WINDOW, loop=self._loop)
+
+    def tearDown(self):
+        self._loop.close()
+
+    def _stored_seq(self, sid):
+        return self._store.get_subscriber_data(sid).state.lte_auth_next_seq
+
+    def _load(self, sid):
+        return lambda: self._stored_seq(sid)
+
+    def test_reserve_and_flush(self):
+        """
+        Test if the sequence numbers are handed out from memory and
+        written back on flush
+        """
+        self.assertEqual(
+            self._journal.reserve('IMSI11111', 1, self._load('IMSI11111')), 1)
+        self.assertEqual(
+            self._journal.reserve('IMSI11111', 3, self._load('IMSI11111')), 2)
+        self.assertEqual(
+            self._journal.reserve('IMSI22222', 1, self._load('IMSI22222')),
+            100)
+        self.assertEqual(self._stored_seq('IMSI11111'), 1)
+        self.assertEqual(self._stored_seq('IMSI22222'), 100)
+
+        self._journal.flush()
+        self.assertEqual(self._stored_seq('IMSI11111'), 5)
+        self.assertEqual(self._stored_seq('IMSI22222'), 101)
+
+    def test_flush_on_skip_window(self):
+        """
+        Test if a subscriber is flushed before it gets a skip window ahead
+        of the store
+        """
+        for _ in range(SKIP_WINDOW - 1):
+            self._journal.reserve('IMSI11111', 1, self._load('IMSI11111'))
+        self.assertEqual(self._stored_seq('IMSI11111'), 1)
+        self._journal.reserve('IMSI11111', 1, self._load('IMSI11111'))
+        self.assertEqual(self._stored_seq('IMSI11111'), 1 + SKIP_WINDOW)
+
+    def test_flush_before_crossing_window(self):
+        """
+        Test if a reservation that would cross the skip window is flushed
+        before it is handed out
+        """
+        self.assertEqual(
+            self._journal.reserve('IMSI11111', 8, self._load('IMSI11111')), 1)
+        self.assertEqual(self._stored_seq('IMSI11111'), 1)
+        self.assertEqual(
+            self._journal.reserve('IMSI11111', 5, self._load('IMSI11111')), 9)
+        self.assertEqual(self._stored_seq('IMSI11111'), 9)
+        with self.assertRaises(ValueError):
+            self._journal.reserve('IMSI11111', SKIP_WINDOW + 1,
+                                  self._load('IMSI11111'))
+
+    def test_reserve_waits_for_flush(self):
+        """
+        Test if the reservations crossing the skip window wait for the
+        flush in progress to commit, and are not handed out if it fails
+        """
+        writing = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        set_lte_auth_seqs = self._store.set_lte_auth_seqs
+        fail = [True]
+
+        def slow_set_lte_auth_seqs(seqs):
+            writing.set()
+            release.wait(5)
+            if fail[0]:
+                raise RuntimeError('write failed')
+            set_lte_auth_seqs(seqs)
+
+        def reserve(results):
+            try:
+                results.append(self._journal.reserve(
+                    'IMSI11111', 1, self._load('IMSI11111')))
+            except RuntimeError as err:
+                results.append(err)
+
+        for _ in range(SKIP_WINDOW - 1):
+            self._journal.reserve('IMSI11111', 1, self._load('IMSI11111'))
+        with mock.patch.object(self._store, 'set_lte_auth_seqs',
+                               side_effect=slow_set_lte_auth_seqs):
+            # Reaches the window and flushes
+            flusher_results = []
+            flusher = threading.Thread(target=reserve,
+                                       args=(flusher_results,),
+                                       daemon=True)
+            flusher.start()
+            self.assertTrue(writing.wait(5))
+            waiter_results = []
+            waiter = threading.Thread(target=reserve,
+                                      args=(waiter_results,), daemon=True)
+            waiter.start()
+            waiter.join(0.1)
+            self.assertTrue(waiter.is_alive())
+
+            # The failed write keeps the window closed
+            release.set()
+            flusher.join(5)
+            waiter.join(5)
+            self.assertIsInstance(flusher_results[0], RuntimeError)
+            self.assertIsInstance(waiter_results[0], RuntimeError)
+            self.assertEqual(self._stored_seq('IMSI11111'), 1)
+
+            fail[0] = False
+            self.assertEqual(
+                self._journal.reserve('IMSI11111', 1,
+                                      self._load('IMSI11111')),
+                1 + SKIP_WINDOW)
+        self.assertEqual(self._stored_seq('IMSI11111'), 1 + SKIP_WINDOW)
+
+    def test_set_next_seq(self):
+        """
+        Test if a set sequence number is flushed right away
+        """
+        self._journal.set_next_seq('IMSI22222', 50)
+        self.assertEqual(self._stored_seq('IMSI22222'), 50)
+        self.assertEqual(
+            self._journal.get_next_seq('IMSI22222', self._load('IMSI22222')),
+            50)
+
+    def test_skip_on_start(self):
+        """
+        Test if the sequence numbers skip the window on start
+        """
+        self._journal.start()
+        self._journal.stop()
+        self.assertEqual(self._stored_seq('IMSI11111'), 1 + SKIP_WINDOW)
+        self.assertEqual(self._stored_seq('IMSI22222'), 100 + SKIP_WINDOW)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark of E-UTRAN vector generation with Milenage, reporting vectors/s
+on a single core for a range of subscribers and vectors per request.
+
+Not collected by the unit test runner, run it explicitly with:
+    python3 -m pytest -s magma/subscriberdb/tests/crypto/milenage_benchmark.py
+"""
+
+import os
+import time
+import unittest
+
+from magma.subscriberdb.crypto.milenage import Milenage
+
+NUM_SUBSCRIBERS = 1000
+NUM_REQUESTS = 5000
+PLMN = b'\x02\xf8\x59'
+
+
+class MilenageBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self._milenage = Milenage(b'\x80\x00')
+        self._keys = [(os.urandom(16), os.urandom(16))
+                      for _ in range(NUM_SUBSCRIBERS)]
+
+    def _vectors_per_second(self, num_vectors, batched):
+        start = time.perf_counter()
+        for i in range(NUM_REQUESTS):
+            key, opc = self._keys[i % NUM_SUBSCRIBERS]
+            sqns = [(i + j) << 5 for j in range(num_vectors)]
+            if batched:
+                self._milenage.generate_eutran_vectors(key, opc, sqns, PLMN)
+            else:
+                for sqn in sqns:
+                    self._milenage.generate_eutran_vector(key, opc, sqn,
+                                                          PLMN)
+        elapsed = time.perf_counter() - start
+        return NUM_REQUESTS * num_vectors / elapsed
+
+    def _batch_vectors_per_second(self, num_vectors, batch_size):
+        start = time.perf_counter()
+        for i in range(0, NUM_REQUESTS, batch_size):
+            subscribers = []
+            for j in range(i, i + batch_size):
+                key, opc = self._keys[j % NUM_SUBSCRIBERS]
+                subscribers.append(
+                    (key, opc, [(j + k) << 5 for k in range(num_vectors)]))
+            self._milenage.generate_eutran_vectors_batch(subscribers, PLMN)
+        elapsed = time.perf_counter() - start
+        return NUM_REQUESTS * num_vectors / elapsed
+
+    def test_vectors_per_second(self):
+        for num_vectors in (1, 5):
+            for batched in (False, True):
+                rate = self._vectors_per_second(num_vectors, batched)
+                print('\n%s: %d subscribers, %d vectors per request, '
+                      '%.0f vectors/s'
+                      % ('batched' if batched else 'one at a time',
+                         NUM_SUBSCRIBERS, num_vectors, rate))
+            rate = self._batch_vectors_per_second(num_vectors, 100)
+            print('\nbatches of 100 subscribers: %d vectors per request, '
+                  '%.0f vectors/s' % (num_vectors, rate))
+
+
+if __name__ == "__main__":
+    unittest.main()
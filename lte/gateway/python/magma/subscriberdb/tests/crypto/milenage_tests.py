@@ -172,6 +172,54 @@ class MilenageTests(unittest.TestCase):
         self.assertEqual(autn, autn_)
         self.assertEqual(kasme, kasme_)
 
+    def test_eutran_vectors(self):
+        """Batched vectors match the vectors generated one at a time"""
+        key = b'\x8b\xafG?/\x8f\xd0\x94\x87\xcc\xcb\xd7\t|hb'
+        op_c = b"\x8e'\xb6\xaf\x0ei.u\x0f2fz;\x14`]"
+        plmn = b'\x02\xf8\x59'
+        sqns = [7351, 7352, 2 ** 48 - 1]
+        rands = [bytes([i]) * 16 for i in range(len(sqns))]
+
+        crypto = Milenage(b'\x80\x00')
+        rand_iter = iter(rands)
+        Milenage.generate_rand = lambda: next(rand_iter)
+        vectors = crypto.generate_eutran_vectors(key, op_c, sqns, plmn)
+
+        self.assertEqual(len(sqns), len(vectors))
+        for sqn, rand, vector in zip(sqns, rands, vectors):
+            self.rand = rand
+            Milenage.generate_rand = lambda: self.rand
+            self.assertEqual(
+                crypto.generate_eutran_vector(key, op_c, sqn, plmn), vector)
+            mac_a, _ = Milenage.f1(key, sqn.to_bytes(6, 'big'), rand, op_c,
+                                   b'\x80\x00')
+            self.assertEqual(mac_a, vector[2][8:])
+            xres, _ = Milenage.f2_f5(key, rand, op_c)
+            self.assertEqual(xres, vector[1])
+
+    def test_eutran_vectors_batch(self):
+        """Vectors of several subscribers match their own vectors"""
+        plmn = b'\x02\xf8\x59'
+        subscribers = [
+            (b'\x8b\xafG?/\x8f\xd0\x94\x87\xcc\xcb\xd7\t|hb',
+             b"\x8e'\xb6\xaf\x0ei.u\x0f2fz;\x14`]", [7351, 7352]),
+            (bytes(range(16)), bytes(range(16, 32)), []),
+            (bytes(range(32, 48)), bytes(range(48, 64)), [1, 2, 3]),
+        ]
+        rands = [bytes([i]) * 16 for i in range(5)]
+
+        crypto = Milenage(b'\x80\x00')
+        rand_iter = iter(rands)
+        Milenage.generate_rand = lambda: next(rand_iter)
+        batch = crypto.generate_eutran_vectors_batch(subscribers, plmn)
+
+        rand_iter = iter(rands)
+        self.assertEqual(
+            [crypto.generate_eutran_vectors(key, opc, sqns, plmn)
+             for key, opc, sqns in subscribers],
+            batch)
+        self.assertEqual([2, 0, 3], [len(vectors) for vectors in batch])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -11,12 +11,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+# pylint: disable=protected-access
+
+import asyncio
 import unittest
 
 from lte.protos.mconfig.mconfigs_pb2 import SubscriberDB
 from lte.protos.subscriberdb_pb2 import (GSMSubscription, LTESubscription,
                                          SubscriberData, SubscriberState)
 from magma.subscriberdb import processor
+from magma.subscriberdb.auth_seq_journal import LteAuthSeqJournal
 from magma.subscriberdb.crypto.milenage import BaseLTEAuthAlgo, Milenage
 from magma.subscriberdb.crypto.utils import CryptoError
 from magma.subscriberdb.store.base import SubscriberNotFoundError
@@ -81,6 +85,7 @@ class ProcessorTests(unittest.TestCase):
 
     def setUp(self):
         store = SqliteStore('file::memory:')
+        self._store = store
         op = 16*b'\x11'
         amf = b'\x80\x00'
         self._sub_profiles = {
@@ -175,6 +180,66 @@ class ProcessorTests(unittest.TestCase):
                          3*b'\x00'),
                          eutran_vector)
 
+    def test_lte_auth_multiple_vectors(self):
+        """
+        Test if we get the requested number of auth vectors, each with its
+        own sequence number
+        """
+        eutran_vector = _dummy_eutran_vector()
+        self.assertEqual(self._processor.generate_lte_auth_vectors(
+            '11111', 3*b'\x00', 3), 3 * [eutran_vector])
+        self.assertEqual(self._processor.get_next_lte_auth_seq('11111'), 4)
+
+        # The number of vectors is clamped
+        self.assertEqual(len(self._processor.generate_lte_auth_vectors(
+            '11111', 3*b'\x00', 0)), 1)
+        self.assertEqual(len(self._processor.generate_lte_auth_vectors(
+            '11111', 3*b'\x00', 100)), processor.MAX_LTE_AUTH_VECTORS)
+
+    def test_lte_auth_keys_cache(self):
+        """
+        Test if the cached keys are dropped when the subscriber changes,
+        and kept when only its state changes
+        """
+        self._processor.generate_lte_auth_vector('11111', 3*b'\x00')
+        self.assertIn('IMSI11111', self._processor._auth_cache)
+
+        self._processor.set_next_lte_auth_seq('11111', 10)
+        self.assertIn('IMSI11111', self._processor._auth_cache)
+
+        with self._store.edit_subscriber('IMSI11111') as subs:
+            subs.lte.state = LTESubscription.INACTIVE
+        self.assertNotIn('IMSI11111', self._processor._auth_cache)
+        with self.assertRaises(CryptoError):
+            self._processor.generate_lte_auth_vector('11111', 3*b'\x00')
+
+        self._processor.generate_lte_auth_vector('44444', 3*b'\x00')
+        self.assertIn('IMSI44444', self._processor._auth_cache)
+        self._store.resync([])
+        self.assertNotIn('IMSI44444', self._processor._auth_cache)
+
+    def test_lte_auth_seq_journal(self):
+        """
+        Test if the sequence numbers are kept by the journal when it's set
+        """
+        loop = asyncio.new_event_loop()
+        journal = LteAuthSeqJournal(self._store, 1, 100, loop=loop)
+        self._processor = processor.Processor(
+            self._store, self._default_sub_profile, self._sub_profiles,
+            16*b'\x11', b'\x80\x00', auth_seq_journal=journal)
+
+        self._processor.generate_lte_auth_vectors('11111', 3*b'\x00', 2)
+        self.assertEqual(self._processor.get_next_lte_auth_seq('11111'), 3)
+        seq = self._store.get_subscriber_data('IMSI11111').state
+        self.assertEqual(seq.lte_auth_next_seq, 1)
+
+        journal.flush()
+        seq = self._store.get_subscriber_data('IMSI11111').state
+        self.assertEqual(seq.lte_auth_next_seq, 4)
+        with self.assertRaises(SubscriberNotFoundError):
+            self._processor.get_next_lte_auth_seq('12345')
+        loop.close()
+
     def test_lte_auth_success_opc(self):
         """
         Test if we get the auth vector using passed OPc
@@ -299,7 +299,7 @@ class MessageCodecTests(unittest.TestCase):
     def _decode_check(self, msg, msg_bytes):
         decoded_msg = message.decode(msg_bytes)
         self.assertEqual(msg.header, decoded_msg.header)
-        self.assertEqual(msg._avps, decoded_msg._avps)
+        self.assertEqual(msg.avps, decoded_msg.avps)
 
     def _encode_check(self, msg, msg_bytes):
         out_buf = bytearray(msg.length)
@@ -438,3 +438,25 @@ class MessageAVPTests(unittest.TestCase):
 
         # Doesn't exist so returns None
         self.assertEqual(self.msg.find_avp(0, 1337), None)
+
+    def test_decoded_message_avps(self):
+        """A decoded message only decodes the AVPs that are looked up"""
+        msg_bytes = bytearray(self.msg.length)
+        self.msg.encode(msg_bytes, 0)
+        encoded = bytes(msg_bytes)
+        decoded_msg = message.decode(msg_bytes)
+
+        self.assertEqual(decoded_msg.find_avp(0, 257).value, '127.0.0.1')
+        self.assertEqual(len(decoded_msg._avps), 3)
+        self.assertIsInstance(decoded_msg._avps[0], tuple)
+        self.assertIsInstance(decoded_msg._avps[2], avp.AddressAVP)
+
+        # The buffer can be reused once decoded
+        msg_bytes[:] = b'\x00' * len(msg_bytes)
+        self.assertEqual(decoded_msg.find_avp(0, 1).value, 'hello')
+
+        # AVPs not decoded are encoded back as they were received
+        out_buf = bytearray(decoded_msg.length)
+        decoded_msg.encode(out_buf, 0)
+        self.assertEqual(out_buf, encoded)
+        self.assertEqual(decoded_msg.avps, self.msg.avps)
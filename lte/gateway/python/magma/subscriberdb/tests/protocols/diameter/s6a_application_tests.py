@@ -14,6 +14,7 @@ limitations under the License.
 # pylint:disable=protected-access
 
 import asyncio
+import threading
 import unittest
 from unittest.mock import Mock
 
@@ -65,6 +66,45 @@ class MockProcessor(LTEProcessor):
         )
 
 
+class BlockingProcessor(MockProcessor):
+    """
+    MockProcessor blocking the auth of IMSI 1 until released, and failing
+    the auth of IMSI 4
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.unknown_done = threading.Event()
+
+    def generate_lte_auth_vector(self, imsi, plmn):
+        if imsi == '1':
+            self.release.wait()
+        elif imsi == '4':
+            raise RuntimeError('auth failed')
+        try:
+            return super().generate_lte_auth_vector(imsi, plmn)
+        finally:
+            if imsi == '3':
+                self.unknown_done.set()
+
+
+def _auth_request(imsi):
+    msg = message.Message()
+    msg.header.application_id = s6a.S6AApplication.APP_ID
+    msg.header.command_code = \
+        s6a.S6AApplicationCommands.AUTHENTICATION_INFORMATION
+    msg.header.request = True
+    msg.append_avp(avp.AVP('Session-Id', 'session-%s' % imsi))
+    msg.append_avp(avp.AVP('Auth-Session-State', 1))
+    msg.append_avp(avp.AVP('User-Name', imsi))
+    msg.append_avp(avp.AVP('Visited-PLMN-Id', b'(Y'))
+    msg.append_avp(avp.AVP('Requested-EUTRAN-Authentication-Info', [
+        avp.AVP('Number-Of-Requested-Vectors', 1),
+        avp.AVP('Immediate-Response-Preferred', 0),
+    ]))
+    return msg
+
+
 class S6AApplicationTests(unittest.TestCase):
     """
     Tests for the S6a commands implemented. These tests check that
@@ -370,5 +410,105 @@ class S6AApplicationTests(unittest.TestCase):
         self._check_reply(req_buf, resp_buf)
 
 
+class S6AAuthWorkersTests(unittest.TestCase):
+    """
+    Tests for processing auth requests on the auth workers
+    """
+    REALM = "mai.facebook.com"
+    HOST = "hss.mai.facebook.com"
+    HOST_ADDR = "127.0.0.1"
+
+    def setUp(self):
+        self._loop = asyncio.new_event_loop()
+        self._processor = BlockingProcessor()
+        self._s6a_manager = s6a.S6AApplication(
+            self._processor,
+            self.REALM,
+            self.HOST,
+            self.HOST_ADDR,
+            loop=self._loop,
+            auth_workers=2,
+        )
+        self._writer = Mock()
+        self._s6a_manager.set_writer(self._writer)
+
+    def tearDown(self):
+        self._processor.release.set()
+        self._loop.close()
+
+    def _result_codes(self, writer=None):
+        writer = writer or self._writer
+        return [call[0][0].find_avp(*avp.resolve('Result-Code')).value
+                for call in writer.send_msg.call_args_list]
+
+    def _wait_for_responses(self, writer, count):
+        async def wait_for_responses():
+            while writer.send_msg.call_count < count:
+                await asyncio.sleep(0.01)
+        self._loop.run_until_complete(
+            asyncio.wait_for(wait_for_responses(), 1))
+
+    def test_responses_in_request_order(self):
+        """
+        Test that a response waits for the responses to earlier requests,
+        even if it is ready first
+        """
+        self._s6a_manager.handle_msg(0, _auth_request('1'))
+        self._s6a_manager.handle_msg(0, _auth_request('3'))
+        self._loop.run_until_complete(self._loop.run_in_executor(
+            None, self._processor.unknown_done.wait, 1))
+        self._loop.run_until_complete(asyncio.sleep(0.01))
+        self._writer.send_msg.assert_not_called()
+
+        self._processor.release.set()
+
+        async def wait_for_responses():
+            while self._writer.send_msg.call_count < 2:
+                await asyncio.sleep(0.01)
+        self._loop.run_until_complete(
+            asyncio.wait_for(wait_for_responses(), 1))
+        self.assertEqual(self._result_codes(),
+                         [avp.ResultCode.DIAMETER_SUCCESS,
+                          avp.ResultCode.DIAMETER_ERROR_USER_UNKNOWN])
+        # Both requests were counted as pending until answered
+        self.assertEqual(self._writer.add_pending.call_count, 2)
+        self.assertEqual(self._writer.remove_pending.call_count, 2)
+
+    def test_responses_ordered_per_connection(self):
+        """
+        Test that a response only waits for the earlier requests of its own
+        connection
+        """
+        self._s6a_manager.handle_msg(0, _auth_request('1'))
+        other_writer = Mock()
+        self._s6a_manager.set_writer(other_writer)
+        self._s6a_manager.handle_msg(0, _auth_request('3'))
+
+        self._wait_for_responses(other_writer, 1)
+        self.assertEqual(self._result_codes(other_writer),
+                         [avp.ResultCode.DIAMETER_ERROR_USER_UNKNOWN])
+        self._writer.send_msg.assert_not_called()
+
+        self._processor.release.set()
+        self._wait_for_responses(self._writer, 1)
+        self.assertEqual(self._result_codes(),
+                         [avp.ResultCode.DIAMETER_SUCCESS])
+        self.assertEqual(self._s6a_manager._pending_responses, {})
+
+    def test_worker_failure(self):
+        """
+        Test that a request failing on a worker is answered with
+        DIAMETER_UNABLE_TO_COMPLY, in request order
+        """
+        self._s6a_manager.handle_msg(0, _auth_request('4'))
+        self._s6a_manager.handle_msg(0, _auth_request('3'))
+
+        self._wait_for_responses(self._writer, 2)
+        self.assertEqual(self._result_codes(),
+                         [avp.ResultCode.DIAMETER_UNABLE_TO_COMPLY,
+                          avp.ResultCode.DIAMETER_ERROR_USER_UNKNOWN])
+        self.assertEqual(self._writer.remove_pending.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
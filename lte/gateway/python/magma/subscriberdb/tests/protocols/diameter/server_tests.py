@@ -16,7 +16,7 @@ limitations under the License.
 import asyncio
 import unittest
 
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock
 
 from magma.subscriberdb.protocols.diameter import server, message
 
@@ -43,8 +43,8 @@ class ServerTests(unittest.TestCase):
             """ Deep copy the memoryview for checking later  """
             return self._writes(memview.tobytes())
 
-        self._transport = asyncio.Transport()
-        self._transport.write = Mock(side_effect=convert_memview_to_bytes)
+        self._transport = Mock(spec=asyncio.Transport)
+        self._transport.write.side_effect = convert_memview_to_bytes
 
         # Here goes nothing..
         self._server.connection_made(self._transport)
@@ -99,6 +99,52 @@ class ServerTests(unittest.TestCase):
         # We should flush the read buffer
         self.assertEqual(len(self._server._readbuf), 0)
 
+    def test_pipelined_messages(self):
+        """Check that all the messages of a read are handled, and the
+        rest of a partial message is kept in the buffer"""
+        msg = message.Message()
+        msg.header.application_id = 0xfac3b00c
+        req_buf = bytearray(msg.length)
+        msg.encode(req_buf, 0)
+
+        self._server.data_received(bytes(req_buf * 3)[:-4])
+        self.assertEqual(self._server._handle_msg.call_count, 2)
+        self.assertEqual(len(self._server._readbuf), len(req_buf) - 4)
+        self._server.data_received(bytes(req_buf[-4:]))
+        self.assertEqual(self._server._handle_msg.call_count, 3)
+        self.assertEqual(len(self._server._readbuf), 0)
+
+    def test_skip_bad_message(self):
+        """Check that a framed message that fails to decode is skipped
+        without dropping the messages after it"""
+        msg = message.Message()
+        msg.header.application_id = 0xfac3b00c
+        req_buf = bytearray(msg.length)
+        msg.encode(req_buf, 0)
+        # A message with 4 bytes of garbage as its AVPs
+        bad_buf = (b'\x01\x00\x00\x18' + bytes(req_buf[4:]) +
+                   b'\x00' * 4)
+
+        self._server.data_received(bad_buf + bytes(req_buf))
+        self._server._handle_msg.assert_called_once_with(0xfac3b00c, ANY)
+        self.assertEqual(len(self._server._readbuf), 0)
+
+    def test_batched_answers(self):
+        """Check that the answers to the messages of a read are written
+        in one call"""
+        msg = message.Message()
+        msg.header.application_id = 0xfac3b00c
+        req_buf = bytearray(msg.length)
+        msg.encode(req_buf, 0)
+        self._server._handle_msg.side_effect = \
+            lambda _, msg: self._server.writer.send_msg(msg)
+
+        self._server.data_received(bytes(req_buf * 2))
+        self._transport.write.assert_not_called()
+        self._transport.writelines.assert_called_once_with(ANY)
+        bufs = self._transport.writelines.call_args[0][0]
+        self.assertEqual([buf.tobytes() for buf in bufs], [req_buf] * 2)
+
 
 class WriterTests(unittest.TestCase):
     """
@@ -113,8 +159,8 @@ class WriterTests(unittest.TestCase):
             """ Deep copy the memoryview for checking later  """
             return self._writes(memview.tobytes())
 
-        self._transport = asyncio.Transport()
-        self._transport.write = Mock(side_effect=convert_memview_to_bytes)
+        self._transport = Mock(spec=asyncio.Transport)
+        self._transport.write.side_effect = convert_memview_to_bytes
 
         self.writer = server.Writer("mai.facebook.com",
                                      "hss.mai.facebook.com",
@@ -139,6 +185,42 @@ class WriterTests(unittest.TestCase):
         buf = self.writer._get_write_buf(msg)
         self.assertEqual(len(buf), msg.length)
 
+    def test_batch(self):
+        """Test that the messages sent in a batch are written together
+        at the end of the outermost batch"""
+        msg = message.Message()
+        self.writer.begin_batch()
+        self.writer.begin_batch()
+        self.writer.send_msg(msg)
+        self.writer.end_batch()
+        self.writer.send_msg(msg)
+        self._transport.writelines.assert_not_called()
+        self.writer.end_batch()
+        self._transport.writelines.assert_called_once_with(ANY)
+        self.assertEqual(len(self._transport.writelines.call_args[0][0]), 2)
+        self._writes.assert_not_called()
+
+    def test_pending_backpressure(self):
+        """Test that reading pauses when too many requests are pending,
+        and resumes once half of them were answered"""
+        writer = server.Writer("mai.facebook.com",
+                               "hss.mai.facebook.com",
+                               "127.0.0.1",
+                               self._transport,
+                               max_pending=4)
+        for _ in range(3):
+            writer.add_pending()
+        self._transport.pause_reading.assert_not_called()
+        writer.add_pending()
+        writer.add_pending()
+        self._transport.pause_reading.assert_called_once_with()
+
+        for _ in range(2):
+            writer.remove_pending()
+        self._transport.resume_reading.assert_not_called()
+        writer.remove_pending()
+        self._transport.resume_reading.assert_called_once_with()
+
     def test_write(self):
         """Test that the writer will push to the transport"""
         msg = memoryview(b'helloworld')
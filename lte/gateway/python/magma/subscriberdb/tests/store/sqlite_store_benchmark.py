@@ -0,0 +1,103 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark of SqliteStore.resync with 100k subscribers and 0.1% changes,
+with the previous delete-all and reinsert and with the diff-based resync.
+
+Not collected by the unit test runner, run it explicitly with:
+    python3 -m pytest -s magma/subscriberdb/tests/store/sqlite_store_benchmark.py
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+from lte.protos.subscriberdb_pb2 import SubscriberData
+from magma.subscriberdb.sid import SIDUtils
+from magma.subscriberdb.store.sqlite import SqliteStore
+
+NUM_SUBSCRIBERS = 100 * 1000
+CHURN = 0.001
+
+
+class _ReinsertingSqliteStore(SqliteStore):
+    """ Previous implementation: delete everything and reinsert """
+
+    def resync(self, subscribers):
+        with self.conn:
+            res = self.conn.execute(
+                "SELECT subscriber_id, data FROM subscriberdb")
+            current_state = {}
+            for row in res:
+                sub = SubscriberData()
+                sub.ParseFromString(row[1])
+                current_state[row[0]] = sub.state
+
+            self.conn.execute("DELETE FROM subscriberdb")
+
+            for sub in subscribers:
+                sid = SIDUtils.to_str(sub.sid)
+                if sid in current_state:
+                    sub.state.CopyFrom(current_state[sid])
+                self.conn.execute(
+                    "INSERT INTO subscriberdb(subscriber_id, data) "
+                    "VALUES (?, ?)", (sid, sub.SerializeToString()))
+
+
+def _subscribers(generation):
+    """
+    Subscriber list as streamed by the cloud. Every generation changes
+    the auth key of a different CHURN share of the subscribers.
+    """
+    changed = int(NUM_SUBSCRIBERS * CHURN)
+    subscribers = []
+    for i in range(NUM_SUBSCRIBERS):
+        sub = SubscriberData(sid=SIDUtils.to_pb('IMSI%015d' % i))
+        sub.lte.auth_key = b'\x00' * 16
+        if generation * changed <= i < (generation + 1) * changed:
+            sub.lte.auth_key = b'\x01' * 16
+        sub.sub_profile = 'default'
+        subscribers.append(sub)
+    return subscribers
+
+
+class SqliteStoreBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _run_resyncs(self, store_cls):
+        store = store_cls(os.path.join(self._dir.name, store_cls.__name__))
+        store.resync(_subscribers(0))
+        elapsed = []
+        for generation in range(1, 4):
+            subscribers = _subscribers(generation)
+            start = time.perf_counter()
+            store.resync(subscribers)
+            elapsed.append(time.perf_counter() - start)
+        self.assertEqual(NUM_SUBSCRIBERS, len(store.list_subscribers()))
+        return min(elapsed)
+
+    def test_resync(self):
+        for name, store_cls in (('reinsert', _ReinsertingSqliteStore),
+                                ('diff', SqliteStore)):
+            elapsed = self._run_resyncs(store_cls)
+            print('\n%s: %d subscribers, %.1f%% changed, %.3f s per resync'
+                  % (name, NUM_SUBSCRIBERS, CHURN * 100, elapsed))
+
+
+if __name__ == "__main__":
+    unittest.main()
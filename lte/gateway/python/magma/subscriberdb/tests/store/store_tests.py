@@ -109,6 +109,87 @@ class StoreTests(unittest.TestCase):
             with self._store.edit_subscriber('IMSI3000') as subs:
                 pass
 
+    def test_subscriber_resync(self):
+        """
+        Test if resync writes only the changed subscribers and keeps the
+        state of the existing ones
+        """
+        (sid1, _) = self._add_subscriber('IMSI11111')
+        (sid2, _) = self._add_subscriber('IMSI22222')
+        self._add_subscriber('IMSI33333')
+        with self._store.edit_subscriber(sid1) as subs:
+            subs.state.lte_auth_next_seq = 10
+        with self._store.edit_subscriber(sid2) as subs:
+            subs.state.lte_auth_next_seq = 20
+
+        sub1 = SubscriberData(sid=SIDUtils.to_pb(sid1))
+        sub2 = SubscriberData(sid=SIDUtils.to_pb(sid2))
+        sub2.lte.auth_key = b'1234'
+        sub4 = SubscriberData(sid=SIDUtils.to_pb('IMSI44444'))
+        self._store.resync([sub1, sub2, sub4])
+
+        self.assertEqual(self._store.list_subscribers(),
+                         [sid1, sid2, 'IMSI44444'])
+        data1 = self._store.get_subscriber_data(sid1)
+        self.assertEqual(data1.state.lte_auth_next_seq, 10)
+        data2 = self._store.get_subscriber_data(sid2)
+        self.assertEqual(data2.lte.auth_key, b'1234')
+        self.assertEqual(data2.state.lte_auth_next_seq, 20)
+        self.assertEqual(self._store.get_subscriber_data('IMSI44444'), sub4)
+
+    def test_change_callback(self):
+        """
+        Test if the change callbacks run on changes other than to the state
+        """
+        changes = []
+        self._store.add_change_callback(changes.append)
+        (sid1, sub1) = self._add_subscriber('IMSI11111')
+        self._add_subscriber('IMSI22222')
+        self.assertEqual(changes, [[sid1], ['IMSI22222']])
+
+        with self._store.edit_subscriber(sid1) as subs:
+            subs.state.lte_auth_next_seq = 10
+        sub1.state.lte_auth_next_seq = 11
+        self._store.update_subscriber(sub1)
+        self.assertEqual(len(changes), 2)
+
+        sub1.lte.auth_key = b'1234'
+        self._store.update_subscriber(sub1)
+        with self._store.edit_subscriber(sid1) as subs:
+            subs.lte.auth_key = b'5678'
+        self.assertEqual(changes[2:], [[sid1], [sid1]])
+
+        self._store.resync([sub1])
+        self.assertEqual(changes[4:], [['IMSI22222', sid1]])
+        self._store.delete_subscriber(sid1)
+        self._store.delete_all_subscribers()
+        self.assertEqual(changes[5:], [[sid1], None])
+
+    def test_resync_legacy_table(self):
+        """
+        Test if rows written without a digest are rewritten on resync
+        """
+        legacy_store = SqliteStore("file:legacy?mode=memory&cache=shared")
+        conn = legacy_store.conn
+        with conn:
+            conn.execute("DROP TABLE subscriberdb")
+            conn.execute("CREATE TABLE subscriberdb"
+                         "(subscriber_id text PRIMARY KEY, data text)")
+            sub = SubscriberData(sid=SIDUtils.to_pb('IMSI11111'))
+            sub.state.lte_auth_next_seq = 10
+            conn.execute("INSERT INTO subscriberdb(subscriber_id, data) "
+                         "VALUES (?, ?)",
+                         ('IMSI11111', sub.SerializeToString()))
+        # The new store adds the digest column to the existing table
+        store = SqliteStore("file:legacy?mode=memory&cache=shared")
+
+        sub = SubscriberData(sid=SIDUtils.to_pb('IMSI11111'))
+        sub.lte.auth_key = b'1234'
+        store.resync([sub])
+        data = store.get_subscriber_data('IMSI11111')
+        self.assertEqual(data.lte.auth_key, b'1234')
+        self.assertEqual(data.state.lte_auth_next_seq, 10)
+
 
 if __name__ == "__main__":
     unittest.main()
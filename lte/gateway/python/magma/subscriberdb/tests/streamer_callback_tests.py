@@ -18,10 +18,13 @@ import unittest
 import unittest.mock
 
 from lte.protos.s6a_service_pb2 import DeleteSubscriberRequest
+from lte.protos.subscriberdb_pb2 import LTESubscription, SubscriberData
+from magma.subscriberdb.sid import SIDUtils
 from magma.subscriberdb.store.sqlite import SqliteStore
 from magma.subscriberdb.streamer_callback import SubscriberDBStreamerCallback
 
 from magma.common.service_registry import ServiceRegistry
+from orc8r.protos.streamer_pb2 import DataUpdate
 
 
 class MockFuture(object):
@@ -49,6 +52,7 @@ class SubscriberDBStreamerCallbackTests(unittest.TestCase):
 
     def setUp(self):
         store = SqliteStore('file::memory:')
+        self._store = store
         self._streamer_callback = \
             SubscriberDBStreamerCallback(store, loop=asyncio.new_event_loop())
         ServiceRegistry.add_service('test', '0.0.0.0', 0)
@@ -87,6 +91,47 @@ class SubscriberDBStreamerCallbackTests(unittest.TestCase):
         mock.DeleteSubscriber.future.assert_called_once_with(
             DeleteSubscriberRequest(imsi_list=["101", "303"]))
 
+    @unittest.mock.patch('magma.subscriberdb.streamer_callback.S6aServiceStub')
+    def test_incremental_updates(self, s6a_service_mock_stub):
+        """
+        Test that non-resync updates only touch the changed subscribers
+        """
+        mock = unittest.mock.Mock()
+        mock.DeleteSubscriber.future.side_effect = [unittest.mock.Mock()]
+        s6a_service_mock_stub.side_effect = [mock]
+
+        def _sub(sid, state):
+            sub = SubscriberData(sid=SIDUtils.to_pb(sid))
+            sub.lte.state = state
+            return sub
+
+        for sid in ('IMSI101', 'IMSI202', 'IMSI303'):
+            sub = _sub(sid, LTESubscription.ACTIVE)
+            sub.state.lte_auth_next_seq = 1000
+            self._store.add_subscriber(sub)
+
+        updates = [
+            # Deactivated
+            DataUpdate(key='IMSI101', value=_sub(
+                'IMSI101', LTESubscription.INACTIVE).SerializeToString()),
+            # Deleted, without the IMSI prefix
+            DataUpdate(key='303', value=b''),
+            # Added
+            DataUpdate(key='IMSI404', value=_sub(
+                'IMSI404', LTESubscription.ACTIVE).SerializeToString()),
+        ]
+        self._streamer_callback.process_update('subscriberdb', updates,
+                                               False)
+
+        self.assertEqual(['IMSI101', 'IMSI202', 'IMSI404'],
+                         sorted(self._store.list_subscribers()))
+        sub = self._store.get_subscriber_data('IMSI101')
+        self.assertEqual(LTESubscription.INACTIVE, sub.lte.state)
+        # Local state is left intact
+        self.assertEqual(1000, sub.state.lte_auth_next_seq)
+        mock.DeleteSubscriber.future.assert_called_once_with(
+            DeleteSubscriberRequest(imsi_list=["101", "303"]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -90,7 +90,6 @@ setup(
         'flask>=1.0.2',
         'aioeventlet>=0.4',
         'aiodns>=1.1.1',
-        'pymemoize>=1.0.2',
         'wsgiserver>=1.3',
         'pycrypto>=2.6.1',
         # pin recursive dependencies of ryu and others
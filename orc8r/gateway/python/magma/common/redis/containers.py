@@ -14,7 +14,8 @@ from copy import deepcopy
 import redis
 from redis.lock import Lock
 import redis_collections
-from typing import Any, Iterator, List, MutableMapping, Optional, TypeVar
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, \
+    Optional, Tuple, TypeVar
 
 from magma.common.redis.serializers import RedisSerde
 from orc8r.protos.redis_pb2 import RedisState
@@ -26,6 +27,9 @@ from orc8r.protos.redis_pb2 import RedisState
 
 T = TypeVar('T')
 
+# Number of keys requested per SCAN call and fetched per MGET
+SCAN_BATCH_SIZE = 1000
+
 class RedisList(redis_collections.List):
     """
     List-like interface serializing elements to a Redis datastore.
@@ -101,7 +105,71 @@ class RedisSet(redis_collections.Set):
         return {deepcopy(elt, memo) for elt in self}
 
 
-class RedisHashDict(redis_collections.DefaultDict):
+class LocalCacheMixin:
+    """
+    Read-through cache of deserialized values for the Redis dicts.
+
+    Values are kept in process memory along with the RedisState version they
+    were read or written with, so that repeated reads of a key skip the Redis
+    round trip and the deserialization, and writes skip the version lookup.
+
+    The cache is only coherent if the instance is the single writer of its
+    keys, i.e. in the process that owns them. Writes made by other processes
+    are not seen until the key is evicted: `check_cache_versions` compares
+    the cached versions against Redis in one round trip, and evicts the keys
+    that were changed externally.
+
+    Cached values are shared with the callers, they must not be mutated
+    in-place without being written back.
+    """
+    _local_cache = None  # type: Optional[Dict[str, Tuple[int, Any]]]
+
+    @property
+    def local_cache_enabled(self) -> bool:
+        return self._local_cache is not None
+
+    def invalidate_cache(self, key: Optional[str] = None) -> None:
+        """Evict *key* from the local cache, or every key if it is None"""
+        if self._local_cache is None:
+            return
+        if key is None:
+            self._local_cache.clear()
+        else:
+            self._local_cache.pop(key, None)
+
+    def _cache_put(self, key: str, version: int, value: Any) -> None:
+        if self._local_cache is not None:
+            self._local_cache[key] = (version, value)
+
+    def _cache_evict(self, key: str) -> None:
+        if self._local_cache is not None:
+            self._local_cache.pop(key, None)
+
+    def _evict_stale(self, keys: List[str],
+                     serialized_values: List[Optional[bytes]]) -> List[str]:
+        """Evict the keys whose cached version differs from the version of
+        the matching serialized value (None for a deleted key).
+        """
+        evicted = []
+        for key, serialized_value in zip(keys, serialized_values):
+            entry = self._local_cache.get(key)
+            if entry is None:
+                continue
+            if serialized_value is not None:
+                proto_wrapper = RedisState()
+                proto_wrapper.ParseFromString(serialized_value)
+                if not proto_wrapper.is_garbage and \
+                        proto_wrapper.version == entry[0]:
+                    continue
+            # Only drop the entry that was checked, it may have been
+            # replaced by a concurrent write in the meantime
+            if self._local_cache.get(key) is entry:
+                self._local_cache.pop(key, None)
+            evicted.append(key)
+        return evicted
+
+
+class RedisHashDict(LocalCacheMixin, redis_collections.DefaultDict):
     """
     Dict-like interface serializing elements to a Redis datastore. This dict
     utilizes Redis's hashmap functionality
@@ -128,6 +196,7 @@ class RedisHashDict(redis_collections.DefaultDict):
         self, client, key, serialize, deserialize,
         default_factory=None,
         writeback=False,
+        local_cache=False,
     ):
         """
         Initialize instance.
@@ -143,6 +212,10 @@ class RedisHashDict(redis_collections.DefaultDict):
                 local cache of values and the `sync` method can be called to
                 store these values. NOTE: only use this option if syncing
                 between services is not important.
+            local_cache (bool): if set to true, values read or written by
+                this instance are kept in process memory along with their
+                version, see `LocalCacheMixin`. Only use this option in the
+                process that owns the hash.
 
         Returns:
             redis_dict (redis_collections.Dict): persistent dict-like interface
@@ -155,6 +228,32 @@ class RedisHashDict(redis_collections.DefaultDict):
         self._unpickle = deserialize
         super().__init__(
             default_factory, redis=client, key=key, writeback=writeback)
+        self._local_cache = {} if local_cache else None
+
+    def __contains__(self, key):
+        if self._local_cache is not None and key in self._local_cache:
+            return True
+        return super().__contains__(key)
+
+    def __getitem__(self, key):
+        """Return the item of dictionary with key *key*.
+
+        Override in order to serve the item from the local cache
+        """
+        if self._local_cache is None:
+            return super().__getitem__(key)
+        try:
+            return self._local_cache[key][1]
+        except KeyError:
+            pass
+        pickled_value = self.redis.hget(self.key, self._pickle_key(key))
+        if pickled_value is None:
+            if hasattr(self, '__missing__'):
+                return self.__missing__(key)
+            raise KeyError(key)
+        value = self._unpickle(pickled_value)
+        self._local_cache[key] = (_parse_version(pickled_value), value)
+        return value
 
     def __setitem__(self, key, value):
         """Set ``d[key]`` to *value*.
@@ -168,6 +267,23 @@ class RedisHashDict(redis_collections.DefaultDict):
 
         if self.writeback:
             self.cache[key] = value
+        self._cache_put(key, version + 1, value)
+
+    def __delitem__(self, key):
+        self._cache_evict(key)
+        super().__delitem__(key)
+
+    def pop(self, key, *args):
+        self._cache_evict(key)
+        return super().pop(key, *args)
+
+    def popitem(self):
+        self.invalidate_cache()
+        return super().popitem()
+
+    def clear(self, pipe=None):
+        self.invalidate_cache()
+        super().clear(pipe)
 
     def __copy__(self):
         return {key: self[key] for key in self}
@@ -179,6 +295,8 @@ class RedisHashDict(redis_collections.DefaultDict):
         """Return the version of the value for key *key*. Returns 0 if
         key is not in the map
         """
+        if self._local_cache is not None and key in self._local_cache:
+            return self._local_cache[key][0]
         try:
             value = self.cache[key]
         except KeyError:
@@ -191,45 +309,65 @@ class RedisHashDict(redis_collections.DefaultDict):
         proto_wrapper.ParseFromString(value)
         return proto_wrapper.version
 
+    def check_cache_versions(self) -> List[str]:
+        """Evict the locally cached values whose version no longer matches
+        the one stored in Redis, with a single HMGET.
+
+        Returns the list of evicted keys.
+        """
+        if not self._local_cache:
+            return []
+        keys = list(self._local_cache)
+        pickled_values = self.redis.hmget(
+            self.key, [self._pickle_key(key) for key in keys])
+        return self._evict_stale(keys, pickled_values)
 
-class RedisFlatDict(MutableMapping[str, T]):
+
+class RedisFlatDict(LocalCacheMixin, MutableMapping[str, T]):
     """
     Dict-like interface serializing elements to a Redis datastore. This
     dict stores key directly (i.e. without a hashmap).
+
+    Iteration walks the keys with SCAN, so that Redis is not blocked on large
+    key spaces, and fetches their values with one MGET per batch of keys.
+    Each value's RedisState wrapper is parsed once to filter out garbage and
+    read its version. Use the bulk `items`, `versions` and `get_many` methods
+    rather than a lookup per key.
     """
 
-    def __init__(self, client: redis.Redis, serde: RedisSerde[T]):
+    def __init__(self, client: redis.Redis, serde: RedisSerde[T],
+                 local_cache: bool = False):
         """
         Args:
             client (redis.Redis): Redis client object
             serde (): RedisSerde for de/serializing the object stored
+            local_cache (bool): if set to true, values read or written by
+                this instance are kept in process memory along with their
+                version, see `LocalCacheMixin`. Only use this option in the
+                process that owns the keys.
         """
         super().__init__()
         self.redis = client
         self.serde = serde
         self.redis_type = serde.redis_type
+        self._local_cache = {} if local_cache else None
 
     def __len__(self) -> int:
         """Return the number of items in the dictionary."""
-        return len(self.keys())
+        return sum(1 for _ in self)
 
     def __iter__(self) -> Iterator[str]:
         """Return an iterator over the keys of the dictionary."""
-        type_pattern = "*:" + self.redis_type
-        for k in self.redis.keys(pattern=type_pattern):
-            try:
-                deserialized_key = k.decode('utf-8')
-                split_key = deserialized_key.split(":", 1)
-            except AttributeError:
-                split_key = k.split(":", 1)
-            if self.is_garbage(split_key[0]):
-                continue
-            yield split_key[0]
+        for key, proto_wrapper, _ in self._scan():
+            if not proto_wrapper.is_garbage:
+                yield key
 
     def __contains__(self, key: str) -> bool:
         """Return ``True`` if *key* is present and not garbage,
         else ``False``.
         """
+        if self._local_cache is not None and key in self._local_cache:
+            return True
         composite_key = self._make_composite_key(key)
         return bool(self.redis.exists(composite_key)) and \
                not self.is_garbage(key)
@@ -241,6 +379,11 @@ class RedisFlatDict(MutableMapping[str, T]):
         """
         if ':' in key:
             raise ValueError("Key %s cannot contain ':' char" % key)
+        if self._local_cache is not None:
+            try:
+                return self._local_cache[key][1]
+            except KeyError:
+                pass
         composite_key = self._make_composite_key(key)
         serialized_value = self.redis.get(composite_key)
         if serialized_value is None:
@@ -251,7 +394,9 @@ class RedisFlatDict(MutableMapping[str, T]):
         if proto_wrapper.is_garbage:
             raise KeyError("Key %s is garbage" % key)
 
-        return self.serde.deserialize(serialized_value)
+        value = self.serde.deserialize(serialized_value)
+        self._cache_put(key, proto_wrapper.version, value)
+        return value
 
     def __setitem__(self, key: str, value: T) -> Any:
         """Set ``d[key:type]`` to *value*."""
@@ -260,7 +405,9 @@ class RedisFlatDict(MutableMapping[str, T]):
         version = self.get_version(key)
         serialized_value = self.serde.serialize(value, version + 1)
         composite_key = self._make_composite_key(key)
-        return self.redis.set(composite_key, serialized_value)
+        ret = self.redis.set(composite_key, serialized_value)
+        self._cache_put(key, version + 1, value)
+        return ret
 
     def __delitem__(self, key: str) -> int:
         """Remove ``d[key:type]`` from dictionary.
@@ -268,6 +415,7 @@ class RedisFlatDict(MutableMapping[str, T]):
         """
         if ':' in key:
             raise ValueError("Key %s cannot contain ':' char" % key)
+        self._cache_evict(key)
         composite_key = self._make_composite_key(key)
         deleted_count = self.redis.delete(composite_key)
         if not deleted_count:
@@ -288,6 +436,7 @@ class RedisFlatDict(MutableMapping[str, T]):
         Clear all keys in the dictionary. Objects are immediately deleted
         (i.e. not garbage collected)
         """
+        self.invalidate_cache()
         for key in self.keys():
             composite_key = self._make_composite_key(key)
             self.redis.delete(composite_key)
@@ -296,6 +445,8 @@ class RedisFlatDict(MutableMapping[str, T]):
         """Return the version of the value for key *key:type*. Returns 0 if
         key is not in the map
         """
+        if self._local_cache is not None and key in self._local_cache:
+            return self._local_cache[key][0]
         composite_key = self._make_composite_key(key)
         value = self.redis.get(composite_key)
         if value is None:
@@ -311,10 +462,60 @@ class RedisFlatDict(MutableMapping[str, T]):
         """
         return list(self.__iter__())
 
+    def items(self) -> List[Tuple[str, T]]:
+        """Return a copy of the dictionary's list of (key, value) pairs,
+        fetched in bulk
+        """
+        return [(key, self._deserialize(key, proto_wrapper, serialized_value))
+                for key, proto_wrapper, serialized_value in self._scan()
+                if not proto_wrapper.is_garbage]
+
+    def values(self) -> List[T]:
+        """Return a copy of the dictionary's list of values, fetched in
+        bulk
+        """
+        return [value for _, value in self.items()]
+
+    def versions(self, keys: Optional[Iterable[str]] = None) \
+            -> Dict[str, int]:
+        """Return the version of every key of the dictionary, or of *keys*
+        only, without deserializing the values. Keys that are not in the
+        map or are garbage are left out.
+        """
+        if keys is None:
+            states = self._scan()
+        else:
+            states = self._fetch_many(list(keys))
+        return {key: proto_wrapper.version
+                for key, proto_wrapper, _ in states
+                if not proto_wrapper.is_garbage}
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, T]:
+        """Return the values of *keys* with one MGET per batch of keys.
+        Keys that are not in the map or are garbage are left out.
+        """
+        values = {}
+        to_fetch = []
+        for key in keys:
+            if ':' in key:
+                raise ValueError("Key %s cannot contain ':' char" % key)
+            if self._local_cache is not None and key in self._local_cache:
+                values[key] = self._local_cache[key][1]
+            else:
+                to_fetch.append(key)
+        for key, proto_wrapper, serialized_value in \
+                self._fetch_many(to_fetch):
+            if proto_wrapper.is_garbage:
+                continue
+            values[key] = self._deserialize(key, proto_wrapper,
+                                            serialized_value)
+        return values
+
     def mark_as_garbage(self, key: str) -> Any:
         """Mark ``d[key:type]`` for garbage collection
         Raises a KeyError if *key:type* is not in the map.
         """
+        self._cache_evict(key)
         composite_key = self._make_composite_key(key)
         value = self.redis.get(composite_key)
         if value is None:
@@ -343,18 +544,8 @@ class RedisFlatDict(MutableMapping[str, T]):
         """Return a copy of the dictionary's list of keys that are garbage
         Note: for redis *key:type* key is returned
         """
-        garbage_keys = []
-        type_pattern = "*:" + self.redis_type
-        for k in self.redis.keys(pattern=type_pattern):
-            try:
-                deserialized_key = k.decode('utf-8')
-                split_key = deserialized_key.split(":", 1)
-            except AttributeError:
-                split_key = k.split(":", 1)
-            if not self.is_garbage(split_key[0]):
-                continue
-            garbage_keys.append(split_key[0])
-        return garbage_keys
+        return [key for key, proto_wrapper, _ in self._scan()
+                if proto_wrapper.is_garbage]
 
     def delete_garbage(self, key) -> bool:
         """Remove ``d[key:type]`` from dictionary iff the object is garbage
@@ -365,6 +556,19 @@ class RedisFlatDict(MutableMapping[str, T]):
         count = self.__delitem__(key)
         return count > 0
 
+    def check_cache_versions(self) -> List[str]:
+        """Evict the locally cached values whose version no longer matches
+        the one stored in Redis, with a single MGET.
+
+        Returns the list of evicted keys.
+        """
+        if not self._local_cache:
+            return []
+        keys = list(self._local_cache)
+        serialized_values = self.redis.mget(
+            [self._make_composite_key(key) for key in keys])
+        return self._evict_stale(keys, serialized_values)
+
     def lock(self, key: str) -> Lock:
         """Lock the dictionary for key *key*"""
         lock_key = self._make_composite_key(key) + ":lock"
@@ -372,3 +576,66 @@ class RedisFlatDict(MutableMapping[str, T]):
 
     def _make_composite_key(self, key):
         return key + ":" + self.redis_type
+
+    def _scan(self) -> Iterator[Tuple[str, RedisState, bytes]]:
+        """Walk the keys of the dictionary with SCAN and fetch their values
+        with one MGET per batch. Garbage keys are included.
+
+        Yields (key, RedisState wrapper, serialized value) tuples. Keys
+        returned more than once by SCAN are yielded once, keys deleted
+        during the scan are skipped.
+        """
+        type_pattern = "*:" + self.redis_type
+        seen = set()
+        batch = []
+        for k in self.redis.scan_iter(match=type_pattern,
+                                      count=SCAN_BATCH_SIZE):
+            try:
+                key = k.decode('utf-8').split(":", 1)[0]
+            except AttributeError:
+                key = k.split(":", 1)[0]
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                yield from self._fetch_states(batch)
+                batch = []
+        if batch:
+            yield from self._fetch_states(batch)
+
+    def _fetch_many(self, keys: List[str]) \
+            -> Iterator[Tuple[str, RedisState, bytes]]:
+        """Fetch the values of *keys* with one MGET per batch of keys"""
+        for i in range(0, len(keys), SCAN_BATCH_SIZE):
+            yield from self._fetch_states(keys[i:i + SCAN_BATCH_SIZE])
+
+    def _fetch_states(self, keys: List[str]) \
+            -> Iterator[Tuple[str, RedisState, bytes]]:
+        composite_keys = [self._make_composite_key(key) for key in keys]
+        serialized_values = self.redis.mget(composite_keys)
+        for key, serialized_value in zip(keys, serialized_values):
+            if serialized_value is None:
+                continue
+            proto_wrapper = RedisState()
+            proto_wrapper.ParseFromString(serialized_value)
+            yield key, proto_wrapper, serialized_value
+
+    def _deserialize(self, key: str, proto_wrapper: RedisState,
+                     serialized_value: bytes) -> T:
+        """Deserialize a fetched value, or reuse the locally cached one if
+        it has the same version
+        """
+        if self._local_cache is not None:
+            entry = self._local_cache.get(key)
+            if entry is not None and entry[0] == proto_wrapper.version:
+                return entry[1]
+        value = self.serde.deserialize(serialized_value)
+        self._cache_put(key, proto_wrapper.version, value)
+        return value
+
+
+def _parse_version(serialized_value: bytes) -> int:
+    proto_wrapper = RedisState()
+    proto_wrapper.ParseFromString(serialized_value)
+    return proto_wrapper.version
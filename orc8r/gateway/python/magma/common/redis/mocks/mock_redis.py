@@ -11,6 +11,8 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import re
+from collections import deque
+from fnmatch import fnmatchcase
 from redis.exceptions import RedisError
 
 
@@ -19,6 +21,10 @@ class MockRedis(object):
     MockRedis implements a mock Redis Server using an in-memory dictionary
     """
     redis = {}
+    # Keyspace notifications of set and delete are published to the
+    # subscribed pubsubs if 'K' is in the flags
+    notify_keyspace_events = ''
+    pubsubs = []
 
     def __init__(self, host, port):
         self.host = host
@@ -26,6 +32,8 @@ class MockRedis(object):
 
     def serialize_key(self, key):
         """ Serialize key to plaintext encoded as UTF-8 bytes. """
+        if isinstance(key, bytes):
+            return key
         return key.encode('utf-8')
 
     def deserialize_key(self, serialized):
@@ -40,6 +48,7 @@ class MockRedis(object):
         skey = self.serialize_key(key)
         if skey in self.redis:
             del self.redis[skey]
+            self._notify_keyspace(key, 'del')
             return 1
         return 0
 
@@ -57,6 +66,12 @@ class MockRedis(object):
         """Mock set."""
         skey = self.serialize_key(key)
         self.redis[skey] = value
+        self._notify_keyspace(key, 'set')
+
+    def mget(self, keys):
+        """Mock mget."""
+        skeys = [self.serialize_key(key) for key in keys]
+        return [self.redis.get(skey) for skey in skeys]
 
     def keys(self, pattern=".*"):
         """ Mock keys with regex pattern matching."""
@@ -79,6 +94,11 @@ class MockRedis(object):
                 ret.append(key)
         return ret
 
+    # pylint: disable=unused-argument
+    def scan_iter(self, match=".*", count=None):
+        """ Mock scan_iter, backed by keys."""
+        return iter(self.keys(pattern=match))
+
     def hget(self, hashkey, key):
         """Mock hget."""
 
@@ -88,6 +108,16 @@ class MockRedis(object):
         return self.redis[hashkey][skey] if skey in self.redis[hashkey] \
             else None
 
+    def hexists(self, hashkey, key):
+        """Mock hexists."""
+
+        return self.hget(hashkey, key) is not None
+
+    def hmget(self, hashkey, keys):
+        """Mock hmget."""
+
+        return [self.hget(hashkey, key) for key in keys]
+
     def hgetall(self, hashkey):
         """Mock hgetall."""
 
@@ -111,14 +141,32 @@ class MockRedis(object):
     def hdel(self, hashkey, key):
         """ Mock hdel"""
         skey = self.serialize_key(key)
-        if hashkey not in self.redis:
-            return
-        self.redis[hashkey].pop(skey)
+        if hashkey not in self.redis or skey not in self.redis[hashkey]:
+            return 0
+        del self.redis[hashkey][skey]
+        return 1
 
-    def pipeline(self):
+    # pylint: disable=unused-argument
+    def pipeline(self, transaction=True):
         """ Mock pipline"""
         return MockRedisPipeline(self)
 
+    # pylint: disable=unused-argument
+    def config_get(self, pattern="*"):
+        """ Mock config_get, only for notify-keyspace-events."""
+        return {'notify-keyspace-events': self.notify_keyspace_events}
+
+    def pubsub(self):
+        """ Mock pubsub."""
+        return MockRedisPubSub()
+
+    def _notify_keyspace(self, key, event):
+        if 'K' not in self.notify_keyspace_events:
+            return
+        channel = '__keyspace@0__:' + key
+        for pubsub in self.pubsubs:
+            pubsub.publish(channel, event)
+
     # pylint: disable=unused-argument
     def transaction(self, func, *args, **kwargs):
         """ Mock transaction."""
@@ -164,14 +212,31 @@ class MockUnavailableRedis(object):
         """Mock set."""
         raise RedisError("mock redis error")
 
+    def mget(self, keys):
+        """Mock mget."""
+        raise RedisError("mock redis error")
+
     def keys(self, pattern=".*"):
         """ Mock keys with regex pattern matching."""
         raise RedisError("mock redis error")
 
+    # pylint: disable=unused-argument
+    def scan_iter(self, match=".*", count=None):
+        """ Mock scan_iter."""
+        raise RedisError("mock redis error")
+
     def hget(self, hashkey, key):
         """Mock hget."""
         raise RedisError("mock redis error")
 
+    def hexists(self, hashkey, key):
+        """Mock hexists."""
+        raise RedisError("mock redis error")
+
+    def hmget(self, hashkey, keys):
+        """Mock hmget."""
+        raise RedisError("mock redis error")
+
     def hgetall(self, hashkey):
         """Mock hgetall."""
         raise RedisError("mock redis error")
@@ -188,48 +253,104 @@ class MockUnavailableRedis(object):
         """ Mock hdel"""
         raise RedisError("mock redis error")
 
-    def pipeline(self):
+    # pylint: disable=unused-argument
+    def pipeline(self, transaction=True):
         """ Mock pipline"""
         raise RedisError("mock redis error")
 
+    # pylint: disable=unused-argument
+    def config_get(self, pattern="*"):
+        """ Mock config_get."""
+        raise RedisError("mock redis error")
+
+    def pubsub(self):
+        """ Mock pubsub."""
+        raise RedisError("mock redis error")
+
     # pylint: disable=unused-argument
     def transaction(self, func, *args, **kwargs):
         """ Mock transaction."""
         raise RedisError("mock redis error")
 
 class MockRedisPipeline(object):
-    """Mock redis-python pipeline object. """
+    """Mock redis-python pipeline object. Commands are queued and only
+    applied to the mock server on execute."""
 
     def __init__(self, redis):
         """Initialize the object."""
         self.redis = redis
-        self.pipe_res = []
+        self.command_stack = []
+
+    def __len__(self):
+        return len(self.command_stack)
 
     def execute(self):
         """ Mock execute."""
-        return self.pipe_res
+        pipe_res = [command(*args) for command, args in self.command_stack]
+        self.command_stack = []
+        return pipe_res
 
     def delete(self, key):
         """ Mock delete."""
-        del_res = self.redis.delete(key)
-        self.pipe_res.append(del_res)
-        return del_res
+        self.command_stack.append((self.redis.delete, (key,)))
+
+    def set(self, key, value):
+        """ Mock set."""
+        self.command_stack.append((self.redis.set, (key, value)))
 
     def hget(self, hashkey, key):
         """Mock hget."""
-        hget_res = self.redis.hget(hashkey, key)
-        self.pipe_res.append(hget_res)
-        return hget_res
+        self.command_stack.append((self.redis.hget, (hashkey, key)))
+
+    def hset(self, hashkey, key, value):
+        """Mock hset."""
+        self.command_stack.append((self.redis.hset, (hashkey, key, value)))
 
     def hdel(self, hashkey, key):
         """ Mock hdel"""
-        hdel_res = self.redis.hdel(hashkey, key)
-        self.pipe_res.append(hdel_res)
-        return hdel_res
+        self.command_stack.append((self.redis.hdel, (hashkey, key)))
 
     def multi(self):
         """ Mock multi """
-        self.pipe_res.clear()
+        self.command_stack = []
+
+
+class MockRedisPubSub(object):
+    """Mock redis-python pubsub object, only supporting psubscribe"""
+
+    def __init__(self):
+        self.patterns = []
+        self.messages = deque()
+
+    def psubscribe(self, *patterns):
+        """ Mock psubscribe."""
+        if not self.patterns:
+            MockRedis.pubsubs.append(self)
+        for pattern in patterns:
+            self.patterns.append(pattern)
+            self.messages.append({'type': 'psubscribe', 'pattern': None,
+                                  'channel': pattern.encode('utf-8'),
+                                  'data': len(self.patterns)})
+
+    def get_message(self):
+        """ Mock get_message."""
+        return self.messages.popleft() if self.messages else None
+
+    def close(self):
+        """ Mock close."""
+        if self in MockRedis.pubsubs:
+            MockRedis.pubsubs.remove(self)
+        self.patterns = []
+        self.messages.clear()
+
+    def publish(self, channel, data):
+        """ Deliver a message published on channel """
+        for pattern in self.patterns:
+            if fnmatchcase(channel, pattern):
+                self.messages.append({'type': 'pmessage',
+                                      'pattern': pattern.encode('utf-8'),
+                                      'channel': channel.encode('utf-8'),
+                                      'data': data.encode('utf-8')})
 
 
 class MockRedisLock(object):
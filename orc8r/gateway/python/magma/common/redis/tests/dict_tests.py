@@ -26,6 +26,7 @@ class RedisDictTests(TestCase):
     """
     @mock.patch("redis.Redis", MockRedis)
     def setUp(self):
+        MockRedis.redis.clear()
         client = get_default_client()
         # Use arbitrary orc8r proto to test with
         self._hash_dict = RedisHashDict(
@@ -170,6 +171,88 @@ class RedisDictTests(TestCase):
         with self.assertRaises(KeyError):
             self._flat_dict.mark_as_garbage(bad_key)
 
+    @mock.patch("redis.Redis", MockRedis)
+    def test_flat_bulk_methods(self):
+        expected = LogVerbosity(verbosity=1)
+        expected2 = LogVerbosity(verbosity=2)
+        self._flat_dict['k1'] = expected
+        self._flat_dict['k2'] = expected
+        self._flat_dict['k2'] = expected2
+        self._flat_dict['k3'] = expected
+        self._flat_dict.mark_as_garbage('k3')
+
+        # Values are fetched in bulk, not one GET per key
+        with mock.patch.object(self._flat_dict.redis, 'get') as get:
+            self.assertEqual(
+                [('k1', expected), ('k2', expected2)],
+                sorted(self._flat_dict.items(), key=lambda item: item[0]))
+            self.assertEqual({'k1': 1, 'k2': 2}, self._flat_dict.versions())
+            self.assertEqual({'k2': expected2},
+                             self._flat_dict.get_many(['k2', 'k3', 'k4']))
+            self.assertEqual(2, len(self._flat_dict))
+            self.assertEqual(['k3'], self._flat_dict.garbage_keys())
+            get.assert_not_called()
+
+    @mock.patch("redis.Redis", MockRedis)
+    def test_hash_local_cache(self):
+        client = get_default_client()
+        cached = RedisHashDict(
+            client,
+            "unittest",
+            get_proto_serializer(),
+            get_proto_deserializer(LogVerbosity),
+            local_cache=True)
+        expected = LogVerbosity(verbosity=1)
+        cached['key1'] = expected
+
+        # Reads are served from the cache without hitting Redis
+        with mock.patch.object(client, 'hget') as hget:
+            self.assertIs(expected, cached['key1'])
+            self.assertEqual(1, cached.get_version('key1'))
+            hget.assert_not_called()
+
+        # External writes are detected by the version check
+        self._hash_dict['key1'] = LogVerbosity(verbosity=2)
+        self.assertEqual(expected, cached['key1'])
+        self.assertEqual(['key1'], cached.check_cache_versions())
+        self.assertEqual(LogVerbosity(verbosity=2), cached['key1'])
+        self.assertEqual(2, cached.get_version('key1'))
+        self.assertEqual([], cached.check_cache_versions())
+
+        cached.pop('key1')
+        self.assertNotIn('key1', cached)
+        self.assertRaises(KeyError, cached.__getitem__, 'key1')
+
+    @mock.patch("redis.Redis", MockRedis)
+    def test_flat_local_cache(self):
+        client = get_default_client()
+        serde = RedisSerde('log_verbosity',
+                           get_proto_serializer(),
+                           get_proto_deserializer(LogVerbosity))
+        cached = RedisFlatDict(client, serde, local_cache=True)
+        expected = LogVerbosity(verbosity=1)
+        cached['key1'] = expected
+        cached['key2'] = expected
+
+        with mock.patch.object(client, 'get') as get:
+            self.assertIs(expected, cached['key1'])
+            self.assertEqual(1, cached.get_version('key1'))
+            get.assert_not_called()
+
+        self._flat_dict['key1'] = LogVerbosity(verbosity=2)
+        del self._flat_dict['key2']
+        self.assertEqual(['key1', 'key2'],
+                         sorted(cached.check_cache_versions()))
+        self.assertEqual(LogVerbosity(verbosity=2), cached['key1'])
+        self.assertNotIn('key2', cached)
+
+        cached.mark_as_garbage('key1')
+        self.assertIsNone(cached.get('key1'))
+
+        cached['key3'] = expected
+        cached.clear()
+        self.assertIsNone(cached.get('key3'))
+
 
 if __name__ == "__main__":
     main()
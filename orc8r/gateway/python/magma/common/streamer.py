@@ -12,6 +12,7 @@ limitations under the License.
 """
 
 import logging
+import random
 import threading
 import time
 from typing import Any, List
@@ -34,12 +35,14 @@ class StreamerClient(threading.Thread):
     StreamerClient provides an interface to communicate with the Streamer
     service in the cloud to get updates for a stream.
 
-    The StreamerClient spawns a thread which listens to updates and
-    schedules a callback in the asyncio event loop when an update
-    is received from the cloud.
+    The StreamerClient spawns a thread per stream which listens to updates
+    and schedules a callback in the asyncio event loop when an update
+    is received from the cloud. A slow or failing stream doesn't delay the
+    others.
 
-    If the connection to the cloud gets terminated, the StreamerClient
-    would retry (TBD: with exponential backoff) to connect back to the cloud.
+    Each stream is pulled every reconnect_sec seconds. If the connection to
+    the cloud fails, the stream is retried with exponential backoff and
+    jitter, up to max_backoff_sec seconds between attempts.
     """
 
     class Callback:
@@ -96,36 +99,72 @@ class StreamerClient(threading.Thread):
         self._stream_timeout = get_service_config_value(
             'streamer', 'stream_timeout', 150)
         logging.info("Streamer timeout: %d", self._stream_timeout)
+        self._max_backoff = get_service_config_value(
+            'streamer', 'max_backoff_sec', 600)
+        self._max_backoff = max(self._reconnect_pause, self._max_backoff)
 
     def run(self):
-        while True:
-            try:
-                channel = ServiceRegistry.get_rpc_channel(
-                        'streamer', ServiceRegistry.CLOUD)
-                client = StreamerStub(channel)
-                self.process_all_streams(client)
-            except Exception as exp:  # pylint: disable=broad-except
-                logging.error("Error with streamer: %s", exp)
-
-            # If the connection is terminated, wait for a period of time
-            # before connecting back to the cloud.
-            # TODO: make this more intelligent (exponential backoffs, etc.)
-            time.sleep(self._reconnect_pause)
-
-    def process_all_streams(self, client):
+        workers = []
         for stream_name, callback in self._stream_callbacks.items():
-            try:
-                self.process_stream_updates(client, stream_name, callback)
-
-                STREAMER_RESPONSES.labels(result='Success').inc()
-            except grpc.RpcError as err:
-                logging.error(
-                    "Error! Streaming from the cloud failed! [%s] %s",
-                    err.code(), err.details())
-                STREAMER_RESPONSES.labels(result='RpcError').inc()
-            except ValueError as err:
-                logging.error("Error! Streaming from cloud failed! %s", err)
-                STREAMER_RESPONSES.labels(result='ValueError').inc()
+            worker = threading.Thread(target=self._run_stream,
+                                      args=(stream_name, callback),
+                                      name='streamer-' + stream_name)
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+
+    def _run_stream(self, stream_name, callback):
+        failures = 0
+        while True:
+            if self.process_stream(stream_name, callback):
+                failures = 0
+                pause = self._reconnect_pause
+            else:
+                failures += 1
+                pause = self.get_backoff(failures)
+                logging.info("Retrying stream %s in %.1f seconds",
+                             stream_name, pause)
+            time.sleep(pause)
+
+    def get_backoff(self, failures: int) -> float:
+        """
+        Return the pause before the next attempt after *failures*
+        consecutive failures: a random duration between half and all of
+        reconnect_sec * 2^(failures - 1), capped at max_backoff_sec. The
+        jitter spreads out the reconnections of gateways that lost the
+        cloud at the same time.
+        """
+        exponent = min(failures - 1, 16)
+        cap = min(self._max_backoff, self._reconnect_pause * 2 ** exponent)
+        return random.uniform(cap / 2, cap)
+
+    def process_stream(self, stream_name, callback) -> bool:
+        """
+        Connect to the cloud and process the updates of a stream.
+
+        Returns True if the stream was processed successfully.
+        """
+        try:
+            channel = ServiceRegistry.get_rpc_channel(
+                'streamer', ServiceRegistry.CLOUD)
+            client = StreamerStub(channel)
+            self.process_stream_updates(client, stream_name, callback)
+            STREAMER_RESPONSES.labels(result='Success').inc()
+            return True
+        except grpc.RpcError as err:
+            logging.error(
+                "Error! Streaming %s from the cloud failed! [%s] %s",
+                stream_name, err.code(), err.details())
+            STREAMER_RESPONSES.labels(result='RpcError').inc()
+        except ValueError as err:
+            logging.error("Error! Streaming %s from cloud failed! %s",
+                          stream_name, err)
+            STREAMER_RESPONSES.labels(result='ValueError').inc()
+        except Exception as exp:  # pylint: disable=broad-except
+            logging.error("Error with streamer: %s", exp)
+        return False
 
     def process_stream_updates(self, client, stream_name, callback):
         extra_args = self._get_extra_args_any(callback, stream_name)
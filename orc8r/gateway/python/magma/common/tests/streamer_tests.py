@@ -0,0 +1,80 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+import unittest.mock
+
+import grpc
+from magma.common.streamer import StreamerClient
+
+
+class _RpcError(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return 'unavailable'
+
+
+class StreamerClientTests(unittest.TestCase):
+    """
+    Tests for the StreamerClient reconnection logic
+    """
+
+    def setUp(self):
+        self._callbacks = {
+            'stream1': unittest.mock.Mock(),
+            'stream2': unittest.mock.Mock(),
+        }
+        self._streamer = StreamerClient(self._callbacks,
+                                        unittest.mock.Mock())
+        self._streamer._reconnect_pause = 10
+        self._streamer._max_backoff = 100
+
+    def test_backoff(self):
+        """ Backoff doubles with each failure, with jitter, up to a cap """
+        for failures, cap in ((1, 10), (2, 20), (4, 80), (5, 100),
+                              (100, 100)):
+            for _ in range(20):
+                backoff = self._streamer.get_backoff(failures)
+                self.assertGreaterEqual(backoff, cap / 2)
+                self.assertLessEqual(backoff, cap)
+
+    @unittest.mock.patch('magma.common.streamer.StreamerStub')
+    @unittest.mock.patch('magma.common.streamer.ServiceRegistry')
+    def test_failing_stream(self, _registry_mock, stub_mock):
+        """ A failing stream doesn't prevent others from being processed """
+        stub_mock.return_value.GetUpdates.side_effect = \
+            lambda request, timeout: self._get_updates(request)
+        self._callbacks['stream1'].get_request_args.return_value = None
+        self._callbacks['stream2'].get_request_args.return_value = None
+
+        self.assertFalse(self._streamer.process_stream(
+            'stream1', self._callbacks['stream1']))
+        self.assertTrue(self._streamer.process_stream(
+            'stream2', self._callbacks['stream2']))
+        self._streamer._loop.call_soon_threadsafe.assert_called_once_with(
+            self._callbacks['stream2'].process_update, 'stream2', [], False)
+
+    @staticmethod
+    def _get_updates(request):
+        if request.stream_name == 'stream1':
+            raise _RpcError()
+        update_batch = unittest.mock.Mock()
+        update_batch.updates = []
+        update_batch.resync = False
+        return [update_batch]
+
+
+if __name__ == "__main__":
+    unittest.main()
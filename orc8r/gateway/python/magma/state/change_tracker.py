@@ -0,0 +1,189 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+import redis
+from redis.exceptions import RedisError
+
+# Keyspace events needed to see every write and deletion of a state key:
+# K (keyspace channel), $ (string commands), g (generic commands such as
+# DEL) and x (expirations). 'A' is an alias for all the command classes.
+REQUIRED_KEYSPACE_EVENTS = ('g', '$', 'x')
+
+# Seconds between two reads of the pending notifications. Redis buffers the
+# notifications until they are read, and drops the subscriber once its
+# 'client-output-buffer-limit pubsub' is exceeded, so they are read much
+# more often than the replication interval.
+DEFAULT_DRAIN_INTERVAL = 1
+
+
+class StateChangeTracker:
+    """
+    StateChangeTracker follows the writes and deletions of the replicated
+    state keys with Redis keyspace notifications, so that a replication
+    iteration only needs to visit the keys that changed since the previous
+    one. Writers don't need to cooperate, state written by other processes
+    (e.g. the MME) is tracked as well.
+
+    Notifications are only delivered while the tracker is subscribed: the
+    changes made before start() or while the connection was lost are not
+    known. pop_changes() returns None in these cases, and the caller has to
+    sweep all keys instead.
+
+    Redis buffers the notifications until they are read. The tracker reads
+    them every drain_interval seconds on the event loop, so the buffer only
+    holds the changes of a short burst. If a burst still overflows the
+    pubsub output buffer limit set in redis.conf, Redis disconnects the
+    subscriber, the next read fails and the tracker stops: the caller falls
+    back to a full sweep and starts the tracker again.
+
+    Keyspace notifications must be enabled in the Redis config with at least
+    the "Kg$x" flags. Otherwise the tracker doesn't start, and the caller
+    keeps sweeping all keys.
+    """
+
+    def __init__(self,
+                 client: redis.Redis,
+                 redis_types: Iterable[str],
+                 loop: asyncio.AbstractEventLoop,
+                 db: int = 0,
+                 drain_interval: float = DEFAULT_DRAIN_INTERVAL):
+        self._client = client
+        self._channel_prefix = '__keyspace@%d__:' % db
+        self._redis_types = list(redis_types)
+        self._loop = loop
+        self._drain_interval = drain_interval
+        self._drain_handle = None
+        self._pubsub = None
+        self._changes = defaultdict(set)  # {redis_type => {key}}
+        self._has_warned = False
+
+    @property
+    def is_tracking(self) -> bool:
+        return self._pubsub is not None
+
+    def start(self) -> bool:
+        """
+        Subscribe to the keyspace notifications of the tracked types,
+        changes made before the call are not tracked.
+
+        Returns False if keyspace notifications are not available.
+        """
+        self.stop()
+        try:
+            events = self._client.config_get('notify-keyspace-events')
+            flags = events.get('notify-keyspace-events', '')
+            if not _has_required_events(flags):
+                if not self._has_warned:
+                    logging.warning(
+                        "Redis keyspace notifications are disabled "
+                        "(notify-keyspace-events: '%s'), replicating state "
+                        "with full sweeps", flags)
+                    self._has_warned = True
+                return False
+            pubsub = self._client.pubsub()
+            pubsub.psubscribe(*[self._channel_prefix + '*:' + redis_type
+                                for redis_type in self._redis_types])
+        except RedisError as err:
+            logging.warning("Failed to subscribe to Redis keyspace "
+                            "notifications: %s", err)
+            return False
+        self._pubsub = pubsub
+        self._changes.clear()
+        self._schedule_drain()
+        return True
+
+    def stop(self) -> None:
+        """ Unsubscribe from the keyspace notifications """
+        if self._drain_handle is not None:
+            self._drain_handle.cancel()
+            self._drain_handle = None
+        if self._pubsub is None:
+            return
+        try:
+            self._pubsub.close()
+        except RedisError:
+            pass
+        self._pubsub = None
+
+    def mark_changed(self, redis_type: str, key: str) -> None:
+        """
+        Add *key* to the changes returned by the next pop_changes() call,
+        e.g. to retry the replication of a key that failed.
+        """
+        if self.is_tracking:
+            self._changes[redis_type].add(key)
+
+    def pop_changes(self) -> Optional[Dict[str, Set[str]]]:
+        """
+        Return the keys that changed since the previous call for each
+        tracked type, or None if changes may have been missed.
+        """
+        if not self._drain():
+            return None
+        changes = self._changes
+        self._changes = defaultdict(set)
+        return changes
+
+    def _schedule_drain(self) -> None:
+        self._drain_handle = self._loop.call_later(self._drain_interval,
+                                                   self._drain_periodically)
+
+    def _drain_periodically(self) -> None:
+        if self._drain():
+            self._schedule_drain()
+
+    def _drain(self) -> bool:
+        """
+        Read the pending notifications. Returns False, and stops the
+        tracker, if they can't be read.
+        """
+        if self._pubsub is None:
+            return False
+        try:
+            while True:
+                message = self._pubsub.get_message()
+                if message is None:
+                    break
+                self._handle_message(message)
+        except RedisError as err:
+            logging.warning("Lost Redis keyspace notifications: %s", err)
+            self.stop()
+            return False
+        return True
+
+    def _handle_message(self, message) -> None:
+        if message['type'] != 'pmessage':
+            return
+        channel = message['channel']
+        if isinstance(channel, bytes):
+            channel = channel.decode('utf-8')
+        composite_key = channel[len(self._channel_prefix):]
+        for redis_type in self._redis_types:
+            suffix = ':' + redis_type
+            if composite_key.endswith(suffix):
+                key = composite_key[:-len(suffix)]
+                # RedisFlatDict keys never contain ':'
+                if ':' not in key:
+                    self._changes[redis_type].add(key)
+                return
+
+
+def _has_required_events(flags: str) -> bool:
+    if 'K' not in flags:
+        return False
+    return 'A' in flags or all(event in flags
+                               for event in REQUIRED_KEYSPACE_EVENTS)
@@ -12,14 +12,17 @@ limitations under the License.
 """
 # pylint: disable=broad-except
 
+import asyncio
 import logging
 import json
 import jsonpickle
 import grpc
 
 from magma.common.grpc_client_manager import GRPCClientManager
+from magma.common.redis.client import get_default_client
 from magma.common.service import MagmaService
 from magma.common.sdwatchdog import SDWatchdogTask
+from magma.state.change_tracker import StateChangeTracker
 from magma.state.garbage_collector import GarbageCollector
 from magma.state.keys import make_mem_key, make_scoped_device_id
 from magma.state.redis_dicts import get_json_redis_dicts, \
@@ -34,11 +37,30 @@ from google.protobuf.json_format import MessageToDict
 DEFAULT_SYNC_INTERVAL = 60
 DEFAULT_GRPC_TIMEOUT = 10
 GARBAGE_COLLECTION_ITERATION_INTERVAL = 2
+# Sweep all keys every so many iterations even when changes are tracked
+FULL_SWEEP_ITERATION_INTERVAL = 10
+# Bounds of a single ReportStates request
+DEFAULT_REPORT_MAX_STATES = 500
+DEFAULT_REPORT_MAX_BYTES = 1024 * 1024
+# Number of ReportStates requests in flight
+DEFAULT_MAX_CONCURRENT_REPORTS = 4
+# Request metadata enabling gzip compression of a single call
+GZIP_COMPRESSION_METADATA = (('grpc-internal-encoding-request', 'gzip'),)
 
 class StateReplicator(SDWatchdogTask):
     """
     StateReplicator periodically fetches all configured state from Redis,
     reporting any updates to the Orchestrator State service.
+
+    When Redis keyspace notifications are enabled, only the keys that changed
+    since the previous iteration are fetched, and all keys are swept every
+    FULL_SWEEP_ITERATION_INTERVAL iterations, or when notifications were
+    lost.
+
+    States are reported in chunks bounded in number of states and bytes, a
+    few chunks at a time. The versions of a chunk are recorded as soon as it
+    is replicated, so a large report makes progress even if some chunks
+    fail.
     """
     def __init__(self,
                  service: MagmaService,
@@ -59,6 +81,29 @@ class StateReplicator(SDWatchdogTask):
         self._redis_dicts.extend(get_json_redis_dicts(service.config))
         # _grpc_client_manager to manage grpc client recyclings
         self._grpc_client_manager = grpc_client_manager
+        # Tracks the keys changed between replication iterations
+        self._change_tracker = StateChangeTracker(
+            get_default_client(),
+            [redis_dict.redis_type for redis_dict in self._redis_dicts],
+            service.loop)
+        # Number of incremental iterations before the next full sweep
+        self._iterations_until_full_sweep = 0
+        # Whether the current iteration visits all keys
+        self._has_swept_all_keys = False
+        # (type, deviceID) => (redis_dict, key) of the states being
+        # reported, to track them again if their replication fails
+        self._reported_keys = {}
+
+        # ReportStates chunking and compression
+        config = service.config
+        self._report_max_states = config.get('report_max_states',
+                                             DEFAULT_REPORT_MAX_STATES)
+        self._report_max_bytes = config.get('report_max_bytes',
+                                            DEFAULT_REPORT_MAX_BYTES)
+        self._max_concurrent_reports = config.get(
+            'max_concurrent_reports', DEFAULT_MAX_CONCURRENT_REPORTS)
+        self._report_metadata = GZIP_COMPRESSION_METADATA \
+            if config.get('compress_reports', False) else None
 
         # Flag to indicate if resync has completed successfully.
         # Replication cannot proceed until this flag is True
@@ -68,6 +113,10 @@ class StateReplicator(SDWatchdogTask):
         # collection
         self._replication_iteration = 0
 
+    def stop(self) -> None:
+        super().stop()
+        self._change_tracker.stop()
+
     async def _run(self):
         if not self._has_resync_completed:
             try:
@@ -90,8 +139,7 @@ class StateReplicator(SDWatchdogTask):
     async def _resync(self):
         states_to_sync = []
         for redis_dict in self._redis_dicts:
-            for key in redis_dict:
-                version = redis_dict.get_version(key)
+            for key, version in redis_dict.versions().items():
                 device_id = make_scoped_device_id(key, redis_dict.state_scope)
                 state_id = StateID(type=redis_dict.redis_type,
                                    deviceID=device_id)
@@ -123,18 +171,39 @@ class StateReplicator(SDWatchdogTask):
         logging.info("Successfully resynced state with Orchestrator!")
 
     async def _collect_states_to_replicate(self):
+        changes = self._pop_changes()
+        self._has_swept_all_keys = changes is None
         states_to_report = []
+        self._reported_keys = {}
         for redis_dict in self._redis_dicts:
-            for key in redis_dict:
+            if changes is None:
+                versions = redis_dict.versions()
+            else:
+                changed_keys = changes.get(redis_dict.redis_type, set())
+                versions = redis_dict.versions(changed_keys)
+                # Changed keys that were deleted or marked as garbage
+                for key in changed_keys - versions.keys():
+                    device_id = make_scoped_device_id(key,
+                                                      redis_dict.state_scope)
+                    self._state_versions.pop(
+                        make_mem_key(device_id, redis_dict.redis_type), None)
+
+            # Fetch the versions of the keys in one pass, then only the
+            # values of the keys that changed
+            changed_versions = {}
+            for key, redis_version in versions.items():
                 device_id = make_scoped_device_id(key, redis_dict.state_scope)
                 in_mem_key = make_mem_key(device_id, redis_dict.redis_type)
-                redis_version = redis_dict.get_version(key)
-                self._state_keys_from_current_iteration.add(in_mem_key)
+                if changes is None:
+                    self._state_keys_from_current_iteration.add(in_mem_key)
                 if in_mem_key in self._state_versions and \
                         self._state_versions[in_mem_key] == redis_version:
                     continue
+                changed_versions[key] = (device_id, redis_version)
 
-                redis_state = redis_dict.get(key)
+            changed_states = redis_dict.get_many(changed_versions)
+            for key, redis_state in changed_states.items():
+                device_id, redis_version = changed_versions[key]
                 if redis_dict.state_format == PROTO_FORMAT:
                     state_to_serialize = MessageToDict(redis_state)
                     serialized_json_state = json.dumps(state_to_serialize)
@@ -146,6 +215,8 @@ class StateReplicator(SDWatchdogTask):
                       version=redis_version)
 
                 states_to_report.append(state_proto)
+                self._reported_keys[(redis_dict.redis_type, device_id)] = \
+                    (redis_dict, key)
 
         if len(states_to_report) == 0:
             logging.debug("Not replicating state. No state has changed!")
@@ -153,17 +224,57 @@ class StateReplicator(SDWatchdogTask):
         return ReportStatesRequest(states=states_to_report)
 
     async def _send_to_state_service(self, request: ReportStatesRequest):
+        chunks = self._split_request(request)
+        if len(chunks) > 1:
+            logging.info("Replicating %d states in %d chunks",
+                         len(request.states), len(chunks))
+        semaphore = asyncio.Semaphore(self._max_concurrent_reports)
+        await asyncio.gather(*[self._send_chunk(chunk, semaphore)
+                               for chunk in chunks])
+
+    def _split_request(self, request: ReportStatesRequest):
+        """
+        Split the states of request into requests of at most
+        report_max_states states and report_max_bytes bytes. A state larger
+        than report_max_bytes is sent on its own.
+        """
+        chunks = []
+        chunk = ReportStatesRequest()
+        chunk_size = 0
+        for state in request.states:
+            state_size = state.ByteSize()
+            if chunk.states and (
+                    len(chunk.states) >= self._report_max_states or
+                    chunk_size + state_size > self._report_max_bytes):
+                chunks.append(chunk)
+                chunk = ReportStatesRequest()
+                chunk_size = 0
+            chunk.states.extend([state])
+            chunk_size += state_size
+        if chunk.states:
+            chunks.append(chunk)
+        return chunks
+
+    async def _send_chunk(self, request: ReportStatesRequest,
+                          semaphore: asyncio.Semaphore):
+        async with semaphore:
+            await self._report_states(request)
+
+    async def _report_states(self, request: ReportStatesRequest):
         state_client = self._grpc_client_manager.get_client()
         try:
             response = await grpc_async_wrapper(
                 state_client.ReportStates.future(
                     request,
                     DEFAULT_GRPC_TIMEOUT,
+                    metadata=self._report_metadata,
                 ),
                 self._loop)
 
         except grpc.RpcError as err:
             logging.error("GRPC call failed for state replication: %s", err)
+            for state in request.states:
+                self._track_unreplicated_state(state.type, state.deviceID)
         else:
             unreplicated_states = set()
             for idAndError in response.unreportedStates:
@@ -171,6 +282,8 @@ class StateReplicator(SDWatchdogTask):
                     "Failed to replicate state for (%s,%s): %s",
                     idAndError.type, idAndError.deviceID, idAndError.error)
                 unreplicated_states.add((idAndError.type, idAndError.deviceID))
+                self._track_unreplicated_state(idAndError.type,
+                                               idAndError.deviceID)
             # Update in-memory map for successfully reported states
             for state in request.states:
                 if (state.type, state.deviceID) in unreplicated_states:
@@ -187,7 +300,33 @@ class StateReplicator(SDWatchdogTask):
             # reset timeout to config-specified + some buffer
             self.set_timeout(self._interval * 2)
 
+    def _pop_changes(self):
+        """
+        Return the keys changed since the previous iteration for each redis
+        type, or None if all keys have to be swept.
+        """
+        changes = None
+        if self._iterations_until_full_sweep > 0:
+            changes = self._change_tracker.pop_changes()
+        if changes is None:
+            # Subscribe before sweeping, so that no change is missed
+            self._change_tracker.start()
+            self._iterations_until_full_sweep = FULL_SWEEP_ITERATION_INTERVAL
+        else:
+            self._iterations_until_full_sweep -= 1
+        return changes
+
+    def _track_unreplicated_state(self, state_type: str, device_id: str):
+        """ Collect the state again in the next iteration """
+        reported = self._reported_keys.get((state_type, device_id))
+        if reported is not None:
+            redis_dict, key = reported
+            self._change_tracker.mark_changed(redis_dict.redis_type, key)
+
     async def _cleanup_deleted_keys(self):
+        if not self._has_swept_all_keys:
+            # Deleted keys of an incremental iteration are already removed
+            return
         deleted_keys = set(self._state_versions) - \
             self._state_keys_from_current_iteration
         for key in deleted_keys:
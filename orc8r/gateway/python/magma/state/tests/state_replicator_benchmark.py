@@ -0,0 +1,102 @@
+"""
+Copyright 2020 The Magma Authors.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark of a StateReplicator iteration with 100k keys and 1% churn, with
+full sweeps and with keyspace notification driven change tracking.
+
+Not collected by the unit test runner, run it explicitly with:
+    python3 -m pytest -s magma/state/tests/state_replicator_benchmark.py
+
+Besides the collection time, the number of values fetched from Redis is
+reported.
+"""
+
+import asyncio
+import time
+from unittest import TestCase, mock
+from unittest.mock import MagicMock
+
+from magma.common.redis.client import get_default_client
+from magma.common.redis.containers import RedisFlatDict
+from magma.common.redis.mocks.mock_redis import MockRedis
+from magma.common.redis.serializers import get_proto_deserializer, \
+    get_proto_serializer, RedisSerde
+from magma.state.keys import make_mem_key
+from magma.state.state_replicator import StateReplicator
+from orc8r.protos.common_pb2 import NetworkID
+
+NID_TYPE = 'network_id'
+NUM_KEYS = 100 * 1000
+CHURN = 0.01
+
+
+class _CountingMockRedis(MockRedis):
+    fetched = 0
+
+    def mget(self, keys):
+        _CountingMockRedis.fetched += len(keys)
+        return super().mget(keys)
+
+
+class StateReplicatorBenchmark(TestCase):
+
+    @mock.patch("redis.Redis", _CountingMockRedis)
+    def _run(self, notify_keyspace_events):
+        MockRedis.redis.clear()
+        MockRedis.notify_keyspace_events = notify_keyspace_events
+        loop = asyncio.new_event_loop()
+        service = MagicMock()
+        service.config = {
+            'state_protos': [{'proto_file': 'orc8r.protos.common_pb2',
+                              'proto_msg': 'NetworkID',
+                              'redis_key': NID_TYPE,
+                              'state_scope': 'network'}],
+        }
+        service.loop = loop
+        replicator = StateReplicator(service, MagicMock(), MagicMock())
+        serde = RedisSerde(NID_TYPE, get_proto_serializer(),
+                           get_proto_deserializer(NetworkID))
+        nid_dict = RedisFlatDict(get_default_client(), serde)
+        for i in range(NUM_KEYS):
+            nid_dict['id%d' % i] = NetworkID(id='foo')
+
+        def collect():
+            _CountingMockRedis.fetched = 0
+            start = time.perf_counter()
+            req = loop.run_until_complete(
+                replicator._collect_states_to_replicate())
+            elapsed = time.perf_counter() - start
+            # Mark the states as replicated
+            for state in req.states:
+                mem_key = make_mem_key(state.deviceID, state.type)
+                replicator._state_versions[mem_key] = state.version
+            return len(req.states), elapsed, _CountingMockRedis.fetched
+
+        # The first iteration always sweeps all keys
+        collect()
+        for i in range(0, NUM_KEYS, int(1 / CHURN)):
+            nid_dict['id%d' % i] = NetworkID(id='bar')
+        reported, elapsed, fetched = collect()
+        self.assertEqual(NUM_KEYS * CHURN, reported)
+
+        replicator.stop()
+        loop.close()
+        MockRedis.notify_keyspace_events = ''
+        MockRedis.redis.clear()
+        return elapsed, fetched
+
+    def test_collect_with_churn(self):
+        for name, events in (('full sweep', ''), ('change tracking', 'Kg$x')):
+            elapsed, fetched = self._run(events)
+            print('\n%s: %d keys, %.1f%% churn, %.1f ms per iteration, '
+                  '%d values fetched'
+                  % (name, NUM_KEYS, CHURN * 100, elapsed * 1e3, fetched))
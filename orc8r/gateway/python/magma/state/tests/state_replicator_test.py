@@ -29,8 +29,10 @@ from magma.common.redis.serializers import get_proto_deserializer, \
 from magma.common.grpc_client_manager import GRPCClientManager
 from magma.state.keys import make_mem_key
 from magma.state.garbage_collector import GarbageCollector
-from magma.state.state_replicator import StateReplicator
+from magma.state.state_replicator import GZIP_COMPRESSION_METADATA, \
+    StateReplicator
 from magma.common.redis.mocks.mock_redis import MockRedis
+from redis.exceptions import RedisError
 from orc8r.protos.state_pb2_grpc import StateServiceStub
 from orc8r.protos.common_pb2 import NetworkID, IDList
 from google.protobuf.json_format import MessageToDict
@@ -419,3 +421,158 @@ class StateReplicatorTests(TestCase):
         # Cancel the replicator's loop so there are no other activities
         self.state_replicator._periodic_task.cancel()
         self.loop.run_until_complete(test())
+
+    @mock.patch("redis.Redis", MockRedis)
+    @mock.patch('snowflake.snowflake', get_mock_snowflake)
+    @mock.patch('magma.magmad.state_reporter.ServiceRegistry.get_rpc_channel')
+    def test_chunked_compressed_report(self, get_grpc_mock):
+        async def test():
+            get_grpc_mock.return_value = self.channel
+            self.nid_client.clear()
+            self.idlist_client.clear()
+            self.log_client.clear()
+            self.foo_client.clear()
+
+            self.state_replicator._report_max_states = 2
+            self.state_replicator._report_metadata = \
+                GZIP_COMPRESSION_METADATA
+            for i in range(5):
+                self.nid_client['id%d' % i] = NetworkID(id='foo')
+            # Set state that will be 'unreplicated'
+            self.log_client['id1'] = LogVerbosity(verbosity=5)
+
+            req = await self.state_replicator._collect_states_to_replicate()
+            self.assertEqual(6, len(req.states))
+            chunks = self.state_replicator._split_request(req)
+            self.assertEqual([2, 2, 2],
+                             [len(chunk.states) for chunk in chunks])
+            # Chunks are also bounded in size, a state larger than the
+            # bound is sent on its own
+            self.state_replicator._report_max_states = 100
+            self.state_replicator._report_max_bytes = 1
+            chunks = self.state_replicator._split_request(req)
+            self.assertEqual(6, len(chunks))
+            self.state_replicator._report_max_states = 2
+
+            # The failed state doesn't prevent the others from replicating
+            await self.state_replicator._send_to_state_service(req)
+            self.assertEqual(5, len(self.state_replicator._state_versions))
+            req = await self.state_replicator._collect_states_to_replicate()
+            self.assertEqual(1, len(req.states))
+            self.assertEqual(LOG_TYPE, req.states[0].type)
+
+        # Cancel the replicator's loop so there are no other activities
+        self.state_replicator._periodic_task.cancel()
+        self.loop.run_until_complete(test())
+
+
+class IncrementalStateReplicatorTests(StateReplicatorTests):
+    """
+    Run the StateReplicator tests with Redis keyspace notifications enabled,
+    so that only the first replication iteration sweeps all keys
+    """
+    @mock.patch("redis.Redis", MockRedis)
+    def setUp(self):
+        MockRedis.notify_keyspace_events = 'Kg$x'
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        MockRedis.notify_keyspace_events = ''
+
+    @mock.patch("redis.Redis", MockRedis)
+    @mock.patch('snowflake.snowflake', get_mock_snowflake)
+    @mock.patch('magma.magmad.state_reporter.ServiceRegistry.get_rpc_channel')
+    def test_only_changed_keys_collected(self, get_grpc_mock):
+        async def test():
+            get_grpc_mock.return_value = self.channel
+            self.nid_client.clear()
+            self.idlist_client.clear()
+            self.log_client.clear()
+            self.foo_client.clear()
+
+            for i in range(10):
+                self.nid_client['id%d' % i] = NetworkID(id='foo')
+            req = await self.state_replicator._collect_states_to_replicate()
+            self.assertEqual(10, len(req.states))
+            await self.state_replicator._send_to_state_service(req)
+
+            # Incremental iterations don't scan Redis
+            self.nid_client['id3'] = NetworkID(id='bar')
+            with mock.patch.object(MockRedis, 'scan_iter') as scan_iter:
+                req = await self.state_replicator.\
+                    _collect_states_to_replicate()
+                scan_iter.assert_not_called()
+            self.assertEqual(1, len(req.states))
+            self.assertEqual('id3', req.states[0].deviceID)
+            self.assertEqual(2, req.states[0].version)
+            await self.state_replicator._send_to_state_service(req)
+
+            req = await self.state_replicator._collect_states_to_replicate()
+            self.assertIsNone(req)
+
+        # Cancel the replicator's loop so there are no other activities
+        self.state_replicator._periodic_task.cancel()
+        self.loop.run_until_complete(test())
+
+    @mock.patch("redis.Redis", MockRedis)
+    @mock.patch('snowflake.snowflake', get_mock_snowflake)
+    @mock.patch('magma.magmad.state_reporter.ServiceRegistry.get_rpc_channel')
+    def test_notifications_drained_between_iterations(self, get_grpc_mock):
+        async def test():
+            get_grpc_mock.return_value = self.channel
+            self.nid_client.clear()
+            tracker = self.state_replicator._change_tracker
+            tracker._drain_interval = 0.01
+
+            req = await self.state_replicator._collect_states_to_replicate()
+            self.assertIsNone(req)
+            pubsub = tracker._pubsub
+            self.nid_client['id1'] = NetworkID(id='foo')
+            self.assertTrue(pubsub.messages)
+            # Redis only has to buffer the notifications of a short burst
+            await asyncio.sleep(0.05)
+            self.assertFalse(pubsub.messages)
+
+            req = await self.state_replicator._collect_states_to_replicate()
+            self.assertEqual(['id1'],
+                             [state.deviceID for state in req.states])
+
+        # Cancel the replicator's loop so there are no other activities
+        self.state_replicator._periodic_task.cancel()
+        self.loop.run_until_complete(test())
+
+    @mock.patch("redis.Redis", MockRedis)
+    @mock.patch('snowflake.snowflake', get_mock_snowflake)
+    @mock.patch('magma.magmad.state_reporter.ServiceRegistry.get_rpc_channel')
+    def test_lost_notifications_sweep_all_keys(self, get_grpc_mock):
+        async def test():
+            get_grpc_mock.return_value = self.channel
+            self.nid_client.clear()
+            tracker = self.state_replicator._change_tracker
+            tracker._drain_interval = 0.01
+
+            req = await self.state_replicator._collect_states_to_replicate()
+            self.assertIsNone(req)
+            self.nid_client['id1'] = NetworkID(id='foo')
+
+            # Redis disconnects a subscriber over its output buffer limit
+            with mock.patch.object(
+                    tracker._pubsub, 'get_message',
+                    side_effect=RedisError('Connection closed by server')):
+                await asyncio.sleep(0.05)
+            self.assertFalse(tracker.is_tracking)
+
+            with mock.patch.object(MockRedis, 'scan_iter',
+                                   wraps=self.nid_client.redis.scan_iter) \
+                    as scan_iter:
+                req = await self.state_replicator.\
+                    _collect_states_to_replicate()
+                scan_iter.assert_called()
+            self.assertEqual(['id1'],
+                             [state.deviceID for state in req.states])
+            self.assertTrue(tracker.is_tracking)
+
+        # Cancel the replicator's loop so there are no other activities
+        self.state_replicator._periodic_task.cancel()
+        self.loop.run_until_complete(test())